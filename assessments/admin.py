@@ -29,3 +29,5 @@ from assessments.models import *
 
 admin.site.register(score_sheet_address.ScoreSheetAddress,
                     score_sheet_address.ScoreSheetAddressAdmin)
+admin.site.register(session_exam_progress.SessionExamProgress,
+                    session_exam_progress.SessionExamProgressAdmin)
@@ -24,16 +24,38 @@
 #
 ##############################################################################
 import copy
+import itertools
 import unicodedata
-from decimal import Decimal, Context, Inexact
+from decimal import Decimal, Context, Inexact, InvalidOperation
+from typing import List
 
+from django.core.exceptions import ValidationError
 from django.db import transaction
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
+from assessments.models import session_exam_progress
 from base.models import academic_year, session_exam_calendar, exam_enrollment, tutor, offer_year, \
     learning_unit_year
 from base.auth.roles import program_manager
 from base.models.enums import exam_enrollment_justification_type
+from base.models.exam_enrollment import ExamEnrollment
+from base.models.session_exam_deadline import SessionExamDeadline
+
+SUBMITTED_FIELDS = [
+    'score_reencoded',
+    'justification_reencoded',
+    'score_draft',
+    'justification_draft',
+    'score_final',
+    'justification_final',
+    'changed',
+]
+
+UPDATED = 'UPDATED'
+UNCHANGED = 'UNCHANGED'
+NOT_MODIFIABLE = 'NOT_MODIFIABLE'
+ERROR = 'ERROR'
 
 
 def get_scores_encoding_list(user, **kwargs):
@@ -123,14 +145,81 @@ def find_related_learning_unit_years(scores_encoding_list):
             for enrollment in scores_encoding_list.enrollments}
 
 
-def update_enrollments(scores_encoding_list, user):
+def submit_enrollments(scores_encoding_list, user) -> 'EnrollmentsSubmissionReport':
+    """
+    Validate all the encoded scores in memory, then save the modified enrollments (and their history when encoded by a
+    program manager) in bulk. Invalid rows do not prevent the valid ones to be saved : the outcome of each row is
+    given in the report.
+    """
     is_program_manager = program_manager.is_program_manager(user)
-    updated_enrollments = []
-    for enrollment in scores_encoding_list.enrollments:
-        enrollment_updated = update_enrollment(enrollment, user, is_program_manager)
-        if enrollment_updated:
-            updated_enrollments.append(enrollment_updated)
-    return updated_enrollments
+    report = validate_enrollments(scores_encoding_list, is_program_manager)
+    updated_enrollments = report.updated_enrollments
+    if updated_enrollments:
+        now = timezone.now()
+        for enrollment in updated_enrollments:
+            enrollment.changed = now
+        with transaction.atomic():
+            ExamEnrollment.objects.bulk_update(updated_enrollments, SUBMITTED_FIELDS)
+            if is_program_manager:
+                exam_enrollment.bulk_create_exam_enrollment_historic(user, updated_enrollments)
+            if session_exam_progress.is_enabled():
+                session_exam_progress.refresh({enrollment.session_exam_id for enrollment in updated_enrollments})
+    return report
+
+
+def validate_enrollments(scores_encoding_list, is_program_manager) -> 'EnrollmentsSubmissionReport':
+    """ Compute the outcome of the submission of each encoded score without saving anything """
+    _preload_session_exam_deadlines(scores_encoding_list.enrollments)
+    return EnrollmentsSubmissionReport([
+        _validate_enrollment_submission(enrollment, is_program_manager)
+        for enrollment in scores_encoding_list.enrollments
+    ])
+
+
+def _validate_enrollment_submission(enrollment, is_program_manager) -> 'EnrollmentSubmissionResult':
+    try:
+        enrollment_cleaned = clean_score_and_justification(enrollment)
+        if not can_modify_exam_enrollment(enrollment_cleaned, is_program_manager):
+            return EnrollmentSubmissionResult(enrollment, NOT_MODIFIABLE)
+        if not is_enrollment_changed(enrollment_cleaned, is_program_manager):
+            return EnrollmentSubmissionResult(enrollment, UNCHANGED)
+        _assign_score_and_justification(enrollment_cleaned, is_program_manager)
+        enrollment_cleaned.full_clean()
+        if not enrollment_cleaned.justification_valid():
+            raise ValueError(_('Invalid justification value'))
+    except InvalidOperation:
+        return EnrollmentSubmissionResult(enrollment, ERROR, error=_("Scores must be between 0 and 20"))
+    except (ValueError, ValidationError) as e:
+        error_msg = e.messages[0] if isinstance(e, ValidationError) else e.args[0]
+        return EnrollmentSubmissionResult(enrollment, ERROR, error=error_msg)
+    return EnrollmentSubmissionResult(enrollment_cleaned, UPDATED)
+
+
+def _preload_session_exam_deadlines(enrollments):
+    """ Fetch in one query the deadlines of the enrollments which were not loaded with them """
+    offer_enrollments_by_session = {}
+    for enrollment in enrollments:
+        offer_enrollment = enrollment.learning_unit_enrollment.offer_enrollment
+        if not hasattr(offer_enrollment, 'session_exam_deadlines'):
+            # Several enrollments can hold their own instance of the same offer enrollment
+            offer_enrollments_by_session.setdefault(
+                enrollment.session_exam.number_session, {}
+            ).setdefault(offer_enrollment.pk, []).append(offer_enrollment)
+
+    for number_session, offer_enrollments in offer_enrollments_by_session.items():
+        deadlines = SessionExamDeadline.objects.filter(
+            offer_enrollment_id__in=offer_enrollments.keys(),
+            number_session=number_session
+        ).order_by('offer_enrollment_id')
+        deadlines_by_offer_enrollment = {
+            offer_enrollment_id: list(offer_enrollment_deadlines)
+            for offer_enrollment_id, offer_enrollment_deadlines in itertools.groupby(
+                deadlines, key=lambda deadline: deadline.offer_enrollment_id
+            )
+        }
+        for offer_enrollment_id, instances in offer_enrollments.items():
+            for offer_enrollment in instances:
+                offer_enrollment.session_exam_deadlines = deadlines_by_offer_enrollment.get(offer_enrollment_id, [])
 
 
 def assign_encoded_to_reencoded_enrollments(scores_encoding_list):
@@ -146,25 +235,6 @@ def assign_encoded_to_reencoded_enrollments(scores_encoding_list):
     return scores_encoding_list
 
 
-def update_enrollment(enrollment, user, is_program_manager=None):
-    if is_program_manager is None:
-        is_program_manager = program_manager.is_program_manager(user)
-
-    enrollment = clean_score_and_justification(enrollment)
-
-    if can_modify_exam_enrollment(enrollment, is_program_manager) and \
-            is_enrollment_changed(enrollment, is_program_manager):
-
-        with transaction.atomic():
-            enrollment_updated = set_score_and_justification(enrollment, is_program_manager)
-
-            if is_program_manager:
-                exam_enrollment.create_exam_enrollment_historic(user, enrollment)
-
-            return enrollment_updated
-    return None
-
-
 def clean_score_and_justification(enrollment):
     is_decimal_scores_authorized = enrollment.learning_unit_enrollment.learning_unit_year.decimal_scores
 
@@ -236,7 +306,7 @@ def is_deadline_reached(enrollment, is_program_manager=True):
         return exam_enrollment.is_deadline_tutor_reached(enrollment)
 
 
-def set_score_and_justification(enrollment, is_program_manager):
+def _assign_score_and_justification(enrollment, is_program_manager):
     enrollment.score_reencoded = None
     enrollment.justification_reencoded = None
     enrollment.score_draft = enrollment.score_encoded
@@ -245,11 +315,25 @@ def set_score_and_justification(enrollment, is_program_manager):
         enrollment.score_final = enrollment.score_encoded
         enrollment.justification_final = enrollment.justification_encoded
 
-    #Validation
-    enrollment.full_clean()
-    enrollment.save()
 
-    return enrollment
+class EnrollmentSubmissionResult:
+    def __init__(self, enrollment, status, error=None):
+        self.enrollment = enrollment
+        self.status = status
+        self.error = error
+
+
+class EnrollmentsSubmissionReport:
+    def __init__(self, results: List[EnrollmentSubmissionResult]):
+        self.results = results
+
+    @property
+    def updated_enrollments(self):
+        return [result.enrollment for result in self.results if result.status == UPDATED]
+
+    @property
+    def errors(self):
+        return [result for result in self.results if result.status == ERROR]
 
 
 class ScoresEncodingList:
@@ -30,6 +30,7 @@ from typing import List
 import attr
 from django.db.models import OuterRef, Subquery, Q, Count, F
 
+from assessments.models import session_exam_progress
 from attribution.models import attribution
 from base.auth.roles import program_manager
 from base.models import offer_year, exam_enrollment, tutor
@@ -42,6 +43,11 @@ from base.models.tutor import Tutor
 
 
 def get_scores_encoding_progress(user, offer_year_id, number_session, academic_year, learning_unit_year_ids=None):
+    if session_exam_progress.is_enabled():
+        queryset = _search_session_exam_progress(user, offer_year_id, number_session, academic_year,
+                                                 learning_unit_year_ids)
+        return _sort_by_acronym([ScoreEncodingProgress(obj) for obj in queryset])
+
     queryset = exam_enrollment.get_progress_by_learning_unit_years_and_offer_years(
         user=user,
         offer_year_id=offer_year_id,
@@ -54,6 +60,26 @@ def get_scores_encoding_progress(user, offer_year_id, number_session, academic_y
     return _sort_by_acronym([ScoreEncodingProgress(obj) for obj in queryset])
 
 
+def _search_session_exam_progress(user, offer_year_id, number_session, academic_year, learning_unit_year_ids):
+    """ Filters of exam_enrollment.get_progress_by_learning_unit_years_and_offer_years on the maintained progress """
+    if offer_year_id:
+        offer_year_ids = [offer_year_id]
+    else:
+        offer_year_ids = offer_year.find_by_user(user).values_list('id', flat=True)
+
+    if learning_unit_year_ids is None and not program_manager.is_program_manager(user):
+        tutor_user = tutor.find_by_user(user)
+        if tutor_user:
+            learning_unit_year_ids = [luy.pk for luy in attribution.find_by_tutor(tutor_user)]
+
+    return session_exam_progress.search(
+        number_session=number_session,
+        academic_year=academic_year,
+        offer_year_ids=offer_year_ids,
+        learning_unit_year_ids=learning_unit_year_ids,
+    )
+
+
 def find_related_offer_years(score_encoding_progress_list):
     all_offers_ids = [score_encoding_progress.offer_year_id for score_encoding_progress in score_encoding_progress_list]
     return OfferYear.objects.filter(pk__in=all_offers_ids).order_by('acronym')
@@ -63,6 +89,16 @@ def find_related_tutors(user, academic_year, session_exam_number):
     # Find all offer managed by current user
     offer_year_ids = list(offer_year.find_by_user(user).values_list('id', flat=True))
 
+    if session_exam_progress.is_enabled():
+        learning_unit_year_ids = list(
+            session_exam_progress.search(number_session=session_exam_number, academic_year=academic_year,
+                                         offer_year_ids=offer_year_ids)
+            .order_by('learning_unit_year_id').distinct('learning_unit_year_id')
+            .values_list('learning_unit_year_id', flat=True)
+        )
+        tutors = tutor.find_by_learning_unit(learning_unit_year_ids)
+        return sorted(tutors, key=_order_by_last_name_and_first_name)
+
     learning_unit_year_ids = list(exam_enrollment.find_for_score_encodings(session_exam_number=session_exam_number,
                                                                       academic_year=academic_year,
                                                                       offers_year=offer_year_ids,
@@ -28,6 +28,7 @@ import logging
 
 from django.conf import settings
 
+from assessments.models import session_exam_progress
 from base.models import session_exam_calendar, offer_year_calendar
 from base.models.enums import academic_calendar_type as ac_type
 from base.models.session_exam_deadline import SessionExamDeadline
@@ -37,8 +38,9 @@ logger = logging.getLogger(settings.DEFAULT_LOGGER)
 
 def recompute_all_deadlines(academic_calendar):
     if academic_calendar.reference == ac_type.SCORES_EXAM_SUBMISSION:
-        for off_year_cal in academic_calendar.offeryearcalendar_set.all():
-            compute_deadline(off_year_cal)
+        with session_exam_progress.defer_refresh():
+            for off_year_cal in academic_calendar.offeryearcalendar_set.all():
+                compute_deadline(off_year_cal)
 
 
 def compute_deadline_by_student(session_exam_deadline):
@@ -90,18 +92,19 @@ def _impact_scores_encodings_deadlines(oyc):
 
 
 def _save_new_deadlines(sessions_exam_deadlines, end_date_academic, end_date_offer_year, tutor_submission_date):
-    for sess_exam_deadline in sessions_exam_deadlines:
-        end_date_student = _one_day_before(sess_exam_deadline.deliberation_date)
-
-        new_deadline = min(filter(None, (_get_date_instance(end_date_academic),
-                                         _get_date_instance(end_date_offer_year),
-                                         _get_date_instance(end_date_student))))
-        new_deadline_tutor = _compute_delta_deadline_tutor(new_deadline, tutor_submission_date)
-
-        if _is_deadline_changed(sess_exam_deadline, new_deadline, new_deadline_tutor):
-            sess_exam_deadline.deadline = new_deadline
-            sess_exam_deadline.deadline_tutor = new_deadline_tutor
-            sess_exam_deadline.save()
+    with session_exam_progress.defer_refresh():
+        for sess_exam_deadline in sessions_exam_deadlines:
+            end_date_student = _one_day_before(sess_exam_deadline.deliberation_date)
+
+            new_deadline = min(filter(None, (_get_date_instance(end_date_academic),
+                                             _get_date_instance(end_date_offer_year),
+                                             _get_date_instance(end_date_student))))
+            new_deadline_tutor = _compute_delta_deadline_tutor(new_deadline, tutor_submission_date)
+
+            if _is_deadline_changed(sess_exam_deadline, new_deadline, new_deadline_tutor):
+                sess_exam_deadline.deadline = new_deadline
+                sess_exam_deadline.deadline_tutor = new_deadline_tutor
+                sess_exam_deadline.save()
 
 
 def _is_deadline_changed(sess_exam_deadline, new_deadline, new_deadline_tutor):
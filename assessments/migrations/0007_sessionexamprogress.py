@@ -0,0 +1,39 @@
+# Generated by Django 2.2.13 on 2026-10-18 18:20
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0566_searchindexentry'),
+        ('assessments', '0006_auto_20190802_1104'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SessionExamProgress',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('number_session', models.IntegerField()),
+                ('total_exam_enrollments', models.PositiveIntegerField(default=0)),
+                ('exam_enrollments_encoded', models.PositiveIntegerField(default=0)),
+                ('draft_scores', models.PositiveIntegerField(default=0)),
+                ('scores_not_yet_submitted', models.PositiveIntegerField(default=0)),
+                ('deadline', models.DateField(blank=True, null=True)),
+                ('deadline_tutor', models.IntegerField(blank=True, null=True)),
+                ('changed', models.DateTimeField(auto_now=True)),
+                ('learning_unit_year', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='base.LearningUnitYear')),
+                ('offer_year', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='base.OfferYear')),
+                ('session_exam', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='base.SessionExam')),
+            ],
+            options={
+                'unique_together': {('session_exam', 'offer_year')},
+            },
+        ),
+        migrations.AddIndex(
+            model_name='sessionexamprogress',
+            index=models.Index(fields=['number_session', 'learning_unit_year'], name='session_exam_progress_luy'),
+        ),
+    ]
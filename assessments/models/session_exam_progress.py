@@ -0,0 +1,251 @@
+##############################################################################
+#
+#    OSIS stands for Open Student Information System. It's an application
+#    designed to manage the core business of higher education institutions,
+#    such as universities, faculties, institutes and professional schools.
+#    The core business involves the administration of students, teachers,
+#    courses, programs and so on.
+#
+#    Copyright (C) 2015-2020 Université catholique de Louvain (http://www.uclouvain.be)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    A copy of this license - GNU General Public License - is available
+#    at the root of the source code of this program.  If not,
+#    see http://www.gnu.org/licenses/.
+#
+##############################################################################
+import contextlib
+import functools
+import itertools
+import operator
+import threading
+from typing import Iterable, Set, Tuple
+
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models import Case, Count, F, IntegerField, Q, QuerySet, Sum, When
+
+from base.models.enums import exam_enrollment_state
+from base.models.exam_enrollment import ExamEnrollment
+from base.models.session_exam import SessionExam
+from base.models.session_exam_deadline import compute_deadline_tutor
+from osis_common.models.osis_model_admin import OsisModelAdmin
+
+SCORE_SUBMITTED = Q(score_final__isnull=False) | Q(justification_final__isnull=False)
+SCORE_NOT_SUBMITTED = Q(score_final__isnull=True) & Q(justification_final__isnull=True)
+DRAFT_NOT_SUBMITTED = (Q(score_draft__isnull=False) | Q(justification_draft__isnull=False)) & SCORE_NOT_SUBMITTED
+
+OFFER_YEAR_LOOKUP = 'learning_unit_enrollment__offer_enrollment__offer_year_id'
+DEADLINE_LOOKUP = 'learning_unit_enrollment__offer_enrollment__sessionexamdeadline'
+
+REBUILD_BATCH_SIZE = 500
+
+_deferred = threading.local()
+
+
+class SessionExamProgressAdmin(OsisModelAdmin):
+    list_display = ('session_exam', 'offer_year', 'exam_enrollments_encoded', 'draft_scores',
+                    'total_exam_enrollments', 'deadline', 'changed')
+    list_filter = ('number_session', 'learning_unit_year__academic_year')
+    raw_id_fields = ('session_exam', 'offer_year', 'learning_unit_year')
+    search_fields = ['learning_unit_year__acronym', 'offer_year__acronym']
+
+
+class SessionExamProgress(models.Model):
+    """
+    Score encoding progress of the enrolled students of an offer year to a session exam, maintained in the
+    transaction which changes the exam enrollments. The earliest deadline (and its tutor delta) of the students
+    is kept so that the progress page needs no subquery on the deadlines.
+    """
+    session_exam = models.ForeignKey('base.SessionExam', on_delete=models.CASCADE)
+    offer_year = models.ForeignKey('base.OfferYear', on_delete=models.CASCADE)
+    learning_unit_year = models.ForeignKey('base.LearningUnitYear', on_delete=models.CASCADE)
+    number_session = models.IntegerField()
+    total_exam_enrollments = models.PositiveIntegerField(default=0)
+    exam_enrollments_encoded = models.PositiveIntegerField(default=0)
+    draft_scores = models.PositiveIntegerField(default=0)
+    scores_not_yet_submitted = models.PositiveIntegerField(default=0)
+    deadline = models.DateField(blank=True, null=True)
+    deadline_tutor = models.IntegerField(blank=True, null=True)  # Delta day(s)
+    changed = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('session_exam', 'offer_year')
+        indexes = [
+            models.Index(fields=['number_session', 'learning_unit_year'], name='session_exam_progress_luy'),
+        ]
+
+    def __str__(self):
+        return "{} - {}".format(self.session_exam, self.offer_year)
+
+
+def is_enabled() -> bool:
+    return getattr(settings, 'SCORE_ENCODING_PROGRESS_AGGREGATE_ENABLED', False)
+
+
+def refresh(session_exam_ids: Iterable[int]) -> None:
+    """ Recompute, in the current transaction, the progress of the session exams """
+    session_exam_ids = sorted({session_exam_id for session_exam_id in session_exam_ids if session_exam_id})
+    if not session_exam_ids:
+        return
+    with transaction.atomic():
+        # Lock the session exams so that concurrent refreshes of the same progress rows are serialized
+        list(SessionExam.objects.select_for_update().filter(pk__in=session_exam_ids).order_by('pk')
+             .values_list('pk', flat=True))
+        SessionExamProgress.objects.filter(session_exam_id__in=session_exam_ids).delete()
+        SessionExamProgress.objects.bulk_create(
+            _compute_progress(ExamEnrollment.objects.filter(session_exam_id__in=session_exam_ids))
+        )
+
+
+@contextlib.contextmanager
+def defer_refresh():
+    """
+    Within the block, the changed session exams are collected and their progress is recomputed once, at the end of
+    the block. Meant for the loops saving the exam enrollments or the deadlines one by one.
+    When the block raises, the refresh is left to the commit of the changes already saved (if any).
+    """
+    if getattr(_deferred, 'changes', None) is not None:
+        yield
+        return
+    changes = _deferred.changes = {'session_exam_ids': set(), 'offer_enrollments': set()}
+    try:
+        yield
+    except Exception:
+        transaction.on_commit(lambda: _refresh_changes(changes))
+        raise
+    finally:
+        _deferred.changes = None
+    _refresh_changes(changes)
+
+
+def _refresh_changes(changes: dict) -> None:
+    refresh(changes['session_exam_ids'] | _find_session_exam_ids(changes['offer_enrollments']))
+
+
+def schedule_refresh(session_exam_ids: Iterable[int]) -> None:
+    """ Recompute the progress of the session exams now, or at the end of the enclosing defer_refresh block """
+    changes = getattr(_deferred, 'changes', None)
+    if changes is None:
+        refresh(session_exam_ids)
+    else:
+        changes['session_exam_ids'].update(session_exam_ids)
+
+
+def schedule_refresh_by_offer_enrollment(offer_enrollment_id: int, number_session: int) -> None:
+    """ Same as schedule_refresh for the session exams where the student of the offer enrollment is enrolled """
+    changes = getattr(_deferred, 'changes', None)
+    if changes is None:
+        refresh(_find_session_exam_ids({(offer_enrollment_id, number_session)}))
+    else:
+        changes['offer_enrollments'].add((offer_enrollment_id, number_session))
+
+
+def _find_session_exam_ids(offer_enrollments: Iterable[Tuple[int, int]]) -> Set[int]:
+    """ :param offer_enrollments: (offer enrollment id, number session) pairs """
+    offer_enrollment_ids_by_session = {}
+    for offer_enrollment_id, number_session in offer_enrollments:
+        offer_enrollment_ids_by_session.setdefault(number_session, set()).add(offer_enrollment_id)
+    if not offer_enrollment_ids_by_session:
+        return set()
+    condition = functools.reduce(operator.or_, (
+        Q(learning_unit_enrollment__offer_enrollment_id__in=offer_enrollment_ids, session_exam__number_session=nb)
+        for nb, offer_enrollment_ids in offer_enrollment_ids_by_session.items()
+    ))
+    return set(ExamEnrollment.objects.filter(condition).values_list('session_exam_id', flat=True).distinct())
+
+
+def rebuild() -> int:
+    """ Recompute the progress of all the session exams. Return the number of progress rows created """
+    session_exam_ids = list(
+        ExamEnrollment.objects.order_by('session_exam_id').values_list('session_exam_id', flat=True).distinct()
+    )
+    with transaction.atomic():
+        SessionExamProgress.objects.all().delete()
+        rows_count = 0
+        for offset in range(0, len(session_exam_ids), REBUILD_BATCH_SIZE):
+            batch_ids = session_exam_ids[offset:offset + REBUILD_BATCH_SIZE]
+            rows = SessionExamProgress.objects.bulk_create(
+                _compute_progress(ExamEnrollment.objects.filter(session_exam_id__in=batch_ids))
+            )
+            rows_count += len(rows)
+    return rows_count
+
+
+def search(number_session: int, academic_year=None, offer_year_ids=None, learning_unit_year_ids=None) -> QuerySet:
+    """
+    Progress rows annotated like the result of exam_enrollment.get_progress_by_learning_unit_years_and_offer_years
+    :param offer_year_ids: Filter on a list of offer year ids (no filter if None)
+    :param learning_unit_year_ids: Filter on a list of learning unit year ids (no filter if None)
+    """
+    queryset = SessionExamProgress.objects.filter(number_session=number_session, total_exam_enrollments__gt=0)
+    if academic_year:
+        queryset = queryset.filter(learning_unit_year__academic_year=academic_year)
+    if offer_year_ids is not None:
+        queryset = queryset.filter(offer_year__in=offer_year_ids)
+    if learning_unit_year_ids is not None:
+        queryset = queryset.filter(learning_unit_year__in=learning_unit_year_ids)
+    return queryset.annotate(
+        learning_unit_year_acronym=F('learning_unit_year__acronym'),
+        learning_unit_year_specific_title=F('learning_unit_year__specific_title'),
+        learning_container_year_common_title=F('learning_unit_year__learning_container_year__common_title'),
+    )
+
+
+def _compute_progress(exam_enrollments: QuerySet) -> Iterable[SessionExamProgress]:
+    exam_enrollments = exam_enrollments.filter(enrollment_state=exam_enrollment_state.ENROLLED)
+    earliest_deadlines = _get_earliest_deadlines(exam_enrollments)
+    counts = exam_enrollments.values(
+        'session_exam_id',
+        'session_exam__number_session',
+        'session_exam__learning_unit_year_id',
+        offer_year=F(OFFER_YEAR_LOOKUP),
+    ).annotate(
+        total_exam_enrollments=Count('id'),
+        exam_enrollments_encoded=_count_if(SCORE_SUBMITTED),
+        draft_scores=_count_if(DRAFT_NOT_SUBMITTED),
+        scores_not_yet_submitted=_count_if(SCORE_NOT_SUBMITTED),
+    ).order_by()
+    for row in counts:
+        deadline, deadline_tutor = earliest_deadlines.get((row['session_exam_id'], row['offer_year']), (None, None))
+        yield SessionExamProgress(
+            session_exam_id=row['session_exam_id'],
+            offer_year_id=row['offer_year'],
+            learning_unit_year_id=row['session_exam__learning_unit_year_id'],
+            number_session=row['session_exam__number_session'],
+            total_exam_enrollments=row['total_exam_enrollments'],
+            exam_enrollments_encoded=row['exam_enrollments_encoded'],
+            draft_scores=row['draft_scores'],
+            scores_not_yet_submitted=row['scores_not_yet_submitted'],
+            deadline=deadline,
+            deadline_tutor=deadline_tutor,
+        )
+
+
+def _get_earliest_deadlines(exam_enrollments: QuerySet) -> dict:
+    """ Return the earliest (deadline, deadline_tutor) of the students by (session exam id, offer year id) """
+    deadlines = exam_enrollments.filter(**{
+        DEADLINE_LOOKUP + '__number_session': F('session_exam__number_session')
+    }).values_list(
+        'session_exam_id', OFFER_YEAR_LOOKUP, DEADLINE_LOOKUP + '__deadline', DEADLINE_LOOKUP + '__deadline_tutor',
+    ).order_by('session_exam_id', OFFER_YEAR_LOOKUP).distinct()
+    return {
+        key: min(
+            ((deadline, deadline_tutor) for _, _, deadline, deadline_tutor in rows),
+            key=lambda row: (row[0], compute_deadline_tutor(*row) or row[0])
+        )
+        for key, rows in itertools.groupby(deadlines, key=lambda row: (row[0], row[1]))
+    }
+
+
+def _count_if(condition: Q) -> Sum:
+    return Sum(Case(When(condition, then=1), default=0, output_field=IntegerField()))
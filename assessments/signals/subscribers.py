@@ -23,9 +23,13 @@
 #    see http://www.gnu.org/licenses/.
 #
 ##############################################################################
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
 from assessments.business import scores_encodings_deadline
+from assessments.models import session_exam_progress
+from base.models.exam_enrollment import ExamEnrollment
+from base.models.session_exam_deadline import SessionExamDeadline
 from base.signals import publisher
 
 
@@ -42,3 +46,16 @@ def compute_student_score_encoding_deadline(sender, **kwargs):
 @receiver(publisher.compute_all_scores_encodings_deadlines)
 def compute_all_scores_encodings_deadlines(sender, **kwargs):
     scores_encodings_deadline.recompute_all_deadlines(kwargs['academic_calendar'])
+
+
+@receiver([post_save, post_delete], sender=ExamEnrollment)
+def _exam_enrollment_changed(sender, instance, **kwargs):
+    if session_exam_progress.is_enabled():
+        session_exam_progress.schedule_refresh([instance.session_exam_id])
+
+
+@receiver([post_save, post_delete], sender=SessionExamDeadline)
+def _session_exam_deadline_changed(sender, instance, **kwargs):
+    if session_exam_progress.is_enabled():
+        session_exam_progress.schedule_refresh_by_offer_enrollment(instance.offer_enrollment_id,
+                                                                   instance.number_session)
@@ -1,10 +1,17 @@
 from assessments.calendar.scores_diffusion_calendar import ScoresDiffusionCalendar
 from assessments.calendar.scores_exam_submission_calendar import ScoresExamSubmissionCalendar
 from backoffice.celery import app as celery_app
+from base.business.event_perms import verify_academic_event_indexes
 
 
 @celery_app.task
 def run() -> dict:
     ScoresDiffusionCalendar.ensure_consistency_until_n_plus_6()
     ScoresExamSubmissionCalendar.ensure_consistency_until_n_plus_6()
+    changed_references = verify_academic_event_indexes([
+        ScoresDiffusionCalendar.event_reference,
+        ScoresExamSubmissionCalendar.event_reference,
+    ])
+    if changed_references:
+        return {'Academic calendars changed without being saved': changed_references}
     return {}
@@ -28,6 +28,13 @@ import decimal
 from django.test import TestCase
 
 from assessments.business import score_encoding_list
+from base.models.exam_enrollment import ExamEnrollment, ExamEnrollmentHistory
+from base.tests.factories.exam_enrollment import ExamEnrollmentFactory
+from base.tests.factories.offer_enrollment import OfferEnrollmentFactory
+from base.tests.factories.person import PersonFactory
+from base.tests.factories.program_manager import ProgramManagerFactory
+from base.tests.factories.session_exam_deadline import SessionExamDeadlineFactory
+from base.tests.factories.session_examen import SessionExamFactory
 
 
 class TestConvertToDecimal(TestCase):
@@ -45,3 +52,72 @@ class TestConvertToDecimal(TestCase):
     def test_when_deciamls_unauthorized(self):
         with self.assertRaises(ValueError):
             score_encoding_list._convert_to_decimal(float(15.555), False)
+
+
+class TestSubmitEnrollments(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.program_manager = ProgramManagerFactory(person=PersonFactory())
+        cls.user = cls.program_manager.person.user
+
+    def setUp(self):
+        self.enrollment_valid = ExamEnrollmentFactory()
+        self.enrollment_invalid = ExamEnrollmentFactory()
+        self.enrollment_unchanged = ExamEnrollmentFactory(score_final=decimal.Decimal(10))
+
+    def _encode(self, enrollment, score):
+        enrollment.score_encoded = score
+        enrollment.justification_encoded = None
+        return enrollment
+
+    def test_should_save_valid_rows_and_report_invalid_ones(self):
+        scores_list = score_encoding_list.ScoresEncodingList(enrollments=[
+            self._encode(self.enrollment_valid, '12'),
+            self._encode(self.enrollment_invalid, '25'),
+            self._encode(self.enrollment_unchanged, '10'),
+        ])
+
+        report = score_encoding_list.submit_enrollments(scores_list, self.user)
+
+        self.assertEqual(
+            [result.status for result in report.results],
+            [score_encoding_list.UPDATED, score_encoding_list.ERROR, score_encoding_list.UNCHANGED]
+        )
+        self.assertEqual([e.pk for e in report.updated_enrollments], [self.enrollment_valid.pk])
+        self.assertEqual(len(report.errors), 1)
+        self.assertEqual(ExamEnrollment.objects.get(pk=self.enrollment_valid.pk).score_final, decimal.Decimal(12))
+        self.assertIsNone(ExamEnrollment.objects.get(pk=self.enrollment_invalid.pk).score_final)
+
+    def test_should_create_history_for_each_updated_enrollment_of_program_manager(self):
+        scores_list = score_encoding_list.ScoresEncodingList(enrollments=[
+            self._encode(self.enrollment_valid, '12'),
+            self._encode(self.enrollment_invalid, '14'),
+        ])
+
+        score_encoding_list.submit_enrollments(scores_list, self.user)
+
+        self.assertCountEqual(
+            ExamEnrollmentHistory.objects.values_list('exam_enrollment_id', flat=True),
+            [self.enrollment_valid.pk, self.enrollment_invalid.pk]
+        )
+
+
+class TestPreloadSessionExamDeadlines(TestCase):
+    def test_should_preload_deadline_on_each_instance_of_the_same_offer_enrollment(self):
+        offer_enrollment = OfferEnrollmentFactory()
+        session_exam = SessionExamFactory(number_session=1)
+        deadline = SessionExamDeadlineFactory(offer_enrollment=offer_enrollment, number_session=1)
+        for _ in range(2):
+            ExamEnrollmentFactory(
+                session_exam=session_exam,
+                learning_unit_enrollment__offer_enrollment=offer_enrollment
+            )
+        enrollments = list(ExamEnrollment.objects.select_related(
+            'session_exam', 'learning_unit_enrollment__offer_enrollment'
+        ))
+
+        with self.assertNumQueries(1):
+            score_encoding_list._preload_session_exam_deadlines(enrollments)
+
+        for enrollment in enrollments:
+            self.assertEqual(enrollment.learning_unit_enrollment.offer_enrollment.session_exam_deadlines, [deadline])
@@ -25,7 +25,7 @@
 ##############################################################################
 from random import randint
 
-from django.test import TestCase
+from django.test import TestCase, override_settings
 
 from assessments.business import score_encoding_progress
 from attribution.tests.factories.attribution import AttributionFactory
@@ -222,3 +222,8 @@ class ScoreEncodingProgressTest(TestCase):
                 exam_enrollment.score_final = randint(0, 20)
                 exam_enrollment.save()
                 counter_filled -= 1
+
+
+@override_settings(SCORE_ENCODING_PROGRESS_AGGREGATE_ENABLED=True)
+class ScoreEncodingProgressAggregateTest(ScoreEncodingProgressTest):
+    """ Same progress computed from the progress maintained by session exam and offer year """
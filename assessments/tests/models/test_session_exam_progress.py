@@ -0,0 +1,152 @@
+##############################################################################
+#
+#    OSIS stands for Open Student Information System. It's an application
+#    designed to manage the core business of higher education institutions,
+#    such as universities, faculties, institutes and professional schools.
+#    The core business involves the administration of students, teachers,
+#    courses, programs and so on.
+#
+#    Copyright (C) 2015-2020 Université catholique de Louvain (http://www.uclouvain.be)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    A copy of this license - GNU General Public License - is available
+#    at the root of the source code of this program.  If not,
+#    see http://www.gnu.org/licenses/.
+#
+##############################################################################
+import datetime
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from assessments.models import session_exam_progress
+from assessments.models.session_exam_progress import SessionExamProgress
+from base.models.enums import exam_enrollment_justification_type, exam_enrollment_state, number_session
+from base.models.exam_enrollment import ExamEnrollment
+from base.tests.factories.exam_enrollment import ExamEnrollmentFactory
+from base.tests.factories.learning_unit_enrollment import LearningUnitEnrollmentFactory
+from base.tests.factories.learning_unit_year import LearningUnitYearFactory
+from base.tests.factories.offer_enrollment import OfferEnrollmentFactory
+from base.tests.factories.offer_year import OfferYearFactory
+from base.tests.factories.session_exam_deadline import SessionExamDeadlineFactory
+from base.tests.factories.session_examen import SessionExamFactory
+
+
+@override_settings(SCORE_ENCODING_PROGRESS_AGGREGATE_ENABLED=True)
+class SessionExamProgressTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.learning_unit_year = LearningUnitYearFactory()
+        cls.session_exam = SessionExamFactory(number_session=number_session.ONE,
+                                              learning_unit_year=cls.learning_unit_year)
+        cls.offer_year = OfferYearFactory(academic_year=cls.learning_unit_year.academic_year)
+        cls.enrollments = [cls._create_exam_enrollment(cls.offer_year) for _ in range(4)]
+
+    @classmethod
+    def _create_exam_enrollment(cls, offer_year, **kwargs):
+        offer_enrollment = OfferEnrollmentFactory(offer_year=offer_year)
+        return ExamEnrollmentFactory(
+            session_exam=cls.session_exam,
+            learning_unit_enrollment=LearningUnitEnrollmentFactory(offer_enrollment=offer_enrollment,
+                                                                   learning_unit_year=cls.learning_unit_year),
+            **kwargs
+        )
+
+    def _get_progress(self, offer_year=None):
+        return SessionExamProgress.objects.get(session_exam=self.session_exam, offer_year=offer_year or self.offer_year)
+
+    def test_progress_updated_when_scores_saved(self):
+        self.enrollments[0].score_draft = 12
+        self.enrollments[0].save()
+        self.enrollments[1].score_final = 15
+        self.enrollments[1].save()
+        self.enrollments[2].justification_final = exam_enrollment_justification_type.ABSENCE_UNJUSTIFIED
+        self.enrollments[2].save()
+
+        progress = self._get_progress()
+        self.assertEqual(progress.total_exam_enrollments, 4)
+        self.assertEqual(progress.exam_enrollments_encoded, 2)
+        self.assertEqual(progress.draft_scores, 1)
+        self.assertEqual(progress.scores_not_yet_submitted, 2)
+        self.assertEqual(progress.learning_unit_year, self.learning_unit_year)
+        self.assertEqual(progress.number_session, number_session.ONE)
+
+    def test_only_enrolled_students_counted(self):
+        self.enrollments[0].enrollment_state = exam_enrollment_state.NOT_ENROLLED
+        self.enrollments[0].save()
+        self.assertEqual(self._get_progress().total_exam_enrollments, 3)
+
+    def test_progress_by_offer_year(self):
+        other_offer_year = OfferYearFactory(academic_year=self.learning_unit_year.academic_year)
+        self._create_exam_enrollment(other_offer_year, score_final=10)
+
+        self.assertEqual(self._get_progress().total_exam_enrollments, 4)
+        other_progress = self._get_progress(other_offer_year)
+        self.assertEqual(other_progress.total_exam_enrollments, 1)
+        self.assertEqual(other_progress.exam_enrollments_encoded, 1)
+
+    def test_earliest_deadline_kept(self):
+        for enrollment, deadline in zip(self.enrollments, [datetime.date(2020, 6, 20), datetime.date(2020, 6, 10)]):
+            SessionExamDeadlineFactory(offer_enrollment=enrollment.learning_unit_enrollment.offer_enrollment,
+                                       number_session=number_session.ONE, deadline=deadline, deadline_tutor=2)
+        SessionExamDeadlineFactory(offer_enrollment=self.enrollments[2].learning_unit_enrollment.offer_enrollment,
+                                   number_session=number_session.TWO, deadline=datetime.date(2020, 1, 1))
+
+        progress = self._get_progress()
+        self.assertEqual(progress.deadline, datetime.date(2020, 6, 10))
+        self.assertEqual(progress.deadline_tutor, 2)
+
+    def test_progress_updated_on_bulk_update_and_refresh(self):
+        for enrollment in self.enrollments:
+            enrollment.score_final = 10
+        ExamEnrollment.objects.bulk_update(self.enrollments, ['score_final'])
+        self.assertEqual(self._get_progress().exam_enrollments_encoded, 0)
+
+        session_exam_progress.refresh([self.session_exam.pk])
+        self.assertEqual(self._get_progress().exam_enrollments_encoded, 4)
+
+    def test_refresh_deferred_to_the_end_of_the_block(self):
+        with mock.patch.object(session_exam_progress, 'refresh', wraps=session_exam_progress.refresh) as mock_refresh:
+            with session_exam_progress.defer_refresh():
+                for enrollment in self.enrollments:
+                    enrollment.score_final = 10
+                    enrollment.save()
+                    SessionExamDeadlineFactory(offer_enrollment=enrollment.learning_unit_enrollment.offer_enrollment,
+                                               number_session=number_session.ONE)
+                self.assertEqual(self._get_progress().exam_enrollments_encoded, 0)
+
+        mock_refresh.assert_called_once_with({self.session_exam.pk})
+        self.assertEqual(self._get_progress().exam_enrollments_encoded, 4)
+        self.assertIsNotNone(self._get_progress().deadline)
+
+    def test_search(self):
+        SessionExamFactory(number_session=number_session.TWO, learning_unit_year=self.learning_unit_year)
+
+        progress_list = list(session_exam_progress.search(
+            number_session=number_session.ONE,
+            academic_year=self.learning_unit_year.academic_year,
+            offer_year_ids=[self.offer_year.pk],
+        ))
+        self.assertEqual(len(progress_list), 1)
+        self.assertEqual(progress_list[0].learning_unit_year_acronym, self.learning_unit_year.acronym)
+        self.assertFalse(session_exam_progress.search(number_session=number_session.ONE, learning_unit_year_ids=[]))
+
+    def test_rebuild(self):
+        SessionExamProgress.objects.all().delete()
+        self.assertEqual(session_exam_progress.rebuild(), 1)
+        self.assertEqual(self._get_progress().scores_not_yet_submitted, 4)
+
+
+class SessionExamProgressDisabledTest(TestCase):
+    def test_progress_not_maintained(self):
+        ExamEnrollmentFactory()
+        self.assertFalse(SessionExamProgress.objects.exists())
@@ -32,7 +32,7 @@ from django.test import TestCase, TransactionTestCase
 from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
 
-from assessments.views.upload_xls_utils import _get_score_list_filtered_by_enrolled_state
+from assessments.views.upload_xls_utils import _get_score_list_filtered_by_enrolled_state, ScoreSheetImport
 from attribution.tests.factories.attribution import AttributionFactory
 from base.models.enums import exam_enrollment_state
 from base.models.enums import number_session, academic_calendar_type, exam_enrollment_justification_type
@@ -317,3 +317,48 @@ class TestUploadXls(MixinTestUploadScoresFile, TestCase):
     def _unsubscribe_one_student(self, exam):
         exam.enrollment_state = exam_enrollment_state.NOT_ENROLLED
         exam.save()
+
+
+class TestPreviewXls(MixinTestUploadScoresFile, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.preview_url = reverse('upload_encoding_preview',
+                                   kwargs={'learning_unit_year_id': self.learning_unit_year.id})
+
+    def test_with_correct_score_sheet_should_return_changes_without_saving(self):
+        with open("assessments/tests/resources/correct_score_sheet.xlsx", 'rb') as score_sheet:
+            response = self.client.post(self.preview_url, {'file': score_sheet})
+
+        self.assertEqual(response.status_code, 200)
+        preview = response.json()
+        self.assertEqual(preview['errors'], [])
+        self.assertCountEqual(
+            [(change['registration_id'], change['new_score'], change['new_justification']) for change in preview['changes']],
+            [
+                (REGISTRATION_ID_1, '16', None),
+                (REGISTRATION_ID_2, None, exam_enrollment_justification_type.ABSENCE_UNJUSTIFIED)
+            ]
+        )
+        self.assert_enrollments_equal(self.exam_enrollments, [("score_draft", None), ("justification_draft", None)])
+
+    def test_with_numbers_outside_scope_should_return_rows_in_error(self):
+        with open("assessments/tests/resources/incorrect_scores.xlsx", 'rb') as score_sheet:
+            response = self.client.post(self.preview_url, {'file': score_sheet})
+
+        self.assertEqual(
+            [error['row_number'] for error in response.json()['errors']],
+            [12, 13]
+        )
+
+
+class TestScoreSheetImport(TestCase):
+    def test_last_line_of_an_enrollment_encoded_several_times_wins(self):
+        score_sheet_import = ScoreSheetImport(mock.Mock(), is_program_manager=True)
+        enrollment_1, enrollment_1_again, enrollment_2 = mock.Mock(pk=1), mock.Mock(pk=1), mock.Mock(pk=2)
+
+        score_sheet_import.add_encoded_enrollment(12, enrollment_1)
+        score_sheet_import.add_encoded_enrollment(13, enrollment_2)
+        score_sheet_import.add_encoded_enrollment(14, enrollment_1_again)
+
+        self.assertListEqual(score_sheet_import._get_scores_encoding_list().enrollments,
+                             [enrollment_2, enrollment_1_again])
@@ -61,6 +61,8 @@ urlpatterns = [
             score_encoding.export_xls, name='scores_encoding_download'),
         url(r'^upload/(?P<learning_unit_year_id>[0-9]+)/$',
             upload_xls_utils.upload_scores_file, name='upload_encoding'),
+        url(r'^upload/(?P<learning_unit_year_id>[0-9]+)/preview/$',
+            upload_xls_utils.preview_scores_file, name='upload_encoding_preview'),
     ])),
 
     url(r'^offers/', include([
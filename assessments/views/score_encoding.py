@@ -25,6 +25,7 @@
 ##############################################################################
 import copy
 import logging
+import time
 import traceback
 
 import pika
@@ -45,18 +46,23 @@ import base
 from assessments.business import score_encoding_progress, score_encoding_list, score_encoding_export
 from assessments.business import score_encoding_sheet
 from assessments.models import score_sheet_address as score_sheet_address_mdl
+from assessments.models import session_exam_progress
 from attribution import models as mdl_attr
 from base import models as mdl
 from base.auth.roles import program_manager
 from base.models.enums import exam_enrollment_state as enrollment_states, exam_enrollment_state
 from base.models.person import Person
 from base.utils import send_mail
+from base.utils.queue_publisher import queue_publisher
 from osis_common.document import paper_sheet
-from osis_common.queue.queue_sender import send_message
 
 logger = logging.getLogger(settings.DEFAULT_LOGGER)
 queue_exception_logger = logging.getLogger(settings.QUEUE_EXCEPTION_LOGGER)
 
+# Attempts (and exponential backoff in seconds) to read the scores sheets data when the database connection is lost
+SCORES_SHEETS_DB_ATTEMPTS = 3
+SCORES_SHEETS_DB_RETRY_BACKOFF = 0.5
+
 
 def _is_inside_scores_encodings_period(user):
     return mdl.session_exam_calendar.current_session_exam()
@@ -220,7 +226,6 @@ def online_encoding(request, learning_unit_year_id=None):
 def online_encoding_form(request, learning_unit_year_id=None):
     template_name = "online_encoding_form.html"
     if request.method == 'POST':
-        updated_enrollments = None
         encoded_enrollment_ids = _extract_id_from_post_data(request)
         # Get only encoded from database
         scores_list_encoded = score_encoding_list.get_scores_encoding_list(
@@ -232,7 +237,7 @@ def online_encoding_form(request, learning_unit_year_id=None):
             request,
             scores_list_encoded.enrollments)
 
-        updated_enrollments = _update_enrollments(request, scores_list_encoded, updated_enrollments)
+        updated_enrollments = _update_enrollments(request, scores_list_encoded)
 
         context = _get_common_encoding_context(request, learning_unit_year_id)
         if messages.get_messages(request):
@@ -264,20 +269,21 @@ def online_encoding_submission(request, learning_unit_year_id):
         ex for ex in scores_list.enrollments
         if not ex.is_final and ex.enrollment_state == exam_enrollment_state.ENROLLED
     ])
-    for exam_enroll in draft_scores_not_sumitted_yet:
-        if (exam_enroll.score_draft is not None and exam_enroll.score_final is None) \
-                or (exam_enroll.justification_draft and not exam_enroll.justification_final):
-            submitted_enrollments.append(exam_enroll)
-            not_submitted_enrollments.remove(exam_enroll)
-        if exam_enroll.is_draft:
-            if exam_enroll.score_draft is not None:
-                exam_enroll.score_final = exam_enroll.score_draft
-            if exam_enroll.justification_draft:
-                exam_enroll.justification_final = exam_enroll.justification_draft
-            exam_enroll.full_clean()
-            with transaction.atomic():
-                exam_enroll.save()
-                mdl.exam_enrollment.create_exam_enrollment_historic(request.user, exam_enroll)
+    with session_exam_progress.defer_refresh():
+        for exam_enroll in draft_scores_not_sumitted_yet:
+            if (exam_enroll.score_draft is not None and exam_enroll.score_final is None) \
+                    or (exam_enroll.justification_draft and not exam_enroll.justification_final):
+                submitted_enrollments.append(exam_enroll)
+                not_submitted_enrollments.remove(exam_enroll)
+            if exam_enroll.is_draft:
+                if exam_enroll.score_draft is not None:
+                    exam_enroll.score_final = exam_enroll.score_draft
+                if exam_enroll.justification_draft:
+                    exam_enroll.justification_final = exam_enroll.justification_draft
+                exam_enroll.full_clean()
+                with transaction.atomic():
+                    exam_enroll.save()
+                    mdl.exam_enrollment.create_exam_enrollment_historic(request.user, exam_enroll)
 
     # Send mail to all the teachers of the submitted learning unit on any submission
     all_encoded = len(not_submitted_enrollments) == 0
@@ -310,10 +316,9 @@ def search_by_specific_criteria(request):
 @permission_required('assessments.can_access_scoreencoding', raise_exception=True)
 @user_passes_test(_is_inside_scores_encodings_period, login_url=reverse_lazy('outside_scores_encodings_period'))
 def specific_criteria_submission(request):
-    updated_enrollments = None
     scores_list_encoded = _get_score_encoding_list_with_only_enrollment_modified(request)
 
-    updated_enrollments = _update_enrollments(request, scores_list_encoded, updated_enrollments)
+    updated_enrollments = _update_enrollments(request, scores_list_encoded)
 
     if messages.get_messages(request):
         context = _get_specific_criteria_context(request)
@@ -361,10 +366,9 @@ def online_double_encoding_form(request, learning_unit_year_id=None):
 @transaction.non_atomic_requests
 def online_double_encoding_validation(request, learning_unit_year_id=None):
     if request.method == 'POST':
-        updated_enrollments = None
         scores_list_encoded = _get_score_encoding_list_with_only_enrollment_modified(request, learning_unit_year_id)
 
-        updated_enrollments = _update_enrollments(request, scores_list_encoded, updated_enrollments)
+        updated_enrollments = _update_enrollments(request, scores_list_encoded)
 
         if updated_enrollments:
             is_program_manager = program_manager.is_program_manager(request.user)
@@ -382,15 +386,18 @@ def online_double_encoding_validation(request, learning_unit_year_id=None):
     return HttpResponseRedirect(reverse('online_encoding', args=(learning_unit_year_id,)))
 
 
-def _update_enrollments(request, scores_list_encoded, updated_enrollments):
-    try:
-        updated_enrollments = score_encoding_list.update_enrollments(
-            scores_encoding_list=scores_list_encoded,
-            user=request.user)
-    except Exception as e:
-        error_msg = e.messages[0] if isinstance(e, ValidationError) else e.args[0]
-        messages.add_message(request, messages.ERROR, _(error_msg))
-    return updated_enrollments
+def _update_enrollments(request, scores_list_encoded):
+    report = score_encoding_list.submit_enrollments(
+        scores_encoding_list=scores_list_encoded,
+        user=request.user
+    )
+    error_messages = []
+    for result in report.errors:
+        error_msg = str(_(result.error))
+        if error_msg not in error_messages:
+            error_messages.append(error_msg)
+            messages.add_message(request, messages.ERROR, error_msg)
+    return report.updated_enrollments
 
 
 @login_required
@@ -449,7 +456,10 @@ def __send_messages_for_each_offer_year(
     """
     sent_error_messages = []
     offer_years = get_offer_years_from_enrollments(updated_enrollments)
+    if not offer_years:
+        return sent_error_messages
     score_sheet_addresses = score_sheet_address_mdl.search_from_offer_years(offer_years)
+    receivers = list(set([tutor.person for tutor in mdl.tutor.find_by_learning_unit(learning_unit_year)]))
     for offer_year in offer_years:
         score_sheet_address = next(
             (
@@ -462,6 +472,7 @@ def __send_messages_for_each_offer_year(
             all_enrollments,
             learning_unit_year,
             offer_year,
+            receivers,
             pgm_manager=pgm_manager,
             score_sheet_address=score_sheet_address
         )
@@ -479,6 +490,7 @@ def __send_message_for_offer_year(
         all_enrollments,
         learning_unit_year,
         offer_year,
+        receivers,
         pgm_manager: mdl.person.Person,
         score_sheet_address: score_sheet_address_mdl.ScoreSheetAddress = None
 ):
@@ -487,7 +499,6 @@ def __send_message_for_offer_year(
     offer_acronym = offer_year.acronym
     sent_error_message = None
     if progress == 100:
-        receivers = list(set([tutor.person for tutor in mdl.tutor.find_by_learning_unit(learning_unit_year)]))
         cc_list = [pgm_manager]
         if score_sheet_address and score_sheet_address.email:
             # Todo: Refactor CC list must not be a person but a list of email...
@@ -540,11 +551,12 @@ def bulk_send_messages_to_notify_encoding_progress(logged_user, updated_enrollme
     is_program_manager = program_manager.is_program_manager(logged_user)
     if is_program_manager:
         pgm_manager = mdl.person.find_by_user(logged_user)
-        mail_already_sent_by_learning_unit = set()
-        for enrollment in updated_enrollments:
+        updated_enrollments_by_learning_unit = {}
+        for enrollment in updated_enrollments or []:
             learning_unit_year = enrollment.learning_unit_enrollment.learning_unit_year
-            if learning_unit_year in mail_already_sent_by_learning_unit:
-                continue
+            updated_enrollments_by_learning_unit.setdefault(learning_unit_year, []).append(enrollment)
+
+        for learning_unit_year, learning_unit_updated_enrollments in updated_enrollments_by_learning_unit.items():
             scores_list = score_encoding_list.get_scores_encoding_list(
                 user=logged_user,
                 learning_unit_year_id=learning_unit_year.id
@@ -553,10 +565,9 @@ def bulk_send_messages_to_notify_encoding_progress(logged_user, updated_enrollme
                 scores_list.enrollments,
                 learning_unit_year,
                 is_program_manager,
-                updated_enrollments,
+                learning_unit_updated_enrollments,
                 pgm_manager=pgm_manager
             )
-            mail_already_sent_by_learning_unit.add(learning_unit_year)
 
 
 def send_messages_to_notify_encoding_progress(
@@ -677,51 +688,56 @@ def _get_score_encoding_list_with_only_enrollment_modified(request, learning_uni
 
 
 def get_json_data_scores_sheets(tutor_global_id):
-    try:
-        if isinstance(tutor_global_id, bytes):
-            tutor_global_id = tutor_global_id.decode('utf-8')
-        person = mdl.person.find_by_global_id(tutor_global_id)
-        tutor = mdl.tutor.find_by_person(person)
-        number_session = mdl.session_exam_calendar.find_session_exam_number()
-        academic_yr = mdl.academic_year.current_academic_year()
-
-        if tutor:
-            exam_enrollments = list(mdl.exam_enrollment.find_for_score_encodings(number_session,
-                                                                                 tutor=tutor,
-                                                                                 academic_year=academic_yr))
-            return score_encoding_sheet.scores_sheet_data(exam_enrollments, tutor=tutor)
-        else:
-
+    if isinstance(tutor_global_id, bytes):
+        tutor_global_id = tutor_global_id.decode('utf-8')
+    attempts = SCORES_SHEETS_DB_ATTEMPTS
+    for attempt in range(1, attempts + 1):
+        try:
+            return _get_json_data_scores_sheets(tutor_global_id)
+        except (PsycopOperationalError, PsycopInterfaceError, DjangoOperationalError, DjangoInterfaceError):
+            queue_exception_logger.error(
+                'Postgres Error during get_json_data_scores_sheets on global_id {} => {}'.format(
+                    tutor_global_id,
+                    'retried' if attempt < attempts else 'abandoned after {} attempts'.format(attempts)
+                )
+            )
+            trace = traceback.format_exc()
+            queue_exception_logger.error(trace)
+        except Exception:
+            logger.warning('(Not PostgresError) during get_json_data_scores_sheets on global_id {}'.format(
+                tutor_global_id
+            ))
+            trace = traceback.format_exc()
+            logger.error(trace)
             return {}
-    except (PsycopOperationalError, PsycopInterfaceError, DjangoOperationalError, DjangoInterfaceError):
-        queue_exception_logger.error(
-            'Postgres Error during get_json_data_scores_sheets on global_id {} => retried'.format(tutor_global_id)
-        )
-        trace = traceback.format_exc()
-        queue_exception_logger.error(trace)
-        return get_json_data_scores_sheets(tutor_global_id)
-    except Exception:
-        logger.warning('(Not PostgresError) during get_json_data_scores_sheets on global_id {}'.format(tutor_global_id))
-        trace = traceback.format_exc()
-        logger.error(trace)
+        finally:
+            close_old_connections()
+        if attempt < attempts:
+            time.sleep(SCORES_SHEETS_DB_RETRY_BACKOFF * 2 ** (attempt - 1))
+    return {}
+
+
+def _get_json_data_scores_sheets(tutor_global_id):
+    person = mdl.person.find_by_global_id(tutor_global_id)
+    tutor = mdl.tutor.find_by_person(person)
+    number_session = mdl.session_exam_calendar.find_session_exam_number()
+    academic_yr = mdl.academic_year.current_academic_year()
+
+    if tutor:
+        exam_enrollments = list(mdl.exam_enrollment.find_for_score_encodings(number_session,
+                                                                             tutor=tutor,
+                                                                             academic_year=academic_yr))
+        return score_encoding_sheet.scores_sheet_data(exam_enrollments, tutor=tutor)
+    else:
+
         return {}
-    finally:
-        close_old_connections()
 
 
 def send_json_scores_sheets_to_response_queue(global_id):
     data = get_json_data_scores_sheets(global_id)
-    credentials = pika.PlainCredentials(settings.QUEUES.get('QUEUE_USER'),
-                                        settings.QUEUES.get('QUEUE_PASSWORD'))
-    rabbit_settings = pika.ConnectionParameters(settings.QUEUES.get('QUEUE_URL'),
-                                                settings.QUEUES.get('QUEUE_PORT'),
-                                                settings.QUEUES.get('QUEUE_CONTEXT_ROOT'),
-                                                credentials)
     try:
-        connect = pika.BlockingConnection(rabbit_settings)
-        channel = connect.channel()
         queue_name = settings.QUEUES.get('QUEUES_NAME').get('SCORE_ENCODING_PDF_RESPONSE')
-        send_message(queue_name, data, connect, channel)
+        queue_publisher.publish(queue_name, data)
     except (RuntimeError, pika.exceptions.ConnectionClosed, pika.exceptions.ChannelClosed, pika.exceptions.AMQPError):
         logger.exception('Could not send back scores_sheets json in response queue for global_id {}'.format(global_id))
 
@@ -29,7 +29,7 @@ from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.core.exceptions import ValidationError
 from django.db import transaction
-from django.http import HttpResponseRedirect
+from django.http import HttpResponseRedirect, JsonResponse
 from django.urls import reverse
 from django.utils.translation import gettext as _
 from django.utils.translation import pgettext_lazy
@@ -88,9 +88,42 @@ def upload_scores_file(request, learning_unit_year_id=None):
     return HttpResponseRedirect(reverse('online_encoding', args=[learning_unit_year_id, ]))
 
 
-def _get_all_data(worksheet):
+@login_required
+@require_http_methods(["POST"])
+def preview_scores_file(request, learning_unit_year_id=None):
+    form = ScoreFileForm(request.POST, request.FILES)
+    if not form.is_valid():
+        error_msgs = [error_msg for error_msgs in form.errors.values() for error_msg in error_msgs]
+        return JsonResponse(_get_preview_without_changes(error_msgs), status=400)
+
+    try:
+        score_sheet_import = _prepare_xls_scores_import(request, request.FILES['file'], learning_unit_year_id)
+    except IndexError:
+        return JsonResponse(_get_preview_without_changes([_("Your excel file isn't well structured.")]), status=400)
+    if score_sheet_import is None:
+        error_msgs = [message.message for message in messages.get_messages(request)]
+        return JsonResponse(_get_preview_without_changes(error_msgs), status=400)
+    return JsonResponse(score_sheet_import.preview())
+
+
+def _get_preview_without_changes(error_msgs):
+    return {
+        'changes': [],
+        'errors': [{'row_number': None, 'message': "{}".format(error_msg)} for error_msg in error_msgs]
+    }
+
+
+def _read_rows(worksheet):
     """
     :param worksheet: The excel worksheet (containing examEnrollments/scores)
+    :return: The values of all the lines of the worksheet, read in a single pass.
+    """
+    return [tuple(cell.value for cell in row) for row in worksheet.rows]
+
+
+def _get_all_data(rows):
+    """
+    :param rows: The values of all the lines of the worksheet (containing examEnrollments/scores)
     :return: All learn_unit_acronyms, offer_acronyms, registration_ids, session and academic_years
              in all lines of the worksheet.
     """
@@ -100,35 +133,35 @@ def _get_all_data(worksheet):
     sessions = []
     academic_years = []
 
-    for count, row in enumerate(worksheet.rows):
+    for row in rows:
         if not _is_valid_registration_id(row):
             # In case of blank line or line that is not a examEnrollment
             continue
-        session = row[col_session].value
+        session = row[col_session]
         session = int(session) if isinstance(session, str) and session.isdigit() else session
         if session and session not in sessions:
             sessions.append(session)
 
         try:
             academic_year = None
-            if type(row[col_academic_year].value) is int:
-                academic_year = int(row[col_academic_year].value)
-            elif type(row[col_academic_year].value) is str:
-                academic_year = int(row[col_academic_year].value[:4])
+            if type(row[col_academic_year]) is int:
+                academic_year = int(row[col_academic_year])
+            elif type(row[col_academic_year]) is str:
+                academic_year = int(row[col_academic_year][:4])
             if academic_year and academic_year not in academic_years:
                 academic_years.append(academic_year)
         except (ValueError, TypeError):
             pass
 
-        learn_unit_acronym = row[col_learning_unit].value
+        learn_unit_acronym = row[col_learning_unit]
         if learn_unit_acronym and learn_unit_acronym not in learn_unit_acronyms:
             learn_unit_acronyms.append(learn_unit_acronym)
 
-        offer_acronym = row[col_offer].value
+        offer_acronym = row[col_offer]
         if offer_acronym and offer_acronym not in offer_acronyms:
             offer_acronyms.append(offer_acronym)
 
-        registration_id = row[col_registration_id].value
+        registration_id = row[col_registration_id]
         if registration_id and registration_id not in registration_ids:
             registration_ids.append(registration_id)
 
@@ -140,30 +173,52 @@ def _get_all_data(worksheet):
 
 
 def __save_xls_scores(request, file_name, learning_unit_year_id):
+    score_sheet_import = _prepare_xls_scores_import(request, file_name, learning_unit_year_id)
+    if score_sheet_import is None:
+        return False
+
+    new_scores_number = score_sheet_import.apply(request.user)
+
+    _show_error_messages(request, score_sheet_import.errors)
+
+    if new_scores_number:
+        messages.add_message(request, messages.SUCCESS, '%s %s' % (str(new_scores_number), _('Score(s) saved')))
+        if not score_sheet_import.is_program_manager:
+            __warn_that_score_responsibles_must_submit_scores(request, score_sheet_import.learning_unit_year)
+        return True
+    else:
+        messages.add_message(request, messages.ERROR, '%s' % _("No scores injected"))
+        return False
+
+
+def _prepare_xls_scores_import(request, file_name, learning_unit_year_id):
+    """
+    Read the score sheet and check all its lines against the enrollments managed by the user, without saving anything.
+    :return: The ScoreSheetImport to apply or None if the file cannot be imported (errors are added to messages)
+    """
     try:
         workbook = load_workbook(file_name, read_only=True, data_only=True)
     except KeyError:
         messages.add_message(request, messages.ERROR, _("The file must be a valid 'XLSX' excel file"))
-        return False
-    worksheet = workbook.active
-    new_scores_number = 0
+        return None
+    rows = _read_rows(workbook.active)
     learning_unit_year = mdl.learning_unit_year.get_by_id(learning_unit_year_id)
     is_program_manager = program_manager.is_program_manager(request.user)
 
-    data_xls = _get_all_data(worksheet)
+    data_xls = _get_all_data(rows)
 
     try:
         data_xls['session'] = _extract_session_number(data_xls)
         data_xls['academic_year'] = _extract_academic_year(data_xls)
     except Exception as e:
         messages.add_message(request, messages.ERROR, _(e.args[0]))
-        return False
+        return None
 
     academic_year_in_database = mdl.academic_year.find_academic_year_by_year(data_xls['academic_year'])
     if not academic_year_in_database:
         messages.add_message(request, messages.ERROR,
                              '%s (%s).' % (_("No data for this academic year"), data_xls['academic_year']))
-        return False
+        return None
 
     score_list = _get_score_list_filtered_by_enrolled_state(learning_unit_year_id, request.user)
 
@@ -174,9 +229,10 @@ def __save_xls_scores(request, file_name, learning_unit_year_id):
     registration_ids_managed_by_user = score_encoding_list.find_related_registration_ids(score_list)
 
     enrollments_grouped = _group_exam_enrollments_by_registration_id_and_learning_unit_year(score_list.enrollments)
-    errors_list = {}
+    emails_by_registration_id = _get_emails_by_registration_id(score_list.enrollments)
+    score_sheet_import = ScoreSheetImport(learning_unit_year, is_program_manager)
     # Iterates over the lines of the spreadsheet.
-    for count, row in enumerate(worksheet.rows):
+    for count, row in enumerate(rows):
         if _row_can_be_ignored(row):
             continue
 
@@ -187,23 +243,13 @@ def __save_xls_scores(request, file_name, learning_unit_year_id):
                                   learn_unit_acronyms_managed=learn_unit_acronyms_managed_by_user,
                                   registration_ids_managed=registration_ids_managed_by_user,
                                   learning_unit_year=learning_unit_year)
-            _check_consistency_data(row)
-            updated_row = _update_row(request.user, row, enrollments_grouped, is_program_manager)
-            if updated_row:
-                new_scores_number+=1
+            _check_consistency_data(row, emails_by_registration_id)
+            enrollment = _get_encoded_enrollment(row, enrollments_grouped, is_program_manager)
+            if enrollment:
+                score_sheet_import.add_encoded_enrollment(row_number, enrollment)
         except Exception as e:
-            errors_list[row_number] = e
-
-    _show_error_messages(request, errors_list)
-
-    if new_scores_number:
-        messages.add_message(request, messages.SUCCESS, '%s %s' % (str(new_scores_number), _('Score(s) saved')))
-        if not is_program_manager:
-            __warn_that_score_responsibles_must_submit_scores(request, learning_unit_year)
-        return True
-    else:
-        messages.add_message(request, messages.ERROR, '%s' % _("No scores injected"))
-        return False
+            score_sheet_import.errors[row_number] = e
+    return score_sheet_import
 
 
 def _extract_session_number(data_xls):
@@ -231,13 +277,13 @@ def _extract_academic_year(data_xls):
 
 def _extract_registration_id(row):
     if _is_valid_registration_id(row):
-        xls_registration_id = str(row[col_registration_id].value)
+        xls_registration_id = str(row[col_registration_id])
         return xls_registration_id.zfill(REGISTRATION_ID_LENGTH)
     return None
 
 
 def _extract_email(row):
-    return str(row[col_email].value)
+    return str(row[col_email])
 
 
 def _group_exam_enrollments_by_registration_id_and_learning_unit_year(enrollments):
@@ -249,23 +295,31 @@ def _group_exam_enrollments_by_registration_id_and_learning_unit_year(enrollment
     return exam_enrollments_by_registration_id
 
 
+def _get_emails_by_registration_id(enrollments):
+    return {
+        enrollment.learning_unit_enrollment.student.registration_id:
+            enrollment.learning_unit_enrollment.student.person.email
+        for enrollment in enrollments
+    }
+
+
 def _row_can_be_ignored(row):
     return not _is_valid_registration_id(row) or _is_empty_row(row)
 
 
 def _is_valid_registration_id(row):
-    registration_id_value = row[col_registration_id].value
+    registration_id_value = row[col_registration_id]
     return registration_id_value and str(registration_id_value).isdigit()
 
 
 def _is_empty_row(row):
-    return (row[col_score].value is None or row[col_score].value == '') and not row[col_justification].value
+    return (row[col_score] is None or row[col_score] == '') and not row[col_justification]
 
 
 def _check_intergity_data(row, **kwargs):
     xls_registration_id = _extract_registration_id(row)
-    xls_offer_year_acronym = row[col_offer].value
-    xls_learning_unit_acronym = row[col_learning_unit].value
+    xls_offer_year_acronym = row[col_offer]
+    xls_learning_unit_acronym = row[col_learning_unit]
     registration_ids_managed = kwargs.get('registration_ids_managed')
     learn_unit_acronyms_managed = kwargs.get('learn_unit_acronyms_managed')
     offer_acronyms_managed = kwargs.get('offer_acronyms_managed')
@@ -296,25 +350,24 @@ def _check_intergity_data(row, **kwargs):
             raise UploadValueError("%s" % _("Student not registered for exam"), messages.ERROR)
 
 
-def _check_consistency_data(row):
+def _check_consistency_data(row, emails_by_registration_id):
     xls_registration_id = _extract_registration_id(row)
     xls_email = _extract_email(row)
-    if not _registration_id_matches_email(xls_registration_id, xls_email):
+    if not _registration_id_matches_email(emails_by_registration_id.get(xls_registration_id), xls_email):
         raise UploadValueError("%s" % _("Registration ID does not match email"), messages.ERROR)
 
 
-def _registration_id_matches_email(registration_id, email):
-    student_by_registration_id = mdl.student.find_by_registration_id(registration_id)
+def _registration_id_matches_email(student_email, email):
     if email == 'None':
         email = ""
-    return str(student_by_registration_id.person.email).strip() == email.strip()
+    return str(student_email).strip() == email.strip()
 
 
-def _update_row(user, row, enrollments_managed_grouped, is_program_manager):
+def _get_encoded_enrollment(row, enrollments_managed_grouped, is_program_manager):
     xls_registration_id = _extract_registration_id(row)
-    xls_learning_unit_acronym = row[col_learning_unit].value
-    xls_score = _clean_value(row[col_score].value)
-    xls_justification = _clean_value(row[col_justification].value)
+    xls_learning_unit_acronym = row[col_learning_unit]
+    xls_score = _clean_value(row[col_score])
+    xls_justification = _clean_value(row[col_justification])
 
     key = "{}_{}".format(xls_registration_id, xls_learning_unit_acronym)
     enrollments = enrollments_managed_grouped.get(key, [])
@@ -336,16 +389,13 @@ def _update_row(user, row, enrollments_managed_grouped, is_program_manager):
         raise UploadValueError("%s" % _("You can't encode a 'score' and a 'justification' together"), messages.ERROR)
 
     if xls_justification and _is_informative_justification(enrollment, xls_justification, is_program_manager):
-       return False
+        return None
 
     enrollment.score_encoded = xls_score
     enrollment.justification_encoded = None
     if xls_justification:
         enrollment.justification_encoded = _get_justification_from_aliases(enrollment, xls_justification)
-    return score_encoding_list.update_enrollment(
-        enrollment=enrollment,
-        user=user
-    )
+    return enrollment
 
 
 def _clean_value(value):
@@ -429,6 +479,73 @@ def _get_score_list_filtered_by_enrolled_state(learning_unit_year_id, a_user):
     return score_list
 
 
+class ScoreSheetImport:
+    """
+    Scores read from a score sheet, checked against the enrollments managed by the user, waiting to be applied.
+    """
+    def __init__(self, learning_unit_year, is_program_manager):
+        self.learning_unit_year = learning_unit_year
+        self.is_program_manager = is_program_manager
+        self.errors = {}
+        self._encoded_enrollments_by_pk = {}
+
+    def add_encoded_enrollment(self, row_number, enrollment):
+        # When an enrollment is encoded on several lines, the last one wins (and keeps the position of its line)
+        self._encoded_enrollments_by_pk.pop(enrollment.pk, None)
+        self._encoded_enrollments_by_pk[enrollment.pk] = (row_number, enrollment)
+
+    def _get_scores_encoding_list(self):
+        return score_encoding_list.ScoresEncodingList(
+            learning_unit_year=self.learning_unit_year,
+            enrollments=[enrollment for __, enrollment in self._encoded_enrollments_by_pk.values()]
+        )
+
+    def _results_by_encoded_row(self, report):
+        return zip(self._encoded_enrollments_by_pk.values(), report.results)
+
+    def preview(self):
+        """
+        :return: The changes which would be applied by the import, line by line, and the lines in error
+        """
+        report = score_encoding_list.validate_enrollments(self._get_scores_encoding_list(), self.is_program_manager)
+        changes = []
+        errors = {row_number: _extract_error_message(error) for row_number, error in self.errors.items()}
+        for (row_number, old_enrollment), result in self._results_by_encoded_row(report):
+            if result.status == score_encoding_list.ERROR:
+                errors[row_number] = _(result.error)
+                continue
+            changes.append({
+                'row_number': row_number,
+                'registration_id': old_enrollment.learning_unit_enrollment.student.registration_id,
+                'status': result.status,
+                'old_score': self._get_score(old_enrollment),
+                'old_justification': self._get_justification(old_enrollment),
+                'new_score': self._get_score(result.enrollment),
+                'new_justification': self._get_justification(result.enrollment),
+            })
+        return {
+            'changes': changes,
+            'errors': [{'row_number': row_number, 'message': str(errors[row_number])} for row_number in sorted(errors)],
+        }
+
+    def apply(self, user):
+        """
+        Save all the valid encoded scores in bulk. The lines in error are added to the errors of the import.
+        :return: The number of saved scores
+        """
+        report = score_encoding_list.submit_enrollments(self._get_scores_encoding_list(), user)
+        for (row_number, __), result in self._results_by_encoded_row(report):
+            if result.status == score_encoding_list.ERROR:
+                self.errors[row_number] = UploadValueError(result.error, messages.ERROR)
+        return len(report.updated_enrollments)
+
+    def _get_score(self, enrollment):
+        return enrollment.score_final if self.is_program_manager else enrollment.score_draft
+
+    def _get_justification(self, enrollment):
+        return enrollment.justification_final if self.is_program_manager else enrollment.justification_draft
+
+
 class UploadValueError(ValueError):
     def __init__(self, value, message):
         self.value = value
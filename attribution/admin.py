@@ -36,5 +36,8 @@ admin.site.register(attribution_new.AttributionNew,
 admin.site.register(attribution_charge_new.AttributionChargeNew,
                     attribution_charge_new.AttributionChargeNewAdmin)
 
+admin.site.register(attribution_publication.AttributionPublication,
+                    attribution_publication.AttributionPublicationAdmin)
+
 admin.site.register(tutor_application.TutorApplication,
                     tutor_application.TutorApplicationAdmin)
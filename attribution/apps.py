@@ -28,3 +28,6 @@ from django.apps import AppConfig
 
 class AttributionConfig(AppConfig):
     name = 'attribution'
+
+    def ready(self):
+        from . import signals
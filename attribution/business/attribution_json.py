@@ -23,20 +23,25 @@
 #    see http://www.gnu.org/licenses/.
 #
 ##############################################################################
+import hashlib
+import json
 import logging
 import time
+from typing import Dict, List, Tuple
 
 import pika
 import pika.exceptions
 from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db.models import Prefetch
 from django.utils import timezone
 
 from attribution import models as mdl_attribution
+from attribution.models.attribution_publication import AttributionPublication
 from base import models as mdl_base
 from base.models.enums.learning_container_year_types import IN_CHARGE_TYPES
 from base.models.proposal_learning_unit import is_in_suppression_proposal
-from osis_common.queue import queue_sender
+from base.utils.queue_publisher import queue_publisher
 
 logger = logging.getLogger(settings.DEFAULT_LOGGER)
 
@@ -47,7 +52,8 @@ def publish_to_portal(global_ids=None):
 
     if queue_name:
         try:
-            queue_sender.send_message(queue_name, attribution_list)
+            # The attributions of all the tutors are split in several messages to keep them small
+            queue_publisher.publish_in_chunks(queue_name, attribution_list)
         except (RuntimeError, pika.exceptions.ConnectionClosed, pika.exceptions.ChannelClosed,
                 pika.exceptions.AMQPError):
             logger.exception('Could not recompute attributions for portal...')
@@ -58,6 +64,68 @@ def publish_to_portal(global_ids=None):
         return False
 
 
+def publish_dirty_to_portal() -> Dict[str, int]:
+    """
+    Publish the attributions of the tutors marked as changed, by batches of tutors.
+    A document identical to the last one published (same content hash) is not sent again.
+    """
+    result = {'published': 0, 'unchanged': 0}
+    queue_name = settings.QUEUES.get('QUEUES_NAME', {}).get('ATTRIBUTION_RESPONSE')
+    if not queue_name:
+        logger.error('Could not publish attributions to portal because not queue name ATTRIBUTION_RESPONSE')
+        return result
+
+    # The tutors marked again during the publication stay dirty for the next run
+    started_at = timezone.now()
+    dirty_publications = AttributionPublication.objects.filter(
+        dirty=True,
+        marked_at__lte=started_at
+    ).order_by('marked_at')
+    while True:
+        publications = list(dirty_publications[:settings.ATTRIBUTION_PUBLICATION_BATCH_SIZE])
+        if not publications:
+            return result
+        try:
+            published, unchanged = _publish_changed_documents(queue_name, publications, started_at)
+        except (RuntimeError, pika.exceptions.ConnectionClosed, pika.exceptions.ChannelClosed,
+                pika.exceptions.AMQPError):
+            logger.exception('Could not publish changed attributions to portal...')
+            return result
+        result['published'] += published
+        result['unchanged'] += unchanged
+
+
+def _publish_changed_documents(queue_name: str, publications: List[AttributionPublication], started_at) \
+        -> Tuple[int, int]:
+    publications_by_global_id = {publication.global_id: publication for publication in publications}
+    documents_to_publish = []
+    publications_to_update = []
+    for document in _compute_list(list(publications_by_global_id)):
+        publication = publications_by_global_id[document['global_id']]
+        content_hash = _get_content_hash(document)
+        if content_hash != publication.content_hash:
+            publication.content_hash = content_hash
+            publication.published_at = timezone.now()
+            documents_to_publish.append(document)
+            publications_to_update.append(publication)
+
+    queue_publisher.publish_in_chunks(queue_name, documents_to_publish)
+    AttributionPublication.objects.bulk_update(publications_to_update, ['content_hash', 'published_at'])
+    AttributionPublication.objects.filter(
+        pk__in=[publication.pk for publication in publications],
+        marked_at__lte=started_at
+    ).update(dirty=False)
+    return len(documents_to_publish), len(publications) - len(documents_to_publish)
+
+
+def _get_content_hash(document: Dict) -> str:
+    # The computation datetime changes at each computation and the order of the attributions is not significant
+    attributions = sorted(
+        json.dumps(attribution, sort_keys=True, cls=DjangoJSONEncoder) for attribution in document['attributions']
+    )
+    return hashlib.sha256(json.dumps([document['global_id'], attributions]).encode('utf-8')).hexdigest()
+
+
 def _compute_list(global_ids=None):
     attribution_list = _get_all_attributions_with_charges(global_ids)
     attribution_list = _group_attributions_by_global_id(attribution_list, global_ids)
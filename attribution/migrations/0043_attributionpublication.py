@@ -0,0 +1,25 @@
+# Generated by Django 2.2.13 on 2026-10-18 14:00
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attribution', '0042_merge_20210126_0900'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttributionPublication',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('global_id', models.CharField(max_length=10, unique=True)),
+                ('dirty', models.BooleanField(db_index=True, default=True)),
+                ('marked_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('content_hash', models.CharField(blank=True, max_length=64)),
+                ('published_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+    ]
@@ -1,5 +1,6 @@
 from attribution.models import attribution
 from attribution.models import attribution_charge_new
 from attribution.models import attribution_new
+from attribution.models import attribution_publication
 from attribution.models import tutor_application
 
@@ -0,0 +1,65 @@
+##############################################################################
+#
+#    OSIS stands for Open Student Information System. It's an application
+#    designed to manage the core business of higher education institutions,
+#    such as universities, faculties, institutes and professional schools.
+#    The core business involves the administration of students, teachers,
+#    courses, programs and so on.
+#
+#    Copyright (C) 2015-2020 Université catholique de Louvain (http://www.uclouvain.be)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    A copy of this license - GNU General Public License - is available
+#    at the root of the source code of this program.  If not,
+#    see http://www.gnu.org/licenses/.
+#
+##############################################################################
+from typing import Iterable
+
+from django.conf import settings
+from django.contrib import admin
+from django.db import models
+from django.utils import timezone
+
+
+class AttributionPublicationAdmin(admin.ModelAdmin):
+    list_display = ('global_id', 'dirty', 'marked_at', 'published_at')
+    list_filter = ('dirty',)
+    search_fields = ['global_id']
+
+
+class AttributionPublication(models.Model):
+    """ Publication state on the portal of the attributions of a tutor (identified by its global id) """
+    global_id = models.CharField(max_length=10, unique=True)
+    dirty = models.BooleanField(default=True, db_index=True)
+    marked_at = models.DateTimeField(default=timezone.now)
+    content_hash = models.CharField(max_length=64, blank=True)
+    published_at = models.DateTimeField(blank=True, null=True)
+
+    def __str__(self):
+        return self.global_id
+
+
+def is_enabled() -> bool:
+    return getattr(settings, 'ATTRIBUTION_INCREMENTAL_PUBLICATION_ENABLED', False)
+
+
+def mark_dirty(global_ids: Iterable[str]) -> None:
+    global_ids = {global_id for global_id in global_ids if global_id}
+    if not global_ids:
+        return
+    now = timezone.now()
+    AttributionPublication.objects.filter(global_id__in=global_ids).update(dirty=True, marked_at=now)
+    AttributionPublication.objects.bulk_create(
+        [AttributionPublication(global_id=global_id, marked_at=now) for global_id in global_ids],
+        ignore_conflicts=True
+    )
@@ -0,0 +1,82 @@
+##############################################################################
+#
+#    OSIS stands for Open Student Information System. It's an application
+#    designed to manage the core business of higher education institutions,
+#    such as universities, faculties, institutes and professional schools.
+#    The core business involves the administration of students, teachers,
+#    courses, programs and so on.
+#
+#    Copyright (C) 2015-2020 Université catholique de Louvain (http://www.uclouvain.be)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    A copy of this license - GNU General Public License - is available
+#    at the root of the source code of this program.  If not,
+#    see http://www.gnu.org/licenses/.
+#
+##############################################################################
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from attribution.models import attribution_publication
+from attribution.models.attribution_charge_new import AttributionChargeNew
+from attribution.models.attribution_new import AttributionNew
+from base.models.learning_container_year import LearningContainerYear
+from base.models.learning_unit_year import LearningUnitYear
+from base.models.person import Person
+from base.models.tutor import Tutor
+
+
+@receiver([post_save, post_delete], sender=AttributionNew)
+def _attribution_changed(sender, instance, **kwargs):
+    if attribution_publication.is_enabled():
+        _mark_dirty(Person.objects.filter(tutor=instance.tutor_id))
+
+
+@receiver([post_save, post_delete], sender=AttributionChargeNew)
+def _attribution_charge_changed(sender, instance, **kwargs):
+    if attribution_publication.is_enabled():
+        _mark_dirty(Person.objects.filter(tutor__attributionnew=instance.attribution_id))
+
+
+@receiver(post_save, sender=LearningUnitYear)
+def _learning_unit_year_saved(sender, instance, **kwargs):
+    # The attributions hold the title of the learning unit year and the title of the next one
+    if attribution_publication.is_enabled():
+        _mark_dirty(Person.objects.filter(
+            tutor__attributionnew__learning_container_year__learningunityear__learning_unit=instance.learning_unit_id,
+            tutor__attributionnew__learning_container_year__academic_year__year__in=[
+                instance.academic_year.year, instance.academic_year.year - 1
+            ],
+        ))
+
+
+@receiver(post_save, sender=LearningContainerYear)
+def _learning_container_year_saved(sender, instance, **kwargs):
+    # The titles of the learning unit years include the common title of their container
+    if attribution_publication.is_enabled():
+        _mark_dirty(Person.objects.filter(
+            tutor__attributionnew__learning_container_year__learning_container=instance.learning_container_id,
+            tutor__attributionnew__learning_container_year__academic_year__year__in=[
+                instance.academic_year.year, instance.academic_year.year - 1
+            ],
+        ))
+
+
+@receiver(post_save, sender=Person)
+def _person_saved(sender, instance, **kwargs):
+    if attribution_publication.is_enabled() and instance.global_id and \
+            Tutor.objects.filter(person=instance.pk).exists():
+        attribution_publication.mark_dirty([instance.global_id])
+
+
+def _mark_dirty(persons):
+    attribution_publication.mark_dirty(persons.values_list('global_id', flat=True).distinct())
@@ -1,4 +1,5 @@
 from . import check_academic_calendar
+from . import publish_changed_attributions
 
 from celery.schedules import crontab
 from backoffice.celery import app as celery_app
@@ -7,4 +8,8 @@ celery_app.conf.beat_schedule.update({
         'task': 'attribution.tasks.check_academic_calendar.run',
         'schedule': crontab(minute=0, hour=0, day_of_month='*', month_of_year='*', day_of_week=0)
     },
+    '|Attribution| Publish changed attributions': {
+        'task': 'attribution.tasks.publish_changed_attributions.run',
+        'schedule': crontab(minute='*/5')
+    },
 })
@@ -1,8 +1,14 @@
 from attribution.calendar.application_courses_calendar import ApplicationCoursesCalendar
 from backoffice.celery import app as celery_app
+from base.business.event_perms import verify_academic_event_indexes
 
 
 @celery_app.task
 def run() -> dict:
     ApplicationCoursesCalendar.ensure_consistency_until_n_plus_6()
+    changed_references = verify_academic_event_indexes([
+        ApplicationCoursesCalendar.event_reference,
+    ])
+    if changed_references:
+        return {'Academic calendars changed without being saved': changed_references}
     return {}
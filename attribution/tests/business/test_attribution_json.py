@@ -24,11 +24,14 @@
 #
 ##############################################################################
 from decimal import Decimal
+from unittest import mock
 
 import factory
-from django.test import TestCase
+from django.test import TestCase, override_settings
 
 from attribution.business import attribution_json
+from attribution.models import attribution_publication
+from attribution.models.attribution_publication import AttributionPublication
 from attribution.models.enums import function
 from attribution.tests.factories.attribution import AttributionNewFactory
 from attribution.tests.factories.attribution_charge_new import AttributionChargeNewFactory
@@ -180,6 +183,67 @@ class AttributionJsonTest(TestCase):
         self.assertEqual(attribution_json._get_title_next_luyr(self.learning_unit_yr), next_luy.complete_title)
 
 
+@override_settings(
+    ATTRIBUTION_INCREMENTAL_PUBLICATION_ENABLED=True,
+    QUEUES={'QUEUES_NAME': {'ATTRIBUTION_RESPONSE': 'attribution_response'}}
+)
+@mock.patch('attribution.business.attribution_json.queue_publisher')
+class PublishDirtyAttributionsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.academic_year = AcademicYearFactory(current=True)
+        cls.l_container = LearningContainerYearInChargeFactory(academic_year=cls.academic_year, acronym="LBIR1210")
+        LearningUnitYearWithComponentFactory(
+            academic_year=cls.academic_year,
+            learning_container_year=cls.l_container,
+            acronym="LBIR1210",
+            subtype=learning_unit_year_subtypes.FULL
+        )
+        cls.tutor_1 = TutorFactory(person__global_id='00012345')
+        cls.tutor_2 = TutorFactory(person__global_id='08923545')
+        cls.attribution_tutor_1 = AttributionNewFactory(learning_container_year=cls.l_container, tutor=cls.tutor_1)
+        _create_attribution_charge(cls.academic_year, cls.attribution_tutor_1, "LBIR1210", Decimal(15.5))
+        attribution_tutor_2 = AttributionNewFactory(learning_container_year=cls.l_container, tutor=cls.tutor_2)
+        _create_attribution_charge(cls.academic_year, attribution_tutor_2, "LBIR1210", Decimal(7.5))
+
+    def test_should_mark_tutors_dirty_when_their_attributions_change(self, mock_publisher):
+        self.assertCountEqual(
+            AttributionPublication.objects.filter(dirty=True).values_list('global_id', flat=True),
+            ['00012345', '08923545']
+        )
+
+    def test_should_publish_only_dirty_tutors(self, mock_publisher):
+        AttributionPublication.objects.update(dirty=False)
+        attribution_publication.mark_dirty(['00012345'])
+
+        result = attribution_json.publish_dirty_to_portal()
+
+        self.assertEqual(result, {'published': 1, 'unchanged': 0})
+        queue_name, documents = mock_publisher.publish_in_chunks.call_args[0]
+        self.assertEqual(queue_name, 'attribution_response')
+        self.assertEqual([document['global_id'] for document in documents], ['00012345'])
+        self.assertFalse(AttributionPublication.objects.filter(dirty=True).exists())
+
+    def test_should_not_publish_unchanged_documents_again(self, mock_publisher):
+        attribution_json.publish_dirty_to_portal()
+        attribution_publication.mark_dirty(['00012345', '08923545'])
+        self.attribution_tutor_1.attributionchargenew_set.update(allocation_charge=Decimal(20))
+
+        result = attribution_json.publish_dirty_to_portal()
+
+        self.assertEqual(result, {'published': 1, 'unchanged': 1})
+        documents = mock_publisher.publish_in_chunks.call_args[0][1]
+        self.assertEqual([document['global_id'] for document in documents], ['00012345'])
+
+    def test_should_keep_tutors_dirty_when_publication_fails(self, mock_publisher):
+        mock_publisher.publish_in_chunks.side_effect = RuntimeError
+
+        result = attribution_json.publish_dirty_to_portal()
+
+        self.assertEqual(result, {'published': 0, 'unchanged': 0})
+        self.assertEqual(AttributionPublication.objects.filter(dirty=True).count(), 2)
+
+
 class LearningUnitYearWithComponentFactory(LearningUnitYearFactory):
     @factory.post_generation
     def components(obj, create, extracted, **kwargs):
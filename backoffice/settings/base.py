@@ -184,6 +184,10 @@ DATABASES = {
 
 AUTHENTICATION_BACKENDS = os.environ.get('AUTHENTICATION_BACKENDS', 'django.contrib.auth.backends.ModelBackend').split()
 PERMISSION_CACHE_ENABLED = os.environ.get('PERMISSION_CACHE_ENABLED', 'True').lower() == 'true'
+# Memoize the permission decisions of a request by (perm, object) and share the role assignments between requests
+PERMISSION_DECISION_CACHE_ENABLED = os.environ.get('PERMISSION_DECISION_CACHE_ENABLED', 'False').lower() == 'true'
+PERMISSION_SHARED_CACHE_ENABLED = os.environ.get('PERMISSION_SHARED_CACHE_ENABLED', 'False').lower() == 'true'
+PERMISSION_SHARED_CACHE_TIMEOUT = int(os.environ.get('PERMISSION_SHARED_CACHE_TIMEOUT', 3600))
 
 # Internationalization
 # https://docs.djangoproject.com/en/1.9/topics/i18n/
@@ -261,6 +265,12 @@ LOGO_OSIS_URL = os.environ.get('LOGO_OSIS_URL', '')
 # They are used to ensure the migration of Data between Osis and other application (ex : Osis <> Osis-Portal)
 # See in settings.dev.example to configure the queues
 QUEUES = {}
+# Queue publisher : connections kept open by process, bounded retries with exponential backoff (in seconds)
+# and maximal size (in bytes) of the messages when a large payload is split in chunks
+QUEUE_PUBLISHER_POOL_SIZE = int(os.environ.get('QUEUE_PUBLISHER_POOL_SIZE', 4))
+QUEUE_PUBLISHER_RETRIES = int(os.environ.get('QUEUE_PUBLISHER_RETRIES', 3))
+QUEUE_PUBLISHER_RETRY_BACKOFF = float(os.environ.get('QUEUE_PUBLISHER_RETRY_BACKOFF', 0.5))
+QUEUE_PUBLISHER_MAX_MESSAGE_SIZE = int(os.environ.get('QUEUE_PUBLISHER_MAX_MESSAGE_SIZE', 1024 * 1024))
 
 
 # Celery settings
@@ -422,6 +432,15 @@ ESB_REFRESH_LEARNING_UNIT_PEDAGOGY_ENDPOINT = os.environ.get('ESB_REFRESH_LEARNI
 ESB_GEOCODING_ENDPOINT = os.environ.get('ESB_GEOCODING_ENDPOINT')
 ESB_ENTITIES_HISTORY_ENDPOINT = os.environ.get('ESB_ENTITIES_HISTORY_ENDPOINT')
 ESB_ENTITY_ADDRESS_ENDPOINT = os.environ.get('ESB_ENTITY_ADDRESS_ENDPOINT')
+# Entities synchronization : number of concurrent address requests and attempts by address
+ESB_ENTITIES_SYNC_MAX_WORKERS = int(os.environ.get('ESB_ENTITIES_SYNC_MAX_WORKERS', 8))
+ESB_ENTITIES_SYNC_RETRIES = int(os.environ.get('ESB_ENTITIES_SYNC_RETRIES', 3))
+# Publication of the general information : number of concurrent portal requests, attempts by program and number of
+# seconds during which the publications asked for the same program are merged. The queue is kept by each web process
+# (lost on restart) and the publication status is only shared between processes with a shared cache backend.
+PUBLICATION_MAX_WORKERS = int(os.environ.get('PUBLICATION_MAX_WORKERS', 4))
+PUBLICATION_RETRIES = int(os.environ.get('PUBLICATION_RETRIES', 3))
+PUBLICATION_COALESCE_WINDOW = int(os.environ.get('PUBLICATION_COALESCE_WINDOW', 2))
 
 RELEASE_TAG = os.environ.get('RELEASE_TAG')
 
@@ -451,6 +470,10 @@ BOOTSTRAP3 = {
 AJAX_SELECT_BOOTSTRAP = False
 
 
+# The in-memory indexes and caches enabled below (PROGRAM_TREE_CACHE, ENTITY_HIERARCHY_INDEX, ACADEMIC_CALENDAR_INDEX,
+# GENERAL_INFORMATION_CACHE, CMS_TEXT_CACHE, PERMISSION_SHARED_CACHE) are invalidated through version stamps kept in
+# the default cache. 'locmem' is local to each process : a change made by one process is not seen by the others until
+# their entries expire. Use a shared backend ('redis') whenever one of them is enabled with several processes.
 BACKEND_CACHE = os.environ.get("BACKEND_CACHE", "locmem").lower()
 if BACKEND_CACHE == 'locmem':
     CACHE_CONFIG = {
@@ -474,6 +497,67 @@ else:
 
 CACHES = {"default": CACHE_CONFIG}
 
+PROGRAM_TREE_CACHE_ENABLED = os.environ.get('PROGRAM_TREE_CACHE_ENABLED', 'False').lower() == 'true'
+PROGRAM_TREE_CACHE_TIMEOUT = int(os.environ.get('PROGRAM_TREE_CACHE_TIMEOUT', 3600))
+
+# Keep the entity hierarchy of each reference date in memory of each process (invalidated on EntityVersion save/delete)
+ENTITY_HIERARCHY_INDEX_ENABLED = os.environ.get('ENTITY_HIERARCHY_INDEX_ENABLED', 'False').lower() == 'true'
+
+# Keep the academic events of each calendar reference in memory of each process (invalidated on AcademicCalendar
+# save or delete)
+ACADEMIC_CALENDAR_INDEX_ENABLED = os.environ.get('ACADEMIC_CALENDAR_INDEX_ENABLED', 'False').lower() == 'true'
+
+# Cache the general information served to the portal (invalidated when the texts, admission conditions,
+# achievements or contacts change)
+GENERAL_INFORMATION_CACHE_ENABLED = os.environ.get('GENERAL_INFORMATION_CACHE_ENABLED', 'False').lower() == 'true'
+GENERAL_INFORMATION_CACHE_TIMEOUT = int(os.environ.get('GENERAL_INFORMATION_CACHE_TIMEOUT', 24 * 3600))
+
+# Keep the CMS texts loaded in bulk in memory of each process (invalidated on TranslatedText or label save)
+CMS_TEXT_CACHE_ENABLED = os.environ.get('CMS_TEXT_CACHE_ENABLED', 'False').lower() == 'true'
+CMS_TEXT_CACHE_SIZE = int(os.environ.get('CMS_TEXT_CACHE_SIZE', 10000))
+
+# Answer the GroupElementYear ancestry queries from the closure table (run 'rebuild_group_element_year_closure' first)
+GROUP_ELEMENT_YEAR_CLOSURE_ENABLED = os.environ.get('GROUP_ELEMENT_YEAR_CLOSURE_ENABLED', 'False').lower() == 'true'
+
+# Answer the acronym, code and title searches from the trigram search index (run 'rebuild_search_index' first)
+SEARCH_INDEX_ENABLED = os.environ.get('SEARCH_INDEX_ENABLED', 'False').lower() == 'true'
+
+# Postpone the learning units to N+6 by chunks of objects created in bulk instead of one transaction per object
+AUTOMATIC_POSTPONEMENT_BATCH_ENABLED = os.environ.get('AUTOMATIC_POSTPONEMENT_BATCH_ENABLED', 'False').lower() == 'true'
+AUTOMATIC_POSTPONEMENT_CHUNK_SIZE = int(os.environ.get('AUTOMATIC_POSTPONEMENT_CHUNK_SIZE', 100))
+
+# Publish on the portal only the attributions of the tutors marked as changed (periodic job, by batches of tutors)
+ATTRIBUTION_INCREMENTAL_PUBLICATION_ENABLED = os.environ.get(
+    'ATTRIBUTION_INCREMENTAL_PUBLICATION_ENABLED', 'False'
+).lower() == 'true'
+ATTRIBUTION_PUBLICATION_BATCH_SIZE = int(os.environ.get('ATTRIBUTION_PUBLICATION_BATCH_SIZE', 500))
+
+# Read the score encoding progress page from the progress maintained by session exam and offer year
+# (run 'rebuild_session_exam_progress' first)
+SCORE_ENCODING_PROGRESS_AGGREGATE_ENABLED = os.environ.get(
+    'SCORE_ENCODING_PROGRESS_AGGREGATE_ENABLED', 'False'
+).lower() == 'true'
+
+# Excel exports with more rows than this threshold are written in streaming (write-only workbook, chunked querysets)
+XLS_STREAMING_THRESHOLD = int(os.environ.get('XLS_STREAMING_THRESHOLD', 2000))
+XLS_STREAMING_CHUNK_SIZE = int(os.environ.get('XLS_STREAMING_CHUNK_SIZE', 500))
+
+# Heavy exports are generated by a Celery worker (base.tasks.export_job) instead of the request worker.
+# Search exports are queued only above EXPORT_JOB_ROWS_THRESHOLD rows, program tree exports (Excel, PDF) above
+# EXPORT_JOB_TREE_LINKS_THRESHOLD links. Generated files are kept EXPORT_JOB_EXPIRY_HOURS
+# hours : schedule 'base.tasks.export_job.delete_expired' in celery beat to clean them.
+# Generated files are stored in EXPORT_JOB_ROOT, which must be out of MEDIA_ROOT and shared with the Celery workers.
+EXPORT_JOB_ENABLED = os.environ.get('EXPORT_JOB_ENABLED', 'False').lower() == 'true'
+EXPORT_JOB_ROWS_THRESHOLD = int(os.environ.get('EXPORT_JOB_ROWS_THRESHOLD', 5000))
+EXPORT_JOB_TREE_LINKS_THRESHOLD = int(os.environ.get('EXPORT_JOB_TREE_LINKS_THRESHOLD', 500))
+EXPORT_JOB_EXPIRY_HOURS = int(os.environ.get('EXPORT_JOB_EXPIRY_HOURS', 24))
+EXPORT_JOB_ROOT = os.environ.get('EXPORT_JOB_ROOT', os.path.join(BASE_DIR, "export_jobs"))
+
+# Search results expected by the query planner above SEARCH_COUNT_ESTIMATE_THRESHOLD rows are counted with the planner
+# estimation (0 to always count exactly). Exact counts are cached SEARCH_COUNT_CACHE_TIMEOUT seconds (0 to disable).
+SEARCH_COUNT_ESTIMATE_THRESHOLD = int(os.environ.get('SEARCH_COUNT_ESTIMATE_THRESHOLD', 0))
+SEARCH_COUNT_CACHE_TIMEOUT = int(os.environ.get('SEARCH_COUNT_CACHE_TIMEOUT', 0))
+
 
 WAFFLE_FLAG_DEFAULT = os.environ.get("WAFFLE_FLAG_DEFAULT", "False").lower() == 'true'
 
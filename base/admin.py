@@ -92,6 +92,9 @@ admin.site.register(exam_enrollment.ExamEnrollmentHistory,
 admin.site.register(external_learning_unit_year.ExternalLearningUnitYear,
                     external_learning_unit_year.ExternalLearningUnitYearAdmin)
 
+admin.site.register(export_job.ExportJob,
+                    export_job.ExportJobAdmin)
+
 admin.site.register(external_offer.ExternalOffer,
                     external_offer.ExternalOfferAdmin)
 
@@ -101,6 +104,9 @@ admin.site.register(hops.Hops,
 admin.site.register(group_element_year.GroupElementYear,
                     group_element_year.GroupElementYearAdmin)
 
+admin.site.register(group_element_year_closure.GroupElementYearClosure,
+                    group_element_year_closure.GroupElementYearClosureAdmin)
+
 admin.site.register(learning_achievement.LearningAchievement,
                     learning_achievement.LearningAchievementAdmin)
 
@@ -173,6 +179,9 @@ admin.site.register(program_manager.ProgramManager,
 admin.site.register(proposal_learning_unit.ProposalLearningUnit,
                     proposal_learning_unit.ProposalLearningUnitAdmin)
 
+admin.site.register(search_index.SearchIndexEntry,
+                    search_index.SearchIndexEntryAdmin)
+
 admin.site.register(session_exam.SessionExam,
                     session_exam.SessionExamAdmin)
 
@@ -23,18 +23,24 @@
 #    see http://www.gnu.org/licenses/.
 #
 ##############################################################################
+import bisect
 import datetime
+import hashlib
+import threading
 from abc import ABC
-from typing import List
+from typing import Callable, Dict, Iterable, List, Tuple
 
 import attr
+from django.conf import settings
+from django.core.cache import cache
 from django.core.exceptions import PermissionDenied
 from django.db.models import F
 from django.db.models.query import QuerySet
 from django.utils.functional import cached_property
 from django.utils.translation import gettext_lazy as _
 
-from base.models.academic_calendar import AcademicCalendar
+from base.models.academic_calendar import AcademicCalendar, ACADEMIC_CALENDAR_VERSION, \
+    invalidate_academic_event_indexes
 from base.models.academic_year import AcademicYear
 from base.models.enums import academic_calendar_type
 from base.models.learning_unit_year import LearningUnitYear
@@ -64,6 +70,108 @@ class AcademicEvent:
         return self.authorized_target_year == target_year
 
 
+class AcademicEventIndex:
+    """
+    Academic events of a calendar reference sorted by start date, with the events and target years open at a date
+    found in logarithmic time.
+
+    When ACADEMIC_CALENDAR_INDEX_ENABLED is set, the index of each reference is built once per process and shared by
+    all requests. It is dropped when the version stamp kept in Django's cache changes, i.e. when an academic calendar
+    is saved or deleted or when verify_academic_event_indexes finds a change made without saving.
+    """
+    _indexes = {}  # type: Dict[Tuple[str, str], AcademicEventIndex]
+    _lock = threading.Lock()
+
+    def __init__(self, academic_events: Iterable[AcademicEvent], version: int = None):
+        self.version = version
+        self.academic_events = sorted(academic_events, key=lambda academic_event: academic_event.start_date)
+
+        self._academic_event_by_target_year = {}
+        for academic_event in self.academic_events:
+            self._academic_event_by_target_year.setdefault(academic_event.authorized_target_year, academic_event)
+
+        # The open events only change on a start date or on the day after an end date
+        self._boundaries = sorted(
+            {academic_event.start_date for academic_event in self.academic_events} |
+            {
+                academic_event.end_date + datetime.timedelta(days=1) for academic_event in self.academic_events
+                if academic_event.end_date is not None
+            }
+        )
+        self._open_events_by_interval = [
+            [academic_event for academic_event in self.academic_events if academic_event.is_open(boundary)]
+            for boundary in self._boundaries
+        ]
+        self._target_years_by_interval = [
+            sorted(academic_event.authorized_target_year for academic_event in open_events)
+            for open_events in self._open_events_by_interval
+        ]
+
+    @classmethod
+    def get(cls, event_reference: str, load_academic_events: Callable[[str], List[AcademicEvent]]) \
+            -> 'AcademicEventIndex':
+        if not cls.is_enabled():
+            return cls(load_academic_events(event_reference))
+
+        key = (load_academic_events.__qualname__, event_reference)
+        version = ACADEMIC_CALENDAR_VERSION.get()
+        index = cls._indexes.get(key)
+        if index is None or index.version != version:
+            # The version is read before loading from database, to never keep stale data under a new version
+            index = cls(load_academic_events(event_reference), version=version)
+            with cls._lock:
+                cls._indexes[key] = index
+        return index
+
+    @staticmethod
+    def is_enabled() -> bool:
+        return getattr(settings, 'ACADEMIC_CALENDAR_INDEX_ENABLED', False)
+
+    def get_open_academic_events(self, date: datetime.date) -> List[AcademicEvent]:
+        interval = bisect.bisect_right(self._boundaries, date) - 1
+        return list(self._open_events_by_interval[interval]) if interval >= 0 else []
+
+    def get_target_years_opened(self, date: datetime.date) -> List[int]:
+        interval = bisect.bisect_right(self._boundaries, date) - 1
+        return list(self._target_years_by_interval[interval]) if interval >= 0 else []
+
+    def get_academic_event(self, target_year: int) -> AcademicEvent:
+        return self._academic_event_by_target_year.get(target_year)
+
+
+def verify_academic_event_indexes(event_references: Iterable[str]) -> List[str]:
+    """
+    Compare the academic calendars of the references with the ones found by the previous verification. When they
+    changed without AcademicCalendar.save() (e.g. by a queryset update), the indexes of all processes are dropped.
+
+    :return: The references of which the academic calendars changed since the previous verification
+    """
+    event_references = list(event_references)
+    calendars_by_reference = {event_reference: [] for event_reference in event_references}
+    calendars = AcademicCalendar.objects.filter(
+        reference__in=event_references
+    ).order_by(
+        'pk'
+    ).values_list(
+        'reference', 'pk', 'title', 'start_date', 'end_date', 'data_year_id', 'sessionexamcalendar__number_session'
+    )
+    for calendar in calendars:
+        calendars_by_reference[calendar[0]].append(calendar)
+
+    changed_references = []
+    for event_reference, reference_calendars in calendars_by_reference.items():
+        fingerprint_key = 'academic_calendar_fingerprint_{}'.format(event_reference)
+        fingerprint = hashlib.md5(repr(reference_calendars).encode()).hexdigest()
+        previous_fingerprint = cache.get(fingerprint_key)
+        if previous_fingerprint is not None and previous_fingerprint != fingerprint:
+            changed_references.append(event_reference)
+        cache.set(fingerprint_key, fingerprint, timeout=None)
+
+    if changed_references:
+        invalidate_academic_event_indexes()
+    return changed_references
+
+
 class AcademicEventCalendarHelper(ABC):
     event_reference = None
 
@@ -75,7 +183,7 @@ class AcademicEventCalendarHelper(ABC):
         target_years_opened = self.get_target_years_opened()
         if target_year is None:
             return bool(target_years_opened)
-        return bool(next((year for year in target_years_opened if year == target_year), False))
+        return target_year in target_years_opened
 
     def get_target_years_opened(self, date=None) -> List[int]:
         """
@@ -84,10 +192,7 @@ class AcademicEventCalendarHelper(ABC):
         """
         if date is None:
             date = datetime.date.today()
-        return sorted([
-            academic_event.authorized_target_year for academic_event in self._get_academic_events
-            if academic_event.is_open(date)
-        ])
+        return self._get_academic_event_index.get_target_years_opened(date)
 
     def get_opened_academic_events(self, date=None) -> List[AcademicEvent]:
         """
@@ -96,7 +201,7 @@ class AcademicEventCalendarHelper(ABC):
         """
         if date is None:
             date = datetime.date.today()
-        return [academic_event for academic_event in self._get_academic_events if academic_event.is_open(date)]
+        return self._get_academic_event_index.get_open_academic_events(date)
 
     def get_next_academic_event(self, date=None) -> AcademicEvent:
         """
@@ -130,19 +235,15 @@ class AcademicEventCalendarHelper(ABC):
         """
         Return academic event related to target_year provided
         """
-        return next(
-            (academic_event for academic_event in self._get_academic_events
-             if academic_event.authorized_target_year == target_year
-             ),
-            None
-        )
+        return self._get_academic_event_index.get_academic_event(target_year)
 
     @cached_property
+    def _get_academic_event_index(self) -> AcademicEventIndex:
+        return AcademicEventIndex.get(self.event_reference, AcademicEventFactory().get_academic_events)
+
+    @property
     def _get_academic_events(self) -> List[AcademicEvent]:
-        return sorted(
-            AcademicEventFactory().get_academic_events(self.event_reference),
-            key=lambda academic_event: academic_event.start_date
-        )
+        return self._get_academic_event_index.academic_events
 
     @classmethod
     def ensure_consistency_until_n_plus_6(cls):
@@ -182,11 +283,8 @@ class AcademicEventSessionCalendarHelper(AcademicEventCalendarHelper):
         )
 
     @cached_property
-    def _get_academic_events(self) -> List[AcademicSessionEvent]:
-        return sorted(
-            AcademicEventSessionFactory().get_academic_session_events(self.event_reference),
-            key=lambda academic_session_event: academic_session_event.start_date
-        )
+    def _get_academic_event_index(self) -> AcademicEventIndex:
+        return AcademicEventIndex.get(self.event_reference, AcademicEventSessionFactory().get_academic_session_events)
 
 
 class AcademicEventSessionFactory:
@@ -0,0 +1,121 @@
+##############################################################################
+#
+#    OSIS stands for Open Student Information System. It's an application
+#    designed to manage the core business of higher education institutions,
+#    such as universities, faculties, institutes and professional schools.
+#    The core business involves the administration of students, teachers,
+#    courses, programs and so on.
+#
+#    Copyright (C) 2015-2020 Université catholique de Louvain (http://www.uclouvain.be)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    A copy of this license - GNU General Public License - is available
+#    at the root of the source code of this program.  If not,
+#    see http://www.gnu.org/licenses/.
+#
+##############################################################################
+import hashlib
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.contrib import messages
+from django.db import transaction
+from django.http import HttpRequest
+from django.urls import reverse
+from django.utils.html import format_html
+from django.utils.translation import gettext as _
+
+from base.models.export_job import ExportJob
+from base.models.group_element_year import GroupElementYear
+from base.tasks import export_job as export_job_task
+from program_management.models.element import Element
+
+IGNORED_PARAMETERS = ('csrfmiddlewaretoken',)
+
+
+def is_export_job_request(request: HttpRequest) -> bool:
+    """ True when the request is replayed by the worker generating the export """
+    return getattr(request, 'export_job', None) is not None
+
+
+def must_be_queued(request: HttpRequest, rows_count: int = None, rows_threshold: int = None) -> bool:
+    """
+    :param rows_count: size of the export, None if unknown (the export is then always queued)
+    :param rows_threshold: size above which the export is queued, EXPORT_JOB_ROWS_THRESHOLD by default
+    """
+    if not settings.EXPORT_JOB_ENABLED or is_export_job_request(request):
+        return False
+    if rows_threshold is None:
+        rows_threshold = settings.EXPORT_JOB_ROWS_THRESHOLD
+    return rows_count is None or rows_count > rows_threshold
+
+
+def count_program_tree_links(request: HttpRequest, year: int, code: str, **kwargs) -> int:
+    """ Size of the export of a program tree (Excel, PDF) : the number of links under its root """
+    root_element_id = Element.objects.filter(
+        group_year__academic_year__year=year,
+        group_year__partial_acronym=code,
+    ).values_list('pk', flat=True).first()
+    if root_element_id is None:
+        return 0
+    return len(GroupElementYear.objects.get_adjacency_list([root_element_id]))
+
+
+def queue_export_job(request: HttpRequest) -> ExportJob:
+    """
+    Register the export asked by the request and send it to the Celery worker.
+    If the same user already asked the same export (same view and parameters), the existing job is returned as long
+    as it is being generated or its file is not expired.
+    """
+    query_string = _encode_parameters(request.GET)
+    body = _encode_parameters(request.POST) if request.method == 'POST' else ''
+    request_hash = _get_request_hash(request.user.pk, request.method, request.path, query_string, body)
+
+    existing_job = ExportJob.objects.reusable().filter(user=request.user, request_hash=request_hash).first()
+    if existing_job:
+        return existing_job
+
+    job = ExportJob.objects.create(
+        user=request.user,
+        request_hash=request_hash,
+        method=request.method,
+        path=request.path,
+        query_string=query_string,
+        body=body,
+        language=getattr(request, 'LANGUAGE_CODE', '') or '',
+        host=request.get_host(),
+        scheme=request.scheme,
+    )
+    transaction.on_commit(lambda: export_job_task.run.delay(job.pk))
+    return job
+
+
+def notify_export_job_queued(request, job: ExportJob):
+    messages.info(
+        request,
+        format_html(
+            "{} <a href=\"{}\">{}</a>",
+            _("The export is being generated in background."),
+            reverse('export_job_detail', kwargs={'uuid': job.uuid}),
+            _("Download the export"),
+        )
+    )
+
+
+def _encode_parameters(parameters) -> str:
+    return urlencode(
+        sorted((key, value) for key, values in parameters.lists() if key not in IGNORED_PARAMETERS for value in values)
+    )
+
+
+def _get_request_hash(user_id: int, method: str, path: str, query_string: str, body: str) -> str:
+    return hashlib.sha256("|".join([str(user_id), method, path, query_string, body]).encode()).hexdigest()
@@ -51,6 +51,7 @@ from base.models.enums.entity_container_year_link_type import ENTITY_TYPE_LIST
 from base.models.enums.learning_unit_year_periodicity import PERIODICITY_TYPES
 from base.models.enums.proposal_type import ProposalType
 from base.utils import send_mail as send_mail_util
+from osis_role.cache import bulk_evaluation
 from osis_role.errors import get_permission_error
 from reference.models import language
 
@@ -310,14 +311,15 @@ def _apply_action_on_proposals(
         permission_check: Callable[[proposal_learning_unit.ProposalLearningUnit, person.Person, bool], bool]
 ) -> List[Tuple[proposal_learning_unit.ProposalLearningUnit, Dict]]:
     proposals_with_results = []
-    for proposal in proposals:
-        perm, perm_result = permission_check(proposal, author, True)
-        if perm_result:
-            proposal_with_result = (proposal, action_method(proposal))
-        else:
-            perm_denied_msg = get_permission_error(author.user, perm)
-            proposal_with_result = (proposal, {ERROR: _(str(perm_denied_msg))})
-        proposals_with_results.append(proposal_with_result)
+    with bulk_evaluation(author.user, [proposal.learning_unit_year for proposal in proposals]):
+        for proposal in proposals:
+            perm, perm_result = permission_check(proposal, author, True)
+            if perm_result:
+                proposal_with_result = (proposal, action_method(proposal))
+            else:
+                perm_denied_msg = get_permission_error(author.user, perm)
+                proposal_with_result = (proposal, {ERROR: _(str(perm_denied_msg))})
+            proposals_with_results.append(proposal_with_result)
     return proposals_with_results
 
 
@@ -24,19 +24,21 @@
 #
 ##############################################################################
 from collections import defaultdict
-from typing import List, Dict
+from typing import List, Dict, Iterator, Tuple
 
 from django.db.models import QuerySet
 from django.db.models import Subquery, OuterRef
 from django.db.models.expressions import RawSQL
 from django.template.defaultfilters import yesno
 from django.utils.translation import gettext_lazy as _
-from openpyxl.styles import Alignment, PatternFill, Color, Font
+from openpyxl.styles import Alignment, PatternFill, Color, Font, Border, Side
 from openpyxl.utils import get_column_letter
 
 from attribution.business import attribution_charge_new
 from attribution.models.enums.function import Functions
 from base.business.xls import get_name_or_username, _get_all_columns_reference
+from base.business.xls_streaming import StreamingWorksheet, RowStyle, generate_streaming_xls, iterate_in_chunks, \
+    must_be_streamed
 from base.models.enums.learning_component_year_type import LECTURING, PRACTICAL_EXERCISES
 from base.models.enums.proposal_type import ProposalType
 from base.models.group_element_year import GroupElementYear
@@ -61,6 +63,8 @@ DEFAULT_LEGEND_FILLS = {
     PatternFill(patternType='solid', fgColor=TRANSFORMATION_AND_MODIFICATION_COLOR): ['A6'],
 }
 BOLD_FONT = Font(bold=True)
+WHITE_FONT = Font(color=Color('00FFFFFF'))
+TOP_BORDER = Border(top=Side(style='thin'))
 SPACES = '  '
 HEADER_TEACHERS = _('List of teachers')
 HEADER_PROGRAMS = _('Trainings')
@@ -93,6 +97,15 @@ def learning_unit_titles_part1() -> List[str]:
 
 
 def prepare_xls_content(learning_unit_years: QuerySet, with_grp=False, with_attributions=False) -> List:
+    return [row for learning_unit_yr, row in _iterate_xls_content(learning_unit_years, with_grp, with_attributions)]
+
+
+def _iterate_xls_content(
+        learning_unit_years: QuerySet,
+        with_grp: bool,
+        with_attributions: bool,
+        chunked: bool = False
+) -> Iterator[Tuple[LearningUnitYear, List]]:
     qs = annotate_qs(learning_unit_years)
 
     if with_grp:
@@ -100,9 +113,7 @@ def prepare_xls_content(learning_unit_years: QuerySet, with_grp=False, with_attr
             closest_trainings=RawSQL(SQL_RECURSIVE_QUERY_EDUCATION_GROUP_TO_CLOSEST_TRAININGS, ())
         ).prefetch_related('element')
 
-    result = []
-
-    for learning_unit_yr in qs:
+    for learning_unit_yr in (iterate_in_chunks(qs) if chunked else qs):
         lu_data_part1 = _get_data_part1(learning_unit_yr)
         lu_data_part2 = _get_data_part2(learning_unit_yr, with_attributions)
 
@@ -110,9 +121,7 @@ def prepare_xls_content(learning_unit_years: QuerySet, with_grp=False, with_attr
             lu_data_part2.append(_add_training_data(learning_unit_yr))
 
         lu_data_part1.extend(lu_data_part2)
-        result.append(lu_data_part1)
-
-    return result
+        yield learning_unit_yr, lu_data_part1
 
 
 def annotate_qs(learning_unit_years: QuerySet) -> QuerySet:
@@ -152,10 +161,24 @@ def create_xls_with_parameters(user, learning_units, filters, extra_configuratio
     if with_attributions:
         titles_part1.append(str(HEADER_TEACHERS))
 
-    working_sheets_data = prepare_xls_content(learning_units, with_grp, with_attributions)
-
     titles_part1.extend(titles_part2)
 
+    if must_be_streamed(learning_units):
+        worksheet = StreamingWorksheet(
+            title=WORKSHEET_TITLE,
+            header_titles=titles_part1,
+            rows=_iterate_styled_rows_with_parameters(learning_units, titles_part1, with_grp, with_attributions),
+        )
+        return generate_streaming_xls(
+            [worksheet, _get_proposal_legend_streaming_worksheet()],
+            XLS_FILENAME,
+            XLS_DESCRIPTION,
+            get_name_or_username(user),
+            filters
+        )
+
+    working_sheets_data = prepare_xls_content(learning_units, with_grp, with_attributions)
+
     ws_data = xls_build.prepare_xls_parameters_list(working_sheets_data,
                                                     _get_parameters_configurable_list(learning_units,
                                                                                       titles_part1,
@@ -165,6 +188,30 @@ def create_xls_with_parameters(user, learning_units, filters, extra_configuratio
     return xls_build.generate_xls(ws_data, filters)
 
 
+def _iterate_styled_rows_with_parameters(learning_units, titles, with_grp, with_attributions):
+    wrapped_columns = {
+        idx: WRAP_TEXT_ALIGNMENT for idx, title in enumerate(titles)
+        if title in (str(HEADER_PROGRAMS), str(HEADER_TEACHERS))
+    }
+    for learning_unit_yr, row in _iterate_xls_content(learning_units, with_grp, with_attributions, chunked=True):
+        proposal = getattr(learning_unit_yr, "proposallearningunit", None)
+        font = PROPOSAL_LINE_STYLES.get(proposal.type) if proposal else None
+        yield row, RowStyle(font=font, alignments_by_column=wrapped_columns)
+
+
+def _get_proposal_legend_streaming_worksheet() -> StreamingWorksheet:
+    legend_data = prepare_proposal_legend_ws_data()
+    fill_by_cell = {cell: fill for fill, cells in DEFAULT_LEGEND_FILLS.items() for cell in cells}
+    return StreamingWorksheet(
+        title=legend_data[xls_build.WORKSHEET_TITLE_KEY],
+        header_titles=legend_data[xls_build.HEADER_TITLES_KEY],
+        rows=[
+            (row, RowStyle(fills_by_column={0: fill_by_cell["A{}".format(line)]}))
+            for line, row in enumerate(legend_data[xls_build.CONTENT_KEY], start=2)
+        ]
+    )
+
+
 def _get_parameters_configurable_list(learning_units, titles, user):
     parameters = {
         xls_build.DESCRIPTION: XLS_DESCRIPTION,
@@ -383,6 +430,14 @@ def extract_xls_data_from_learning_unit(learning_unit_yr: LearningUnitYear) -> L
 
 def create_xls(user, found_learning_units, filters):
     titles = learning_unit_titles_part_1() + learning_unit_titles_part2()
+    if must_be_streamed(found_learning_units):
+        worksheet = StreamingWorksheet(
+            title=WORKSHEET_TITLE,
+            header_titles=titles,
+            rows=map(extract_xls_data_from_learning_unit, iterate_in_chunks(found_learning_units)),
+        )
+        return generate_streaming_xls([worksheet], XLS_FILENAME, XLS_DESCRIPTION, get_name_or_username(user), filters)
+
     working_sheets_data = prepare_ue_xls_content(found_learning_units)
     parameters = {xls_build.DESCRIPTION: XLS_DESCRIPTION,
                   xls_build.USER: get_name_or_username(user),
@@ -404,6 +459,21 @@ def create_xls_attributions(user, found_learning_units, filters):
                                                                             str(_('Attrib. vol1')),
                                                                             str(_('Attrib. vol2')),
                                                                             ]
+    if must_be_streamed(found_learning_units):
+        worksheet = StreamingWorksheet(
+            title=WORKSHEET_TITLE,
+            header_titles=titles,
+            rows=_iterate_styled_rows_with_attributions(found_learning_units, len(titles)),
+            header_style=RowStyle(font=BOLD_FONT),
+        )
+        return generate_streaming_xls(
+            [worksheet],
+            XLS_FILENAME,
+            _('Learning units list with attributions'),
+            get_name_or_username(user),
+            filters
+        )
+
     xls_data = prepare_xls_content_with_attributions(found_learning_units, len(titles))
     working_sheets_data = xls_data.get('data')
     cells_with_top_border = xls_data.get('cells_with_top_border')
@@ -414,7 +484,7 @@ def create_xls_attributions(user, found_learning_units, filters):
                   xls_build.HEADER_TITLES: titles,
                   xls_build.WS_TITLE: WORKSHEET_TITLE,
                   xls_build.BORDER_CELLS: {xls_build.BORDER_TOP: cells_with_top_border},
-                  xls_build.FONT_CELLS: {Font(color=Color('00FFFFFF')): cells_with_white_font},
+                  xls_build.FONT_CELLS: {WHITE_FONT: cells_with_white_font},
                   xls_build.FONT_ROWS: {BOLD_FONT: [0]}
                   }
 
@@ -423,15 +493,34 @@ def create_xls_attributions(user, found_learning_units, filters):
 
 def prepare_xls_content_with_attributions(found_learning_units: QuerySet, nb_columns: int) -> Dict:
     data = []
-    qs = annotate_qs(found_learning_units)
     cells_with_top_border = []
     cells_with_white_font = []
-    line = 2
 
-    for learning_unit_yr in qs:
-        first = True
-        cells_with_top_border.extend(["{}{}".format(letter, line) for letter in _get_all_columns_reference(nb_columns)])
+    rows = _iterate_xls_content_with_attributions(found_learning_units)
+    for line, (row, is_first_row_of_learning_unit) in enumerate(rows, start=2):
+        data.append(row)
+        if is_first_row_of_learning_unit:
+            cells_with_top_border.extend(
+                ["{}{}".format(letter, line) for letter in _get_all_columns_reference(nb_columns)]
+            )
+        else:
+            cells_with_white_font.extend(["{}{}".format(letter, line) for letter in _get_all_columns_reference(24)])
+
+    return {
+        'data': data,
+        'cells_with_top_border': cells_with_top_border or None,
+        'cells_with_white_font': cells_with_white_font or None,
+    }
+
 
+def _iterate_xls_content_with_attributions(
+        found_learning_units: QuerySet,
+        chunked: bool = False
+) -> Iterator[Tuple[List, bool]]:
+    """ Yield one row by attribution (or one row if no attribution) and if it is the first row of the learning unit"""
+    qs = annotate_qs(found_learning_units)
+
+    for learning_unit_yr in (iterate_in_chunks(qs) if chunked else qs):
         lu_data_part1 = _get_data_part1(learning_unit_yr)
         lu_data_part2 = _get_data_part2(learning_unit_yr, False)
 
@@ -440,23 +529,20 @@ def prepare_xls_content_with_attributions(found_learning_units: QuerySet, nb_col
         attributions_values = attribution_charge_new.find_attribution_charge_new_by_learning_unit_year_as_dict(
             learning_unit_yr).values()
         if attributions_values:
-            for value in attributions_values:
-                data.append(lu_data_part1+_get_attribution_detail(value))
-                line += 1
-                if not first:
-                    cells_with_white_font.extend(
-                        ["{}{}".format(letter, line-1) for letter in _get_all_columns_reference(24)]
-                    )
-                first = False
+            for index, value in enumerate(attributions_values):
+                yield lu_data_part1 + _get_attribution_detail(value), index == 0
         else:
-            data.append(lu_data_part1)
-            line += 1
+            yield lu_data_part1, True
 
-    return {
-        'data': data,
-        'cells_with_top_border': cells_with_top_border or None,
-        'cells_with_white_font': cells_with_white_font or None,
-    }
+
+def _iterate_styled_rows_with_attributions(found_learning_units: QuerySet, nb_columns: int):
+    first_row_style = RowStyle(border=TOP_BORDER)
+    other_rows_style = RowStyle(fonts_by_column={column: WHITE_FONT for column in range(24)})
+    for row, is_first_row_of_learning_unit in _iterate_xls_content_with_attributions(found_learning_units, True):
+        if is_first_row_of_learning_unit:
+            yield row + [None] * (nb_columns - len(row)), first_row_style
+        else:
+            yield row, other_rows_style
 
 
 def _get_attribution_detail(an_attribution):
@@ -24,7 +24,7 @@
 from django.db.models import Exists, OuterRef
 from django.utils.translation import gettext as _
 
-from base.business.learning_units.edition import duplicate_learning_unit_year
+from base.business.learning_units.edition import duplicate_learning_unit_year, duplicate_learning_unit_years
 from base.business.utils.postponement import AutomaticPostponementToN6
 from base.models.enums import proposal_type
 from base.models.learning_unit import LearningUnit
@@ -40,6 +40,7 @@ class LearningUnitAutomaticPostponementToN6(AutomaticPostponementToN6):
     send_before = send_mail_before_annual_procedure_of_automatic_postponement_of_luy
     send_after = send_mail_after_annual_procedure_of_automatic_postponement_of_luy
     extend_method = duplicate_learning_unit_year
+    batch_extend_method = duplicate_learning_unit_years
     msg_result = _("%(number_extended)s learning unit(s) extended and %(number_error)s error(s)")
 
     def get_queryset(self, queryset=None):
@@ -76,3 +77,16 @@ class LearningUnitAutomaticPostponementToN6(AutomaticPostponementToN6):
         ).latest(
             'academic_year__year'
         )
+
+    def get_objects_to_copy(self, objects_to_duplicate):
+        learning_unit_years = LearningUnitYear.objects.filter(
+            learning_unit__in=objects_to_duplicate,
+            proposallearningunit__isnull=True,
+        ).select_related(
+            'academic_year', 'learning_container_year',
+        ).order_by(
+            'learning_unit', '-academic_year__year'
+        ).distinct(
+            'learning_unit'
+        )
+        return {luy.learning_unit_id: luy for luy in learning_unit_years}
@@ -24,7 +24,9 @@
 #
 ##############################################################################
 import logging
-from typing import Dict, List, Any
+import uuid
+from collections import OrderedDict
+from typing import Dict, List, Any, Tuple
 
 from django.conf import settings
 from django.db import IntegrityError, transaction, Error
@@ -46,20 +48,26 @@ from base.forms.learning_unit_specifications import update_future_luy
 from base.forms.utils.choice_field import NO_PLANNED_END_DISPLAY
 from base.models import academic_year
 from base.models.academic_year import AcademicYear, compute_max_academic_year_adjournment
+from base.models import search_index
 from base.models.entity import Entity
 from base.models.enums import learning_unit_year_subtypes, learning_component_year_type
 from base.models.enums.component_type import COMPONENT_TYPES
 from base.models.enums.entity_container_year_link_type import ENTITY_TYPE_LIST
 from base.models.enums.proposal_type import ProposalType
+from base.models.external_learning_unit_year import ExternalLearningUnitYear
 from base.models.learning_achievement import LearningAchievement
 from base.models.learning_component_year import LearningComponentYear
 from base.models.learning_container_year import LearningContainerYear
 from base.models.learning_unit import LearningUnit
 from base.models.learning_unit_year import LearningUnitYear
 from base.models.proposal_learning_unit import ProposalLearningUnit
+from base.models.teaching_material import TeachingMaterial
+from cms import repository as cms_repository
 from cms.enums.entity_name import LEARNING_UNIT_YEAR
 from cms.models.text_label import TextLabel
 from cms.models.translated_text import TranslatedText
+from education_group import publisher
+from learning_unit.ddd.domain.learning_unit_year_identity import LearningUnitYearIdentity
 from learning_unit.models.learning_class_year import LearningClassYear
 from osis_common.utils.numbers import normalize_fraction
 from reference.models.language import Language
@@ -68,6 +76,27 @@ logger = logging.getLogger(settings.DEFAULT_LOGGER)
 FIELDS_TO_EXCLUDE_WITH_REPORT = ("is_vacant", "type_declaration_vacant", "attribution_procedure")
 NO_DATA = _('No data')
 
+LEARNING_UNIT_YEAR_FIELDS_TO_COMPARE = {
+    'acronym': _('Acronym'),
+    'specific_title': _('English title proper'),
+    'specific_title_english': _('English title proper'),
+    'subtype': _('Subtype'),
+    'credits': _('credits'),
+    'internship_subtype': _('Internship subtype'),
+    'status': _('Status'),
+    'session': _('Session derogation'),
+    'quadrimester': _('Quadrimester'),
+    'campus': _('Campus'),
+    'language': _('Language'),
+}
+LEARNING_CONTAINER_YEAR_FIELDS_TO_COMPARE = {
+    'container_type': _('type'),
+    'common_title': _('Common title'),
+    'common_title_english': _('Common English title'),
+    'acronym': _('Acronym'),
+    'team': _('Team management')
+}
+
 
 # TODO :: Use LearningUnitPostponementForm to extend/shorten a LearningUnit and remove all this code
 def edit_learning_unit_end_date(learning_unit_to_edit: LearningUnit,
@@ -277,6 +306,179 @@ def _duplicate_cms_data(duplicated_luy):
         update_related_object(item, 'reference', duplicated_luy.id)
 
 
+def duplicate_learning_unit_years(
+        learning_unit_years_to_duplicate: List[Tuple[LearningUnitYear, AcademicYear]]
+) -> List[LearningUnitYear]:
+    """
+    Set-based counterpart of duplicate_learning_unit_year: duplicate each (learning unit year, academic year) couple
+    with one bulk_create by model. The duplicated learning unit years are returned in the same order.
+    """
+    if not learning_unit_years_to_duplicate:
+        return []
+    old_luys = LearningUnitYear.objects.select_related(
+        'learning_container_year', 'externallearningunityear'
+    ).in_bulk({old_luy.pk for old_luy, _ in learning_unit_years_to_duplicate})
+
+    new_luys = []
+    for old_luy, new_academic_year in learning_unit_years_to_duplicate:
+        new_luy = _build_copy(old_luys[old_luy.pk], academic_year=new_academic_year, attribution_procedure=None)
+        new_luys.append(new_luy)
+    _bulk_get_or_create_container_years(new_luys)
+    LearningUnitYear.objects.bulk_create(new_luys)
+
+    _bulk_duplicate_learning_component_years(new_luys)
+    _bulk_duplicate_teaching_materials(new_luys)
+    _bulk_duplicate_cms_data(new_luys)
+    _bulk_duplicate_externals(new_luys)
+
+    # bulk_create doesn't call save() nor send the post_save signal
+    for new_luy in new_luys:
+        publisher.learning_unit_year_created.send(
+            None,
+            learning_unit_identity=LearningUnitYearIdentity(code=new_luy.acronym, year=new_luy.academic_year.year)
+        )
+    if search_index.is_enabled():
+        search_index.index_learning_unit_years(new_luy.pk for new_luy in new_luys)
+    return new_luys
+
+
+def _build_copy(obj, **new_values):
+    # Unlike duplicate_object, the copy doesn't share the model state (and the related objects cache) of obj
+    new_obj = obj.__class__(**{
+        field.attname: getattr(obj, field.attname) for field in obj._meta.concrete_fields if not field.primary_key
+    })
+    new_obj.external_id = None
+    new_obj.uuid = uuid.uuid4()
+    new_obj.copied_from = obj
+    for attribute_name, new_value in new_values.items():
+        setattr(new_obj, attribute_name, new_value)
+    return new_obj
+
+
+def _bulk_get_or_create_container_years(new_luys):
+    def _key(lcy, ac_year_id):
+        return lcy.learning_container_id, ac_year_id
+
+    old_lcys = [new_luy.copied_from.learning_container_year for new_luy in new_luys]
+    if None in old_lcys:
+        raise LearningContainerYear.DoesNotExist("A learning unit year to duplicate has no container")
+    # Sometimes, the container already exists, we can directly use it and its entitycontaineryear
+    lcys_by_key = {
+        _key(lcy, lcy.academic_year_id): lcy
+        for lcy in LearningContainerYear.objects.filter(
+            learning_container__in={old_lcy.learning_container_id for old_lcy in old_lcys},
+            academic_year__in={new_luy.academic_year_id for new_luy in new_luys},
+        )
+    }
+    lcys_to_create = []
+    keys = []
+    for new_luy, old_lcy in zip(new_luys, old_lcys):
+        key = _key(old_lcy, new_luy.academic_year_id)
+        if key not in lcys_by_key:
+            new_lcy = _build_copy(old_lcy, academic_year=new_luy.academic_year)
+            new_lcy.is_vacant = False
+            new_lcy.type_declaration_vacant = None
+            lcys_by_key[key] = new_lcy
+            lcys_to_create.append(new_lcy)
+        keys.append(key)
+
+    _raise_if_entity_versions_do_not_exist(lcys_to_create)
+    LearningContainerYear.objects.bulk_create(lcys_to_create)
+    # The containers must be assigned once they have a pk
+    for new_luy, key in zip(new_luys, keys):
+        new_luy.learning_container_year = lcys_by_key[key]
+
+
+def _raise_if_entity_versions_do_not_exist(new_lcys):
+    entity_attrs = LearningContainerYear.get_attrs_by_entity_container_type().values()
+    entities_by_id = Entity.objects.filter(
+        pk__in={getattr(new_lcy, attr + '_id') for new_lcy in new_lcys for attr in entity_attrs}
+    ).prefetch_related(
+        "entityversion_set"
+    ).in_bulk()
+    for new_lcy in new_lcys:
+        new_academic_year = new_lcy.academic_year
+        for attr in entity_attrs:
+            entity = entities_by_id.get(getattr(new_lcy, attr + '_id'))
+            if entity and not any(obj.exists_at_specific_date(new_academic_year.end_date)
+                                  for obj in entity.entityversion_set.all()):
+                raise IntegrityError(
+                    _('The entity %(entity_acronym)s does not exist for the selected academic year '
+                      '%(academic_year)s') % {
+                        'entity_acronym': entity.most_recent_acronym,
+                        'academic_year': new_academic_year
+                    })
+
+
+def _bulk_duplicate_learning_component_years(new_luys):
+    old_components_by_luy = _group_by(
+        LearningComponentYear.objects.filter(learning_unit_year__in={luy.copied_from.pk for luy in new_luys}),
+        'learning_unit_year_id'
+    )
+    new_components = [
+        _build_copy(old_component, learning_unit_year=new_luy)
+        for new_luy in new_luys
+        for old_component in old_components_by_luy.get(new_luy.copied_from.pk, [])
+    ]
+    LearningComponentYear.objects.bulk_create(new_components)
+
+    old_classes_by_component = _group_by(
+        LearningClassYear.objects.filter(
+            learning_component_year__in={component.copied_from.pk for component in new_components}
+        ).order_by("acronym"),
+        'learning_component_year_id'
+    )
+    LearningClassYear.objects.bulk_create([
+        _build_copy(old_class, learning_component_year=new_component)
+        for new_component in new_components
+        for old_class in old_classes_by_component.get(new_component.copied_from.pk, [])
+    ])
+
+
+def _bulk_duplicate_teaching_materials(new_luys):
+    old_materials_by_luy = _group_by(
+        TeachingMaterial.objects.filter(learning_unit_year__in={luy.copied_from.pk for luy in new_luys}),
+        'learning_unit_year_id'
+    )
+    TeachingMaterial.objects.bulk_create([
+        _build_copy(material, learning_unit_year=new_luy)
+        for new_luy in new_luys
+        for material in old_materials_by_luy.get(new_luy.copied_from.pk, [])
+    ])
+
+
+def _bulk_duplicate_cms_data(new_luys):
+    old_texts_by_luy = _group_by(
+        TranslatedText.objects.filter(
+            entity=LEARNING_UNIT_YEAR,
+            reference__in={luy.copied_from.pk for luy in new_luys}
+        ),
+        'reference'
+    )
+    new_texts = TranslatedText.objects.bulk_create([
+        _build_copy(text, reference=new_luy.pk)
+        for new_luy in new_luys
+        for text in old_texts_by_luy.get(new_luy.copied_from.pk, [])
+    ])
+    if new_texts:
+        cms_repository.invalidate_cms_texts()
+
+
+def _bulk_duplicate_externals(new_luys):
+    ExternalLearningUnitYear.objects.bulk_create([
+        _build_copy(new_luy.copied_from.externallearningunityear, learning_unit_year=new_luy)
+        for new_luy in new_luys
+        if new_luy.copied_from.is_external()
+    ])
+
+
+def _group_by(queryset, attribute_name):
+    objects_by_attribute = {}
+    for obj in queryset:
+        objects_by_attribute.setdefault(getattr(obj, attribute_name), []).append(obj)
+    return objects_by_attribute
+
+
 def _check_shorten_partims(learning_unit_to_edit, new_academic_year):
     if not LearningUnitYear.objects.filter(
             learning_unit=learning_unit_to_edit, subtype=learning_unit_year_subtypes.FULL).exists():
@@ -362,14 +564,63 @@ def get_postponement_conflict_report(
     This function will return a list of learning unit year (luy_without_conflict) ( > luy_start)
     which doesn't have any conflict. If any conflict found, the variable 'errors' will store it.
     """
-    result = {'luy_without_conflict': [luy_start]}
-    for luy in luy_start.find_gt_learning_units_year():
-        error_list = _check_postponement_conflict(luy_start, luy)
-        if error_list and not override_postponement_consistency:
-            result['errors'] = error_list
-            break
-        result['luy_without_conflict'].append(luy)
-    return result
+    return get_postponement_conflict_reports(
+        [luy_start],
+        override_postponement_consistency=override_postponement_consistency
+    )[luy_start.pk]
+
+
+def get_postponement_conflict_reports(
+        luys_start: List[LearningUnitYear],
+        override_postponement_consistency: bool = False) -> Dict[int, Dict[str, List]]:
+    """
+    Bulk counterpart of get_postponement_conflict_report: all the following years of the given learning unit years
+    are loaded with a fixed number of queries, whatever the number of years to compare.
+    The reports are keyed by the id of the learning unit year they start from.
+    """
+    if not luys_start:
+        return {}
+    luys_by_learning_unit = _find_learning_unit_years_to_compare(luys_start)
+    lcys = [luy.learning_container_year for luys in luys_by_learning_unit.values() for luy in luys]
+    entity_attrs = LearningContainerYear.get_attrs_by_entity_container_type().values()
+    entities_by_id = Entity.objects.filter(
+        pk__in={getattr(lcy, attr + '_id') for lcy in lcys for attr in entity_attrs}
+    ).prefetch_related(
+        'entityversion_set'
+    ).in_bulk()
+    luys_with_components_by_lcy = _group_by(
+        learning_unit_year_with_context.get_with_context(learning_container_year_id=list({lcy.pk for lcy in lcys})),
+        'learning_container_year_id'
+    )
+
+    reports = {}
+    for luy_start in luys_start:
+        luys = luys_by_learning_unit[luy_start.learning_unit_id]
+        start = next(luy for luy in luys if luy.pk == luy_start.pk)
+        result = {'luy_without_conflict': [luy_start]}
+        for luy in luys:
+            if luy.academic_year.year <= start.academic_year.year:
+                continue
+            error_list = _check_postponement_conflict_with_prefetched_data(
+                start, luy, entities_by_id, luys_with_components_by_lcy
+            )
+            if error_list and not override_postponement_consistency:
+                result['errors'] = error_list
+                break
+            result['luy_without_conflict'].append(luy)
+        reports[luy_start.pk] = result
+    return reports
+
+
+def _find_learning_unit_years_to_compare(luys_start):
+    learning_unit_years = LearningUnitYear.objects.filter(
+        learning_unit__in={luy.learning_unit_id for luy in luys_start},
+        academic_year__year__gte=min(luy.academic_year.year for luy in luys_start),
+    ).select_related(
+        'academic_year', 'learning_unit', 'campus', 'language',
+        'learning_container_year__academic_year',
+    ).order_by('academic_year__year')
+    return _group_by(learning_unit_years, 'learning_unit_id')
 
 
 # TODO :: Use LearningUnitPostponementForm to extend/shorten a LearningUnit and remove all this code
@@ -421,32 +672,38 @@ def _check_postponement_conflict(luy: LearningUnitYear, next_luy: LearningUnitYe
     return error_list
 
 
+def _check_postponement_conflict_with_prefetched_data(luy, next_luy, entities_by_id, luys_with_components_by_lcy):
+    error_list = []
+    lcy = luy.learning_container_year
+    next_lcy = next_luy.learning_container_year
+    error_list.extend(_get_flat_differences(luy, next_luy, LEARNING_UNIT_YEAR_FIELDS_TO_COMPARE))
+    error_list.extend(_get_flat_differences(lcy, next_lcy, LEARNING_CONTAINER_YEAR_FIELDS_TO_COMPARE))
+    error_list.extend(_check_postponement_conflict_on_prefetched_entities(lcy, next_lcy, entities_by_id))
+    error_list.extend(_check_postponement_conflict_on_learning_units_volumes(
+        luys_with_components_by_lcy.get(lcy.pk, []),
+        luys_with_components_by_lcy.get(next_lcy.pk, []),
+        next_lcy
+    ))
+    return error_list
+
+
 def _check_postponement_conflict_on_learning_unit_year(luy, next_luy):
-    fields_to_compare = {
-        'acronym': _('Acronym'),
-        'specific_title': _('English title proper'),
-        'specific_title_english': _('English title proper'),
-        'subtype': _('Subtype'),
-        'credits': _('credits'),
-        'internship_subtype': _('Internship subtype'),
-        'status': _('Status'),
-        'session': _('Session derogation'),
-        'quadrimester': _('Quadrimester'),
-        'campus': _('Campus'),
-        'language': _('Language'),
-    }
-    return _get_differences(luy, next_luy, fields_to_compare)
+    return _get_differences(luy, next_luy, LEARNING_UNIT_YEAR_FIELDS_TO_COMPARE)
 
 
 def _check_postponement_conflict_on_learning_container_year(lcy, next_lcy):
-    fields_to_compare = {
-        'container_type': _('type'),
-        'common_title': _('Common title'),
-        'common_title_english': _('Common English title'),
-        'acronym': _('Acronym'),
-        'team': _('Team management')
-    }
-    return _get_differences(lcy, next_lcy, fields_to_compare)
+    return _get_differences(lcy, next_lcy, LEARNING_CONTAINER_YEAR_FIELDS_TO_COMPARE)
+
+
+def _get_flat_differences(obj1, obj2, fields_to_compare):
+    # Most of the years are identical: the columns are compared as a whole before looking for the fields that differ
+    if _get_flat_values(obj1, fields_to_compare) == _get_flat_values(obj2, fields_to_compare):
+        return []
+    return _get_differences(obj1, obj2, fields_to_compare)
+
+
+def _get_flat_values(obj, fields_to_compare):
+    return tuple(getattr(obj, obj._meta.get_field(field).attname) or '' for field in fields_to_compare)
 
 
 def _get_differences(obj1, obj2, fields_to_compare):
@@ -483,6 +740,33 @@ def _check_postponement_conflict_on_entity_container_year(lcy, next_lcy):
         next_lcy,
         list(filter(lambda entity: entity, next_year_entities.values()))
     )
+    error_list.extend(_get_entities_differences(lcy, next_lcy, current_entities, next_year_entities))
+    return error_list
+
+
+def _check_postponement_conflict_on_prefetched_entities(lcy, next_lcy, entities_by_id):
+    current_entities = _get_map_prefetched_entity_by_type(lcy, entities_by_id)
+    next_year_entities = _get_map_prefetched_entity_by_type(next_lcy, entities_by_id)
+    date = next_lcy.academic_year.start_date
+    entities_not_found = {
+        entity for entity in next_year_entities.values()
+        if entity and not any(version.start_date <= date and (version.end_date is None or version.end_date >= date)
+                              for version in entity.entityversion_set.all())
+    }
+    error_list = [_get_error_entity_not_found(entity, next_lcy.academic_year) for entity in entities_not_found]
+    error_list.extend(_get_entities_differences(lcy, next_lcy, current_entities, next_year_entities))
+    return error_list
+
+
+def _get_map_prefetched_entity_by_type(lcy, entities_by_id):
+    return {
+        link_type: entities_by_id.get(getattr(lcy, attr + '_id'))
+        for link_type, attr in LearningContainerYear.get_attrs_by_entity_container_type().items()
+    }
+
+
+def _get_entities_differences(lcy, next_lcy, current_entities, next_year_entities):
+    error_list = []
     entity_type_diff = filter(lambda type: _is_different_value(current_entities, next_year_entities, type),
                               ENTITY_TYPE_LIST)
     for entity_type in entity_type_diff:
@@ -507,14 +791,17 @@ def _check_if_all_entities_exist(lcy, entities_list):
     entities_not_found = filter(lambda entity: entity.id not in existing_entities, entities_list)
 
     for entity_not_found in set(entities_not_found):
-        error = _("The entity '%(acronym)s' doesn't exist anymore in %(year)s" % {
-            'acronym': entity_not_found.most_recent_acronym,
-            'year': lcy.academic_year
-        })
-        error_list.append(error)
+        error_list.append(_get_error_entity_not_found(entity_not_found, lcy.academic_year))
     return error_list
 
 
+def _get_error_entity_not_found(entity, academic_year):
+    return _("The entity '%(acronym)s' doesn't exist anymore in %(year)s" % {
+        'acronym': entity.most_recent_acronym,
+        'year': academic_year
+    })
+
+
 def _is_different_value(obj1, obj2, field, empty_str_as_none=True):
     value_obj1 = _get_value_from_field(obj1, field)
     value_obj2 = _get_value_from_field(obj2, field)
@@ -531,7 +818,15 @@ def _get_value_from_field(obj, field):
 def _check_postponement_conflict_on_volumes(lcy, next_lcy):
     current_learning_units = learning_unit_year_with_context.get_with_context(learning_container_year_id=lcy.id)
     next_year_learning_units = learning_unit_year_with_context.get_with_context(learning_container_year_id=next_lcy.id)
+    return _check_postponement_conflict_on_learning_units_volumes(
+        current_learning_units,
+        next_year_learning_units,
+        next_lcy
+    )
+
 
+def _check_postponement_conflict_on_learning_units_volumes(current_learning_units, next_year_learning_units,
+                                                           next_lcy):
     error_list = []
     for luy_with_components in current_learning_units:
         try:
@@ -560,7 +855,8 @@ def _check_postponement_conflict_on_components(luy_with_components, next_luy_wit
     error_list = []
 
     current_components = getattr(luy_with_components, 'components', {})
-    next_year_components = getattr(next_luy_with_components, 'components', {})
+    # Copied because the components are popped once validated and the learning units can be compared several times
+    next_year_components = OrderedDict(getattr(next_luy_with_components, 'components', {}))
     for component, volumes_computed in current_components.items():
         try:
             # Get the same component for next year (Key: component type)
@@ -26,7 +26,7 @@
 
 from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
-from django.db.models import Prefetch, Case, When, Value, IntegerField, CharField, Q
+from django.db.models import Prefetch, Value, CharField, Q
 from django.db.models.expressions import F
 from django.db.models.functions import Concat, Upper
 from django.utils.translation import gettext_lazy as _
@@ -37,17 +37,16 @@ from reversion.models import Version
 from backoffice.settings.base import LANGUAGE_CODE_FR, LANGUAGE_CODE_EN
 from base.business.learning_unit import CMS_LABEL_PEDAGOGY_FR_ONLY, \
     CMS_LABEL_PEDAGOGY, CMS_LABEL_PEDAGOGY_FR_AND_EN, CMS_LABEL_PEDAGOGY_FORCE_MAJEURE
-from base.business.learning_unit import CMS_LABEL_SPECIFICATIONS, get_achievements_group_by_language
+from base.business.learning_unit import CMS_LABEL_SPECIFICATIONS
 from base.business.learning_unit_xls import annotate_qs
 from base.business.xls import get_name_or_username
+from base.models.learning_achievement import LearningAchievement
 from base.models.person import get_user_interface_language
 from base.models.teaching_material import TeachingMaterial
 from base.utils.excel import get_html_to_text
-from base.views.learning_unit import get_specifications_context
 from cms.enums.entity_name import LEARNING_UNIT_YEAR
-from cms.models.text_label import TextLabel
 from cms.models.translated_text import TranslatedText
-from cms.models.translated_text_label import TranslatedTextLabel
+from cms.repository import bulk_load_translated_texts, bulk_load_translated_text_labels
 from osis_common.document import xls_build
 
 XLS_DESCRIPTION = _('Learning units list')
@@ -102,28 +101,51 @@ def _get_titles():
 
 
 def _add_cms_title_fr_en(cms_labels, with_en=True):
+    translated_labels = bulk_load_translated_text_labels(
+        LEARNING_UNIT_YEAR,
+        labels=cms_labels,
+        languages=[LANGUAGE_CODE_FR, LANGUAGE_CODE_EN]
+    )
     titles = []
     for label_key in cms_labels:
-        a_text_label = TextLabel.objects.filter(label=label_key).first()
-        titles.append(_add_text_label(a_text_label, LANGUAGE_CODE_FR))
+        titles.append(_add_text_label(translated_labels.get((label_key, LANGUAGE_CODE_FR)), LANGUAGE_CODE_FR))
         if with_en:
-            titles.append(_add_text_label(a_text_label, LANGUAGE_CODE_EN))
+            titles.append(_add_text_label(translated_labels.get((label_key, LANGUAGE_CODE_EN)), LANGUAGE_CODE_EN))
     return titles
 
 
 def prepare_xls_educational_information_and_specifications(learning_unit_years, request):
-    qs = annotate_qs(learning_unit_years)
+    qs = annotate_qs(learning_unit_years).prefetch_related(
+        Prefetch(
+            'teachingmaterial_set',
+            queryset=TeachingMaterial.objects.order_by('order'),
+            to_attr='ordered_teaching_materials'
+        ),
+        Prefetch(
+            'learningachievement_set',
+            queryset=LearningAchievement.objects.select_related('language').order_by('order', 'language__code'),
+            to_attr='ordered_achievements'
+        )
+    )
+    learning_unit_years = list(qs)
     user_language = get_user_interface_language(request.user)
 
+    # The CMS data of all the learning units are loaded at once : the number of queries does not depend on the rows
+    cms_texts = bulk_load_translated_texts(
+        [(LEARNING_UNIT_YEAR, learning_unit_yr.id) for learning_unit_yr in learning_unit_years],
+        text_labels_name=CMS_LABEL_PEDAGOGY + CMS_LABEL_PEDAGOGY_FORCE_MAJEURE + CMS_LABEL_SPECIFICATIONS
+    )
+    translated_labels = bulk_load_translated_text_labels(
+        LEARNING_UNIT_YEAR,
+        labels=CMS_LABEL_PEDAGOGY + CMS_LABEL_PEDAGOGY_FORCE_MAJEURE,
+        languages=[user_language]
+    )
+    last_revisions, last_revisions_force_majeure = _get_last_revisions(learning_unit_years, cms_texts)
+
     result = []
 
-    for learning_unit_yr in qs:
-        translated_labels_with_text = _get_translated_labels_with_text(
-            learning_unit_yr.id,
-            user_language,
-            CMS_LABEL_PEDAGOGY
-        )
-        teaching_materials = TeachingMaterial.objects.filter(learning_unit_year=learning_unit_yr).order_by('order')
+    for learning_unit_yr in learning_unit_years:
+        luy_texts = cms_texts.get_texts(LEARNING_UNIT_YEAR, learning_unit_yr.id)
 
         line = [
             learning_unit_yr.acronym,
@@ -132,8 +154,9 @@ def prepare_xls_educational_information_and_specifications(learning_unit_years,
         ]
 
         for label_key in CMS_LABEL_PEDAGOGY_FR_AND_EN:
-            _add_pedagogies_translated_labels_with_text(label_key, line, translated_labels_with_text)
+            _add_pedagogies_translated_labels_with_text(label_key, line, luy_texts, translated_labels, user_language)
 
+        teaching_materials = learning_unit_yr.ordered_teaching_materials
         if teaching_materials:
             line.append("\n".join(
                 [get_html_to_text(teaching_material.title) for teaching_material in
@@ -142,92 +165,91 @@ def prepare_xls_educational_information_and_specifications(learning_unit_years,
             line.append('')
 
         for label_key in CMS_LABEL_PEDAGOGY_FR_ONLY:
-            translated_label = translated_labels_with_text.filter(text_label__label=label_key).first()
-            if translated_label:
-                line.append(
-                    get_html_to_text(translated_label.text_label.text_fr[0].text)
-                    if translated_label.text_label.text_fr and translated_label.text_label.text_fr[0].text else ''
-                )
-
+            if (label_key, user_language) in translated_labels:
+                line.append(_get_text(luy_texts, label_key, settings.LANGUAGE_CODE_FR))
             else:
                 line.append('')
 
-        _add_revision_informations(learning_unit_yr, line)
+        line.extend(last_revisions.get(learning_unit_yr.id, ['', '']))
 
-        translated_labels_force_majeure_with_text = _get_translated_labels_with_text(
-            learning_unit_yr.id,
-            user_language,
-            CMS_LABEL_PEDAGOGY_FORCE_MAJEURE
-        )
         for label_key in CMS_LABEL_PEDAGOGY_FORCE_MAJEURE:
-            _add_pedagogies_translated_labels_with_text(label_key, line, translated_labels_force_majeure_with_text)
+            _add_pedagogies_translated_labels_with_text(label_key, line, luy_texts, translated_labels, user_language)
 
-        _add_revision_informations(learning_unit_yr, line, is_force_majeure=True)
-        _add_specifications(learning_unit_yr, line, request)
+        line.extend(last_revisions_force_majeure.get(learning_unit_yr.id, ['', '']))
+        _add_specifications(luy_texts, line)
 
-        line.extend(_add_achievements(learning_unit_yr))
+        line.extend(_add_achievements(learning_unit_yr.ordered_achievements))
 
         result.append(line)
 
     return result
 
 
-def _add_revision_informations(learning_unit_yr, line, is_force_majeure=False):
-    translated_texts = TranslatedText.objects.filter(
-        reference=learning_unit_yr.id,
-        entity=LEARNING_UNIT_YEAR,
-        text_label__label__in=CMS_LABEL_PEDAGOGY_FORCE_MAJEURE if is_force_majeure else CMS_LABEL_PEDAGOGY
-    )
-    translated_texts_ids = [translated_text.id for translated_text in translated_texts]
-
-    if is_force_majeure:
-        version = Version.objects.filter(
-            content_type=ContentType.objects.get_for_model(TranslatedText), object_id__in=translated_texts_ids
-        )
-    else:
-        teaching_materials = TeachingMaterial.objects.filter(learning_unit_year_id=learning_unit_yr.id)
-        teaching_materials_ids = [teaching_material.id for teaching_material in teaching_materials]
-        version = Version.objects.filter(
-            Q(content_type=ContentType.objects.get_for_model(TranslatedText), object_id__in=translated_texts_ids) |
-            Q(content_type=ContentType.objects.get_for_model(TeachingMaterial), object_id__in=teaching_materials_ids)
-        )
-
-    version = version.select_related(
-        "revision",
-        "revision__user__person"
+def _get_last_revisions(learning_unit_years, cms_texts):
+    """
+    Return the author and the date of the last revision of the description fiche and of the force majeure description
+    fiche of each learning unit year, i.e. two dicts {learning_unit_year_id: [author, date]}
+    """
+    luy_id_by_translated_text_id = {}
+    force_majeure_translated_text_ids = set()
+    luy_id_by_teaching_material_id = {}
+    for learning_unit_yr in learning_unit_years:
+        for (label, _language), translated_text in cms_texts.get_texts(LEARNING_UNIT_YEAR, learning_unit_yr.id).items():
+            if label in CMS_LABEL_PEDAGOGY_FORCE_MAJEURE:
+                force_majeure_translated_text_ids.add(str(translated_text.id))
+            elif label not in CMS_LABEL_PEDAGOGY:
+                continue
+            luy_id_by_translated_text_id[str(translated_text.id)] = learning_unit_yr.id
+        for teaching_material in learning_unit_yr.ordered_teaching_materials:
+            luy_id_by_teaching_material_id[str(teaching_material.id)] = learning_unit_yr.id
+
+    last_revisions = {}
+    last_revisions_force_majeure = {}
+    if not luy_id_by_translated_text_id and not luy_id_by_teaching_material_id:
+        return last_revisions, last_revisions_force_majeure
+
+    translated_text_content_type = ContentType.objects.get_for_model(TranslatedText)
+    teaching_material_content_type = ContentType.objects.get_for_model(TeachingMaterial)
+    versions = Version.objects.filter(
+        Q(content_type=translated_text_content_type, object_id__in=list(luy_id_by_translated_text_id)) |
+        Q(content_type=teaching_material_content_type, object_id__in=list(luy_id_by_teaching_material_id))
     ).annotate(
         author=Concat(
             Upper(F('revision__user__person__last_name')), Value(' '), F('revision__user__person__first_name'),
             output_field=CharField()
         )
-    ).order_by("-revision__date_created")
-    if version:
-        line.append(version.values('author')[:1][0]["author"])
-        line.append(version.values('revision__date_created')[:1][0]["revision__date_created"].strftime("%d/%m/%Y"))
-    else:
-        line.append('')
-        line.append('')
+    ).order_by(
+        "-revision__date_created"
+    ).values_list('content_type_id', 'object_id', 'author', 'revision__date_created')
+
+    for content_type_id, object_id, author, date_created in versions:
+        revision = [author, date_created.strftime("%d/%m/%Y")]
+        if content_type_id == teaching_material_content_type.id:
+            last_revisions.setdefault(luy_id_by_teaching_material_id[object_id], revision)
+        elif object_id in force_majeure_translated_text_ids:
+            last_revisions_force_majeure.setdefault(luy_id_by_translated_text_id[object_id], revision)
+        else:
+            last_revisions.setdefault(luy_id_by_translated_text_id[object_id], revision)
+    return last_revisions, last_revisions_force_majeure
 
 
-def _add_pedagogies_translated_labels_with_text(label_key, line, translated_labels_with_text):
-    translated_label = translated_labels_with_text.filter(text_label__label=label_key).first()
-    if translated_label:
-        line.append(
-            get_html_to_text(translated_label.text_label.text_fr[0].text)
-            if translated_label.text_label.text_fr and translated_label.text_label.text_fr[0].text else ''
-        )
-        line.append(
-            get_html_to_text(translated_label.text_label.text_en[0].text)
-            if translated_label.text_label.text_en and translated_label.text_label.text_en[0].text else '')
+def _get_text(luy_texts, label_key, language):
+    translated_text = luy_texts.get((label_key, language))
+    return get_html_to_text(translated_text.text) if translated_text and translated_text.text else ''
+
+
+def _add_pedagogies_translated_labels_with_text(label_key, line, luy_texts, translated_labels, user_language):
+    if (label_key, user_language) in translated_labels:
+        line.append(_get_text(luy_texts, label_key, settings.LANGUAGE_CODE_FR))
+        line.append(_get_text(luy_texts, label_key, settings.LANGUAGE_CODE_EN))
     else:
         line.append('')
         line.append('')
 
 
-def _add_achievements(learning_unit_yr):
-    achievements = get_achievements_group_by_language(learning_unit_yr)
-    achievements_fr = (achievements.get('achievements_FR', None))
-    achievements_en = (achievements.get('achievements_EN', None))
+def _add_achievements(achievements):
+    achievements_fr = [achievement for achievement in achievements if achievement.language.code == 'FR']
+    achievements_en = [achievement for achievement in achievements if achievement.language.code == 'EN']
     return ["\n".join([get_html_to_text(achievement.text) for achievement in
                        achievements_fr]) if achievements_fr else '',
             "\n".join([get_html_to_text(achievement.text) for achievement in
@@ -235,50 +257,10 @@ def _add_achievements(learning_unit_yr):
             ]
 
 
-def _add_specifications(learning_unit_yr, line, request):
-    specifications = get_specifications_context(learning_unit_yr, request)
-    obj_fr = specifications.get('form_french')
-    obj_en = specifications.get('form_english')
+def _add_specifications(luy_texts, line):
     for label_key in CMS_LABEL_SPECIFICATIONS:
-        line.append(get_html_to_text(getattr(obj_fr, label_key, '')))
-        line.append(get_html_to_text(getattr(obj_en, label_key, '')))
-
-
-def _get_translated_labels_with_text(learning_unit_year_id, user_language, cms_labels):
-    translated_labels_with_text = TranslatedTextLabel.objects.filter(
-        language=user_language,
-        text_label__label__in=cms_labels
-    ).prefetch_related(
-        Prefetch(
-            "text_label__translatedtext_set",
-            queryset=TranslatedText.objects.filter(
-                language=settings.LANGUAGE_CODE_FR,
-                entity=LEARNING_UNIT_YEAR,
-                reference=learning_unit_year_id
-            ),
-            to_attr="text_fr"
-        ),
-        Prefetch(
-            "text_label__translatedtext_set",
-            queryset=TranslatedText.objects.filter(
-                language=settings.LANGUAGE_CODE_EN,
-                entity=LEARNING_UNIT_YEAR,
-                reference=learning_unit_year_id
-            ),
-            to_attr="text_en"
-        )
-    ).annotate(
-        label_ordering=Case(
-            *[When(text_label__label=label, then=Value(i)) for i, label in enumerate(cms_labels)],
-            default=Value(len(cms_labels)),
-            output_field=IntegerField()
-        )
-    ).select_related(
-        "text_label"
-    ).order_by(
-        "label_ordering"
-    )
-    return translated_labels_with_text
+        line.append(_get_text(luy_texts, label_key, settings.LANGUAGE_CODE_FR))
+        line.append(_get_text(luy_texts, label_key, settings.LANGUAGE_CODE_EN))
 
 
 def _get_wrapped_cells_educational_information_and_specifications(learning_units, nb_col):
@@ -292,6 +274,5 @@ def _get_wrapped_cells_educational_information_and_specifications(learning_units
     return dict_wrapped_styled_cells
 
 
-def _add_text_label(a_text_label, language_code):
-    a_label = TranslatedTextLabel.objects.filter(text_label=a_text_label, language=language_code).first()
+def _add_text_label(a_label, language_code):
     return "{} - {}".format(a_label if a_label else '', language_code.upper())
@@ -23,8 +23,10 @@
 #    see http://www.gnu.org/licenses/.
 #
 ############################################################################
+import logging
 from abc import ABC
 
+from django.conf import settings
 from django.core.exceptions import ObjectDoesNotExist, MultipleObjectsReturned
 from django.db import transaction, Error
 from django.db.models import Max, Q
@@ -33,6 +35,8 @@ from django.utils.translation import gettext as _
 from base.business.education_groups.postponement import ConsistencyError
 from base.models.academic_year import AcademicYear
 
+logger = logging.getLogger(settings.DEFAULT_LOGGER)
+
 
 class AutomaticPostponement(ABC):
     # The model must have annualized data with a FK to AcademicYear
@@ -99,6 +103,9 @@ class AutomaticPostponementToN6(AutomaticPostponement):
     # Callbacks
     # They should be call with __func__ to be staticmethod
     extend_method = None
+    # Optional set-based variant of extend_method: receives a list of (object to copy, academic year) couples
+    # and returns the created objects in the same order
+    batch_extend_method = None
     send_before = None
     send_after = None
 
@@ -108,12 +115,19 @@ class AutomaticPostponementToN6(AutomaticPostponement):
 
         super().__init__(queryset)
 
+        self.chunks_count = 0
+        self.chunks_with_errors_count = 0
+
     def postpone(self):
         # send statistics to the managers
         statistics_context = self.get_statistics_context()
         self.send_before.__func__(statistics_context)
 
         self._extend_objects()
+        statistics_context.update({
+            'chunks': self.chunks_count,
+            'chunks_with_errors': self.chunks_with_errors_count,
+        })
 
         # send statistics with results to the managers
         self.send_after.__func__(statistics_context, self.result, self.errors)
@@ -121,25 +135,86 @@ class AutomaticPostponementToN6(AutomaticPostponement):
         return self.result, self.errors
 
     def _extend_objects(self):
-        for obj in self.to_duplicate:
+        if self.batch_extend_method and settings.AUTOMATIC_POSTPONEMENT_BATCH_ENABLED:
+            self._extend_objects_by_chunks()
+        else:
+            for obj in self.to_duplicate:
+                self._extend_object(obj)
+
+    def _extend_object(self, obj):
+        try:
+            with transaction.atomic():
+                last_year = obj.end_year.year if obj.end_year else self.last_academic_year.year
+                obj_to_copy = self.get_object_to_copy(obj)
+                copied_objs = []
+                last_object_copied = None
+                for year in range(obj.last_year + 1, last_year + 1):
+                    new_obj = self.extend_obj(obj_to_copy, AcademicYear.objects.get(year=year))
+                    copied_objs.append(new_obj)
+                    last_object_copied = new_obj
+
+                self.post_extend(obj_to_copy, copied_objs)
+                if last_object_copied:
+                    self.result.append(last_object_copied)
+
+        # General catch to be sure to not stop the rest of the duplication
+        except (Error, ObjectDoesNotExist, MultipleObjectsReturned, ConsistencyError) as err:
+            self.errors.append(obj)
+
+    def _extend_objects_by_chunks(self):
+        academic_years = {
+            ac_year.year: ac_year
+            for ac_year in AcademicYear.objects.filter(year__lte=self.last_academic_year.year)
+        }
+        objects = list(self.to_duplicate)
+        chunk_size = settings.AUTOMATIC_POSTPONEMENT_CHUNK_SIZE
+        for index in range(0, len(objects), chunk_size):
+            chunk = objects[index:index + chunk_size]
+            self.chunks_count += 1
             try:
                 with transaction.atomic():
-                    last_year = obj.end_year.year if obj.end_year else self.last_academic_year.year
-                    obj_to_copy = self.get_object_to_copy(obj)
-                    copied_objs = []
-                    last_object_copied = None
-                    for year in range(obj.last_year + 1, last_year + 1):
-                        new_obj = self.extend_obj(obj_to_copy, AcademicYear.objects.get(year=year))
-                        copied_objs.append(new_obj)
-                        last_object_copied = new_obj
-
-                    self.post_extend(obj_to_copy, copied_objs)
-                    if last_object_copied:
-                        self.result.append(last_object_copied)
-
-            # General catch to be sure to not stop the rest of the duplication
-            except (Error, ObjectDoesNotExist, MultipleObjectsReturned, ConsistencyError) as err:
-                self.errors.append(obj)
+                    self.result.extend(self._extend_chunk(chunk, academic_years))
+            # The chunk is rolled back: its objects are postponed one by one to isolate the faulty ones
+            except (Error, ObjectDoesNotExist, MultipleObjectsReturned, ConsistencyError):
+                logger.exception("Automatic postponement: chunk %s failed, postponing its objects one by one",
+                                 self.chunks_count)
+                self.chunks_with_errors_count += 1
+                for obj in chunk:
+                    self._extend_object(obj)
+            logger.info(
+                "Automatic postponement: %s/%s object(s) processed (%s extended, %s error(s))",
+                index + len(chunk), len(objects), len(self.result), len(self.errors)
+            )
+
+    def _extend_chunk(self, chunk, academic_years):
+        objects_to_copy = self.get_objects_to_copy(chunk)
+        objects_and_years = []
+        owners = []
+        for obj in chunk:
+            if obj.pk not in objects_to_copy:
+                raise self.model.DoesNotExist("No object to copy for {}".format(obj))
+            last_year = obj.end_year.year if obj.end_year else self.last_academic_year.year
+            for year in range(obj.last_year + 1, last_year + 1):
+                if year not in academic_years:
+                    raise AcademicYear.DoesNotExist("Academic year {} does not exist".format(year))
+                objects_and_years.append((objects_to_copy[obj.pk], academic_years[year]))
+                owners.append(obj)
+
+        copied_objs_by_owner = {}
+        for owner, new_obj in zip(owners, self.batch_extend_objs(objects_and_years)):
+            copied_objs_by_owner.setdefault(owner.pk, []).append(new_obj)
+
+        last_objects_copied = []
+        for obj in chunk:
+            copied_objs = copied_objs_by_owner.get(obj.pk, [])
+            self.post_extend(objects_to_copy[obj.pk], copied_objs)
+            if copied_objs:
+                last_objects_copied.append(copied_objs[-1])
+        return last_objects_copied
+
+    def get_objects_to_copy(self, objects_to_duplicate):
+        """ Override to fetch the objects to copy of a whole chunk in one query """
+        return {obj.pk: self.get_object_to_copy(obj) for obj in objects_to_duplicate}
 
     def get_object_to_copy(self, object_to_duplicate):
         return getattr(object_to_duplicate, self.annualized_set + "_set").latest('academic_year__year')
@@ -148,6 +223,10 @@ class AutomaticPostponementToN6(AutomaticPostponement):
     def extend_obj(cls, obj, last_academic_year):
         return cls.extend_method(obj, last_academic_year)
 
+    @classmethod
+    def batch_extend_objs(cls, objects_and_years):
+        return cls.batch_extend_method(objects_and_years)
+
     def get_queryset(self, queryset=None):
         """ Override if you need to add additional filters"""
         queryset = super().get_queryset(queryset)
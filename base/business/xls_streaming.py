@@ -0,0 +1,152 @@
+##############################################################################
+#
+#    OSIS stands for Open Student Information System. It's an application
+#    designed to manage the core business of higher education institutions,
+#    such as universities, faculties, institutes and professional schools.
+#    The core business involves the administration of students, teachers,
+#    courses, programs and so on.
+#
+#    Copyright (C) 2015-2020 Université catholique de Louvain (http://www.uclouvain.be)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    A copy of this license - GNU General Public License - is available
+#    at the root of the source code of this program.  If not,
+#    see http://www.gnu.org/licenses/.
+#
+import datetime
+import tempfile
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import attr
+from django.conf import settings
+from django.db.models import QuerySet
+from django.http import FileResponse
+from django.utils.functional import Promise
+from django.utils.translation import gettext_lazy as _
+from openpyxl import Workbook
+from openpyxl.styles import Alignment, Border, Font, PatternFill
+from openpyxl.utils import get_column_letter
+from openpyxl.writer.write_only import WriteOnlyCell
+
+from osis_common.document.xls_build import CONTENT_TYPE_XLS
+
+DATE_TIME_FORMAT = '%d-%m-%Y %H:%M'
+MAX_COLUMN_WIDTH = 50
+
+
+@attr.s(slots=True)
+class RowStyle:
+    font = attr.ib(type=Font, default=None)
+    border = attr.ib(type=Border, default=None)
+    fonts_by_column = attr.ib(type=Dict[int, Font], factory=dict)
+    alignments_by_column = attr.ib(type=Dict[int, Alignment], factory=dict)
+    fills_by_column = attr.ib(type=Dict[int, PatternFill], factory=dict)
+
+
+Row = Union[List, Tuple[List, Optional[RowStyle]]]
+
+
+@attr.s(slots=True)
+class StreamingWorksheet:
+    title = attr.ib(type=str)
+    header_titles = attr.ib(type=List[str])
+    rows = attr.ib(type=Iterable[Row])
+    header_style = attr.ib(type=RowStyle, default=None)
+
+
+def must_be_streamed(rows: Union[QuerySet, List]) -> bool:
+    rows_count = rows.count() if isinstance(rows, QuerySet) else len(rows)
+    return rows_count > settings.XLS_STREAMING_THRESHOLD
+
+
+def iterate_in_chunks(rows: Union[QuerySet, Iterable], chunk_size: int = None) -> Iterator:
+    """
+    Iterate over a queryset by fetching chunk_size objects at a time. Contrary to QuerySet.iterator(),
+    the select_related / prefetch_related / annotations of the queryset are applied on each chunk.
+    """
+    if not isinstance(rows, QuerySet):
+        yield from rows
+        return
+
+    chunk_size = chunk_size or settings.XLS_STREAMING_CHUNK_SIZE
+    ordered_pks = list(rows.values_list('pk', flat=True))
+    for start in range(0, len(ordered_pks), chunk_size):
+        chunk_pks = ordered_pks[start:start + chunk_size]
+        objects_by_pk = {obj.pk: obj for obj in rows.filter(pk__in=chunk_pks)}
+        yield from (objects_by_pk[pk] for pk in chunk_pks if pk in objects_by_pk)
+
+
+def generate_streaming_xls(
+        worksheets: List[StreamingWorksheet],
+        filename: str,
+        description: str,
+        user: str,
+        filters: Dict = None
+) -> FileResponse:
+    """
+    Write the worksheets in a write-only workbook (rows are flushed to disk as soon as they are appended) saved in a
+    temporary file, then stream this file in the response. Memory usage does not depend on the number of rows.
+    """
+    workbook = Workbook(write_only=True)
+    for worksheet in worksheets:
+        _write_worksheet(workbook, worksheet)
+    _write_parameters_worksheet(workbook, user, description, filters)
+
+    xls_file = tempfile.TemporaryFile()
+    workbook.save(xls_file)
+    xls_file.seek(0)
+    response = FileResponse(xls_file, content_type=CONTENT_TYPE_XLS)
+    response['Content-Disposition'] = "attachment; filename={}.xlsx".format(filename)
+    return response
+
+
+def _write_worksheet(workbook: Workbook, worksheet: StreamingWorksheet) -> None:
+    xls_worksheet = workbook.create_sheet(title=str(worksheet.title))
+    # Write-only worksheets cannot be resized once rows are written : column widths are based on the header titles
+    for column_index, title in enumerate(worksheet.header_titles, start=1):
+        column_width = min(len(str(title)) + 2, MAX_COLUMN_WIDTH)
+        xls_worksheet.column_dimensions[get_column_letter(column_index)].width = column_width
+
+    xls_worksheet.append(_build_cells(xls_worksheet, worksheet.header_titles, worksheet.header_style))
+    for row in worksheet.rows:
+        values, style = row if isinstance(row, tuple) else (row, None)
+        xls_worksheet.append(_build_cells(xls_worksheet, values, style))
+
+
+def _build_cells(xls_worksheet, values: List, style: Optional[RowStyle]) -> List:
+    values = [str(value) if isinstance(value, Promise) else value for value in values]
+    if style is None:
+        return values
+
+    cells = []
+    for column_index, value in enumerate(values):
+        cell = WriteOnlyCell(xls_worksheet, value=value)
+        font = style.fonts_by_column.get(column_index, style.font)
+        if font:
+            cell.font = font
+        if style.border:
+            cell.border = style.border
+        if column_index in style.alignments_by_column:
+            cell.alignment = style.alignments_by_column[column_index]
+        if column_index in style.fills_by_column:
+            cell.fill = style.fills_by_column[column_index]
+        cells.append(cell)
+    return cells
+
+
+def _write_parameters_worksheet(workbook: Workbook, user: str, description: str, filters: Optional[Dict]) -> None:
+    xls_worksheet = workbook.create_sheet(title=str(_('Parameters')))
+    xls_worksheet.append([str(_('Author')), str(user)])
+    xls_worksheet.append([str(_('Date')), datetime.datetime.now().strftime(DATE_TIME_FORMAT)])
+    xls_worksheet.append([str(_('Description')), str(description)])
+    for key, value in (filters or {}).items():
+        xls_worksheet.append([str(key), str(value)])
@@ -30,8 +30,8 @@ from django.utils.translation import gettext_lazy as _, pgettext_lazy
 from django_filters import OrderingFilter, filters, FilterSet
 
 from base.business.entity import get_entities_ids
-from base.forms.utils.filter_field import filter_field_by_regex
-from base.models import entity_version
+from base.forms.utils.filter_field import filter_field_by_search_index
+from base.models import entity_version, search_index
 from base.models.academic_year import AcademicYear, starting_academic_year
 from base.models.education_group_type import EducationGroupType
 from base.models.education_group_year import EducationGroupYear
@@ -39,6 +39,9 @@ from base.models.enums import education_group_categories
 from base.models.enums import education_group_types
 from base.models.enums.education_group_categories import Categories
 
+# Filtered field : field of the search index entry
+SEARCH_INDEX_FIELDS = {'acronym': 'acronym', 'partial_acronym': 'code', 'title': 'title'}
+
 
 class EducationGroupFilter(FilterSet):
     academic_year = filters.ModelChoiceFilter(
@@ -135,7 +138,9 @@ class EducationGroupFilter(FilterSet):
 
     @staticmethod
     def filter_education_group_year_field(queryset, name, value):
-        return filter_field_by_regex(queryset, name, value)
+        return filter_field_by_search_index(
+            queryset, name, value, search_index.EDUCATION_GROUP_YEAR, SEARCH_INDEX_FIELDS[name]
+        )
 
     def get_queryset(self):
         # Need this close so as to return empty query by default when form is unbound
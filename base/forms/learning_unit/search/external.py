@@ -28,7 +28,9 @@ from django.db.models import BLANK_CHOICE_DASH, OuterRef, Exists
 from django.utils.translation import gettext_lazy as _, pgettext_lazy
 from django_filters import FilterSet, filters, OrderingFilter
 
-from base.forms.utils.filter_field import filter_field_by_regex
+from base.forms.learning_unit.search.simple import SEARCH_INDEX_FIELDS
+from base.forms.utils.filter_field import filter_field_by_search_index
+from base.models import search_index
 from base.models.academic_year import AcademicYear, starting_academic_year
 from base.models.campus import Campus
 from base.models.entity_version_address import EntityVersionAddress
@@ -172,7 +174,9 @@ class ExternalLearningUnitFilter(FilterSet):
         return qs
 
     def filter_learning_unit_year_field(self, queryset, name, value):
-        return filter_field_by_regex(queryset, name, value)
+        return filter_field_by_search_index(
+            queryset, name, value, search_index.LEARNING_UNIT_YEAR, SEARCH_INDEX_FIELDS[name]
+        )
 
     def filter_country_field(self, queryset, name, value):
         if value:
@@ -25,6 +25,7 @@ from django import forms
 from django.utils.translation import gettext_lazy as _, pgettext_lazy
 from django_filters import FilterSet, filters, OrderingFilter
 
+from base.models import search_index
 from base.models.academic_year import AcademicYear
 from base.models.learning_unit_year import LearningUnitYear, LearningUnitYearQuerySet
 
@@ -39,14 +40,14 @@ class QuickLearningUnitYearFilter(FilterSet):
     )
     acronym = filters.CharFilter(
         field_name="acronym",
-        lookup_expr="iregex",
+        method="filter_learning_unit_year_field",
         max_length=40,
         required=False,
         label=_('Code'),
     )
     title = filters.CharFilter(
         field_name="full_title",
-        lookup_expr="icontains",
+        method="filter_learning_unit_year_field",
         max_length=40,
         label=_('Title'),
     )
@@ -86,3 +87,13 @@ class QuickLearningUnitYearFilter(FilterSet):
         )
         queryset = LearningUnitYearQuerySet.annotate_full_title_class_method(queryset)
         return queryset
+
+    @staticmethod
+    def filter_learning_unit_year_field(queryset, name, value):
+        # The code is searched as a regular expression, the title as is
+        regex = name == 'acronym'
+        if search_index.is_enabled():
+            return search_index.filter_by_search_index(
+                queryset, search_index.LEARNING_UNIT_YEAR, name, value, regex=regex
+            )
+        return queryset.filter(**{"{}__{}".format(name, 'iregex' if regex else 'icontains'): value})
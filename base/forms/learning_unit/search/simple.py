@@ -29,10 +29,11 @@ from django.utils.translation import gettext_lazy as _, pgettext_lazy
 from django_filters import FilterSet, filters, OrderingFilter
 
 from base.business.entity import get_entities_ids
-from base.forms.utils.filter_field import filter_field_by_regex, espace_special_characters
+from base.forms.utils.filter_field import filter_field_by_search_index, espace_special_characters
 from base.models.academic_year import AcademicYear, starting_academic_year
 from base.models.enums import quadrimesters, learning_unit_year_subtypes, active_status, learning_container_year_types
 from base.models.enums.learning_container_year_types import LearningContainerYearType
+from base.models import search_index
 from base.models.learning_unit_year import LearningUnitYear, LearningUnitYearQuerySet
 from base.models.proposal_learning_unit import ProposalLearningUnit
 from base.views.learning_units.search.common import SearchTypes
@@ -45,6 +46,9 @@ COMMON_ORDERING_FIELDS = (
     ('credits', 'credits'), ('status', 'status'), ('has_proposal', 'has_proposal'),
 )
 
+# Filtered field : field of the search index entry
+SEARCH_INDEX_FIELDS = {'acronym': 'acronym', 'full_title': 'full_title'}
+
 MOBILITY = 'mobility'
 MOBILITY_CHOICE = ((MOBILITY, _('Mobility')),)
 
@@ -212,7 +216,9 @@ class LearningUnitFilter(FilterSet):
         return queryset
 
     def filter_learning_unit_year_field(self, queryset, name, value):
-        return filter_field_by_regex(queryset, name, value)
+        return filter_field_by_search_index(
+            queryset, name, value, search_index.LEARNING_UNIT_YEAR, SEARCH_INDEX_FIELDS[name]
+        )
 
 
 def filter_by_entities(name, queryset, value, with_subordinated):
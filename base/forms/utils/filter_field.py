@@ -23,6 +23,7 @@
 #    see http://www.gnu.org/licenses/.
 #
 ##############################################################################
+from base.models import search_index
 
 CHARACTER_TO_ESCAPE = [
     '[',
@@ -40,6 +41,19 @@ def filter_field_by_regex(queryset, name, value):
     return queryset
 
 
+def filter_field_by_search_index(queryset, name, value, object_type, index_field):
+    """ Same as filter_field_by_regex, answered from the search index when it is enabled """
+    if value and search_index.is_enabled():
+        return search_index.filter_by_search_index(
+            queryset,
+            object_type,
+            index_field,
+            espace_special_characters(value),
+            regex=True
+        )
+    return filter_field_by_regex(queryset, name, value)
+
+
 def espace_special_characters(value):
     for character in CHARACTER_TO_ESCAPE:
         value = value.replace(character, "\\{}".format(character))
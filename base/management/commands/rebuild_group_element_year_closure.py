@@ -0,0 +1,54 @@
+##############################################################################
+#
+#    OSIS stands for Open Student Information System. It's an application
+#    designed to manage the core business of higher education institutions,
+#    such as universities, faculties, institutes and professional schools.
+#    The core business involves the administration of students, teachers,
+#    courses, programs and so on.
+#
+#    Copyright (C) 2015-2020 Université catholique de Louvain (http://www.uclouvain.be)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    A copy of this license - GNU General Public License - is available
+#    at the root of the source code of this program.  If not,
+#    see http://www.gnu.org/licenses/.
+#
+##############################################################################
+from django.core.management.base import BaseCommand, CommandError
+
+from base.models import group_element_year_closure
+
+
+class Command(BaseCommand):
+    help = "Rebuild the closure table of the GroupElementYear links and check it against the links"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verify-only',
+            action='store_true',
+            help="Only check the closure table without rebuilding it",
+        )
+
+    def handle(self, *args, **options):
+        if not options['verify_only']:
+            rows_count = group_element_year_closure.rebuild()
+            self.stdout.write("{} closure rows created".format(rows_count))
+
+        differences = group_element_year_closure.verify()
+        for difference in differences[:20]:
+            self.stderr.write(
+                "Element {ancestor_element_id} > {descendant_element_id} : expected {expected_path_count} path(s), "
+                "stored {stored_path_count}".format(**difference)
+            )
+        if differences:
+            raise CommandError("{} inconsistencies found in the closure table".format(len(differences)))
+        self.stdout.write(self.style.SUCCESS("Closure table is consistent"))
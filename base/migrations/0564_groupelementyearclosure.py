@@ -0,0 +1,27 @@
+# Generated by Django 2.2.13 on 2026-10-18 09:12
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('program_management', '0008_auto_20200826_0835'),
+        ('base', '0563_auto_20210201_1051'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GroupElementYearClosure',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('path_count', models.PositiveIntegerField(default=1)),
+                ('ancestor_element', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='program_management.Element')),
+                ('descendant_element', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='program_management.Element')),
+            ],
+            options={
+                'unique_together': {('ancestor_element', 'descendant_element')},
+            },
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 2.2.13 on 2026-10-18 16:40
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0565_exportjob'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.CreateModel(
+            name='SearchIndexEntry',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_type', models.CharField(choices=[('learning_unit_year', 'learning_unit_year'), ('group_year', 'group_year'), ('education_group_year', 'education_group_year')], max_length=30)),
+                ('object_id', models.IntegerField()),
+                ('year', models.IntegerField()),
+                ('acronym', models.CharField(blank=True, max_length=255)),
+                ('code', models.CharField(blank=True, max_length=255)),
+                ('title', models.TextField(blank=True)),
+                ('full_title', models.TextField(blank=True)),
+                ('title_en', models.TextField(blank=True)),
+                ('search_text', models.TextField(blank=True)),
+            ],
+            options={
+                'unique_together': {('object_type', 'object_id')},
+            },
+        ),
+        migrations.AddIndex(
+            model_name='searchindexentry',
+            index=models.Index(fields=['object_type', 'year'], name='search_index_type_year'),
+        ),
+        migrations.AddIndex(
+            model_name='searchindexentry',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['acronym'], name='search_index_acronym_trgm', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='searchindexentry',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['code'], name='search_index_code_trgm', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='searchindexentry',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['title'], name='search_index_title_trgm', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='searchindexentry',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['full_title'], name='search_index_full_title_trgm', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='searchindexentry',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_text'], name='search_index_text_trgm', opclasses=['gin_trgm_ops']),
+        ),
+    ]
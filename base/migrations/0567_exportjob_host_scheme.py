@@ -0,0 +1,23 @@
+# Generated by Django 2.2.13 on 2026-10-18 19:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0566_searchindexentry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='exportjob',
+            name='host',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='exportjob',
+            name='scheme',
+            field=models.CharField(default='https', max_length=10),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 2.2.13 on 2026-10-18 21:40
+
+import base.models.export_job
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0567_exportjob_host_scheme'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='exportjob',
+            name='file',
+            field=models.FileField(blank=True, storage=base.models.export_job.ExportJobStorage(), upload_to='export_jobs/'),
+        ),
+    ]
@@ -19,8 +19,10 @@ from base.models import entity_version_address
 from base.models import exam_enrollment
 from base.models import external_learning_unit_year
 from base.models import external_learning_unit_year
+from base.models import export_job
 from base.models import external_offer
 from base.models import group_element_year
+from base.models import group_element_year_closure
 from base.models import hops
 from base.models import learning_achievement
 from base.models import learning_component_year
@@ -45,6 +47,7 @@ from base.models import person_entity
 from base.models import prerequisite
 from base.models import prerequisite_item
 from base.models import proposal_learning_unit
+from base.models import search_index
 from base.models import session_exam
 from base.models import session_exam_calendar
 from base.models import session_exam_deadline
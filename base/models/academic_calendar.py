@@ -23,6 +23,7 @@
 #    see http://www.gnu.org/licenses/.
 #
 ##############################################################################
+from django.conf import settings
 from django.db import models
 from django.utils import timezone
 from django.utils.translation import gettext as _
@@ -33,9 +34,12 @@ from base.models.enums import academic_calendar_type
 from base.models.exceptions import StartDateHigherThanEndDateException
 from base.models.utils.admin_extentions import remove_delete_action
 from base.signals.publisher import compute_all_scores_encodings_deadlines
+from base.utils.cache import VersionStamp
 from osis_common.models.serializable_model import SerializableModel, SerializableModelAdmin
 from osis_common.utils.models import get_object_or_none
 
+ACADEMIC_CALENDAR_VERSION = VersionStamp('academic_calendar_version')
+
 
 class AcademicCalendarAdmin(VersionAdmin, SerializableModelAdmin):
     list_display = ('academic_year', 'title', 'start_date', 'end_date', 'data_year')
@@ -94,6 +98,7 @@ class AcademicCalendar(SerializableModel):
         self.validation_mandatory_dates()
         self.validation_start_end_dates()
         super().save(*args, **kwargs)
+        invalidate_academic_event_indexes()
         compute_all_scores_encodings_deadlines.send(sender=self.__class__, academic_calendar=self)
 
     def validation_start_end_dates(self):
@@ -158,3 +163,9 @@ def get_academic_calendar_by_date_and_reference_and_data_year(data_year, referen
         )
     except AcademicCalendar.DoesNotExist:
         return None
+
+
+def invalidate_academic_event_indexes() -> None:
+    """ Drop the academic event indexes of all processes once the current transaction is committed """
+    if getattr(settings, 'ACADEMIC_CALENDAR_INDEX_ENABLED', False):
+        ACADEMIC_CALENDAR_VERSION.bump_on_commit()
@@ -25,9 +25,11 @@
 ##############################################################################
 import collections
 import datetime
+import threading
 from collections import OrderedDict
-from typing import Dict, Iterable, List
+from typing import Dict, Iterable, List, Optional
 
+from django.conf import settings
 from django.contrib.postgres.fields import ArrayField
 from django.db import models
 from django.db.models import Q
@@ -45,6 +47,7 @@ from base.models.enums import entity_type
 from base.models.enums.entity_type import PEDAGOGICAL_ENTITY_TYPES
 from base.models.enums.organization_type import ACADEMIC_PARTNER, MAIN
 from base.models.utils.func import ArrayConcat
+from base.utils.cache import VersionStamp
 from osis_common.models.serializable_model import SerializableModel, SerializableModelAdmin
 from osis_common.utils.datetime import get_tzinfo
 
@@ -54,6 +57,9 @@ PEDAGOGICAL_ENTITY_ADDED_EXCEPTIONS = [
     "CCR"
 ]
 
+ENTITY_HIERARCHY_VERSION = VersionStamp('entity_hierarchy_index_version')
+ENTITY_HIERARCHY_INDEX_MAX_DATES = 32
+
 
 class Node:
     """ Node used to create an hierarchy between the entity_version """
@@ -94,6 +100,22 @@ class EntityVersionQuerySet(CTEQuerySet):
     def entity(self, entity):
         return self.filter(entity=entity)
 
+    # The bulk operations bypass EntityVersion.save() : invalidate the entity hierarchy indexes as save() does
+
+    def update(self, **kwargs):
+        rows_count = super().update(**kwargs)
+        invalidate_entity_hierarchy_index()
+        return rows_count
+
+    def bulk_create(self, *args, **kwargs):
+        entity_versions = super().bulk_create(*args, **kwargs)
+        invalidate_entity_hierarchy_index()
+        return entity_versions
+
+    def bulk_update(self, *args, **kwargs):
+        super().bulk_update(*args, **kwargs)
+        invalidate_entity_hierarchy_index()
+
     def with_children(self, *extra_fields, date=None, **filter_kwargs):
         """
         Use a Common Table Expression to construct the hierarchy of children entities
@@ -234,11 +256,19 @@ class EntityVersionQuerySet(CTEQuerySet):
             - parents,
             - date,
             - level
+
+        When ENTITY_HIERARCHY_INDEX_ENABLED is set, the tree is read from the EntityHierarchyIndex of the date instead
+        of the recursive query (see EntityHierarchyIndex.get_tree)
         """
         # Convert the entity_ids in list if only one given
         if not isinstance(entity_ids, collections.Iterable):
             entity_ids = [entity_ids]
 
+        if EntityHierarchyIndex.is_enabled():
+            tree = self._get_tree_from_index(entity_ids, date)
+            if tree is not None:
+                return tree
+
         # Get only entity_id field in queryset
         if isinstance(entity_ids, models.QuerySet):
             entity_ids = entity_ids.values('pk')
@@ -267,6 +297,18 @@ class EntityVersionQuerySet(CTEQuerySet):
             'level',
         )
 
+    def _get_tree_from_index(self, entity_ids, date=None) -> Optional[List[dict]]:
+        if self.query.has_filters():
+            return None
+        if isinstance(entity_ids, models.QuerySet):
+            entity_ids = entity_ids.values_list('pk', flat=True)
+        entity_ids = [entity.pk if isinstance(entity, Entity) else entity for entity in entity_ids]
+        tree = EntityHierarchyIndex.get(date).get_tree(entity_ids)
+        if tree is not None:
+            for row in tree:
+                row['date'] = date
+        return tree
+
     def with_acronym_path(self, **kwargs):
         cte = self.with_children('start_date', **kwargs)
         return cte.queryset().with_cte(cte).annotate(
@@ -280,10 +322,12 @@ class EntityVersionQuerySet(CTEQuerySet):
 
     def descendants(self, entity, date=None):
         """ Return the children entities """
-        tree_qs = self.get_tree(entity, date)
+        tree = self.get_tree(entity, date)
 
         # Children contain the asked entity as first element, ignore it
-        return self.filter(pk__in=tree_qs.values('id')[1:]).order_by('acronym')
+        if isinstance(tree, list):
+            return self.filter(pk__in=[row['id'] for row in tree[1:]]).order_by('acronym')
+        return self.filter(pk__in=tree.values('id')[1:]).order_by('acronym')
 
     def pedagogical_entities(self):
         return self.filter(
@@ -354,6 +398,7 @@ class EntityVersion(SerializableModel):
             # FIXME: Create UpperCharField
             self.acronym = self.acronym.upper()
             super(EntityVersion, self).save()
+            invalidate_entity_hierarchy_index()
         else:
             raise AttributeError('EntityVersion invalid parameters')
 
@@ -484,6 +529,9 @@ class EntityVersion(SerializableModel):
 def find_parent_of_type_into_entity_structure(entity_version, entities_structure, parent_type):
     if entity_version.entity_type == parent_type:
         return entity_version.entity
+    elif isinstance(entities_structure, EntityVersionStructure):
+        parent = entities_structure.index.get_parent_of_type(entity_version.entity_id, parent_type)
+        return parent.entity if parent else None
     elif not entities_structure[entity_version.entity_id]['entity_version_parent']:
         return None
     else:
@@ -606,30 +654,171 @@ def find_all_current_entities_version() -> EntityVersionQuerySet:
     return find_latest_version(date=now)
 
 
-# TODO Use recursive query instead
-def build_current_entity_version_structure_in_memory(date: datetime.date = None) -> Dict[int, Dict]:
-    if date:
-        all_current_entities_version = find_latest_version(date=date)
-    else:
-        all_current_entities_version = find_all_current_entities_version()
-    entity_version_by_entity_id = _build_entity_version_by_entity_id(all_current_entities_version)
-    direct_children_by_entity_version_id = _build_direct_children_by_entity_version_id(entity_version_by_entity_id)
-    all_children_by_entity_version_id = _build_all_children_by_entity_version_id(direct_children_by_entity_version_id)
-
-    entity_versions = {}
-    for entity_version in all_current_entities_version:
-        entity_versions[entity_version.entity_id] = {
-            'entity_version_parent': entity_version_by_entity_id.get(entity_version.parent_id),
-            'direct_children': direct_children_by_entity_version_id.get(entity_version.id, []),
-            'all_children': all_children_by_entity_version_id.get(entity_version.id, []),
-            'entity_version': entity_version
+class EntityVersionStructure(dict):
+    """ Structure of the entity versions by entity id, backed by the EntityHierarchyIndex which has built it """
+    def __init__(self, index: 'EntityHierarchyIndex', *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.index = index
+
+
+class EntityHierarchyIndex:
+    """
+    Entity hierarchy at a reference date, with constant time lookups of the ancestors, descendants and
+    parents of a given type of an entity.
+
+    When ENTITY_HIERARCHY_INDEX_ENABLED is set, the index of each date is built once per process and shared by all
+    requests. It is dropped when the version stamp kept in Django's cache changes, i.e. when an entity version is saved
+    or deleted or the entities are synchronized. The shared index must be considered as read only.
+    """
+    _indexes_by_date = OrderedDict()  # type: Dict[datetime.date, EntityHierarchyIndex]
+    _lock = threading.Lock()
+
+    def __init__(self, entity_versions: Iterable[EntityVersion], version: int = None):
+        self.version = version
+        entity_versions = list(entity_versions)
+        entity_version_by_entity_id = _build_entity_version_by_entity_id(entity_versions)
+        direct_children_by_entity_version_id = _build_direct_children_by_entity_version_id(entity_version_by_entity_id)
+        all_children_by_entity_version_id = _build_all_children_by_entity_version_id(
+            direct_children_by_entity_version_id
+        )
+
+        self.structure = EntityVersionStructure(self)
+        for entity_version in entity_versions:
+            self.structure[entity_version.entity_id] = {
+                'entity_version_parent': entity_version_by_entity_id.get(entity_version.parent_id),
+                'direct_children': direct_children_by_entity_version_id.get(entity_version.id, []),
+                'all_children': all_children_by_entity_version_id.get(entity_version.id, []),
+                'entity_version': entity_version
+            }
+
+        self._structure_by_acronym = {}
+        for entity_structure in self.structure.values():
+            self._structure_by_acronym.setdefault(entity_structure['entity_version'].acronym, entity_structure)
+
+        self._ancestors_by_entity_id = {
+            entity_id: self._compute_ancestors(entity_id) for entity_id in self.structure
         }
-    return entity_versions
+        self._parent_by_type = {}
+        for entity_id, ancestors in self._ancestors_by_entity_id.items():
+            parents_by_type = self._parent_by_type[entity_id] = {}
+            for ancestor in ancestors:
+                parents_by_type.setdefault(ancestor.entity_type, ancestor)
+
+    @classmethod
+    def get(cls, date: datetime.date = None) -> 'EntityHierarchyIndex':
+        date = _to_reference_date(date)
+        if not cls.is_enabled():
+            return cls(find_latest_version(date=date))
+
+        version = ENTITY_HIERARCHY_VERSION.get()
+        index = cls._indexes_by_date.get(date)
+        if index is None or index.version != version:
+            # The version is read before loading from database, to never keep stale data under a new version
+            index = cls(find_latest_version(date=date), version=version)
+            with cls._lock:
+                cls._indexes_by_date[date] = index
+                cls._indexes_by_date.move_to_end(date)
+                while len(cls._indexes_by_date) > ENTITY_HIERARCHY_INDEX_MAX_DATES:
+                    cls._indexes_by_date.popitem(last=False)
+        return index
+
+    @staticmethod
+    def is_enabled() -> bool:
+        return getattr(settings, 'ENTITY_HIERARCHY_INDEX_ENABLED', False)
+
+    def _compute_ancestors(self, entity_id: int) -> List[EntityVersion]:
+        ancestors = []
+        visited = {entity_id}
+        parent = self.structure[entity_id]['entity_version_parent']
+        while parent and parent.entity_id not in visited:
+            ancestors.append(parent)
+            visited.add(parent.entity_id)
+            parent = self.structure.get(parent.entity_id, {}).get('entity_version_parent')
+        return ancestors
+
+    def get_entity_version(self, entity_id: int) -> Optional[EntityVersion]:
+        entity_structure = self.structure.get(entity_id)
+        return entity_structure['entity_version'] if entity_structure else None
+
+    def get_by_acronym(self, acronym: str) -> Optional[dict]:
+        return self._structure_by_acronym.get(acronym.upper())
+
+    def get_ancestors(self, entity_id: int) -> List[EntityVersion]:
+        """ Return the entity versions of the ancestors of the entity, from its parent to the root """
+        return self._ancestors_by_entity_id.get(entity_id, [])
+
+    def get_descendants(self, entity_id: int) -> List[EntityVersion]:
+        entity_structure = self.structure.get(entity_id)
+        return entity_structure['all_children'] if entity_structure else []
+
+    def get_parent_of_type(self, entity_id: int, entity_type: str) -> Optional[EntityVersion]:
+        """ Return the closest ancestor of the entity which has the given type """
+        return self._parent_by_type.get(entity_id, {}).get(entity_type)
+
+    def get_parent_or_itself_of_type(self, entity_id: int, entity_type: str) -> Optional[EntityVersion]:
+        entity_version = self.get_entity_version(entity_id)
+        if entity_version and entity_version.entity_type == entity_type:
+            return entity_version
+        return self.get_parent_of_type(entity_id, entity_type)
+
+    def get_tree(self, entity_ids: Iterable[int]) -> Optional[List[dict]]:
+        """
+        Return the rows of EntityVersionQuerySet.get_tree : the entities followed by their descendants, level by
+        level. Return None when an entity has no version at the date of the index, the recursive query also lists
+        the versions of the entities which are not current.
+        """
+        level = []
+        for entity_id in entity_ids:
+            entity_version = self.get_entity_version(entity_id)
+            if entity_version is None:
+                return None
+            level.append((entity_version, []))
+
+        rows = []
+        while level:
+            next_level = []
+            for entity_version, parents in level:
+                rows.append({
+                    'id': entity_version.id,
+                    'acronym': entity_version.acronym,
+                    'parent_id': entity_version.parent_id,
+                    'entity_id': entity_version.entity_id,
+                    'parents': parents,
+                    'level': len(parents),
+                })
+                next_level.extend(
+                    (child, parents + [entity_version.entity_id])
+                    for child in self.structure[entity_version.entity_id]['direct_children']
+                )
+            level = next_level
+        return rows
+
+
+def _to_reference_date(date) -> datetime.date:
+    if date is None:
+        date = datetime.datetime.now(get_tzinfo())
+    if isinstance(date, datetime.datetime):
+        if timezone.is_aware(date):
+            date = timezone.localtime(date)
+        date = date.date()
+    return date
+
+
+def invalidate_entity_hierarchy_index() -> None:
+    """ Drop the entity hierarchy indexes of all processes once the current transaction is committed """
+    if EntityHierarchyIndex.is_enabled():
+        ENTITY_HIERARCHY_VERSION.bump_on_commit()
+
+
+def build_current_entity_version_structure_in_memory(date: datetime.date = None) -> Dict[int, Dict]:
+    return EntityHierarchyIndex.get(date).structure
 
 
 def get_structure_of_entity_version(entity_versions: dict, root: str = None) -> dict:
     if not root:
         return entity_versions
+    if isinstance(entity_versions, EntityVersionStructure):
+        return entity_versions.index.get_by_acronym(root)
     for ev in entity_versions:
         if entity_versions[ev]['entity_version'].acronym == root.upper():
             return entity_versions[ev]
@@ -637,6 +826,14 @@ def get_structure_of_entity_version(entity_versions: dict, root: str = None) ->
 
 def get_entity_version_parent_or_itself_from_type(entity_versions: dict, entity: str, entity_type: str)\
         -> EntityVersion:
+    if isinstance(entity_versions, EntityVersionStructure):
+        entity_structure = entity_versions.index.get_by_acronym(entity)
+        if not entity_structure:
+            return None
+        return entity_versions.index.get_parent_or_itself_of_type(
+            entity_structure['entity_version'].entity_id,
+            entity_type
+        )
     entities_version = get_structure_of_entity_version(entity_versions, root=entity)
     if entities_version.get('entity_version') and entities_version.get('entity_version').entity_type == entity_type:
         return entities_version.get('entity_version')
@@ -160,10 +160,9 @@ class ExamEnrollment(models.Model):
 
 
 def get_session_exam_deadline(enrollment):
-    if hasattr(enrollment.learning_unit_enrollment.offer_enrollment, 'session_exam_deadlines') and \
-            enrollment.learning_unit_enrollment.offer_enrollment.session_exam_deadlines:
-        # Prefetch related
-        return enrollment.learning_unit_enrollment.offer_enrollment.session_exam_deadlines[0]
+    if hasattr(enrollment.learning_unit_enrollment.offer_enrollment, 'session_exam_deadlines'):
+        # Prefetch related (already filtered on the number session of the enrollment)
+        return next(iter(enrollment.learning_unit_enrollment.offer_enrollment.session_exam_deadlines), None)
     else:
         # No prefetch
         offer_enrollment = enrollment.learning_unit_enrollment.offer_enrollment
@@ -249,6 +248,18 @@ def create_exam_enrollment_historic(user, enrollment):
     exam_enrollment_history.save()
 
 
+def bulk_create_exam_enrollment_historic(user, enrollments):
+    author = person.find_by_user(user)
+    ExamEnrollmentHistory.objects.bulk_create([
+        ExamEnrollmentHistory(
+            exam_enrollment=enrollment,
+            score_final=enrollment.score_final,
+            justification_final=enrollment.justification_final,
+            person=author,
+        ) for enrollment in enrollments
+    ])
+
+
 def get_progress_by_learning_unit_years_and_offer_years(user,
                                                         session_exam_number,
                                                         learning_unit_year_id=None,
@@ -0,0 +1,114 @@
+##############################################################################
+#
+#    OSIS stands for Open Student Information System. It's an application
+#    designed to manage the core business of higher education institutions,
+#    such as universities, faculties, institutes and professional schools.
+#    The core business involves the administration of students, teachers,
+#    courses, programs and so on.
+#
+#    Copyright (C) 2015-2020 Université catholique de Louvain (http://www.uclouvain.be)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    A copy of this license - GNU General Public License - is available
+#    at the root of the source code of this program.  If not,
+#    see http://www.gnu.org/licenses/.
+#
+##############################################################################
+import os
+import uuid
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.files.storage import FileSystemStorage
+from django.db import models
+from django.utils import timezone
+from django.utils.deconstruct import deconstructible
+
+from base.models.enums.export_job_status import ExportJobStatus
+from osis_common.models.osis_model_admin import OsisModelAdmin
+
+
+class ExportJobAdmin(OsisModelAdmin):
+    list_display = ('user', 'path', 'status', 'created', 'finished', 'expires_at')
+    list_filter = ('status',)
+    search_fields = ['user__username', 'path']
+    raw_id_fields = ('user',)
+
+
+@deconstructible
+class ExportJobStorage(FileSystemStorage):
+    """
+    Generated files are stored in EXPORT_JOB_ROOT, out of MEDIA_ROOT : they have no public URL and are only downloaded
+    through the export_job_detail view, which checks that the file belongs to the user.
+    """
+    @property
+    def base_location(self):
+        return settings.EXPORT_JOB_ROOT
+
+    @property
+    def location(self):
+        return os.path.abspath(self.base_location)
+
+    @property
+    def base_url(self):
+        return None
+
+
+class ExportJobQuerySet(models.QuerySet):
+    def reusable(self):
+        """ Jobs still being generated or generated files which are not expired """
+        return self.filter(
+            models.Q(status__in=[ExportJobStatus.PENDING.name, ExportJobStatus.RUNNING.name]) |
+            models.Q(status=ExportJobStatus.DONE.name, expires_at__gt=timezone.now())
+        )
+
+    def expired(self):
+        return self.filter(expires_at__lte=timezone.now())
+
+
+class ExportJob(models.Model):
+    """
+    Export (Excel, PDF) generated in background by a Celery worker. The request which asked the export is kept
+    (method, host, path, query string and body) so that the worker can replay it against the same view.
+    """
+    uuid = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    request_hash = models.CharField(max_length=64, db_index=True)
+    method = models.CharField(max_length=10, default='GET')
+    scheme = models.CharField(max_length=10, default='https')
+    host = models.CharField(max_length=255, blank=True)
+    path = models.CharField(max_length=255)
+    query_string = models.TextField(blank=True)
+    body = models.TextField(blank=True)
+    language = models.CharField(max_length=30, blank=True)
+    status = models.CharField(
+        max_length=20,
+        choices=ExportJobStatus.choices(),
+        default=ExportJobStatus.PENDING.name,
+    )
+    file = models.FileField(upload_to='export_jobs/', storage=ExportJobStorage(), blank=True)
+    error = models.TextField(blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+    finished = models.DateTimeField(null=True, blank=True)
+    expires_at = models.DateTimeField(null=True, blank=True, db_index=True)
+
+    objects = ExportJobQuerySet.as_manager()
+
+    class Meta:
+        ordering = ('-created',)
+
+    def __str__(self):
+        return "{} - {} ({})".format(self.user, self.path, self.status)
+
+    @property
+    def filename(self) -> str:
+        return self.file.name.rsplit('/', 1)[-1] if self.file else ''
@@ -78,6 +78,8 @@ class GroupElementYearManager(models.Manager):
             raise Exception('root_elements_ids must be an instance of list')
         if not root_elements_ids:
             return []
+        if group_element_year_closure.is_enabled():
+            return group_element_year_closure.get_adjacency_list(root_elements_ids)
 
         adjacency_query_template = """
             WITH RECURSIVE
@@ -137,6 +139,12 @@ class GroupElementYearManager(models.Manager):
             raise Exception('child_element_ids must be an instance of list')
         if not child_element_ids:
             return []
+        if group_element_year_closure.is_enabled():
+            return group_element_year_closure.get_reverse_adjacency_list(
+                child_element_ids,
+                link_type=link_type,
+                academic_year_id=academic_year_id,
+            )
 
         where_statement = self.__build_where_statement(None, child_element_ids)
 
@@ -200,6 +208,12 @@ class GroupElementYearManager(models.Manager):
 
         if not len(child_element_ids) and not academic_year_id:
             return []
+        if not academic_year_id and group_element_year_closure.is_enabled():
+            return group_element_year_closure.get_root_list(
+                child_element_ids,
+                link_type=link_type,
+                root_category_name=root_category_name,
+            )
 
         where_statement = self.__build_where_statement(academic_year_id, child_element_ids)
         root_query_template = """
@@ -368,3 +382,7 @@ class GroupElementYear(OrderedModel):
 
     def __str__(self):
         return "{} - {}".format(self.parent_element, self.child_element)
+
+
+# Imported at the end of the module : the closure model listens to the GroupElementYear signals
+from base.models import group_element_year_closure  # noqa: E402
@@ -0,0 +1,334 @@
+##############################################################################
+#
+#    OSIS stands for Open Student Information System. It's an application
+#    designed to manage the core business of higher education institutions,
+#    such as universities, faculties, institutes and professional schools.
+#    The core business involves the administration of students, teachers,
+#    courses, programs and so on.
+#
+#    Copyright (C) 2015-2020 Université catholique de Louvain (http://www.uclouvain.be)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    A copy of this license - GNU General Public License - is available
+#    at the root of the source code of this program.  If not,
+#    see http://www.gnu.org/licenses/.
+#
+##############################################################################
+import collections
+from typing import List, Dict, Iterable, Tuple, Set
+
+from django.conf import settings
+from django.db import models, connection, transaction
+from django.db.models import F, Q
+from django.db.models.signals import post_save, post_delete, pre_save
+from django.dispatch import receiver
+
+from base.models import group_element_year
+from base.models.enums.link_type import LinkTypes
+from base.utils.db import dict_fetchall
+from osis_common.models.osis_model_admin import OsisModelAdmin
+from program_management.models.element import Element
+
+ElementId = int
+ParentChildIds = Tuple[ElementId, ElementId]
+
+CLOSURE_QUERY = """
+    WITH RECURSIVE
+        closure_query AS (
+            SELECT parent_element_id AS ancestor_element_id, child_element_id AS descendant_element_id
+            FROM base_groupelementyear
+            WHERE parent_element_id IS NOT NULL AND child_element_id IS NOT NULL
+
+            UNION ALL
+
+            SELECT closure_query.ancestor_element_id, gey.child_element_id
+            FROM base_groupelementyear AS gey
+            INNER JOIN closure_query on closure_query.descendant_element_id = gey.parent_element_id
+            WHERE gey.child_element_id IS NOT NULL
+        )
+    SELECT ancestor_element_id, descendant_element_id, COUNT(*) AS path_count
+    FROM closure_query
+    GROUP BY ancestor_element_id, descendant_element_id
+"""
+
+
+class GroupElementYearClosureAdmin(OsisModelAdmin):
+    list_display = ('ancestor_element', 'descendant_element', 'path_count')
+    raw_id_fields = ('ancestor_element', 'descendant_element')
+
+
+class GroupElementYearClosure(models.Model):
+    """
+    Transitive closure of the GroupElementYear links : one row for each (ancestor, descendant) pair of elements.
+    As the same element can be used several times inside a tree, path_count keeps the number of distinct paths
+    between the two elements, which allows to maintain the table incrementally when a link is removed.
+    """
+    ancestor_element = models.ForeignKey(Element, related_name='+', on_delete=models.CASCADE)
+    descendant_element = models.ForeignKey(Element, related_name='+', on_delete=models.CASCADE)
+    path_count = models.PositiveIntegerField(default=1)
+
+    class Meta:
+        unique_together = ('ancestor_element', 'descendant_element')
+
+    def __str__(self):
+        return "{} > {} ({})".format(self.ancestor_element_id, self.descendant_element_id, self.path_count)
+
+
+def is_enabled() -> bool:
+    return getattr(settings, 'GROUP_ELEMENT_YEAR_CLOSURE_ENABLED', False)
+
+
+def add_links(links: Iterable[ParentChildIds]) -> None:
+    for parent_id, child_id in links:
+        _apply_paths_delta(parent_id, child_id, sign=1)
+
+
+def remove_links(links: Iterable[ParentChildIds]) -> None:
+    for parent_id, child_id in links:
+        _apply_paths_delta(parent_id, child_id, sign=-1)
+
+
+def _apply_paths_delta(parent_id: ElementId, child_id: ElementId, sign: int) -> None:
+    """
+    Each path from an ancestor of the parent to a descendant of the child is created (or removed) by the link.
+    The number of those paths is the product of the paths ancestor -> parent and child -> descendant.
+    """
+    if parent_id is None or child_id is None:
+        return
+    ancestors = dict(
+        GroupElementYearClosure.objects.filter(descendant_element_id=parent_id).values_list(
+            'ancestor_element_id', 'path_count'
+        )
+    )
+    ancestors[parent_id] = 1
+    descendants = dict(
+        GroupElementYearClosure.objects.filter(ancestor_element_id=child_id).values_list(
+            'descendant_element_id', 'path_count'
+        )
+    )
+    descendants[child_id] = 1
+
+    delta_by_pair = {
+        (ancestor_id, descendant_id): sign * ancestor_count * descendant_count
+        for ancestor_id, ancestor_count in ancestors.items()
+        for descendant_id, descendant_count in descendants.items()
+    }
+    existing_rows = GroupElementYearClosure.objects.filter(
+        ancestor_element_id__in=ancestors.keys(),
+        descendant_element_id__in=descendants.keys(),
+    )
+    rows_to_update = []
+    ids_to_delete = []
+    for row in existing_rows:
+        row.path_count += delta_by_pair.pop((row.ancestor_element_id, row.descendant_element_id))
+        if row.path_count > 0:
+            rows_to_update.append(row)
+        else:
+            ids_to_delete.append(row.pk)
+
+    GroupElementYearClosure.objects.bulk_update(rows_to_update, ['path_count'])
+    GroupElementYearClosure.objects.filter(pk__in=ids_to_delete).delete()
+    GroupElementYearClosure.objects.bulk_create(
+        GroupElementYearClosure(ancestor_element_id=ancestor_id, descendant_element_id=descendant_id, path_count=delta)
+        for (ancestor_id, descendant_id), delta in delta_by_pair.items() if delta > 0
+    )
+
+
+@transaction.atomic
+def rebuild() -> int:
+    with connection.cursor() as cursor:
+        cursor.execute("DELETE FROM {}".format(GroupElementYearClosure._meta.db_table))
+        cursor.execute(
+            "INSERT INTO {} (ancestor_element_id, descendant_element_id, path_count) {}".format(
+                GroupElementYearClosure._meta.db_table,
+                CLOSURE_QUERY
+            )
+        )
+        return cursor.rowcount
+
+
+def verify() -> List[Dict]:
+    """
+    Return the pairs of elements for which the stored closure differs from the closure computed from the links
+    """
+    query = """
+        SELECT COALESCE(computed.ancestor_element_id, stored.ancestor_element_id) AS ancestor_element_id,
+               COALESCE(computed.descendant_element_id, stored.descendant_element_id) AS descendant_element_id,
+               computed.path_count AS expected_path_count,
+               stored.path_count AS stored_path_count
+        FROM ({closure_query}) AS computed
+        FULL OUTER JOIN {table} AS stored ON stored.ancestor_element_id = computed.ancestor_element_id
+                                         AND stored.descendant_element_id = computed.descendant_element_id
+        WHERE computed.path_count IS DISTINCT FROM stored.path_count
+    """.format(closure_query=CLOSURE_QUERY, table=GroupElementYearClosure._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(query)
+        return dict_fetchall(cursor)
+
+
+def get_adjacency_list(root_elements_ids: List[ElementId]) -> List[Dict]:
+    """
+    Same result as GroupElementYearManager.get_adjacency_list, computed from the links of the descendants
+    """
+    element_ids = set(root_elements_ids) | set(
+        GroupElementYearClosure.objects.filter(
+            ancestor_element_id__in=root_elements_ids
+        ).values_list('descendant_element_id', flat=True)
+    )
+    links_by_parent = collections.defaultdict(list)
+    links = group_element_year.GroupElementYear.objects.filter(
+        parent_element_id__in=element_ids,
+        child_element__isnull=False,
+    ).filter(
+        Q(child_element__learning_unit_year__isnull=True)
+        | Q(child_element__learning_unit_year__learning_container_year__isnull=False)
+    ).values('id', 'parent_element_id', 'child_element_id', 'order')
+    for link in links:
+        links_by_parent[link['parent_element_id']].append(link)
+
+    result = []
+    for root_id in set(root_elements_ids):
+        stack = [(link, 0, str(root_id)) for link in links_by_parent[root_id]]
+        while stack:
+            link, level, parent_path = stack.pop()
+            path = '|'.join([parent_path, str(link['child_element_id'])])
+            result.append({
+                'starting_node_id': root_id,
+                'id': link['id'],
+                'parent_id': link['parent_element_id'],
+                'child_id': link['child_element_id'],
+                'order': link['order'],
+                'level': level,
+                'path': path,
+            })
+            stack.extend((child_link, level + 1, path) for child_link in links_by_parent[link['child_element_id']])
+    return sorted(result, key=lambda row: (row['starting_node_id'], row['level'], _nulls_last(row['order'])))
+
+
+def get_reverse_adjacency_list(
+        child_element_ids: List[ElementId],
+        link_type: LinkTypes = None,
+        academic_year_id: int = None
+) -> List[Dict]:
+    """
+    Same result as GroupElementYearManager.get_reverse_adjacency_list, computed from the links of the ancestors
+    """
+    links_by_child = _get_links_of_ancestors_by_child(child_element_ids)
+    rows = set()
+    for starting_node_id in set(child_element_ids):
+        to_visit = [
+            (link, 0) for link in links_by_child[starting_node_id]
+            if link_type is None or link['link_type'] == link_type.name
+        ]
+        visited = set()  # type: Set[Tuple[int, int]]
+        while to_visit:
+            link, level = to_visit.pop()
+            if (link['id'], level) in visited:
+                continue
+            visited.add((link['id'], level))
+            if academic_year_id is None or link['academic_year_id'] == academic_year_id:
+                rows.add(
+                    (starting_node_id, link['id'], link['parent_element_id'], link['child_element_id'],
+                     link['order'], level)
+                )
+            to_visit.extend((parent_link, level + 1) for parent_link in links_by_child[link['parent_element_id']])
+    result = [
+        dict(zip(('starting_node_id', 'id', 'parent_id', 'child_id', 'order', 'level'), row)) for row in rows
+    ]
+    return sorted(result, key=lambda row: (row['starting_node_id'], -row['level'], _nulls_last(row['order'])))
+
+
+def get_root_list(
+        child_element_ids: List[ElementId],
+        link_type: LinkTypes = None,
+        root_category_name: List[str] = None
+) -> List[Dict]:
+    """
+    Same result as GroupElementYearManager.get_root_list when roots are searched from children ids :
+    the search stops going up as soon as a root is found.
+    """
+    root_category_name = set(root_category_name or [])
+    links_by_child = _get_links_of_ancestors_by_child(child_element_ids)
+    rows = set()
+    for starting_node_id in set(child_element_ids):
+        to_visit = [
+            link for link in links_by_child[starting_node_id]
+            if link_type is None or link['link_type'] == link_type.name
+        ]
+        visited = set()  # type: Set[int]
+        while to_visit:
+            link = to_visit.pop()
+            if link['id'] in visited:
+                continue
+            visited.add(link['id'])
+            if link['parent_type'] in root_category_name:
+                rows.add((starting_node_id, link['parent_element_id']))
+            else:
+                to_visit.extend(links_by_child[link['parent_element_id']])
+    return [{'child_id': child_id, 'root_id': root_id} for child_id, root_id in sorted(rows)]
+
+
+def _get_links_of_ancestors_by_child(child_element_ids: List[ElementId]) -> Dict[ElementId, List[Dict]]:
+    element_ids = set(child_element_ids) | set(
+        GroupElementYearClosure.objects.filter(
+            descendant_element_id__in=child_element_ids
+        ).values_list('ancestor_element_id', flat=True)
+    )
+    links = group_element_year.GroupElementYear.objects.filter(
+        child_element_id__in=element_ids,
+        parent_element__group_year__isnull=False,
+    ).annotate(
+        academic_year_id=F('parent_element__group_year__academic_year_id'),
+        parent_type=F('parent_element__group_year__education_group_type__name'),
+    ).values('id', 'parent_element_id', 'child_element_id', 'order', 'link_type', 'academic_year_id', 'parent_type')
+
+    links_by_child = collections.defaultdict(list)
+    for link in links:
+        links_by_child[link['child_element_id']].append(link)
+    return links_by_child
+
+
+def _nulls_last(value):
+    return value is None, value or 0
+
+
+@receiver(pre_save, sender=group_element_year.GroupElementYear)
+def _groupelementyear_saving(sender, instance, update_fields=None, **kwargs):
+    # Keep the link as stored before the save : the parent or the child of an existing link can be changed
+    instance._closure_previous_link = None
+    if not is_enabled() or instance._state.adding or instance.pk is None:
+        return
+    if update_fields is not None and not {'parent_element', 'child_element'} & set(update_fields):
+        return
+    instance._closure_previous_link = group_element_year.GroupElementYear.objects.filter(
+        pk=instance.pk
+    ).values_list('parent_element_id', 'child_element_id').first()
+
+
+@receiver(post_save, sender=group_element_year.GroupElementYear)
+def _groupelementyear_saved(sender, instance, created, **kwargs):
+    if not is_enabled():
+        return
+    link = (instance.parent_element_id, instance.child_element_id)
+    if created:
+        add_links([link])
+        return
+    previous_link = getattr(instance, '_closure_previous_link', None)
+    if previous_link is not None and previous_link != link:
+        remove_links([previous_link])
+        add_links([link])
+
+
+@receiver(post_delete, sender=group_element_year.GroupElementYear)
+def _groupelementyear_deleted(sender, instance, **kwargs):
+    if is_enabled():
+        remove_links([(instance.parent_element_id, instance.child_element_id)])
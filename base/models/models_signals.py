@@ -123,3 +123,13 @@ def remove_from_tutor_group(sender, instance, **kwargs):
     if instance.person.user:
         tutors_group = Group.objects.get(name='tutors')
         instance.person.user.groups.remove(tutors_group)
+
+
+@receiver(post_delete, sender=mdl.entity_version.EntityVersion)
+def invalidate_entity_hierarchy_index_on_delete(sender, instance, **kwargs):
+    mdl.entity_version.invalidate_entity_hierarchy_index()
+
+
+@receiver(post_delete, sender=mdl.academic_calendar.AcademicCalendar)
+def invalidate_academic_event_indexes_on_delete(sender, instance, **kwargs):
+    mdl.academic_calendar.invalidate_academic_event_indexes()
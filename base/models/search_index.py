@@ -0,0 +1,271 @@
+##############################################################################
+#
+#    OSIS stands for Open Student Information System. It's an application
+#    designed to manage the core business of higher education institutions,
+#    such as universities, faculties, institutes and professional schools.
+#    The core business involves the administration of students, teachers,
+#    courses, programs and so on.
+#
+#    Copyright (C) 2015-2020 Université catholique de Louvain (http://www.uclouvain.be)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    A copy of this license - GNU General Public License - is available
+#    at the root of the source code of this program.  If not,
+#    see http://www.gnu.org/licenses/.
+#
+##############################################################################
+from typing import Iterable, List
+
+from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import TrigramSimilarity
+from django.db import models, transaction
+from django.db.models import Case, When, Value, FloatField, Q, QuerySet
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from base.models.education_group_year import EducationGroupYear
+from base.models.learning_container_year import LearningContainerYear
+from base.models.learning_unit_year import LearningUnitYear, LearningUnitYearQuerySet
+from education_group.models.group_year import GroupYear
+from osis_common.models.osis_model_admin import OsisModelAdmin
+from program_management.models.education_group_version import EducationGroupVersion
+
+LEARNING_UNIT_YEAR = 'learning_unit_year'
+GROUP_YEAR = 'group_year'
+EDUCATION_GROUP_YEAR = 'education_group_year'
+
+OBJECT_TYPES = (
+    (LEARNING_UNIT_YEAR, LEARNING_UNIT_YEAR),
+    (GROUP_YEAR, GROUP_YEAR),
+    (EDUCATION_GROUP_YEAR, EDUCATION_GROUP_YEAR),
+)
+
+# Field of the index entry : lookup on the indexed queryset
+INDEXED_FIELDS = {
+    LEARNING_UNIT_YEAR: {
+        'year': 'academic_year__year', 'acronym': 'acronym', 'code': 'acronym',
+        'title': 'full_title', 'full_title': 'full_title', 'title_en': 'full_title_en',
+    },
+    GROUP_YEAR: {
+        'year': 'academic_year__year', 'acronym': 'acronym', 'code': 'partial_acronym',
+        'title': 'title_fr', 'full_title': 'full_title_fr', 'title_en': 'full_title_en',
+    },
+    EDUCATION_GROUP_YEAR: {
+        'year': 'academic_year__year', 'acronym': 'acronym', 'code': 'partial_acronym',
+        'title': 'title', 'full_title': 'title', 'title_en': 'title_english',
+    },
+}
+
+REBUILD_BATCH_SIZE = 2000
+
+
+class SearchIndexEntryAdmin(OsisModelAdmin):
+    list_display = ('object_type', 'object_id', 'year', 'acronym', 'code', 'title')
+    list_filter = ('object_type',)
+    search_fields = ['acronym', 'code']
+
+
+class SearchIndexEntry(models.Model):
+    """
+    Denormalized copy of the searched fields of the learning units, groups and trainings : the full titles are stored
+    as displayed (including the container, offer and version titles) so that searching them needs no join.
+    The trigram indexes serve the case insensitive 'contains' and regex searches.
+    """
+    object_type = models.CharField(max_length=30, choices=OBJECT_TYPES)
+    object_id = models.IntegerField()
+    year = models.IntegerField()
+    acronym = models.CharField(max_length=255, blank=True)
+    code = models.CharField(max_length=255, blank=True)
+    title = models.TextField(blank=True)
+    full_title = models.TextField(blank=True)
+    title_en = models.TextField(blank=True)
+    search_text = models.TextField(blank=True)
+
+    class Meta:
+        unique_together = ('object_type', 'object_id')
+        indexes = [
+            models.Index(fields=['object_type', 'year'], name='search_index_type_year'),
+            GinIndex(fields=['acronym'], name='search_index_acronym_trgm', opclasses=['gin_trgm_ops']),
+            GinIndex(fields=['code'], name='search_index_code_trgm', opclasses=['gin_trgm_ops']),
+            GinIndex(fields=['title'], name='search_index_title_trgm', opclasses=['gin_trgm_ops']),
+            GinIndex(fields=['full_title'], name='search_index_full_title_trgm', opclasses=['gin_trgm_ops']),
+            GinIndex(fields=['search_text'], name='search_index_text_trgm', opclasses=['gin_trgm_ops']),
+        ]
+
+    def __str__(self):
+        return "{} {} ({})".format(self.object_type, self.acronym, self.year)
+
+
+def is_enabled() -> bool:
+    return getattr(settings, 'SEARCH_INDEX_ENABLED', False)
+
+
+def filter_by_search_index(queryset: QuerySet, object_type: str, field: str, value: str, regex: bool = False) \
+        -> QuerySet:
+    """
+    Filter the queryset on the objects whose indexed field matches the value (case insensitive).
+    :param field: 'acronym', 'code', 'title', 'full_title' or 'title_en'
+    :param regex: the value is a regular expression, else it is searched as is in the field
+    """
+    # Contains is not translated into a regex : the trigram indexes serve ILIKE as well and the value needs no escaping
+    lookup = '{}__iregex' if regex else '{}__icontains'
+    object_ids = SearchIndexEntry.objects.filter(
+        object_type=object_type,
+        **{lookup.format(field): value}
+    ).values('object_id')
+    return queryset.filter(pk__in=object_ids)
+
+
+def search(term: str, object_types: List[str] = None, year: int = None) -> QuerySet:
+    """
+    Return the entries matching the term, best matches first (the 'rank' annotation).
+    An exact code or acronym comes first, then the codes and acronyms starting with the term, then the entries
+    ordered by trigram similarity.
+    """
+    term = term.strip()
+    queryset = SearchIndexEntry.objects.filter(
+        Q(search_text__contains=_normalize(term)) | Q(search_text__trigram_similar=_normalize(term))
+    )
+    if object_types:
+        queryset = queryset.filter(object_type__in=object_types)
+    if year:
+        queryset = queryset.filter(year=year)
+    return queryset.annotate(
+        rank=Case(
+            When(Q(code__iexact=term) | Q(acronym__iexact=term), then=Value(2.0)),
+            When(Q(code__istartswith=term) | Q(acronym__istartswith=term), then=Value(1.0)),
+            default=Value(0.0),
+            output_field=FloatField()
+        ) + TrigramSimilarity('search_text', _normalize(term))
+    ).order_by('-rank', '-year', 'acronym')
+
+
+@transaction.atomic
+def rebuild() -> int:
+    SearchIndexEntry.objects.all().delete()
+    rows_count = 0
+    for object_type, queryset in _get_indexed_querysets().items():
+        rows_count += _index(object_type, queryset)
+    return rows_count
+
+
+def index_learning_unit_years(learning_unit_year_ids: Iterable[int]) -> None:
+    _reindex(LEARNING_UNIT_YEAR, learning_unit_year_ids)
+
+
+def index_group_years(group_year_ids: Iterable[int]) -> None:
+    _reindex(GROUP_YEAR, group_year_ids)
+
+
+def index_education_group_years(education_group_year_ids: Iterable[int]) -> None:
+    _reindex(EDUCATION_GROUP_YEAR, education_group_year_ids)
+
+
+def _reindex(object_type: str, object_ids: Iterable[int]) -> None:
+    object_ids = list(object_ids)
+    with transaction.atomic():
+        _remove(object_type, object_ids)
+        _index(object_type, _get_indexed_querysets()[object_type].filter(pk__in=object_ids))
+
+
+def _remove(object_type: str, object_ids: Iterable[int]) -> None:
+    SearchIndexEntry.objects.filter(object_type=object_type, object_id__in=list(object_ids)).delete()
+
+
+def _index(object_type: str, queryset: QuerySet) -> int:
+    field_names = INDEXED_FIELDS[object_type]
+    entries = []
+    rows_count = 0
+    for row in queryset.values('id', *field_names.values()).iterator(chunk_size=REBUILD_BATCH_SIZE):
+        entries.append(_build_entry(object_type, {field: row[name] for field, name in field_names.items()}, row['id']))
+        if len(entries) >= REBUILD_BATCH_SIZE:
+            rows_count += len(SearchIndexEntry.objects.bulk_create(entries))
+            entries = []
+    rows_count += len(SearchIndexEntry.objects.bulk_create(entries))
+    return rows_count
+
+
+def _build_entry(object_type: str, values: dict, object_id: int) -> SearchIndexEntry:
+    fields = {field: values[field] or '' for field in ('acronym', 'code', 'title', 'full_title', 'title_en')}
+    return SearchIndexEntry(
+        object_type=object_type,
+        object_id=object_id,
+        year=values['year'],
+        search_text=_normalize(" ".join(
+            filter(None, [fields['acronym'], fields['code'], fields['full_title'], fields['title_en']])
+        )),
+        **fields
+    )
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def _get_indexed_querysets() -> dict:
+    return {
+        LEARNING_UNIT_YEAR: LearningUnitYearQuerySet.annotate_full_title_class_method(LearningUnitYear.objects.all()),
+        GROUP_YEAR: GroupYear.objects.all().annotate_full_titles(),
+        EDUCATION_GROUP_YEAR: EducationGroupYear.objects.all(),
+    }
+
+
+@receiver(post_save, sender=LearningUnitYear)
+def _learningunityear_saved(sender, instance, **kwargs):
+    if is_enabled():
+        index_learning_unit_years([instance.pk])
+
+
+@receiver(post_save, sender=LearningContainerYear)
+def _learningcontaineryear_saved(sender, instance, **kwargs):
+    # The full titles of the learning units include the common title of their container
+    if is_enabled():
+        index_learning_unit_years(instance.learningunityear_set.values_list('pk', flat=True))
+
+
+@receiver(post_save, sender=GroupYear)
+def _groupyear_saved(sender, instance, **kwargs):
+    if is_enabled():
+        index_group_years([instance.pk])
+
+
+@receiver([post_save, post_delete], sender=EducationGroupVersion)
+def _educationgroupversion_changed(sender, instance, **kwargs):
+    # The full titles of the groups include the title of their version and offer
+    if is_enabled() and instance.root_group_id:
+        index_group_years([instance.root_group_id])
+
+
+@receiver(post_save, sender=EducationGroupYear)
+def _educationgroupyear_saved(sender, instance, **kwargs):
+    if is_enabled():
+        index_education_group_years([instance.pk])
+        index_group_years(instance.educationgroupversion_set.values_list('root_group_id', flat=True))
+
+
+@receiver(post_delete, sender=LearningUnitYear)
+def _learningunityear_deleted(sender, instance, **kwargs):
+    if is_enabled():
+        _remove(LEARNING_UNIT_YEAR, [instance.pk])
+
+
+@receiver(post_delete, sender=GroupYear)
+def _groupyear_deleted(sender, instance, **kwargs):
+    if is_enabled():
+        _remove(GROUP_YEAR, [instance.pk])
+
+
+@receiver(post_delete, sender=EducationGroupYear)
+def _educationgroupyear_deleted(sender, instance, **kwargs):
+    if is_enabled():
+        _remove(EDUCATION_GROUP_YEAR, [instance.pk])
@@ -28,6 +28,7 @@ import datetime
 from django.db import models
 
 from base.models import offer_year_calendar, academic_year
+from base.models.academic_calendar import invalidate_academic_event_indexes
 from base.models.enums import number_session, academic_calendar_type
 from osis_common.models.osis_model_admin import OsisModelAdmin
 
@@ -45,6 +46,10 @@ class SessionExamCalendar(models.Model):
     number_session = models.IntegerField(choices=number_session.NUMBERS_SESSION)
     academic_calendar = models.OneToOneField('AcademicCalendar', on_delete=models.CASCADE)
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        invalidate_academic_event_indexes()
+
     def __str__(self):
         return u"%s - %s" % (self.academic_calendar, self.number_session)
 
@@ -1,5 +1,6 @@
 # Import .py file which contains tasks to be executed
 from . import check_academic_calendar
+from . import export_job
 from . import extend_learning_units
 from . import synchronize_entities
 
@@ -19,4 +20,8 @@ celery_app.conf.beat_schedule.update({
         'task': 'base.tasks.synchronize_entities.run',
         'schedule': crontab(minute=1)
     },
+    'Delete expired export jobs': {
+        'task': 'base.tasks.export_job.delete_expired',
+        'schedule': crontab(minute=30)
+    },
 })
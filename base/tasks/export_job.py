@@ -0,0 +1,136 @@
+##############################################################################
+#
+#    OSIS stands for Open Student Information System. It's an application
+#    designed to manage the core business of higher education institutions,
+#    such as universities, faculties, institutes and professional schools.
+#    The core business involves the administration of students, teachers,
+#    courses, programs and so on.
+#
+#    Copyright (C) 2015-2020 Université catholique de Louvain (http://www.uclouvain.be)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    A copy of this license - GNU General Public License - is available
+#    at the root of the source code of this program.  If not,
+#    see http://www.gnu.org/licenses/.
+#
+##############################################################################
+import datetime
+import io
+import logging
+import re
+import tempfile
+
+from django.conf import settings
+from django.contrib.messages.storage import default_storage
+from django.contrib.sessions.backends.db import SessionStore
+from django.core.files import File
+from django.core.handlers.wsgi import WSGIRequest
+from django.http import HttpResponse
+from django.urls import resolve
+from django.utils import timezone, translation
+
+from backoffice.celery import app as celery_app
+from base.models.enums.export_job_status import ExportJobStatus
+from base.models.export_job import ExportJob
+
+logger = logging.getLogger(settings.DEFAULT_LOGGER)
+
+FILENAME_REGEX = re.compile(r'filename="?([^";]+)"?')
+DEFAULT_FILENAME = 'export'
+
+
+@celery_app.task
+def run(export_job_id: int) -> dict:
+    job = ExportJob.objects.select_related('user').get(pk=export_job_id)
+    job.status = ExportJobStatus.RUNNING.name
+    job.save(update_fields=['status'])
+    try:
+        response = __replay_request(job)
+        __save_response_file(job, response)
+        job.status = ExportJobStatus.DONE.name
+    except Exception as e:
+        logger.exception("[Export job] Unable to generate export {}".format(job.uuid))
+        job.status = ExportJobStatus.FAILED.name
+        job.error = str(e)
+    job.finished = timezone.now()
+    job.expires_at = job.finished + datetime.timedelta(hours=settings.EXPORT_JOB_EXPIRY_HOURS)
+    job.save()
+    return {'Export job {}'.format(job.uuid): job.status}
+
+
+@celery_app.task
+def delete_expired() -> dict:
+    expired_jobs = ExportJob.objects.expired()
+    for job in expired_jobs:
+        if job.file:
+            job.file.delete(save=False)
+    deleted_count, _ = expired_jobs.delete()
+    return {'Expired export jobs deleted': deleted_count}
+
+
+def __replay_request(job: ExportJob) -> HttpResponse:
+    """ Call the view which asked the export as the user did, but in the worker """
+    request = WSGIRequest(__build_wsgi_environ(job))
+    request.user = job.user
+    request.session = SessionStore()
+    request._messages = default_storage(request)
+    request.export_job = job
+
+    view = resolve(job.path)
+    with translation.override(job.language or settings.LANGUAGE_CODE):
+        request.LANGUAGE_CODE = translation.get_language()
+        return view.func(request, *view.args, **view.kwargs)
+
+
+def __build_wsgi_environ(job: ExportJob) -> dict:
+    """ WSGI environment of the request which asked the export, on the host and scheme it was received """
+    host = job.host or __get_default_host()
+    server_name, _, server_port = host.partition(':')
+    body = job.body.encode()
+    return {
+        'REQUEST_METHOD': job.method,
+        'SCRIPT_NAME': '',
+        'PATH_INFO': job.path,
+        'QUERY_STRING': job.query_string,
+        'CONTENT_TYPE': 'application/x-www-form-urlencoded',
+        'CONTENT_LENGTH': str(len(body)),
+        'HTTP_HOST': host,
+        'SERVER_NAME': server_name,
+        'SERVER_PORT': server_port or ('443' if job.scheme == 'https' else '80'),
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': job.scheme,
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': io.StringIO(),
+        'wsgi.multithread': False,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+
+
+def __get_default_host() -> str:
+    # Jobs queued before the host was stored
+    allowed_hosts = [host for host in settings.ALLOWED_HOSTS if host != '*' and not host.startswith('.')]
+    return allowed_hosts[0] if allowed_hosts else 'localhost'
+
+
+def __save_response_file(job: ExportJob, response: HttpResponse) -> None:
+    if response.status_code != 200 or response.get('Content-Type', '').startswith('text/html'):
+        raise ValueError("The view did not return a file (status code {})".format(response.status_code))
+
+    match = FILENAME_REGEX.search(response.get('Content-Disposition', ''))
+    filename = match.group(1) if match else DEFAULT_FILENAME
+    with tempfile.TemporaryFile() as export_file:
+        for chunk in (response.streaming_content if response.streaming else [response.content]):
+            export_file.write(chunk)
+        export_file.seek(0)
+        job.file.save(filename, File(export_file), save=False)
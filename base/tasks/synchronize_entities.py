@@ -1,12 +1,18 @@
+import collections
 import datetime
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 import requests
 from django.conf import settings
 from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+from django.utils import timezone
+
 from backoffice.celery import app as celery_app
 from base.models.entity import Entity
-from base.models.entity_version import EntityVersion
+from base.models.entity_version import EntityVersion, invalidate_entity_hierarchy_index
 from base.models.entity_version_address import EntityVersionAddress
 from base.models.enums import organization_type, entity_type
 from base.models.organization import Organization
@@ -15,15 +21,33 @@ from reference.models.country import Country
 
 logger = logging.getLogger(settings.DEFAULT_LOGGER)
 
+ENTITY_FIELDS = ['website', 'organization_id', 'fax', 'phone']
+ADDRESS_FIELDS = ['city', 'street', 'street_number', 'postal_code', 'country_id']
+RETRY_BACKOFF_SECONDS = 0.5
+REPORTED_CHANGES = [
+    'entities_created',
+    'entities_updated',
+    'entity_versions_created',
+    'entity_versions_updated',
+    'addresses_created',
+    'addresses_updated',
+    'overlapping',
+]
+
 
 @celery_app.task
 def run() -> dict:
     try:
+        start = time.monotonic()
         raw_entities = __fetch_entities_from_esb()
         raw_root_entity = next(entity for entity in raw_entities if __is_root_entity(entity))
-        __upsert_entity(raw_root_entity)
-        __save_children_entities(raw_root_entity, raw_entities)
-        return {'Entities synchronized': 'OK'}
+        raw_entities_ordered = __order_from_root(raw_root_entity, raw_entities)
+        raw_addresses = __fetch_addresses_from_esb(raw_entities_ordered)
+        report = __synchronize(raw_entities_ordered, raw_addresses)
+        invalidate_entity_hierarchy_index()
+        report['duration'] = round(time.monotonic() - start, 3)
+        logger.info("[Synchronize entities] {}".format(report))
+        return {'Entities synchronized': 'OK', **report}
     except FetchEntitiesException:
         return {'Entities synchronized': 'Unable to fetch data from ESB'}
 
@@ -65,53 +89,186 @@ def __fetch_address_from_esb(raw_entity):
         raise FetchEntitiesException
 
 
-def __save_children_entities(raw_entity, all_raw_entities):
-    for child_entity in filter(lambda entity: entity['parent_entity_id'] == raw_entity['entity_id'], all_raw_entities):
-        __upsert_entity(child_entity)
-        __save_children_entities(child_entity, all_raw_entities)
+def __fetch_address_with_retries(raw_entity):
+    retries = max(settings.ESB_ENTITIES_SYNC_RETRIES, 1)
+    for attempt in range(1, retries + 1):
+        try:
+            return __fetch_address_from_esb(raw_entity)
+        except FetchEntitiesException:
+            if attempt == retries:
+                raise
+            time.sleep(RETRY_BACKOFF_SECONDS * 2 ** (attempt - 1))
+
+
+def __fetch_addresses_from_esb(raw_entities) -> dict:
+    """ Fetch the address of each entity with a bounded pool of concurrent requests """
+    with ThreadPoolExecutor(max_workers=settings.ESB_ENTITIES_SYNC_MAX_WORKERS) as executor:
+        raw_addresses = executor.map(__fetch_address_with_retries, raw_entities)
+        return {
+            raw_entity['entity_id']: raw_address for raw_entity, raw_address in zip(raw_entities, raw_addresses)
+        }
+
+
+def __order_from_root(raw_root_entity, all_raw_entities) -> list:
+    """ Return the entities reachable from the root, each parent being before its children """
+    raw_entities_by_parent_id = collections.defaultdict(list)
+    for raw_entity in all_raw_entities:
+        if not __is_root_entity(raw_entity):
+            raw_entities_by_parent_id[raw_entity['parent_entity_id']].append(raw_entity)
 
+    ordered = []
+    to_visit = collections.deque([raw_root_entity])
+    visited = set()
+    while to_visit:
+        raw_entity = to_visit.popleft()
+        if raw_entity['entity_id'] in visited:
+            continue
+        visited.add(raw_entity['entity_id'])
+        ordered.append(raw_entity)
+        to_visit.extend(raw_entities_by_parent_id[raw_entity['entity_id']])
+    return ordered
 
-def __upsert_entity(raw_entity):
-    raw_address = __fetch_address_from_esb(raw_entity)
 
-    entity, _ = Entity.objects.update_or_create(
-        external_id=__build_entity_external_id(raw_entity['entity_id']),
-        defaults={
+def __synchronize(raw_entities, raw_addresses) -> dict:
+    """
+    Compare the ESB entities with the ones in database and write only the differences.
+    Entities and entity versions are serializable models and entity versions check their overlapping on save :
+    they are saved one by one, only when changed. Addresses are written in bulk.
+    """
+    report = collections.Counter({change: 0 for change in REPORTED_CHANGES})
+    main_organization = Organization.objects.only('pk').get(type=organization_type.MAIN)
+    belgium = Country.objects.only('pk').get(iso_code='BE')
+
+    with transaction.atomic():
+        entities_by_esb_id = __synchronize_entities(raw_entities, raw_addresses, main_organization, report)
+        entity_versions_by_esb_id = __synchronize_entity_versions(raw_entities, entities_by_esb_id, report)
+        __synchronize_addresses(entity_versions_by_esb_id, raw_addresses, belgium, report)
+    return dict(report)
+
+
+def __synchronize_entities(raw_entities, raw_addresses, main_organization, report) -> dict:
+    existing_entities = Entity.objects.in_bulk(
+        [__build_entity_external_id(raw_entity['entity_id']) for raw_entity in raw_entities],
+        field_name='external_id'
+    )
+    entities_by_esb_id = {}
+    for raw_entity in raw_entities:
+        raw_address = raw_addresses[raw_entity['entity_id']]
+        external_id = __build_entity_external_id(raw_entity['entity_id'])
+        entity = existing_entities.get(external_id) or Entity(external_id=external_id)
+        values = {
             'website': raw_entity['web'] or '',
-            'organization': Organization.objects.only('pk').get(type=organization_type.MAIN),
-            'fax': raw_address['fax'] or '',
-            'phone': raw_address['phone'] or ''
+            'organization_id': main_organization.pk,
+            'fax': __to_str(raw_address['fax']),
+            'phone': __to_str(raw_address['phone']),
         }
-    )
+        if entity.pk is None:
+            __set_values(entity, values)
+            entity.save()
+            report['entities_created'] += 1
+        elif __set_values(entity, values):
+            entity.save()
+            report['entities_updated'] += 1
+        entities_by_esb_id[raw_entity['entity_id']] = entity
+    return entities_by_esb_id
 
-    parent = Entity.objects.only('pk').get(external_id=__build_entity_external_id(raw_entity['parent_entity_id'])) \
-        if not __is_root_entity(raw_entity) else None
-    try:
-        entity_version, _ = EntityVersion.objects.update_or_create(
-            entity=entity,
-            acronym=raw_entity['acronym'],
-            parent=parent,
-            title=raw_entity['name_fr'],
-            entity_type=__get_entity_type(raw_entity),
-            start_date=ESBDate(raw_entity['begin']).to_date(),
-            defaults={
-                'end_date': ESBDate(raw_entity['end']).to_date()
-            }
+
+def __synchronize_entity_versions(raw_entities, entities_by_esb_id, report) -> dict:
+    existing_versions = {
+        __build_entity_version_key(version.entity_id, version.acronym, version.parent_id, version.title,
+                                   version.entity_type, version.start_date): version
+        for version in EntityVersion.objects.filter(
+            entity__in=[entity.pk for entity in entities_by_esb_id.values()]
+        )
+    }
+    entity_versions_by_esb_id = {}
+    for raw_entity in raw_entities:
+        entity = entities_by_esb_id[raw_entity['entity_id']]
+        parent = entities_by_esb_id.get(raw_entity['parent_entity_id']) if not __is_root_entity(raw_entity) else None
+        acronym = raw_entity['acronym'].upper()
+        start_date = ESBDate(raw_entity['begin']).to_date()
+        end_date = ESBDate(raw_entity['end']).to_date()
+        version_type = __get_entity_type(raw_entity)
+        key = __build_entity_version_key(
+            entity.pk, acronym, parent.pk if parent else None, raw_entity['name_fr'], version_type, start_date
         )
+        entity_version = existing_versions.get(key)
+        try:
+            if entity_version is None:
+                entity_version = EntityVersion(
+                    entity=entity,
+                    acronym=acronym,
+                    parent=parent,
+                    title=raw_entity['name_fr'],
+                    entity_type=version_type,
+                    start_date=start_date,
+                    end_date=end_date,
+                )
+                entity_version.save()
+                report['entity_versions_created'] += 1
+            elif entity_version.end_date != end_date:
+                entity_version.end_date = end_date
+                entity_version.save()
+                report['entity_versions_updated'] += 1
+        except AttributeError:
+            logger.info("[Synchronize entities] Overlapping found for " + raw_entity['acronym'])
+            report['overlapping'] += 1
+            continue
+        entity_versions_by_esb_id[raw_entity['entity_id']] = entity_version
+    return entity_versions_by_esb_id
 
-        EntityVersionAddress.objects.update_or_create(
-            entity_version=entity_version,
-            is_main=True,
-            defaults={
-                'city': raw_address['town'] or '',
-                'street': raw_address['streetName'] or '',
-                'street_number': raw_address['streetNumber'] or '',
-                'postal_code': raw_address['postCode'] or '',
-                'country': Country.objects.only('pk').get(iso_code='BE'),
-            }
+
+def __synchronize_addresses(entity_versions_by_esb_id, raw_addresses, country, report):
+    existing_addresses = {
+        address.entity_version_id: address
+        for address in EntityVersionAddress.objects.filter(
+            entity_version__in=[version.pk for version in entity_versions_by_esb_id.values()],
+            is_main=True
         )
-    except AttributeError:
-        logger.info("[Synchronize entities] Overlapping found for " + raw_entity['acronym'])
+    }
+    now = timezone.now()
+    addresses_to_create = []
+    addresses_to_update = []
+    for esb_id, entity_version in entity_versions_by_esb_id.items():
+        raw_address = raw_addresses[esb_id]
+        values = {
+            'city': __to_str(raw_address['town']),
+            'street': __to_str(raw_address['streetName']),
+            'street_number': __to_str(raw_address['streetNumber']),
+            'postal_code': __to_str(raw_address['postCode']),
+            'country_id': country.pk,
+        }
+        address = existing_addresses.get(entity_version.pk)
+        if address is None:
+            address = EntityVersionAddress(entity_version=entity_version, is_main=True, changed=now)
+            __set_values(address, values)
+            addresses_to_create.append(address)
+        elif __set_values(address, values):
+            address.changed = now
+            addresses_to_update.append(address)
+
+    EntityVersionAddress.objects.bulk_create(addresses_to_create)
+    EntityVersionAddress.objects.bulk_update(addresses_to_update, ADDRESS_FIELDS + ['changed'])
+    report['addresses_created'] += len(addresses_to_create)
+    report['addresses_updated'] += len(addresses_to_update)
+
+
+def __build_entity_version_key(entity_id, acronym, parent_id, title, version_type, start_date) -> tuple:
+    return entity_id, acronym, parent_id, title, version_type, start_date
+
+
+def __set_values(obj, values: dict) -> bool:
+    """ Assign the values to the object and return whether one of them has changed """
+    changed = False
+    for field_name, value in values.items():
+        if getattr(obj, field_name) != value:
+            setattr(obj, field_name, value)
+            changed = True
+    return changed
+
+
+def __to_str(value) -> str:
+    return str(value) if value else ''
 
 
 def __build_entity_external_id(esb_id) -> str:
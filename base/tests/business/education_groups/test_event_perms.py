@@ -23,12 +23,17 @@
 #    see http://www.gnu.org/licenses/.
 #
 ##############################################################################
-from django.test import TestCase
+import datetime
+
+from django.core.cache import cache
+from django.test import TestCase, SimpleTestCase
 
 from base.business import event_perms
+from base.business.event_perms import AcademicEvent, AcademicEventIndex
 from base.models.enums import academic_calendar_type
 from base.tests.factories import person as person_factory
-from base.tests.factories.academic_calendar import OpenAcademicCalendarFactory
+from base.models.academic_calendar import AcademicCalendar
+from base.tests.factories.academic_calendar import OpenAcademicCalendarFactory, AcademicCalendarFactory
 from base.tests.factories.academic_year import create_current_academic_year
 from education_group.tests.factories.auth.central_manager import CentralManagerFactory as OFCentralManagerFactory
 from education_group.tests.factories.auth.faculty_manager import FacultyManagerFactory as OFFacultyManagerFactory
@@ -121,3 +126,59 @@ class TestEventPermLearningUnitEdition(TestCase):
         faculty_manager = UEFacultyManagerFactory()
         event_perm = event_perms.generate_event_perm_learning_unit_edition(faculty_manager.person)
         self.assertTrue(event_perm.is_open())
+
+
+class TestAcademicEventIndex(SimpleTestCase):
+    def setUp(self):
+        self.event_2020 = AcademicEvent(
+            title="2020", authorized_target_year=2020,
+            start_date=datetime.date(2020, 9, 1), end_date=datetime.date(2021, 9, 30)
+        )
+        self.event_2021 = AcademicEvent(
+            title="2021", authorized_target_year=2021,
+            start_date=datetime.date(2021, 9, 15), end_date=None
+        )
+        self.index = AcademicEventIndex([self.event_2021, self.event_2020])
+
+    def test_should_sort_events_by_start_date(self):
+        self.assertListEqual(self.index.academic_events, [self.event_2020, self.event_2021])
+
+    def test_should_find_no_event_open_before_first_start_date(self):
+        self.assertListEqual(self.index.get_open_academic_events(datetime.date(2020, 8, 31)), [])
+        self.assertListEqual(self.index.get_target_years_opened(datetime.date(2020, 8, 31)), [])
+
+    def test_should_find_events_open_on_bounds_dates(self):
+        self.assertListEqual(self.index.get_open_academic_events(datetime.date(2020, 9, 1)), [self.event_2020])
+        self.assertListEqual(
+            self.index.get_open_academic_events(datetime.date(2021, 9, 30)),
+            [self.event_2020, self.event_2021]
+        )
+        self.assertListEqual(self.index.get_target_years_opened(datetime.date(2021, 10, 1)), [2021])
+
+    def test_should_find_event_of_target_year(self):
+        self.assertEqual(self.index.get_academic_event(2021), self.event_2021)
+        self.assertIsNone(self.index.get_academic_event(2019))
+
+
+class TestVerifyAcademicEventIndexes(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.academic_calendar = AcademicCalendarFactory(
+            reference=academic_calendar_type.LEARNING_UNIT_EDITION_FACULTY_MANAGERS
+        )
+
+    def setUp(self):
+        cache.delete('academic_calendar_fingerprint_{}'.format(self.academic_calendar.reference))
+
+    def test_should_report_no_change_on_first_verification(self):
+        references = [self.academic_calendar.reference]
+        self.assertListEqual(event_perms.verify_academic_event_indexes(references), [])
+        self.assertListEqual(event_perms.verify_academic_event_indexes(references), [])
+
+    def test_should_report_change_made_without_save(self):
+        references = [self.academic_calendar.reference]
+        event_perms.verify_academic_event_indexes(references)
+        AcademicCalendar.objects.filter(pk=self.academic_calendar.pk).update(
+            end_date=self.academic_calendar.end_date + datetime.timedelta(days=1)
+        )
+        self.assertListEqual(event_perms.verify_academic_event_indexes(references), references)
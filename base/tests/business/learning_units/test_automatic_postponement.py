@@ -27,13 +27,23 @@ from unittest import mock
 from unittest.mock import Mock
 
 from django.db import Error
-from django.test import TestCase
+from django.test import TestCase, override_settings
 
 from base.business.learning_units.automatic_postponement import LearningUnitAutomaticPostponementToN6
+from base.models.learning_component_year import LearningComponentYear
+from base.models.learning_container_year import LearningContainerYear
 from base.models.learning_unit_year import LearningUnitYear
+from base.models.teaching_material import TeachingMaterial
 from base.tests.factories.academic_year import AcademicYearFactory, get_current_year
+from base.tests.factories.learning_component_year import LearningComponentYearFactory
 from base.tests.factories.learning_unit import LearningUnitFactory
 from base.tests.factories.learning_unit_year import LearningUnitYearFactory
+from base.tests.factories.teaching_material import TeachingMaterialFactory
+from cms.enums.entity_name import LEARNING_UNIT_YEAR
+from cms.models.translated_text import TranslatedText
+from cms.tests.factories.translated_text import LearningUnitYearTranslatedTextFactory
+from learning_unit.models.learning_class_year import LearningClassYear
+from learning_unit.tests.factories.learning_class_year import LearningClassYearFactory
 
 
 class TestFetchLearningUnitToPostpone(TestCase):
@@ -103,6 +113,72 @@ class TestFetchLearningUnitToPostpone(TestCase):
         self.assertEqual(len(result), 0)
 
 
+@override_settings(AUTOMATIC_POSTPONEMENT_BATCH_ENABLED=True, AUTOMATIC_POSTPONEMENT_CHUNK_SIZE=2)
+class TestLearningUnitPostponementByChunks(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        current_year = get_current_year()
+        cls.academic_years = [AcademicYearFactory(year=i) for i in range(current_year, current_year + 7)]
+        cls.luys = [
+            LearningUnitYearFactory(
+                learning_unit__end_year=None,
+                academic_year=cls.academic_years[-3],
+                learning_container_year__requirement_entity=None,
+                learning_container_year__allocation_entity=None,
+            ) for _ in range(3)
+        ]
+        component = LearningComponentYearFactory(learning_unit_year=cls.luys[0])
+        LearningClassYearFactory(learning_component_year=component, acronym="A")
+        TeachingMaterialFactory(learning_unit_year=cls.luys[0])
+        LearningUnitYearTranslatedTextFactory(reference=cls.luys[0].pk, text="Pedagogy")
+
+    def test_postpone_by_chunks(self):
+        postponement = LearningUnitAutomaticPostponementToN6()
+        result, errors = postponement.postpone()
+
+        self.assertFalse(errors)
+        self.assertCountEqual(
+            [(luy.learning_unit, luy.academic_year) for luy in result],
+            [(luy.learning_unit, self.academic_years[-1]) for luy in self.luys]
+        )
+        self.assertEqual(postponement.chunks_count, 2)
+        self.assertEqual(postponement.chunks_with_errors_count, 0)
+
+        self.assertEqual(LearningUnitYear.objects.count(), 9)
+        self.assertEqual(LearningContainerYear.objects.count(), 9)
+        self.assertFalse(LearningUnitYear.objects.filter(learning_container_year__isnull=True).exists())
+
+    def test_postpone_related_data_by_chunks(self):
+        LearningUnitAutomaticPostponementToN6().postpone()
+
+        new_luys = LearningUnitYear.objects.filter(learning_unit=self.luys[0].learning_unit).exclude(pk=self.luys[0].pk)
+        self.assertEqual(LearningComponentYear.objects.filter(learning_unit_year__in=new_luys).count(), 2)
+        self.assertEqual(
+            LearningClassYear.objects.filter(learning_component_year__learning_unit_year__in=new_luys).count(), 2
+        )
+        self.assertEqual(TeachingMaterial.objects.filter(learning_unit_year__in=new_luys).count(), 2)
+        self.assertCountEqual(
+            TranslatedText.objects.filter(entity=LEARNING_UNIT_YEAR, text="Pedagogy").values_list('reference', flat=True),
+            [self.luys[0].pk] + [luy.pk for luy in new_luys]
+        )
+
+    @mock.patch('base.business.learning_units.automatic_postponement.LearningUnitAutomaticPostponementToN6.extend_obj')
+    @mock.patch(
+        'base.business.learning_units.automatic_postponement.LearningUnitAutomaticPostponementToN6.batch_extend_objs'
+    )
+    def test_chunk_with_error_is_postponed_object_by_object(self, mock_batch_method, mock_method):
+        mock_batch_method.side_effect = Mock(side_effect=Error("test error"))
+        mock_method.side_effect = Mock(side_effect=Error("test error"))
+
+        postponement = LearningUnitAutomaticPostponementToN6()
+        result, errors = postponement.postpone()
+
+        self.assertCountEqual(errors, [luy.learning_unit for luy in self.luys])
+        self.assertEqual(len(result), 0)
+        self.assertEqual(postponement.chunks_with_errors_count, 2)
+        self.assertEqual(LearningUnitYear.objects.count(), 3)
+
+
 class TestSerializePostponement(TestCase):
     @classmethod
     def setUpTestData(cls):
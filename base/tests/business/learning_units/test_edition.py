@@ -499,6 +499,44 @@ class LearningUnitEditionTestCase(TestCase):
         self.assertIsInstance(error_list, list)
         self.assertEqual(len(error_list), 5)
 
+    def test_get_postponement_conflict_reports_same_errors_as_year_by_year_check(self):
+        another_learning_unit_year = self._create_next_year_learning_unit_year_with_conflicts()
+
+        reports = business_edition.get_postponement_conflict_reports([self.learning_unit_year])
+
+        self.assertEqual(list(reports), [self.learning_unit_year.pk])
+        self.assertEqual(reports[self.learning_unit_year.pk]['luy_without_conflict'], [self.learning_unit_year])
+        self.assertCountEqual(
+            reports[self.learning_unit_year.pk]['errors'],
+            business_edition._check_postponement_conflict(self.learning_unit_year, another_learning_unit_year)
+        )
+
+    def test_get_postponement_conflict_reports_override_postponement_consistency(self):
+        another_learning_unit_year = self._create_next_year_learning_unit_year_with_conflicts()
+
+        reports = business_edition.get_postponement_conflict_reports(
+            [self.learning_unit_year],
+            override_postponement_consistency=True
+        )
+
+        self.assertEqual(
+            reports[self.learning_unit_year.pk],
+            {'luy_without_conflict': [self.learning_unit_year, another_learning_unit_year]}
+        )
+
+    def _create_next_year_learning_unit_year_with_conflicts(self):
+        another_learning_container_year = _build_copy(self.learning_container_year)
+        another_learning_container_year.academic_year = self.next_academic_year
+        another_learning_container_year.common_title = "Title Modified"
+        another_learning_container_year.save()
+
+        another_learning_unit_year = _build_copy(self.learning_unit_year)
+        another_learning_unit_year.academic_year = self.next_academic_year
+        another_learning_unit_year.learning_container_year = another_learning_container_year
+        another_learning_unit_year.specific_title = "Specific title modified"
+        another_learning_unit_year.save()
+        return another_learning_unit_year
+
     def test_extends_only_components_of_learning_unit_year(self):
         # Creating partim with components for the same learningContainerYear
         _create_learning_unit_year_with_components(self.learning_container_year,
@@ -0,0 +1,75 @@
+##############################################################################
+#
+#    OSIS stands for Open Student Information System. It's an application
+#    designed to manage the core business of higher education institutions,
+#    such as universities, faculties, institutes and professional schools.
+#    The core business involves the administration of students, teachers,
+#    courses, programs and so on.
+#
+#    Copyright (C) 2015-2020 Université catholique de Louvain (http://www.uclouvain.be)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#    GNU General Public License for more details.
+#
+#    A copy of this license - GNU General Public License - is available
+#    at the root of the source code of this program.  If not,
+#    see http://www.gnu.org/licenses/.
+#
+import io
+
+from django.test import TestCase, override_settings
+from openpyxl import load_workbook
+from openpyxl.styles import Font
+
+from base.business.xls_streaming import generate_streaming_xls, iterate_in_chunks, must_be_streamed, \
+    StreamingWorksheet, RowStyle
+from base.models.learning_unit_year import LearningUnitYear
+from base.tests.factories.learning_unit_year import LearningUnitYearFactory
+
+
+class TestGenerateStreamingXls(TestCase):
+    def test_should_write_header_rows_and_parameters_worksheet(self):
+        worksheet = StreamingWorksheet(
+            title="Data",
+            header_titles=["Code", "Credits"],
+            rows=iter([["LDROI1001", 5], (["LDROI1002", 10], RowStyle(font=Font(bold=True)))]),
+        )
+
+        response = generate_streaming_xls([worksheet], "export", "Description", "User", {"Year": "2020-21"})
+        workbook = load_workbook(io.BytesIO(b"".join(response.streaming_content)))
+
+        self.assertIn("attachment; filename=export.xlsx", response['Content-Disposition'])
+        self.assertListEqual(
+            [[cell.value for cell in row] for row in workbook["Data"].rows],
+            [["Code", "Credits"], ["LDROI1001", 5], ["LDROI1002", 10]]
+        )
+        self.assertTrue(workbook["Data"]["A3"].font.bold)
+        self.assertEqual(len(workbook.worksheets), 2)
+
+
+class TestIterateInChunks(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.learning_unit_years = LearningUnitYearFactory.create_batch(5)
+
+    def test_should_keep_queryset_ordering_and_fetch_by_chunks(self):
+        qs = LearningUnitYear.objects.filter(
+            pk__in=[luy.pk for luy in self.learning_unit_years]
+        ).order_by('-pk')
+
+        with self.assertNumQueries(4):
+            result = list(iterate_in_chunks(qs, chunk_size=2))
+
+        self.assertListEqual(result, list(qs))
+
+    @override_settings(XLS_STREAMING_THRESHOLD=4)
+    def test_must_be_streamed_when_number_of_rows_exceeds_threshold(self):
+        self.assertTrue(must_be_streamed(LearningUnitYear.objects.all()))
+        self.assertFalse(must_be_streamed(self.learning_unit_years[:4]))
@@ -24,10 +24,11 @@
 #
 ##############################################################################
 import datetime
+from unittest import mock
 
 import factory
 import factory.fuzzy
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.utils import timezone
 
 from base.business.learning_units.perms import find_last_requirement_entity_version
@@ -39,6 +40,7 @@ from base.models.entity_version import (
     get_structure_of_entity_version,
     get_entity_version_parent_or_itself_from_type,
     EntityVersion,
+    EntityHierarchyIndex,
 )
 from base.models.enums import organization_type
 from base.models.enums.entity_type import FACULTY, SCHOOL, INSTITUTE, SECTOR
@@ -629,6 +631,73 @@ class EntityVersionLoadInMemoryTest(TestCase):
                 self.assertEqual(case.get('expected_result'), to_test)
 
 
+class TestEntityHierarchyIndex(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.now = datetime.datetime.now(get_tzinfo())
+        start_date = cls.now - datetime.timedelta(days=10)
+        cls.root = EntityVersionFactory(acronym="SST", entity_type=SECTOR, parent=None, start_date=start_date)
+        cls.SC = EntityVersionFactory(acronym="SC", entity_type=FACULTY, parent=cls.root.entity, start_date=start_date)
+        cls.MATH = EntityVersionFactory(acronym="MATH", entity_type=SCHOOL, parent=cls.SC.entity, start_date=start_date)
+        cls.PHYS = EntityVersionFactory(acronym="PHYS", entity_type=SCHOOL, parent=cls.SC.entity, start_date=start_date)
+
+    def setUp(self):
+        self.index = EntityHierarchyIndex.get(self.now.date())
+
+    def test_get_ancestors(self):
+        self.assertEqual(self.index.get_ancestors(self.MATH.entity_id), [self.SC, self.root])
+        self.assertEqual(self.index.get_ancestors(self.root.entity_id), [])
+
+    def test_get_descendants(self):
+        self.assertCountEqual(self.index.get_descendants(self.SC.entity_id), [self.MATH, self.PHYS])
+
+    def test_get_parent_or_itself_of_type(self):
+        self.assertEqual(self.index.get_parent_or_itself_of_type(self.MATH.entity_id, FACULTY), self.SC)
+        self.assertEqual(self.index.get_parent_or_itself_of_type(self.SC.entity_id, FACULTY), self.SC)
+        self.assertIsNone(self.index.get_parent_or_itself_of_type(self.root.entity_id, FACULTY))
+
+    def test_get_by_acronym(self):
+        self.assertEqual(self.index.get_by_acronym('phys')['entity_version'], self.PHYS)
+
+    @override_settings(ENTITY_HIERARCHY_INDEX_ENABLED=True)
+    def test_should_share_index_until_invalidated(self):
+        index = EntityHierarchyIndex.get(self.now.date())
+        self.assertIs(EntityHierarchyIndex.get(self.now.date()), index)
+
+        entity_version.ENTITY_HIERARCHY_VERSION.bump()
+        self.assertIsNot(EntityHierarchyIndex.get(self.now.date()), index)
+
+    def test_get_tree_should_return_the_rows_of_the_recursive_query(self):
+        expected_rows = EntityVersion.objects.get_tree([self.SC.entity_id], self.now.date())
+
+        rows = self.index.get_tree([self.SC.entity_id])
+
+        self.assertCountEqual(
+            [(row['id'], row['parent_id'], row['entity_id'], row['parents'], row['level']) for row in rows],
+            [(row['id'], row['parent_id'], row['entity_id'], row['parents'], row['level']) for row in expected_rows],
+        )
+        self.assertEqual(rows[0]['entity_id'], self.SC.entity_id)
+
+    def test_get_tree_should_return_none_when_entity_has_no_current_version(self):
+        self.assertIsNone(self.index.get_tree([EntityFactory().pk]))
+
+    @override_settings(ENTITY_HIERARCHY_INDEX_ENABLED=True)
+    def test_get_tree_should_be_read_from_index_when_enabled(self):
+        EntityHierarchyIndex.get(self.now.date())
+        with self.assertNumQueries(0):
+            rows = EntityVersion.objects.get_tree([self.SC.entity_id], self.now.date())
+        self.assertCountEqual([row['id'] for row in rows], [self.SC.id, self.MATH.id, self.PHYS.id])
+
+    @mock.patch('base.models.entity_version.invalidate_entity_hierarchy_index')
+    def test_should_invalidate_index_on_delete_and_bulk_update(self, mock_invalidate):
+        EntityVersion.objects.filter(pk=self.PHYS.pk).update(title='Physics')
+        self.assertTrue(mock_invalidate.called)
+
+        mock_invalidate.reset_mock()
+        EntityVersion.objects.filter(pk=self.PHYS.pk).delete()
+        self.assertTrue(mock_invalidate.called)
+
+
 class TestFindLastEntityVersionByLearningUnitYearId(TestCase):
     def test_when_entity_version(self):
         learning_unit_year = LearningUnitYearFactory()
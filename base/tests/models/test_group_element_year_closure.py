@@ -0,0 +1,154 @@
+##############################################################################
+#
+#    OSIS stands for Open Student Information System. It's an application
+#    designed to manage the core business of higher education institutions,
+#    such as universities, faculties, institutes and professional schools.
+#    The core business involves the administration of students, teachers,
+#    courses, programs and so on.
+#
+#    Copyright (C) 2015-2020 Université catholique de Louvain (http://www.uclouvain.be)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    A copy of this license - GNU General Public License - is available
+#    at the root of the source code of this program.  If not,
+#    see http://www.gnu.org/licenses/.
+#
+##############################################################################
+from django.test import TestCase, override_settings
+
+from base.models import group_element_year_closure
+from base.models.group_element_year import GroupElementYear
+from base.models.group_element_year_closure import GroupElementYearClosure
+from base.tests.factories.academic_year import AcademicYearFactory
+from base.tests.factories.group_element_year import GroupElementYearFactory, GroupElementYearChildLeafFactory
+from program_management.ddd.repositories import find_roots
+from program_management.tests.factories.element import ElementGroupYearFactory
+
+
+@override_settings(GROUP_ELEMENT_YEAR_CLOSURE_ENABLED=True)
+class TestGroupElementYearClosure(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        """
+            root_element_a
+            |-level_1
+              |-level_11 (common)
+                |-level_111 (learning unit)
+            |-level_2
+              |-level_11 (common)
+        """
+        with override_settings(GROUP_ELEMENT_YEAR_CLOSURE_ENABLED=True):
+            cls.academic_year = AcademicYearFactory(current=True)
+            cls.root_element_a = ElementGroupYearFactory(group_year__academic_year=cls.academic_year)
+            cls.level_1 = GroupElementYearFactory(
+                parent_element=cls.root_element_a,
+                child_element__group_year__academic_year=cls.academic_year,
+                order=0,
+            )
+            cls.level_11 = GroupElementYearFactory(
+                parent_element=cls.level_1.child_element,
+                child_element__group_year__academic_year=cls.academic_year,
+            )
+            cls.level_111 = GroupElementYearChildLeafFactory(
+                parent_element=cls.level_11.child_element,
+                child_element__learning_unit_year__academic_year=cls.academic_year,
+            )
+            cls.level_2 = GroupElementYearFactory(
+                parent_element=cls.root_element_a,
+                child_element__group_year__academic_year=cls.academic_year,
+                order=1,
+            )
+            cls.level_21 = GroupElementYearFactory(
+                parent_element=cls.level_2.child_element,
+                child_element=cls.level_11.child_element,
+            )
+        cls.root_categories_name = [category.name for category in find_roots.DEFAULT_ROOT_CATEGORIES]
+
+    def test_should_count_all_paths_between_elements(self):
+        closure_row = GroupElementYearClosure.objects.get(
+            ancestor_element=self.root_element_a,
+            descendant_element=self.level_111.child_element,
+        )
+        self.assertEqual(closure_row.path_count, 2)
+        self.assertListEqual(group_element_year_closure.verify(), [])
+
+    def test_should_decrease_path_count_when_link_deleted(self):
+        self.level_21.delete()
+
+        closure_row = GroupElementYearClosure.objects.get(
+            ancestor_element=self.root_element_a,
+            descendant_element=self.level_111.child_element,
+        )
+        self.assertEqual(closure_row.path_count, 1)
+        self.assertFalse(
+            GroupElementYearClosure.objects.filter(
+                ancestor_element=self.level_2.child_element,
+                descendant_element=self.level_111.child_element,
+            ).exists()
+        )
+        self.assertListEqual(group_element_year_closure.verify(), [])
+
+    def test_should_move_paths_when_child_of_existing_link_changed(self):
+        self.level_21.child_element = ElementGroupYearFactory(group_year__academic_year=self.academic_year)
+        self.level_21.save()
+
+        closure_row = GroupElementYearClosure.objects.get(
+            ancestor_element=self.root_element_a,
+            descendant_element=self.level_111.child_element,
+        )
+        self.assertEqual(closure_row.path_count, 1)
+        self.assertTrue(
+            GroupElementYearClosure.objects.filter(
+                ancestor_element=self.root_element_a,
+                descendant_element=self.level_21.child_element,
+            ).exists()
+        )
+        self.assertListEqual(group_element_year_closure.verify(), [])
+
+    def test_should_keep_closure_when_other_fields_of_link_changed(self):
+        self.level_21.order = 5
+        self.level_21.save()
+
+        self.assertListEqual(group_element_year_closure.verify(), [])
+
+    def test_should_rebuild_closure_from_links(self):
+        GroupElementYearClosure.objects.all().delete()
+
+        group_element_year_closure.rebuild()
+
+        self.assertListEqual(group_element_year_closure.verify(), [])
+
+    def test_adjacency_list_should_be_the_same_as_recursive_query(self):
+        root_ids = [self.root_element_a.pk]
+        with override_settings(GROUP_ELEMENT_YEAR_CLOSURE_ENABLED=False):
+            expected = GroupElementYear.objects.get_adjacency_list(root_ids)
+        self.assertCountEqual(GroupElementYear.objects.get_adjacency_list(root_ids), expected)
+
+    def test_reverse_adjacency_list_should_be_the_same_as_recursive_query(self):
+        child_ids = [self.level_111.child_element_id]
+        with override_settings(GROUP_ELEMENT_YEAR_CLOSURE_ENABLED=False):
+            expected = GroupElementYear.objects.get_reverse_adjacency_list(child_element_ids=child_ids)
+        result = GroupElementYear.objects.get_reverse_adjacency_list(child_element_ids=child_ids)
+        self.assertCountEqual(result, expected)
+
+    def test_root_list_should_be_the_same_as_recursive_query(self):
+        child_ids = [self.level_111.child_element_id]
+        with override_settings(GROUP_ELEMENT_YEAR_CLOSURE_ENABLED=False):
+            expected = GroupElementYear.objects.get_root_list(
+                child_element_ids=child_ids,
+                root_category_name=self.root_categories_name
+            )
+        result = GroupElementYear.objects.get_root_list(
+            child_element_ids=child_ids,
+            root_category_name=self.root_categories_name
+        )
+        self.assertCountEqual(result, expected)
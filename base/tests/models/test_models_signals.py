@@ -23,6 +23,8 @@
 #    see http://www.gnu.org/licenses/.
 #
 ##############################################################################
+from unittest import mock
+
 from django.contrib.auth.models import User
 from django.test import TestCase
 
@@ -30,6 +32,7 @@ from base.models import models_signals as mdl_signals, person as mdl_person
 from base.models.person import Person
 from base.models.structure import Structure
 from base.models.tutor import Tutor
+from base.tests.factories.academic_calendar import AcademicCalendarFactory
 from base.tests.factories.education_group_year import EducationGroupYearFactory
 from base.tests.factories.entity_manager import EntityManagerFactory
 from base.tests.factories.group import TutorGroupFactory, ProgramManagerGroupFactory
@@ -183,3 +186,12 @@ class AddToGroupsSignalsTest(TestCase):
         self.create_test_entity_manager()
         self.assertTrue(self.is_member('entity_managers'),
                         'entity_manager_foo should be in entity_managers group')
+
+
+class InvalidateAcademicEventIndexesSignalsTest(TestCase):
+    @mock.patch('base.models.academic_calendar.invalidate_academic_event_indexes')
+    def test_invalidate_academic_event_indexes_on_delete(self, mock_invalidate):
+        academic_calendar = AcademicCalendarFactory()
+        mock_invalidate.reset_mock()
+        academic_calendar.delete()
+        self.assertTrue(mock_invalidate.called)
@@ -0,0 +1,135 @@
+##############################################################################
+#
+#    OSIS stands for Open Student Information System. It's an application
+#    designed to manage the core business of higher education institutions,
+#    such as universities, faculties, institutes and professional schools.
+#    The core business involves the administration of students, teachers,
+#    courses, programs and so on.
+#
+#    Copyright (C) 2015-2020 Université catholique de Louvain (http://www.uclouvain.be)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    A copy of this license - GNU General Public License - is available
+#    at the root of the source code of this program.  If not,
+#    see http://www.gnu.org/licenses/.
+#
+##############################################################################
+from django.test import TestCase, override_settings
+
+from base.models import search_index
+from base.models.learning_unit_year import LearningUnitYear
+from base.models.search_index import SearchIndexEntry
+from base.tests.factories.academic_year import AcademicYearFactory
+from base.tests.factories.education_group_year import EducationGroupYearFactory
+from base.tests.factories.learning_unit_year import LearningUnitYearFactory
+from education_group.tests.factories.group_year import GroupYearFactory
+
+
+class TestRebuildSearchIndex(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.academic_year = AcademicYearFactory(year=2020)
+        cls.learning_unit_year = LearningUnitYearFactory(
+            acronym='LDROI1001',
+            academic_year=cls.academic_year,
+            learning_container_year__common_title='Droit civil',
+            specific_title='Introduction',
+        )
+        cls.group_year = GroupYearFactory(academic_year=cls.academic_year, title_fr='Tronc commun')
+        cls.education_group_year = EducationGroupYearFactory(academic_year=cls.academic_year)
+
+    def test_should_index_learning_units_groups_and_trainings(self):
+        rows_count = search_index.rebuild()
+
+        self.assertEqual(rows_count, SearchIndexEntry.objects.count())
+        entry = SearchIndexEntry.objects.get(
+            object_type=search_index.LEARNING_UNIT_YEAR,
+            object_id=self.learning_unit_year.pk
+        )
+        self.assertEqual(entry.year, 2020)
+        self.assertEqual(entry.full_title, 'Droit civil - Introduction')
+        self.assertTrue(
+            SearchIndexEntry.objects.filter(object_type=search_index.GROUP_YEAR, object_id=self.group_year.pk).exists()
+        )
+        self.assertTrue(
+            SearchIndexEntry.objects.filter(
+                object_type=search_index.EDUCATION_GROUP_YEAR,
+                object_id=self.education_group_year.pk
+            ).exists()
+        )
+
+    def test_should_filter_queryset_on_index(self):
+        search_index.rebuild()
+
+        queryset = search_index.filter_by_search_index(
+            LearningUnitYear.objects.all(),
+            search_index.LEARNING_UNIT_YEAR,
+            'full_title',
+            'civil - intro'
+        )
+        self.assertQuerysetEqual(queryset, [self.learning_unit_year.pk], transform=lambda luy: luy.pk)
+
+    def test_should_filter_queryset_on_index_with_accented_value(self):
+        accented_learning_unit_year = LearningUnitYearFactory(
+            academic_year=self.academic_year,
+            learning_container_year__common_title='Économie',
+            specific_title='Éléments (1)',
+        )
+        search_index.rebuild()
+
+        queryset = search_index.filter_by_search_index(
+            LearningUnitYear.objects.all(),
+            search_index.LEARNING_UNIT_YEAR,
+            'full_title',
+            'économie - éléments (1'
+        )
+        self.assertQuerysetEqual(queryset, [accented_learning_unit_year.pk], transform=lambda luy: luy.pk)
+
+    def test_should_rank_exact_code_first(self):
+        other_learning_unit_year = LearningUnitYearFactory(
+            acronym='LDROI1001A',
+            academic_year=self.academic_year,
+        )
+        search_index.rebuild()
+
+        entries = search_index.search('ldroi1001', object_types=[search_index.LEARNING_UNIT_YEAR])
+        self.assertEqual(
+            [entry.object_id for entry in entries],
+            [self.learning_unit_year.pk, other_learning_unit_year.pk]
+        )
+
+
+@override_settings(SEARCH_INDEX_ENABLED=True)
+class TestSearchIndexSignals(TestCase):
+    def test_should_index_saved_learning_unit_year(self):
+        learning_unit_year = LearningUnitYearFactory(specific_title='Mécanique')
+
+        entry = SearchIndexEntry.objects.get(object_type=search_index.LEARNING_UNIT_YEAR, object_id=learning_unit_year.pk)
+        self.assertEqual(entry.acronym, learning_unit_year.acronym)
+
+    def test_should_reindex_learning_units_when_container_title_changes(self):
+        learning_unit_year = LearningUnitYearFactory(specific_title='Partie 1')
+        container_year = learning_unit_year.learning_container_year
+        container_year.common_title = 'Physique'
+        container_year.save()
+
+        entry = SearchIndexEntry.objects.get(object_type=search_index.LEARNING_UNIT_YEAR, object_id=learning_unit_year.pk)
+        self.assertEqual(entry.full_title, 'Physique - Partie 1')
+
+    def test_should_remove_deleted_group_year(self):
+        group_year = GroupYearFactory()
+        group_year_id = group_year.pk
+        group_year.delete()
+
+        self.assertFalse(
+            SearchIndexEntry.objects.filter(object_type=search_index.GROUP_YEAR, object_id=group_year_id).exists()
+        )
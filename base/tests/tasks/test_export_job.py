@@ -0,0 +1,173 @@
+# ############################################################################
+#  OSIS stands for Open Student Information System. It's an application
+#  designed to manage the core business of higher education institutions,
+#  such as universities, faculties, institutes and professional schools.
+#  The core business involves the administration of students, teachers,
+#  courses, programs and so on.
+#
+#  Copyright (C) 2015-2020 Université catholique de Louvain (http://www.uclouvain.be)
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  A copy of this license - GNU General Public License - is available
+#  at the root of the source code of this program.  If not,
+#  see http://www.gnu.org/licenses/.
+# ############################################################################
+import datetime
+import shutil
+import tempfile
+
+import mock
+from django.http import HttpResponse
+from django.test import TestCase, RequestFactory, override_settings
+from django.utils import timezone
+
+from backoffice.celery import app as celery_app
+from base.business import export_job as export_job_business
+from base.models.enums.export_job_status import ExportJobStatus
+from base.models.export_job import ExportJob
+from base.tasks import export_job
+from base.tests.factories.group_element_year import GroupElementYearFactory
+from base.tests.factories.user import UserFactory
+from base.views.export_job import export_in_background
+
+EXPORT_JOB_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(EXPORT_JOB_ENABLED=True, EXPORT_JOB_EXPIRY_HOURS=2)
+class TestQueueExportJob(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = UserFactory()
+
+    def _build_request(self, **params):
+        request = RequestFactory().get('/learning_units/', params)
+        request.user = self.user
+        return request
+
+    def test_should_reuse_job_when_same_export_is_asked_twice(self):
+        job = export_job_business.queue_export_job(self._build_request(acronym='LDROI', xls_status='xls'))
+        same_job = export_job_business.queue_export_job(self._build_request(xls_status='xls', acronym='LDROI'))
+
+        self.assertEqual(job, same_job)
+        self.assertEqual(job.status, ExportJobStatus.PENDING.name)
+
+    def test_should_create_new_job_when_parameters_differ_or_previous_file_expired(self):
+        job = export_job_business.queue_export_job(self._build_request(acronym='LDROI'))
+        other_job = export_job_business.queue_export_job(self._build_request(acronym='LECGE'))
+        self.assertNotEqual(job, other_job)
+
+        ExportJob.objects.filter(pk=job.pk).update(
+            status=ExportJobStatus.DONE.name,
+            expires_at=timezone.now() - datetime.timedelta(minutes=1)
+        )
+        self.assertNotEqual(job, export_job_business.queue_export_job(self._build_request(acronym='LDROI')))
+
+    def test_should_store_host_and_scheme_of_the_request(self):
+        job = export_job_business.queue_export_job(self._build_request())
+        self.assertEqual(job.host, 'testserver')
+        self.assertEqual(job.scheme, 'http')
+
+    def test_must_not_queue_request_replayed_by_worker(self):
+        request = self._build_request()
+        self.assertTrue(export_job_business.must_be_queued(request))
+
+        request.export_job = ExportJob(user=self.user)
+        self.assertFalse(export_job_business.must_be_queued(request))
+
+
+@override_settings(EXPORT_JOB_ENABLED=True, EXPORT_JOB_ROWS_THRESHOLD=1)
+@mock.patch('base.views.export_job.notify_export_job_queued')
+class TestExportInBackground(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = UserFactory()
+
+    def setUp(self):
+        self.request = RequestFactory().get('/export/')
+        self.request.user = self.user
+        self.view_func = mock.Mock(return_value=HttpResponse(b'content'))
+
+    def test_should_queue_export_larger_than_threshold(self, mock_notify):
+        response = export_in_background(lambda request: 2)(self.view_func)(self.request)
+
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(self.view_func.called)
+        self.assertTrue(ExportJob.objects.filter(user=self.user).exists())
+
+    def test_should_generate_export_not_larger_than_threshold(self, mock_notify):
+        response = export_in_background(lambda request: 1)(self.view_func)(self.request)
+
+        self.assertEqual(response.content, b'content')
+        self.assertFalse(ExportJob.objects.filter(user=self.user).exists())
+
+    def test_should_count_links_under_the_root_of_the_program_tree(self, mock_notify):
+        root_link = GroupElementYearFactory()
+        GroupElementYearFactory(parent_element=root_link.child_element)
+        root_group_year = root_link.parent_element.group_year
+
+        self.assertEqual(
+            export_job_business.count_program_tree_links(
+                self.request,
+                year=root_group_year.academic_year.year,
+                code=root_group_year.partial_acronym
+            ),
+            2
+        )
+
+
+@override_settings(EXPORT_JOB_EXPIRY_HOURS=2, EXPORT_JOB_ROOT=EXPORT_JOB_ROOT)
+class TestRunExportJob(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.job = ExportJob.objects.create(user=UserFactory(), request_hash='hash', path='/learning_units/',
+                                           query_string='acronym=LDROI', host='osis.example.org', scheme='https')
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(EXPORT_JOB_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    @mock.patch('base.tasks.export_job.resolve')
+    def test_should_store_file_returned_by_the_view(self, mock_resolve):
+        response = HttpResponse(b'content', content_type='application/vnd.ms-excel')
+        response['Content-Disposition'] = "attachment; filename=export.xlsx"
+        mock_resolve.return_value = mock.Mock(func=mock.Mock(return_value=response), args=(), kwargs={})
+
+        export_job.run(self.job.pk)
+
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.status, ExportJobStatus.DONE.name)
+        self.assertEqual(self.job.filename, 'export.xlsx')
+        self.assertEqual(self.job.file.read(), b'content')
+        self.assertTrue(self.job.file.path.startswith(EXPORT_JOB_ROOT))
+        request = mock_resolve.return_value.func.call_args[0][0]
+        self.assertTrue(request.export_job)
+        self.assertEqual(request.build_absolute_uri(), 'https://osis.example.org/learning_units/?acronym=LDROI')
+        self.assertEqual(request.GET['acronym'], 'LDROI')
+
+    @mock.patch('base.tasks.export_job.resolve')
+    def test_should_mark_job_as_failed_when_view_does_not_return_a_file(self, mock_resolve):
+        mock_resolve.return_value = mock.Mock(func=mock.Mock(return_value=HttpResponse(b'<html/>')), args=(), kwargs={})
+
+        export_job.run(self.job.pk)
+
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.status, ExportJobStatus.FAILED.name)
+        self.assertIsNotNone(self.job.expires_at)
+
+
+class TestExportJobTasksRegistration(TestCase):
+    def test_tasks_registered_and_expired_jobs_deletion_scheduled(self):
+        self.assertIn('base.tasks.export_job.run', celery_app.tasks)
+        self.assertIn('base.tasks.export_job.delete_expired', celery_app.tasks)
+        scheduled_tasks = [entry['task'] for entry in celery_app.conf.beat_schedule.values()]
+        self.assertIn('base.tasks.export_job.delete_expired', scheduled_tasks)
@@ -22,9 +22,12 @@
 #  see http://www.gnu.org/licenses/.
 # ############################################################################
 import datetime
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
 
 import mock
-from django.test import TestCase
+from django.test import TestCase, override_settings
 
 from base.models.entity_version import EntityVersion
 from base.models.entity_version_address import EntityVersionAddress
@@ -96,6 +99,64 @@ class TestSynchronizeEntities(TestCase):
         self.assertEqual(result, {'Entities synchronized': 'Unable to fetch data from ESB'})
 
 
+class FakeESBRequestHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == '/entities':
+            payload = {'entities': {'entity': _mock_fetch_entities_from_esb_return_value()}}
+        else:
+            payload = {'address': _mock_fetch_address_from_esb_return_value()}
+        body = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestSynchronizeEntitiesWithFakeESB(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = HTTPServer(('127.0.0.1', 0), FakeESBRequestHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    @classmethod
+    def setUpTestData(cls):
+        MainOrganizationFactory()
+        CountryFactory(iso_code="BE")
+
+    def _run(self):
+        with override_settings(
+                ESB_API_URL='http://127.0.0.1:{}'.format(self.server.server_port),
+                ESB_ENTITIES_HISTORY_ENDPOINT='entities',
+                ESB_ENTITY_ADDRESS_ENDPOINT='entities/{entity_id}/address',
+                ESB_ENTITIES_SYNC_MAX_WORKERS=2,
+        ):
+            return synchronize_entities.run()
+
+    def test_should_create_all_then_report_no_change(self):
+        result = self._run()
+        self.assertEqual(result['Entities synchronized'], 'OK')
+        self.assertEqual(result['entities_created'], 2)
+        self.assertEqual(result['entity_versions_created'], 2)
+        self.assertEqual(result['addresses_created'], 2)
+
+        result = self._run()
+        self.assertEqual(result['Entities synchronized'], 'OK')
+        for change in synchronize_entities.REPORTED_CHANGES:
+            self.assertEqual(result[change], 0)
+        self.assertEqual(EntityVersionAddress.objects.filter(is_main=True).count(), 2)
+
+
 def _mock_fetch_entities_from_esb_return_value():
     return [
         {
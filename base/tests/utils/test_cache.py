@@ -29,7 +29,7 @@ from django.test import TestCase, RequestFactory, SimpleTestCase
 from django.views.generic import TemplateView
 
 from base.tests.factories.user import UserFactory
-from base.utils.cache import cache, RequestCache, CacheFilterMixin, cached_result
+from base.utils.cache import cache, RequestCache, CacheFilterMixin, cached_result, VersionStamp
 
 
 class TestRequestCache(TestCase):
@@ -137,3 +137,24 @@ class TestCachedResult(SimpleTestCase):
             3,
             "Function called 3 times, but should have been executed only the first time"
         )
+
+
+class TestVersionStamp(SimpleTestCase):
+    def setUp(self):
+        self.version_stamp = VersionStamp('test_version_stamp')
+        cache.delete(self.version_stamp.key)
+        self.addCleanup(cache.delete, self.version_stamp.key)
+
+    def test_get_should_be_stable_until_bumped(self):
+        self.assertEqual(self.version_stamp.get(), self.version_stamp.get())
+
+    def test_bump_should_change_the_version(self):
+        version = self.version_stamp.get()
+        self.version_stamp.bump()
+        self.assertNotEqual(self.version_stamp.get(), version)
+
+    def test_bump_should_restart_from_a_new_version_when_the_key_is_lost(self):
+        version = self.version_stamp.get()
+        cache.delete(self.version_stamp.key)
+        self.version_stamp.bump()
+        self.assertGreaterEqual(self.version_stamp.get(), version)
@@ -0,0 +1,117 @@
+##############################################################################
+#
+#    OSIS stands for Open Student Information System. It's an application
+#    designed to manage the core business of higher education institutions,
+#    such as universities, faculties, institutes and professional schools.
+#    The core business involves the administration of students, teachers,
+#    courses, programs and so on.
+#
+#    Copyright (C) 2015-2020 Université catholique de Louvain (http://www.uclouvain.be)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    A copy of this license - GNU General Public License - is available
+#    at the root of the source code of this program.  If not,
+#    see http://www.gnu.org/licenses/.
+#
+##############################################################################
+from django.core.cache import cache
+from django.core.paginator import InvalidPage
+from django.test import TestCase, override_settings
+
+from base.models.person import Person
+from base.tests.factories.person import PersonFactory
+from base.utils.pagination import KeysetPaginator, SearchPaginator, get_search_count
+
+
+class TestKeysetPaginator(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.persons = [
+            PersonFactory(last_name='Dupont', first_name='Marcel'),
+            PersonFactory(last_name='Dupont', first_name=None),
+            PersonFactory(last_name='Dupont', first_name='Albert'),
+            PersonFactory(last_name='Martin', first_name='Jean'),
+            PersonFactory(last_name='Albert', first_name='Louis'),
+        ]
+
+    def _get_all_pages(self, queryset, per_page):
+        paginator = KeysetPaginator(queryset, per_page)
+        page = paginator.page()
+        pages = [page]
+        while page.has_next():
+            page = paginator.page(page.next_cursor)
+            pages.append(page)
+        return pages
+
+    def test_should_follow_the_queryset_ordering(self):
+        for ordering in [('last_name', 'first_name'), ('-last_name', 'first_name'), ('last_name', '-first_name')]:
+            with self.subTest(ordering=ordering):
+                queryset = Person.objects.order_by(*ordering)
+                pages = self._get_all_pages(queryset, 2)
+
+                self.assertEqual([len(page) for page in pages], [2, 2, 1])
+                self.assertEqual(
+                    [person for page in pages for person in page],
+                    list(queryset.order_by(*ordering, 'pk'))
+                )
+
+    def test_should_not_give_next_cursor_on_last_page(self):
+        page = KeysetPaginator(Person.objects.order_by('last_name'), 5).page()
+
+        self.assertEqual(len(page), 5)
+        self.assertFalse(page.has_next())
+
+    def test_should_raise_invalid_page_when_cursor_cannot_be_decoded(self):
+        with self.assertRaises(InvalidPage):
+            KeysetPaginator(Person.objects.order_by('last_name'), 2).page('not a cursor')
+
+    def test_should_refuse_random_ordering(self):
+        with self.assertRaises(ValueError):
+            KeysetPaginator(Person.objects.order_by('?'), 2)
+
+
+class TestGetSearchCount(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        PersonFactory.create_batch(3)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_should_count_exactly_by_default(self):
+        self.assertEqual(get_search_count(Person.objects.all()), (3, False))
+
+    @override_settings(SEARCH_COUNT_CACHE_TIMEOUT=60)
+    def test_should_keep_count_in_cache(self):
+        get_search_count(Person.objects.all())
+        PersonFactory()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(get_search_count(Person.objects.all()), (3, False))
+
+    @override_settings(SEARCH_COUNT_ESTIMATE_THRESHOLD=1)
+    def test_should_return_planner_estimation_when_above_threshold(self):
+        count, is_estimated = get_search_count(Person.objects.all())
+
+        self.assertTrue(is_estimated)
+        self.assertGreaterEqual(count, 1)
+
+    @override_settings(SEARCH_COUNT_ESTIMATE_THRESHOLD=10 ** 9)
+    def test_should_count_exactly_when_estimation_below_threshold(self):
+        self.assertEqual(get_search_count(Person.objects.filter(last_name__isnull=False)), (3, False))
+
+    def test_search_paginator_should_use_search_count(self):
+        paginator = SearchPaginator(Person.objects.order_by('pk'), 2)
+
+        self.assertEqual(paginator.count, 3)
+        self.assertFalse(paginator.count_is_estimated)
+        self.assertEqual(paginator.num_pages, 2)
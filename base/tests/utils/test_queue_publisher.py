@@ -0,0 +1,166 @@
+##############################################################################
+#
+#    OSIS stands for Open Student Information System. It's an application
+#    designed to manage the core business of higher education institutions,
+#    such as universities, faculties, institutes and professional schools.
+#    The core business involves the administration of students, teachers,
+#    courses, programs and so on.
+#
+#    Copyright (C) 2015-2020 Université catholique de Louvain (http://www.uclouvain.be)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    A copy of this license - GNU General Public License - is available
+#    at the root of the source code of this program.  If not,
+#    see http://www.gnu.org/licenses/.
+#
+##############################################################################
+import json
+
+import pika.exceptions
+from django.test import SimpleTestCase
+
+from base.utils.queue_publisher import QueuePublisher, MessageNotConfirmed
+
+
+class InMemoryBroker:
+    """ Broker stand-in : keeps the published messages by queue and can refuse the next publications """
+    def __init__(self):
+        self.messages = {}
+        self.connections = []
+        self.failures_to_raise = []
+
+    def connect(self):
+        connection = InMemoryConnection(self)
+        self.connections.append(connection)
+        return connection
+
+
+class InMemoryConnection:
+    def __init__(self, broker):
+        self.broker = broker
+        self.is_open = True
+        self.channels = []
+        self.closed_by_broker = False
+        self.data_events_processed = 0
+
+    def process_data_events(self):
+        self.data_events_processed += 1
+        if self.closed_by_broker:
+            self.is_open = False
+            raise pika.exceptions.ConnectionClosed()
+
+    def channel(self):
+        channel = InMemoryChannel(self)
+        self.channels.append(channel)
+        return channel
+
+    def close(self):
+        self.is_open = False
+
+
+class InMemoryChannel:
+    def __init__(self, connection):
+        self.connection = connection
+        self.is_open = True
+        self.confirm_mode = False
+
+    def confirm_delivery(self):
+        self.confirm_mode = True
+
+    def basic_publish(self, exchange, routing_key, body, properties=None, mandatory=False):
+        if self.connection.broker.failures_to_raise:
+            raise self.connection.broker.failures_to_raise.pop(0)
+        self.connection.broker.messages.setdefault(routing_key, []).append(json.loads(body.decode('utf-8')))
+        return True
+
+
+class TestQueuePublisher(SimpleTestCase):
+    def setUp(self):
+        self.broker = InMemoryBroker()
+        self.publisher = QueuePublisher(
+            connection_factory=self.broker.connect,
+            pool_size=1,
+            retries=3,
+            retry_backoff=0,
+            max_message_size=50,
+        )
+
+    def test_should_publish_json_message_in_confirm_mode(self):
+        self.publisher.publish('scores', {'global_id': '123', 'scores': []})
+
+        self.assertEqual(self.broker.messages, {'scores': [{'global_id': '123', 'scores': []}]})
+        self.assertTrue(self.broker.connections[0].channels[0].confirm_mode)
+        self.assertTrue(self.broker.connections[0].is_open)
+        self.assertEqual(self.publisher.get_metrics()['messages_sent'], 1)
+
+    def test_should_reuse_the_pooled_connection(self):
+        for _ in range(3):
+            self.publisher.publish('scores', {})
+
+        self.assertEqual(len(self.broker.connections), 1)
+        self.assertEqual(len(self.broker.messages['scores']), 3)
+
+    def test_should_service_pooled_connection_before_reusing_it(self):
+        self.publisher.publish('scores', {})
+        self.publisher.publish('scores', {})
+
+        self.assertEqual(len(self.broker.connections), 1)
+        self.assertEqual(self.broker.connections[0].data_events_processed, 1)
+
+    def test_should_replace_pooled_connection_closed_by_broker_without_retry(self):
+        self.publisher.publish('scores', {})
+        self.broker.connections[0].closed_by_broker = True
+
+        self.publisher.publish('scores', {})
+
+        self.assertEqual(len(self.broker.connections), 2)
+        self.assertEqual(len(self.broker.messages['scores']), 2)
+        self.assertEqual(self.publisher.get_metrics()['retries'], 0)
+
+    def test_should_retry_on_a_new_connection(self):
+        self.broker.failures_to_raise = [pika.exceptions.AMQPConnectionError(), MessageNotConfirmed()]
+
+        self.publisher.publish('scores', {'global_id': '123'})
+
+        self.assertEqual(self.broker.messages, {'scores': [{'global_id': '123'}]})
+        self.assertEqual(len(self.broker.connections), 3)
+        self.assertFalse(self.broker.connections[0].is_open)
+        metrics = self.publisher.get_metrics()
+        self.assertEqual((metrics['messages_sent'], metrics['retries'], metrics['failures']), (1, 2, 0))
+
+    def test_should_raise_when_retries_are_exhausted(self):
+        self.broker.failures_to_raise = [pika.exceptions.AMQPConnectionError() for _ in range(3)]
+
+        with self.assertRaises(pika.exceptions.AMQPConnectionError):
+            self.publisher.publish('scores', {'global_id': '123'})
+
+        self.assertEqual(self.broker.messages, {})
+        metrics = self.publisher.get_metrics()
+        self.assertEqual((metrics['messages_sent'], metrics['retries'], metrics['failures']), (0, 2, 1))
+
+    def test_should_split_large_payload_in_chunks(self):
+        items = [{'global_id': str(i), 'attributions': []} for i in range(5)]
+
+        messages_count = self.publisher.publish_in_chunks('attributions', items)
+
+        self.assertGreater(messages_count, 1)
+        self.assertEqual(len(self.broker.messages['attributions']), messages_count)
+        self.assertEqual([item for message in self.broker.messages['attributions'] for item in message], items)
+        metrics = self.publisher.get_metrics()
+        self.assertEqual(metrics['messages_sent'], messages_count)
+        self.assertLessEqual(metrics['largest_message'], 50)
+
+    def test_should_send_an_item_larger_than_the_limit_alone(self):
+        items = [{'title': 'x' * 100}, {'title': 'y'}]
+
+        self.assertEqual(self.publisher.publish_in_chunks('attributions', items), 2)
+        self.assertEqual(self.broker.messages['attributions'], [[items[0]], [items[1]]])
@@ -26,6 +26,7 @@
 from unittest import mock
 
 from django.http import HttpResponse
+from django.test import override_settings
 
 
 class TestRenderToExcelMixin:
@@ -51,3 +52,28 @@ class TestRenderToExcelMixin:
                 self.assertTrue(self.mocked_xls_function.called)
 
                 self.xls_create_patcher.stop()
+
+    @override_settings(EXPORT_JOB_ENABLED=False)
+    @mock.patch('base.business.export_job.must_be_queued')
+    def test_search_not_counted_for_export_jobs_when_disabled(self, mock_must_be_queued):
+        for xls_status_value, xls_function in self.tuples_xls_status_value_with_xls_method_function:
+            with self.subTest(xls_status_value=xls_status_value), \
+                    mock.patch(xls_function, return_value=HttpResponse()) as mocked_xls_function:
+                get_data = self.get_data.copy()
+                get_data["xls_status"] = xls_status_value
+                self.client.get(self.url, data=get_data)
+
+                self.assertTrue(mocked_xls_function.called)
+                self.assertFalse(mock_must_be_queued.called)
+
+    @override_settings(EXPORT_JOB_ENABLED=True)
+    @mock.patch('base.business.export_job.must_be_queued', return_value=True)
+    def test_xls_queued_when_export_jobs_enabled(self, mock_must_be_queued):
+        for xls_status_value, xls_function in self.tuples_xls_status_value_with_xls_method_function:
+            with self.subTest(xls_status_value=xls_status_value), \
+                    mock.patch(xls_function, return_value=HttpResponse()) as mocked_xls_function:
+                get_data = self.get_data.copy()
+                get_data["xls_status"] = xls_status_value
+                self.client.get(self.url, data=get_data)
+
+                self.assertFalse(mocked_xls_function.called)
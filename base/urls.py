@@ -47,7 +47,7 @@ from base.views import geocoding
 from base.views import learning_achievement, search, user_list
 from base.views import learning_unit, offer, common, institution, organization, academic_calendar, \
     my_osis, student
-from base.views import teaching_material
+from base.views import teaching_material, export_job
 from base.views.learning_units.detail import DetailLearningUnitYearView, DetailLearningUnitYearViewBySlug
 from base.views.learning_units.external import create as create_external
 from base.views.learning_units.pedagogy.publish import publish_and_access_publication
@@ -257,6 +257,10 @@ urlpatterns = [
     url(r'^my_osis/', include([
         url(r'^$', my_osis.my_osis_index, name="my_osis"),
         url(r'^management_tasks/messages_templates', my_osis.messages_templates_index, name="messages_templates"),
+        url(r'^exports/', include([
+            url(r'^$', export_job.export_job_list, name="export_job_list"),
+            path('<uuid:uuid>/', export_job.export_job_detail, name="export_job_detail"),
+        ])),
         url(r'^my_messages/', include([
             url(r'^$', my_osis.my_messages_index, name="my_messages"),
             url(r'^action/$', my_osis.my_messages_action, name="my_messages_action"),
@@ -25,11 +25,13 @@
 ##############################################################################
 import abc
 import logging
+import time
 from enum import Enum
 from functools import wraps
 
 from django.conf import settings
 from django.core.cache import cache
+from django.db import transaction
 from django.http import QueryDict
 
 CACHE_FILTER_TIMEOUT = None
@@ -196,3 +198,35 @@ def cached_result(func):
             setattr(self, cached_property_name, result)
         return result
     return f_cached
+
+
+class VersionStamp:
+    """
+    Version number kept in Django's cache and embedded in the keys of the values derived from the database :
+    bumping it drops those values at once in all the processes sharing the cache.
+    With a cache backend local to each process (locmem, the default BACKEND_CACHE), a bump is only seen by the
+    process which made it : the other processes keep their values until they expire.
+    """
+    def __init__(self, key: str):
+        self.key = key
+
+    def get(self) -> int:
+        version = cache.get(self.key)
+        if version is None:
+            # Start from a timestamp : a lost version key can never give back a version already used
+            cache.add(self.key, int(time.time() * 1000), timeout=None)
+            version = cache.get(self.key)
+        return version
+
+    def bump(self) -> None:
+        try:
+            cache.incr(self.key)
+        except ValueError:
+            cache.set(self.key, int(time.time() * 1000), timeout=None)
+
+    def bump_on_commit(self) -> None:
+        """
+        Bump the version once the current transaction is committed. Bumping before the commit would let a concurrent
+        request cache the old content of the database under the new version.
+        """
+        transaction.on_commit(self.bump)
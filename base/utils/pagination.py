@@ -0,0 +1,202 @@
+##############################################################################
+#
+#    OSIS stands for Open Student Information System. It's an application
+#    designed to manage the core business of higher education institutions,
+#    such as universities, faculties, institutes and professional schools.
+#    The core business involves the administration of students, teachers,
+#    courses, programs and so on.
+#
+#    Copyright (C) 2015-2020 Université catholique de Louvain (http://www.uclouvain.be)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    A copy of this license - GNU General Public License - is available
+#    at the root of the source code of this program.  If not,
+#    see http://www.gnu.org/licenses/.
+#
+##############################################################################
+import base64
+import functools
+import hashlib
+import json
+import operator
+from collections.abc import Sequence
+from typing import List, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import InvalidPage, Paginator
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection
+from django.db.models import Model, Q, QuerySet
+from django.utils.functional import cached_property
+
+SEARCH_COUNT_KEY = 'search_count_{hash}'
+
+
+def get_search_count(queryset: QuerySet) -> Tuple[int, bool]:
+    """
+    Count the rows of a search queryset.
+
+    When the query planner expects at least SEARCH_COUNT_ESTIMATE_THRESHOLD rows, its estimation is returned instead
+    of an exact count. Exact counts are kept SEARCH_COUNT_CACHE_TIMEOUT seconds in Django's cache.
+    :return: The count and whether it is estimated
+    """
+    queryset = queryset.order_by()
+    threshold = getattr(settings, 'SEARCH_COUNT_ESTIMATE_THRESHOLD', 0)
+    if threshold and connection.vendor == 'postgresql':
+        estimated_count = _get_planner_estimated_count(queryset)
+        if estimated_count >= threshold:
+            return estimated_count, True
+
+    timeout = getattr(settings, 'SEARCH_COUNT_CACHE_TIMEOUT', 0)
+    if not timeout:
+        return queryset.count(), False
+
+    key = _get_count_key(queryset)
+    count = cache.get(key)
+    if count is None:
+        count = queryset.count()
+        cache.set(key, count, timeout=timeout)
+    return count, False
+
+
+def _get_planner_estimated_count(queryset: QuerySet) -> int:
+    # QuerySet.explain() cannot be used : Django < 4.0 returns the repr of the decoded json plan (ticket #32226)
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute("EXPLAIN (FORMAT JSON) " + sql, params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def _get_count_key(queryset: QuerySet) -> str:
+    sql, params = queryset.query.sql_with_params()
+    return SEARCH_COUNT_KEY.format(hash=hashlib.md5(repr((sql, params)).encode()).hexdigest())
+
+
+class SearchPaginator(Paginator):
+    """
+    Paginator counting the rows with get_search_count.
+    When the count is estimated, the pages beyond the estimation are empty instead of invalid.
+    """
+
+    count_is_estimated = False
+
+    @cached_property
+    def count(self) -> int:
+        if not isinstance(self.object_list, QuerySet):
+            return len(self.object_list)
+        count, self.count_is_estimated = get_search_count(self.object_list)
+        return count
+
+    def validate_number(self, number):
+        if self.count and self.count_is_estimated:
+            try:
+                number = int(number)
+            except (TypeError, ValueError):
+                return super().validate_number(number)
+            return max(number, 1)
+        return super().validate_number(number)
+
+
+class KeysetPage(Sequence):
+    def __init__(self, object_list: List, next_cursor: Optional[str]):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+
+class KeysetPaginator:
+    """
+    Seek pagination : a page is the rows following the cursor in the ordering of the queryset.
+
+    Unlike the offset pagination, the cost of a page does not depend on its position and no count is needed.
+    The primary key is added to the ordering so that the rows have a total order. Ordering fields must be names
+    (possibly spanning relations or annotations), not expressions. Postgres sorts null values last in ascending order.
+    """
+
+    def __init__(self, queryset: QuerySet, per_page):
+        self.per_page = int(per_page)
+        self.ordering = self._get_ordering(queryset)
+        self.queryset = queryset.order_by(*self.ordering)
+
+    def page(self, cursor: str = None) -> KeysetPage:
+        queryset = self.queryset
+        if cursor:
+            queryset = queryset.filter(self._get_seek_clause(self.decode_cursor(cursor)))
+
+        rows = list(queryset[:self.per_page + 1])
+        object_list = rows[:self.per_page]
+        next_cursor = self.encode_cursor(object_list[-1]) if len(rows) > self.per_page else None
+        return KeysetPage(object_list, next_cursor)
+
+    def encode_cursor(self, obj: Model) -> str:
+        values = [_get_ordering_value(obj, field.lstrip('-')) for field in self.ordering]
+        return base64.urlsafe_b64encode(json.dumps(values, cls=DjangoJSONEncoder).encode()).decode()
+
+    def decode_cursor(self, cursor: str) -> List:
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+        except (ValueError, TypeError):
+            raise InvalidPage('Invalid cursor')
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise InvalidPage('Invalid cursor')
+        return values
+
+    def _get_seek_clause(self, values: List) -> Q:
+        # (f1, f2, ...) > (v1, v2, ...) <=> f1 > v1 OR (f1 = v1 AND f2 > v2) OR ...
+        clauses = []
+        equal_clauses = []
+        for field, value in zip(self.ordering, values):
+            name = field.lstrip('-')
+            after_clause = _get_after_clause(name, value, descending=field.startswith('-'))
+            if after_clause is not None:
+                clauses.append(functools.reduce(operator.and_, equal_clauses, after_clause))
+            equal_clauses.append(Q(**{'{}__isnull'.format(name): True}) if value is None else Q(**{name: value}))
+        return functools.reduce(operator.or_, clauses)
+
+    @staticmethod
+    def _get_ordering(queryset: QuerySet) -> Tuple[str, ...]:
+        ordering = tuple(queryset.query.order_by) or tuple(queryset.model._meta.ordering)
+        if any(not isinstance(field, str) or '?' in field for field in ordering):
+            raise ValueError('Keyset pagination requires an ordering made of field names')
+        if not {'pk', 'id', '-pk', '-id'} & set(ordering):
+            ordering += ('pk',)
+        return ordering
+
+
+def _get_after_clause(name: str, value, descending: bool) -> Optional[Q]:
+    # Postgres sorts null values last in ascending order and first in descending order
+    if descending:
+        return Q(**{'{}__isnull'.format(name): False}) if value is None else Q(**{'{}__lt'.format(name): value})
+    if value is None:
+        return None
+    return Q(**{'{}__gt'.format(name): value}) | Q(**{'{}__isnull'.format(name): True})
+
+
+def _get_ordering_value(obj: Model, field: str):
+    value = obj
+    for attribute in field.split('__'):
+        value = getattr(value, attribute, None)
+        if value is None:
+            return None
+    return value.pk if isinstance(value, Model) else value
@@ -0,0 +1,237 @@
+##############################################################################
+#
+#    OSIS stands for Open Student Information System. It's an application
+#    designed to manage the core business of higher education institutions,
+#    such as universities, faculties, institutes and professional schools.
+#    The core business involves the administration of students, teachers,
+#    courses, programs and so on.
+#
+#    Copyright (C) 2015-2020 Université catholique de Louvain (http://www.uclouvain.be)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    A copy of this license - GNU General Public License - is available
+#    at the root of the source code of this program.  If not,
+#    see http://www.gnu.org/licenses/.
+#
+##############################################################################
+import json
+import logging
+import queue
+import threading
+import time
+from typing import Callable, Iterable, Iterator, Tuple
+
+import pika
+import pika.exceptions
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+
+logger = logging.getLogger(settings.DEFAULT_LOGGER)
+
+# Errors after which the channel is dropped and the message published again
+RETRYABLE_EXCEPTIONS = (pika.exceptions.AMQPError, ConnectionError)
+
+
+class MessageNotConfirmed(pika.exceptions.AMQPChannelError):
+    """ The broker didn't confirm the message (nack or unroutable) """
+
+
+class QueuePublisher:
+    """
+    Publish JSON messages in the queues with a pool of connections kept open between the messages.
+    Each channel is in confirm mode : a message is sent once the broker has confirmed it.
+    A failed publication is retried on a new connection with an exponential backoff.
+    """
+    def __init__(self, connection_factory: Callable = None, pool_size: int = None, retries: int = None,
+                 retry_backoff: float = None, max_message_size: int = None):
+        self._connection_factory = connection_factory or _create_connection
+        self._pool_size = pool_size
+        self._retries = retries
+        self._retry_backoff = retry_backoff
+        self._max_message_size = max_message_size
+        self._pool = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._metrics = _get_empty_metrics()
+
+    @property
+    def pool_size(self) -> int:
+        return self._pool_size if self._pool_size is not None else settings.QUEUE_PUBLISHER_POOL_SIZE
+
+    @property
+    def retries(self) -> int:
+        return self._retries if self._retries is not None else settings.QUEUE_PUBLISHER_RETRIES
+
+    @property
+    def retry_backoff(self) -> float:
+        return self._retry_backoff if self._retry_backoff is not None else settings.QUEUE_PUBLISHER_RETRY_BACKOFF
+
+    @property
+    def max_message_size(self) -> int:
+        return self._max_message_size if self._max_message_size is not None \
+            else settings.QUEUE_PUBLISHER_MAX_MESSAGE_SIZE
+
+    def publish(self, queue_name: str, message) -> None:
+        self._publish_body(queue_name, json.dumps(message, cls=DjangoJSONEncoder).encode('utf-8'))
+
+    def publish_in_chunks(self, queue_name: str, items: Iterable) -> int:
+        """
+        Publish a list as several lists of at most max_message_size bytes (an item larger than that is sent alone)
+        :return: The number of messages sent
+        """
+        messages_count = 0
+        for body in _split_in_chunks(items, self.max_message_size):
+            self._publish_body(queue_name, body)
+            messages_count += 1
+        return messages_count
+
+    def get_metrics(self) -> dict:
+        """
+        :return: e.g. {'messages_sent': 10, 'retries': 1, 'failures': 0, 'bytes_sent': 5120, 'largest_message': 1024}
+        """
+        with self._lock:
+            return dict(self._metrics)
+
+    def reset_metrics(self) -> None:
+        with self._lock:
+            self._metrics = _get_empty_metrics()
+
+    def close(self) -> None:
+        """ Close all the connections kept in the pool """
+        while True:
+            try:
+                connection, _ = self._pool.get_nowait()
+            except queue.Empty:
+                return
+            _close_quietly(connection)
+
+    def _publish_body(self, queue_name: str, body: bytes) -> None:
+        attempts = max(self.retries, 1)
+        for attempt in range(1, attempts + 1):
+            connection = None
+            try:
+                connection, channel = self._acquire()
+                _basic_publish(channel, queue_name, body)
+            except RETRYABLE_EXCEPTIONS as e:
+                _close_quietly(connection)
+                if attempt == attempts:
+                    self._increment(failures=1)
+                    logger.error("Unable to publish a message of {} bytes in queue {} : {!r}".format(
+                        len(body), queue_name, e
+                    ))
+                    raise
+                self._increment(retries=1)
+                time.sleep(self.retry_backoff * 2 ** (attempt - 1))
+            else:
+                self._release(connection, channel)
+                self._increment(messages_sent=1, bytes_sent=len(body), largest_message=len(body))
+                return
+
+    def _acquire(self) -> Tuple:
+        while True:
+            try:
+                connection, channel = self._pool.get_nowait()
+            except queue.Empty:
+                break
+            if _is_alive(connection, channel):
+                return connection, channel
+            _close_quietly(connection)
+        connection = self._connection_factory()
+        channel = connection.channel()
+        channel.confirm_delivery()
+        return connection, channel
+
+    def _release(self, connection, channel) -> None:
+        if self._pool.qsize() < self.pool_size:
+            self._pool.put((connection, channel))
+        else:
+            _close_quietly(connection)
+
+    def _increment(self, messages_sent=0, retries=0, failures=0, bytes_sent=0, largest_message=0) -> None:
+        with self._lock:
+            self._metrics['messages_sent'] += messages_sent
+            self._metrics['retries'] += retries
+            self._metrics['failures'] += failures
+            self._metrics['bytes_sent'] += bytes_sent
+            self._metrics['largest_message'] = max(self._metrics['largest_message'], largest_message)
+
+
+def _get_empty_metrics() -> dict:
+    return {'messages_sent': 0, 'retries': 0, 'failures': 0, 'bytes_sent': 0, 'largest_message': 0}
+
+
+def _create_connection() -> pika.BlockingConnection:
+    credentials = pika.PlainCredentials(settings.QUEUES.get('QUEUE_USER'), settings.QUEUES.get('QUEUE_PASSWORD'))
+    return pika.BlockingConnection(pika.ConnectionParameters(
+        settings.QUEUES.get('QUEUE_URL'),
+        settings.QUEUES.get('QUEUE_PORT'),
+        settings.QUEUES.get('QUEUE_CONTEXT_ROOT'),
+        credentials
+    ))
+
+
+def _basic_publish(channel, queue_name: str, body: bytes) -> None:
+    confirmed = channel.basic_publish(
+        exchange='',
+        routing_key=queue_name,
+        body=body,
+        properties=pika.BasicProperties(content_type='application/json', delivery_mode=2),
+        mandatory=True
+    )
+    # Depending on the version of pika, a refused message is either reported by the returned value or raised
+    if confirmed is False:
+        raise MessageNotConfirmed()
+
+
+def _split_in_chunks(items: Iterable, max_message_size: int) -> Iterator[bytes]:
+    chunk = []
+    chunk_size = 2  # The brackets of the list
+    for item in items:
+        encoded_item = json.dumps(item, cls=DjangoJSONEncoder).encode('utf-8')
+        if chunk and chunk_size + len(encoded_item) + 1 > max_message_size:
+            yield _join_chunk(chunk)
+            chunk = []
+            chunk_size = 2
+        chunk.append(encoded_item)
+        chunk_size += len(encoded_item) + 1
+    if chunk:
+        yield _join_chunk(chunk)
+
+
+def _join_chunk(encoded_items) -> bytes:
+    return b'[' + b','.join(encoded_items) + b']'
+
+
+def _is_alive(connection, channel) -> bool:
+    """
+    An idle BlockingConnection does not answer the heartbeats of the broker : the pending events (heartbeats
+    included) are processed before reusing it, which also detects the connections closed by the broker meanwhile.
+    """
+    if not (connection.is_open and channel.is_open):
+        return False
+    try:
+        connection.process_data_events()
+    except RETRYABLE_EXCEPTIONS:
+        return False
+    return connection.is_open and channel.is_open
+
+
+def _close_quietly(connection) -> None:
+    if connection is None:
+        return
+    try:
+        if connection.is_open:
+            connection.close()
+    except RETRYABLE_EXCEPTIONS:
+        pass
+
+
+queue_publisher = QueuePublisher()
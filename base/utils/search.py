@@ -25,11 +25,15 @@
 ##############################################################################
 import urllib
 
-from django.http import JsonResponse, QueryDict
+from django.conf import settings
+from django.core.paginator import InvalidPage
+from django.http import JsonResponse, QueryDict, Http404
+from django.utils.translation import gettext as _
 from django_filters.views import FilterView
 
 from base.templatetags import pagination
 from base.utils.cache import SearchParametersCache
+from base.utils.pagination import KeysetPaginator, SearchPaginator
 
 
 class SearchMixin:
@@ -39,12 +43,17 @@ class SearchMixin:
         Add possibility to cache search parameters
 
         serializer_class: class used to serialize the resulting queryset
+        keyset_pagination: when the json result is requested with a 'cursor' parameter (empty for the first page),
+                           the page is the rows following the cursor instead of an offset. The response gives the
+                           cursor of the next page and the total is only computed for the first page.
     """
     serializer_class = None
     cache_search = True
+    keyset_pagination = False
+    paginator_class = SearchPaginator
 
     def render_to_response(self, context, **response_kwargs):
-        if "application/json" in self.request.headers.get("Accept", ""):
+        if self._is_json_request():
             serializer = self.serializer_class(
                 context["page_obj"],
                 context={
@@ -52,12 +61,37 @@ class SearchMixin:
                     'language': self.request.LANGUAGE_CODE
                 },
                 many=True)
+            if self._is_keyset_pagination_requested():
+                return JsonResponse({
+                    'object_list': serializer.data,
+                    'total': None if self.request.GET['cursor'] else context['paginator'].count,
+                    'next_cursor': context['page_obj'].next_cursor,
+                })
             return JsonResponse({
                 'object_list': serializer.data,
                 'total': context['paginator'].count,
             })
         return super().render_to_response(context, **response_kwargs)
 
+    def paginate_queryset(self, queryset, page_size):
+        if not self._is_keyset_pagination_requested():
+            return super().paginate_queryset(queryset, page_size)
+
+        try:
+            page = KeysetPaginator(queryset, page_size).page(self.request.GET['cursor'])
+        except InvalidPage as e:
+            raise Http404(_('Invalid page (%(page_number)s): %(message)s') % {
+                'page_number': self.request.GET['cursor'],
+                'message': str(e)
+            })
+        return self.get_paginator(queryset, page_size), page, page.object_list, page.has_next()
+
+    def _is_json_request(self) -> bool:
+        return "application/json" in self.request.headers.get("Accept", "")
+
+    def _is_keyset_pagination_requested(self) -> bool:
+        return self.keyset_pagination and self._is_json_request() and 'cursor' in self.request.GET
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         if self.cache_search:
@@ -77,6 +111,9 @@ class RenderToExcel:
         name: value of xls_status so as to generate the excel
         render_method: function to generate the excel.
                        The function must have as signature f(view_obj, context, **response_kwargs)
+
+        When export jobs are enabled and the search returns more than EXPORT_JOB_ROWS_THRESHOLD rows,
+        the excel is generated in background and the search page is displayed with a link to the export.
     """
     def __init__(self, name, render_method):
         self.name = name
@@ -86,6 +123,19 @@ class RenderToExcel:
         class Wrapped(filter_class):
             def render_to_response(obj, context, **response_kwargs):
                 if obj.request.GET.get('xls_status') == self.name:
+                    if settings.EXPORT_JOB_ENABLED and self._queue_export_job(obj.request, context):
+                        return super().render_to_response(context, **response_kwargs)
                     return self.render_method(obj, context, **response_kwargs)
                 return super().render_to_response(context, **response_kwargs)
         return Wrapped
+
+    @staticmethod
+    def _queue_export_job(request, context) -> bool:
+        # Imported here : it loads the Celery tasks, which are only needed when export jobs are enabled
+        from base.business import export_job
+
+        rows_count = context['filter'].qs.count() if context.get('filter') else None
+        if export_job.must_be_queued(request, rows_count):
+            export_job.notify_export_job_queued(request, export_job.queue_export_job(request))
+            return True
+        return False
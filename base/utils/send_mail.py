@@ -168,7 +168,10 @@ def send_mail_after_annual_procedure_of_automatic_postponement_of_luy(
         'luys_ending_this_year_qs': statistics_context['ending_on_max_academic_year'].order_by(
             "learningunityear__acronym"
         ),
-        'luys_with_errors': luys_with_errors
+        'luys_with_errors': luys_with_errors,
+        # Only filled when the postponement runs by chunks
+        'chunks': statistics_context.get('chunks', 0),
+        'chunks_with_errors': statistics_context.get('chunks_with_errors', 0),
     }
     message_content = message_config.create_message_content(html_template_ref, txt_template_ref, None, receivers,
                                                             template_base_data, None, None)
@@ -0,0 +1,90 @@
+##############################################################################
+#
+#    OSIS stands for Open Student Information System. It's an application
+#    designed to manage the core business of higher education institutions,
+#    such as universities, faculties, institutes and professional schools.
+#    The core business involves the administration of students, teachers,
+#    courses, programs and so on.
+#
+#    Copyright (C) 2015-2020 Université catholique de Louvain (http://www.uclouvain.be)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    A copy of this license - GNU General Public License - is available
+#    at the root of the source code of this program.  If not,
+#    see http://www.gnu.org/licenses/.
+#
+##############################################################################
+import functools
+from typing import Callable
+
+from django.conf import settings
+from django.contrib.auth.decorators import login_required
+from django.http import FileResponse, JsonResponse
+from django.shortcuts import get_object_or_404, redirect
+from django.urls import reverse
+from django.utils import timezone
+
+from base.business.export_job import must_be_queued, queue_export_job, notify_export_job_queued
+from base.models.enums.export_job_status import ExportJobStatus
+from base.models.export_job import ExportJob
+
+
+def export_in_background(rows_count_fn: Callable[..., int], rows_threshold_setting: str = 'EXPORT_JOB_ROWS_THRESHOLD'):
+    """
+    Decorator for export views : when export jobs are enabled and the export is larger than the threshold, the export
+    is queued and generated by a Celery worker.
+    The user is redirected to the previous page with a link to follow the generation.
+    :param rows_count_fn: estimates the size of the export, called with the arguments of the view
+    :param rows_threshold_setting: name of the setting holding the size above which the export is queued
+    """
+    def decorator(view_func):
+        @functools.wraps(view_func)
+        def wrapped_view(request, *args, **kwargs):
+            if settings.EXPORT_JOB_ENABLED and must_be_queued(
+                    request,
+                    rows_count_fn(request, *args, **kwargs),
+                    getattr(settings, rows_threshold_setting)
+            ):
+                notify_export_job_queued(request, queue_export_job(request))
+                return redirect(request.META.get('HTTP_REFERER') or reverse('my_osis'))
+            return view_func(request, *args, **kwargs)
+        return wrapped_view
+    return decorator
+
+
+@login_required
+def export_job_list(request):
+    jobs = ExportJob.objects.reusable().filter(user=request.user)
+    return JsonResponse({'export_jobs': [_serialize_export_job(job) for job in jobs]})
+
+
+@login_required
+def export_job_detail(request, uuid):
+    job = get_object_or_404(ExportJob, uuid=uuid, user=request.user)
+    is_expired = job.expires_at and job.expires_at <= timezone.now()
+    if job.status == ExportJobStatus.DONE.name and job.file and not is_expired:
+        response = FileResponse(job.file.open('rb'))
+        response['Content-Disposition'] = "attachment; filename={}".format(job.filename)
+        return response
+    return JsonResponse(_serialize_export_job(job))
+
+
+def _serialize_export_job(job: ExportJob) -> dict:
+    return {
+        'uuid': str(job.uuid),
+        'path': job.path,
+        'status': job.status,
+        'error': job.error,
+        'created': job.created,
+        'expires_at': job.expires_at,
+        'url': reverse('export_job_detail', kwargs={'uuid': job.uuid}),
+    }
@@ -64,20 +64,23 @@ class BaseLearningUnitSearch(PermissionRequiredMixin, CacheFilterMixin, SearchMi
 
     filterset_class = None
     permission_required = 'base.can_access_learningunit'
-    cache_exclude_params = ['xls_status']
+    cache_exclude_params = ['xls_status', 'cursor']
 
     serializer_class = None
+    keyset_pagination = True
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         self._save_search_type_in_session()
 
         starting_ac = starting_academic_year()
-        if context["paginator"].count == 0 and self.request.GET:
+        # The pages following a cursor are served without counting the rows
+        count = None if self._is_keyset_pagination_requested() else context["paginator"].count
+        if count == 0 and self.request.GET:
             messages.add_message(self.request, messages.WARNING, _('No result!'))
         context.update({
             'form': context["filter"].form,
-            'learning_units_count': context["paginator"].count,
+            'learning_units_count': count,
             'current_academic_year': starting_ac,
             'proposal_academic_year': starting_ac.next(),
             'search_type': self.search_type.value,
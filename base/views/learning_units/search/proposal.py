@@ -59,7 +59,7 @@ class SearchLearningUnitProposal(BaseLearningUnitSearch):
         selected_proposals_acronym = request.POST.getlist("selected_action", default=[])
         selected_proposals = ProposalLearningUnit.objects.filter(
             learning_unit_year__acronym__in=selected_proposals_acronym
-        )
+        ).select_related('learning_unit_year__academic_year', 'learning_unit_year__learning_container_year')
         messages_by_level = apply_action_on_proposals(selected_proposals, user_person, request.POST, research_criteria)
         display_messages_by_level(request, messages_by_level)
         return redirect(reverse("learning_unit_proposal_search") + "?{}".format(request.GET.urlencode()))
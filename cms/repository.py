@@ -0,0 +1,225 @@
+##############################################################################
+#
+#    OSIS stands for Open Student Information System. It's an application
+#    designed to manage the core business of higher education institutions,
+#    such as universities, faculties, institutes and professional schools.
+#    The core business involves the administration of students, teachers,
+#    courses, programs and so on.
+#
+#    Copyright (C) 2015-2020 Université catholique de Louvain (http://www.uclouvain.be)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    A copy of this license - GNU General Public License - is available
+#    at the root of the source code of this program.  If not,
+#    see http://www.gnu.org/licenses/.
+#
+##############################################################################
+import itertools
+import operator
+import threading
+from collections import OrderedDict
+from functools import reduce
+from types import MappingProxyType
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.db.models import Q
+
+from base.utils.cache import VersionStamp
+from cms.models.translated_text import TranslatedText
+from cms.models.translated_text_label import TranslatedTextLabel
+
+CMS_TEXT_VERSION = VersionStamp('cms_text_version')
+
+EntityReference = Tuple[str, int]
+LabelLanguage = Tuple[str, str]
+
+
+class TranslatedTextIndex:
+    """
+    Read-only index of the translated texts of many (entity, reference) pairs.
+
+    The texts of a pair are keyed by (label, language). The instances are shared with the process cache when
+    CMS_TEXT_CACHE_ENABLED is set : they must not be modified.
+    """
+
+    def __init__(self, translated_texts_by_entity_reference: Dict[EntityReference, Iterable[TranslatedText]]):
+        self._texts = MappingProxyType({
+            entity_reference: MappingProxyType({
+                (translated_text.text_label.label, translated_text.language): translated_text
+                for translated_text in translated_texts
+            })
+            for entity_reference, translated_texts in translated_texts_by_entity_reference.items()
+        })
+
+    def __contains__(self, entity_reference: EntityReference) -> bool:
+        return entity_reference in self._texts
+
+    def __len__(self) -> int:
+        return len(self._texts)
+
+    def get_texts(self, entity: str, reference: int) -> MappingProxyType:
+        return self._texts.get((entity, reference), MappingProxyType({}))
+
+    def get_translated_text(self, entity: str, reference: int, label: str, language: str) -> Optional[TranslatedText]:
+        return self.get_texts(entity, reference).get((label, language))
+
+    def get_text(self, entity: str, reference: int, label: str, language: str) -> Optional[str]:
+        translated_text = self.get_translated_text(entity, reference, label, language)
+        return translated_text.text if translated_text else None
+
+
+class _LRUCache:
+    """ Process-local LRU cache dropped as a whole when the CMS version stamp kept in Django's cache changes """
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._version = None
+        self._lock = threading.Lock()
+
+    def get_many(self, keys: Iterable, version: int) -> Dict:
+        with self._lock:
+            if self._version != version:
+                self._entries.clear()
+                self._version = version
+            found = {}
+            for key in keys:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    found[key] = self._entries[key]
+            return found
+
+    def set_many(self, values: Dict, version: int) -> None:
+        with self._lock:
+            if self._version != version:
+                # Loaded under an outdated version : never keep it
+                return
+            self._entries.update(values)
+            for key in values:
+                self._entries.move_to_end(key)
+            while len(self._entries) > getattr(settings, 'CMS_TEXT_CACHE_SIZE', 10000):
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._version = None
+
+
+_lru_cache = _LRUCache()
+
+
+def is_cms_text_cache_enabled() -> bool:
+    return getattr(settings, 'CMS_TEXT_CACHE_ENABLED', False)
+
+
+def bulk_load_translated_texts(
+        entity_references: Iterable[EntityReference],
+        text_labels_name: List[str] = None,
+        language: str = None
+) -> TranslatedTextIndex:
+    """
+    Load the translated texts of all the (entity, reference) pairs with a single query.
+    Same filters as cms.models.translated_text.search.
+    """
+    entity_references = set(entity_references)
+    labels_key = tuple(sorted(text_labels_name)) if text_labels_name else None
+
+    def cache_key(entity_reference):
+        return entity_reference + (labels_key, language)
+
+    found = {}
+    if is_cms_text_cache_enabled():
+        version = CMS_TEXT_VERSION.get()
+        cached = _lru_cache.get_many([cache_key(entity_reference) for entity_reference in entity_references], version)
+        found = {
+            entity_reference: cached[cache_key(entity_reference)]
+            for entity_reference in entity_references if cache_key(entity_reference) in cached
+        }
+
+    missing = entity_references - set(found)
+    if missing:
+        loaded = _load_translated_texts(missing, text_labels_name, language)
+        found.update(loaded)
+        if is_cms_text_cache_enabled():
+            _lru_cache.set_many(
+                {cache_key(entity_reference): texts for entity_reference, texts in loaded.items()},
+                version
+            )
+    return TranslatedTextIndex(found)
+
+
+def bulk_load_translated_text_labels(
+        text_entity: str,
+        labels: List[str] = None,
+        languages: List[str] = None
+) -> MappingProxyType:
+    """
+    Load the translations of the text labels of an entity with a single query.
+    :return: A read-only mapping {(label, language): TranslatedTextLabel}
+    """
+    key = ('labels', text_entity, tuple(sorted(labels)) if labels else None,
+           tuple(sorted(languages)) if languages else None)
+    if is_cms_text_cache_enabled():
+        version = CMS_TEXT_VERSION.get()
+        cached = _lru_cache.get_many([key], version)
+        if key in cached:
+            return cached[key]
+
+    queryset = TranslatedTextLabel.objects.filter(text_label__entity=text_entity).select_related('text_label')
+    if labels:
+        queryset = queryset.filter(text_label__label__in=labels)
+    if languages:
+        queryset = queryset.filter(language__in=languages)
+    translated_labels = MappingProxyType({
+        (translated_label.text_label.label, translated_label.language): translated_label
+        for translated_label in queryset
+    })
+
+    if is_cms_text_cache_enabled():
+        _lru_cache.set_many({key: translated_labels}, version)
+    return translated_labels
+
+
+def _load_translated_texts(
+        entity_references: Iterable[EntityReference],
+        text_labels_name: List[str] = None,
+        language: str = None
+) -> Dict[EntityReference, Tuple[TranslatedText, ...]]:
+    references_by_entity = {}
+    for entity, reference in entity_references:
+        references_by_entity.setdefault(entity, set()).add(reference)
+    entity_clause = reduce(operator.or_, (
+        Q(entity=entity, reference__in=references) for entity, references in references_by_entity.items()
+    ))
+
+    queryset = TranslatedText.objects.filter(entity_clause).select_related('text_label')
+    if language:
+        queryset = queryset.filter(language=language)
+    if text_labels_name:
+        queryset = queryset.filter(text_label__label__in=text_labels_name)
+    queryset = queryset.order_by('entity', 'reference')
+
+    loaded = {entity_reference: () for entity_reference in entity_references}
+    loaded.update({
+        entity_reference: tuple(translated_texts)
+        for entity_reference, translated_texts in itertools.groupby(
+            queryset, key=lambda translated_text: (translated_text.entity, translated_text.reference)
+        )
+    })
+    return loaded
+
+
+def invalidate_cms_texts() -> None:
+    """ Drop the CMS texts kept by all processes once the current transaction is committed """
+    if is_cms_text_cache_enabled():
+        CMS_TEXT_VERSION.bump_on_commit()
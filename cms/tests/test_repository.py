@@ -0,0 +1,154 @@
+##############################################################################
+#
+#    OSIS stands for Open Student Information System. It's an application
+#    designed to manage the core business of higher education institutions,
+#    such as universities, faculties, institutes and professional schools.
+#    The core business involves the administration of students, teachers,
+#    courses, programs and so on.
+#
+#    Copyright (C) 2015-2020 Université catholique de Louvain (http://www.uclouvain.be)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    A copy of this license - GNU General Public License - is available
+#    at the root of the source code of this program.  If not,
+#    see http://www.gnu.org/licenses/.
+#
+##############################################################################
+from unittest import mock
+
+from django.conf import settings
+from django.test import TestCase, override_settings
+
+from cms import repository
+from cms.enums import entity_name
+from cms.repository import bulk_load_translated_texts, bulk_load_translated_text_labels
+from cms.tests.factories.text_label import LearningUnitYearTextLabelFactory
+from cms.tests.factories.translated_text import LearningUnitYearTranslatedTextFactory, OfferTranslatedTextFactory
+from cms.tests.factories.translated_text_label import TranslatedTextLabelFactory
+
+
+class TestBulkLoadTranslatedTexts(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.text_label_resume = LearningUnitYearTextLabelFactory(label='resume')
+        cls.text_label_mobility = LearningUnitYearTextLabelFactory(label='mobility')
+        cls.resume_fr = LearningUnitYearTranslatedTextFactory(
+            text_label=cls.text_label_resume, reference=1, text='Résumé', language=settings.LANGUAGE_CODE_FR
+        )
+        cls.resume_en = LearningUnitYearTranslatedTextFactory(
+            text_label=cls.text_label_resume, reference=1, text='Summary', language=settings.LANGUAGE_CODE_EN
+        )
+        cls.mobility_fr = LearningUnitYearTranslatedTextFactory(
+            text_label=cls.text_label_mobility, reference=2, text='Mobilité', language=settings.LANGUAGE_CODE_FR
+        )
+        cls.offer_text = OfferTranslatedTextFactory(text_label=cls.text_label_resume, reference=1)
+
+    def setUp(self):
+        repository._lru_cache.clear()
+
+    def test_should_load_all_references_with_one_query(self):
+        with self.assertNumQueries(1):
+            index = bulk_load_translated_texts(
+                [(entity_name.LEARNING_UNIT_YEAR, 1), (entity_name.LEARNING_UNIT_YEAR, 2),
+                 (entity_name.OFFER_YEAR, 1)]
+            )
+            self.assertEqual(
+                index.get_text(entity_name.LEARNING_UNIT_YEAR, 1, 'resume', settings.LANGUAGE_CODE_EN),
+                'Summary'
+            )
+            self.assertEqual(
+                index.get_translated_text(entity_name.LEARNING_UNIT_YEAR, 2, 'mobility', settings.LANGUAGE_CODE_FR),
+                self.mobility_fr
+            )
+        self.assertEqual(index.get_translated_text(entity_name.OFFER_YEAR, 1, 'resume', self.offer_text.language),
+                         self.offer_text)
+        self.assertEqual(len(index), 3)
+
+    def test_should_filter_on_labels_and_language(self):
+        index = bulk_load_translated_texts(
+            [(entity_name.LEARNING_UNIT_YEAR, 1), (entity_name.LEARNING_UNIT_YEAR, 2)],
+            text_labels_name=['resume'],
+            language=settings.LANGUAGE_CODE_FR
+        )
+        self.assertEqual(list(index.get_texts(entity_name.LEARNING_UNIT_YEAR, 1).values()), [self.resume_fr])
+        self.assertIn((entity_name.LEARNING_UNIT_YEAR, 2), index)
+        self.assertFalse(index.get_texts(entity_name.LEARNING_UNIT_YEAR, 2))
+
+    def test_index_should_be_read_only(self):
+        index = bulk_load_translated_texts([(entity_name.LEARNING_UNIT_YEAR, 1)])
+        with self.assertRaises(TypeError):
+            index.get_texts(entity_name.LEARNING_UNIT_YEAR, 1)[('resume', 'fr-be')] = None
+
+    def test_should_not_query_when_no_references(self):
+        with self.assertNumQueries(0):
+            index = bulk_load_translated_texts([])
+        self.assertEqual(len(index), 0)
+
+    @override_settings(CMS_TEXT_CACHE_ENABLED=True)
+    def test_should_only_load_missing_references_when_cache_enabled(self):
+        bulk_load_translated_texts([(entity_name.LEARNING_UNIT_YEAR, 1)])
+
+        with self.assertNumQueries(0):
+            index = bulk_load_translated_texts([(entity_name.LEARNING_UNIT_YEAR, 1)])
+        self.assertEqual(len(index.get_texts(entity_name.LEARNING_UNIT_YEAR, 1)), 2)
+
+        with self.assertNumQueries(1):
+            index = bulk_load_translated_texts(
+                [(entity_name.LEARNING_UNIT_YEAR, 1), (entity_name.LEARNING_UNIT_YEAR, 2)]
+            )
+        self.assertEqual(len(index), 2)
+
+    @override_settings(CMS_TEXT_CACHE_ENABLED=True)
+    def test_should_reload_when_version_changed(self):
+        bulk_load_translated_texts([(entity_name.LEARNING_UNIT_YEAR, 1)])
+        repository.CMS_TEXT_VERSION.bump()
+
+        with self.assertNumQueries(1):
+            bulk_load_translated_texts([(entity_name.LEARNING_UNIT_YEAR, 1)])
+
+
+class TestBulkLoadTranslatedTextLabels(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.text_label = LearningUnitYearTextLabelFactory(label='resume')
+        cls.label_fr = TranslatedTextLabelFactory(
+            text_label=cls.text_label, language=settings.LANGUAGE_CODE_FR, label='Résumé'
+        )
+        cls.label_en = TranslatedTextLabelFactory(
+            text_label=cls.text_label, language=settings.LANGUAGE_CODE_EN, label='Summary'
+        )
+
+    def setUp(self):
+        repository._lru_cache.clear()
+
+    def test_should_index_labels_by_label_and_language(self):
+        with self.assertNumQueries(1):
+            translated_labels = bulk_load_translated_text_labels(
+                entity_name.LEARNING_UNIT_YEAR,
+                labels=['resume'],
+                languages=[settings.LANGUAGE_CODE_EN]
+            )
+        self.assertEqual(translated_labels, {('resume', settings.LANGUAGE_CODE_EN): self.label_en})
+
+    def test_should_filter_on_entity(self):
+        self.assertFalse(bulk_load_translated_text_labels(entity_name.OFFER_YEAR))
+
+
+@mock.patch("cms.signals.invalidate_cms_texts")
+class TestInvalidateCmsTextsOnChange(TestCase):
+    def test_should_invalidate_when_translated_text_saved(self, mock_invalidate):
+        LearningUnitYearTranslatedTextFactory()
+        self.assertTrue(mock_invalidate.called)
+
+    def test_should_invalidate_when_translated_text_label_saved(self, mock_invalidate):
+        TranslatedTextLabelFactory()
+        self.assertTrue(mock_invalidate.called)
@@ -2,6 +2,7 @@ from typing import Union
 
 from django.conf import settings
 from django.contrib.auth.models import User
+from django.db.models import prefetch_related_objects
 from django.utils.translation import gettext_lazy as _, pgettext
 from rules import predicate
 
@@ -93,13 +94,49 @@ def is_not_orphan_group(self, user, education_group_year=None):
     return education_group_year is not None
 
 
+def _batch_is_older_or_equals_than_limit_settings_year(self, user, objects):
+    prefetch_related_objects(objects, 'academic_year')
+    return {obj.pk: obj.academic_year.year >= settings.YEAR_LIMIT_EDG_MODIFICATION for obj in objects}
+
+
+def _batch_is_education_group_type_authorized_according_to_user_scope(self, user, objects):
+    prefetch_related_objects(objects, 'education_group_type')
+    scopes = [
+        (role.get_allowed_education_group_types(), self.context['role_qs'].filter(pk=role.pk).get_entities_ids())
+        for role in self.context['role_qs']
+    ]
+    return {
+        obj.pk: any(
+            obj.education_group_type.name in allowed_types and obj.management_entity_id in entity_ids
+            for allowed_types, entity_ids in scopes
+        )
+        for obj in objects
+    }
+
+
+def _batch_is_user_attached_to_management_entity(self, user, objects):
+    user_entity_ids = self.context['role_qs'].get_entities_ids()
+    return {obj.pk: obj.management_entity_id in user_entity_ids for obj in objects}
+
+
+def _batch_is_calendar_open(calendar_class):
+    def batch_fn(self, user, objects):
+        prefetch_related_objects(objects, 'academic_year')
+        target_years_opened = calendar_class().get_target_years_opened()
+        return {obj.pk: obj.academic_year.year in target_years_opened for obj in objects}
+    return batch_fn
+
+
 # FIXME: Move to business logic because it's not a predicate (found in MinimumEditableYearValidator)
 @predicate(bind=True)
 @predicate_failed_msg(
     message=_("You cannot change/delete a education group existing before %(limit_year)s") %
     {"limit_year": settings.YEAR_LIMIT_EDG_MODIFICATION}
 )
-@predicate_cache(cache_key_fn=lambda obj: getattr(obj, 'pk', None))
+@predicate_cache(
+    cache_key_fn=lambda obj: getattr(obj, 'pk', None),
+    batch_fn=_batch_is_older_or_equals_than_limit_settings_year
+)
 def is_education_group_year_older_or_equals_than_limit_settings_year(
         self,
         user: User,
@@ -112,7 +149,10 @@ def is_education_group_year_older_or_equals_than_limit_settings_year(
 
 @predicate(bind=True)
 @predicate_failed_msg(message=_("The user is not allowed to create/modify this type of education group"))
-@predicate_cache(cache_key_fn=lambda obj: getattr(obj, 'pk', None))
+@predicate_cache(
+    cache_key_fn=lambda obj: getattr(obj, 'pk', None),
+    batch_fn=_batch_is_education_group_type_authorized_according_to_user_scope
+)
 def is_education_group_type_authorized_according_to_user_scope(
         self,
         user: User,
@@ -129,7 +169,10 @@ def is_education_group_type_authorized_according_to_user_scope(
 
 @predicate(bind=True)
 @predicate_failed_msg(message=_("The user is not attached to the management entity"))
-@predicate_cache(cache_key_fn=lambda obj: getattr(obj, 'pk', None))
+@predicate_cache(
+    cache_key_fn=lambda obj: getattr(obj, 'pk', None),
+    batch_fn=_batch_is_user_attached_to_management_entity
+)
 def is_user_attached_to_management_entity(
         self,
         user: User,
@@ -172,7 +215,10 @@ def is_element_only_inside_standard_program(
 
 @predicate(bind=True)
 @predicate_failed_msg(message=_("This education group is not editable during this period."))
-@predicate_cache(cache_key_fn=lambda obj: getattr(obj, 'pk', None))
+@predicate_cache(
+    cache_key_fn=lambda obj: getattr(obj, 'pk', None),
+    batch_fn=_batch_is_calendar_open(EducationGroupPreparationCalendar)
+)
 def is_program_edition_period_open(self, user, group_year: 'GroupYear' = None):
     calendar = EducationGroupPreparationCalendar()
     if group_year:
@@ -188,7 +234,10 @@ def have_one_program_edition_calendar_open(self, user, group_year: 'GroupYear' =
 
 @predicate(bind=True)
 @predicate_failed_msg(message=_("This education group is not editable during this period."))
-@predicate_cache(cache_key_fn=lambda obj: getattr(obj, 'pk', None))
+@predicate_cache(
+    cache_key_fn=lambda obj: getattr(obj, 'pk', None),
+    batch_fn=_batch_is_calendar_open(EducationGroupExtendedDailyManagementCalendar)
+)
 def is_education_group_extended_daily_management_calendar_open(self, user, group_year: 'GroupYear' = None):
     calendar = EducationGroupExtendedDailyManagementCalendar()
     if group_year:
@@ -204,7 +253,10 @@ def have_one_education_group_extended_daily_management_calendar_open(self, user,
 
 @predicate(bind=True)
 @predicate_failed_msg(message=_("This education group is not editable during this period."))
-@predicate_cache(cache_key_fn=lambda obj: getattr(obj, 'pk', None))
+@predicate_cache(
+    cache_key_fn=lambda obj: getattr(obj, 'pk', None),
+    batch_fn=_batch_is_calendar_open(EducationGroupLimitedDailyManagementCalendar)
+)
 def is_education_group_limited_daily_management_calendar_open(self, user, group_year: 'GroupYear' = None):
     calendar = EducationGroupLimitedDailyManagementCalendar()
     if group_year:
@@ -1,4 +1,5 @@
 from backoffice.celery import app as celery_app
+from base.business.event_perms import verify_academic_event_indexes
 from education_group.calendar.dissertation_submission_calendar import DissertationSubmissionCalendar
 from education_group.calendar.education_group_extended_daily_management import \
     EducationGroupExtendedDailyManagementCalendar
@@ -17,4 +18,14 @@ def run() -> dict:
     EducationGroupSwitchCalendar.ensure_consistency_until_n_plus_6()
     DissertationSubmissionCalendar.ensure_consistency_until_n_plus_6()
     ExamEnrollmentSubmissionCalendar.ensure_consistency_until_n_plus_6()
+    changed_references = verify_academic_event_indexes([
+        EducationGroupPreparationCalendar.event_reference,
+        EducationGroupExtendedDailyManagementCalendar.event_reference,
+        EducationGroupLimitedDailyManagementCalendar.event_reference,
+        EducationGroupSwitchCalendar.event_reference,
+        DissertationSubmissionCalendar.event_reference,
+        ExamEnrollmentSubmissionCalendar.event_reference,
+    ])
+    if changed_references:
+        return {'Academic calendars changed without being saved': changed_references}
     return {}
@@ -1,4 +1,5 @@
 from django.conf import settings
+from django.db.models import prefetch_related_objects
 from django.utils.translation import gettext_lazy as _
 from rules import predicate
 
@@ -31,6 +32,48 @@ PROPOSAL_CONSOLIDATION_ELIGIBLE_STATES = (ProposalState.ACCEPTED.name, ProposalS
 DELETABLE_CONTAINER_TYPES = [LearningContainerYearType.DISSERTATION, LearningContainerYearType.INTERNSHIP]
 
 
+def _batch_is_user_attached_to_current_requirement_entity(self, user, learning_unit_years):
+    prefetch_related_objects(learning_unit_years, 'learning_container_year')
+    user_entity_ids = self.context['role_qs'].get_entities_ids()
+    return {
+        luy.pk: luy.learning_container_year is not None and
+        luy.learning_container_year.requirement_entity_id in user_entity_ids
+        for luy in learning_unit_years
+    }
+
+
+def _batch_is_older_or_equals_than_limit_settings_year(self, user, learning_unit_years):
+    prefetch_related_objects(learning_unit_years, 'academic_year')
+    return {luy.pk: luy.academic_year.year >= settings.YEAR_LIMIT_LUE_MODIFICATION for luy in learning_unit_years}
+
+
+def _batch_has_container_type_in(container_types_allowed):
+    def batch_fn(self, user, learning_unit_years):
+        prefetch_related_objects(learning_unit_years, 'learning_container_year')
+        return {
+            luy.pk: _has_container_type_in(luy.learning_container_year, container_types_allowed)
+            for luy in learning_unit_years
+        }
+    return batch_fn
+
+
+def _has_container_type_in(container, container_types_allowed):
+    return container and container.container_type in [type.name for type in container_types_allowed]
+
+
+def _batch_is_period_open(generate_event_perm):
+    def batch_fn(self, user, learning_unit_years):
+        role = next(iter(self.context['role_qs']), None)
+        if role is None:
+            return {luy.pk: None for luy in learning_unit_years}
+        event_perm = generate_event_perm(role.person, raise_exception=False)
+        open_academic_year_ids = set(
+            event_perm.get_open_academic_calendars_queryset().values_list('data_year_id', flat=True)
+        )
+        return {luy.pk: luy.academic_year_id in open_academic_year_ids for luy in learning_unit_years}
+    return batch_fn
+
+
 @predicate(bind=True)
 @predicate_failed_msg(message=_("You can only modify a learning unit when your are linked to its requirement entity"))
 @predicate_cache(cache_key_fn=lambda obj: getattr(obj, 'pk', None))
@@ -44,7 +87,10 @@ def is_user_attached_to_requirement_entity(self, user, learning_unit_year=None):
 
 @predicate(bind=True)
 @predicate_failed_msg(message=_("You can only modify a learning unit when your are linked to its requirement entity"))
-@predicate_cache(cache_key_fn=lambda obj: getattr(obj, 'pk', None))
+@predicate_cache(
+    cache_key_fn=lambda obj: getattr(obj, 'pk', None),
+    batch_fn=_batch_is_user_attached_to_current_requirement_entity
+)
 def is_user_attached_to_current_requirement_entity(self, user, learning_unit_year=None):
     if learning_unit_year:
         current_container_year = learning_unit_year.learning_container_year
@@ -65,7 +111,10 @@ def _is_attached_to_entity(requirement_entity, self):
         "You can't modify learning unit under year : %(year)d. Modifications should be made in EPC under year %(year)d"
     ) % {"year": settings.YEAR_LIMIT_LUE_MODIFICATION + 1},
 )
-@predicate_cache(cache_key_fn=lambda obj: getattr(obj, 'pk', None))
+@predicate_cache(
+    cache_key_fn=lambda obj: getattr(obj, 'pk', None),
+    batch_fn=_batch_is_older_or_equals_than_limit_settings_year
+)
 def is_learning_unit_year_older_or_equals_than_limit_settings_year(self, user, learning_unit_year=None):
     if learning_unit_year:
         return learning_unit_year.academic_year.year >= settings.YEAR_LIMIT_LUE_MODIFICATION
@@ -118,11 +167,13 @@ def is_learning_unit_container_type_deletable(self, user, learning_unit_year):
         " %(types)s"
     ) % {"types": [type.value for type in FACULTY_EDITABLE_CONTAINER_TYPES]}
 )
-@predicate_cache(cache_key_fn=lambda obj: getattr(obj, 'pk', None))
+@predicate_cache(
+    cache_key_fn=lambda obj: getattr(obj, 'pk', None),
+    batch_fn=_batch_has_container_type_in(FACULTY_EDITABLE_CONTAINER_TYPES)
+)
 def is_learning_unit_container_type_editable(self, user, learning_unit_year):
     if learning_unit_year:
-        container = learning_unit_year.learning_container_year
-        return container and container.container_type in [type.name for type in FACULTY_EDITABLE_CONTAINER_TYPES]
+        return _has_container_type_in(learning_unit_year.learning_container_year, FACULTY_EDITABLE_CONTAINER_TYPES)
     return None
 
 
@@ -133,17 +184,25 @@ def is_learning_unit_container_type_editable(self, user, learning_unit_year):
         " %(types)s"
     ) % {"types": [type.value for type in FACULTY_DATE_EDITABLE_CONTAINER_TYPES]}
 )
-@predicate_cache(cache_key_fn=lambda obj: getattr(obj, 'pk', None))
+@predicate_cache(
+    cache_key_fn=lambda obj: getattr(obj, 'pk', None),
+    batch_fn=_batch_has_container_type_in(FACULTY_DATE_EDITABLE_CONTAINER_TYPES)
+)
 def is_learning_unit_date_container_type_editable(self, user, learning_unit_year):
     if learning_unit_year:
-        container = learning_unit_year.learning_container_year
-        return container and container.container_type in [type.name for type in FACULTY_DATE_EDITABLE_CONTAINER_TYPES]
+        return _has_container_type_in(
+            learning_unit_year.learning_container_year,
+            FACULTY_DATE_EDITABLE_CONTAINER_TYPES
+        )
     return None
 
 
 @predicate(bind=True)
 @predicate_failed_msg(message=_("This learning unit is not editable this period."))
-@predicate_cache(cache_key_fn=lambda obj: getattr(obj, 'pk', None))
+@predicate_cache(
+    cache_key_fn=lambda obj: getattr(obj, 'pk', None),
+    batch_fn=_batch_is_period_open(event_perms.generate_event_perm_learning_unit_edition)
+)
 def is_learning_unit_edition_period_open(self, user, learning_unit_year):
     if learning_unit_year:
         for role in self.context['role_qs']:
@@ -155,7 +214,10 @@ def is_learning_unit_edition_period_open(self, user, learning_unit_year):
 
 @predicate(bind=True)
 @predicate_failed_msg(message=_("You are not allowed to put in proposal for ending date during this academic year"))
-@predicate_cache(cache_key_fn=lambda obj: getattr(obj, 'pk', None))
+@predicate_cache(
+    cache_key_fn=lambda obj: getattr(obj, 'pk', None),
+    batch_fn=_batch_is_period_open(event_perms.generate_event_perm_creation_end_date_proposal)
+)
 def is_proposal_date_edition_period_open(self, user, learning_unit_year):
     if learning_unit_year:
         for role in self.context['role_qs']:
@@ -167,7 +229,10 @@ def is_proposal_date_edition_period_open(self, user, learning_unit_year):
 
 @predicate(bind=True)
 @predicate_failed_msg(message=_("You are not allowed to put in proposal for modification during this academic year"))
-@predicate_cache(cache_key_fn=lambda obj: getattr(obj, 'pk', None))
+@predicate_cache(
+    cache_key_fn=lambda obj: getattr(obj, 'pk', None),
+    batch_fn=_batch_is_period_open(event_perms.generate_event_perm_modification_transformation_proposal)
+)
 def is_proposal_edition_period_open(self, user, learning_unit_year):
     if learning_unit_year:
         for role in self.context['role_qs']:
@@ -179,7 +244,10 @@ def is_proposal_edition_period_open(self, user, learning_unit_year):
 
 @predicate(bind=True)
 @predicate_failed_msg(message=_("You are not allowed to create proposal during this academic year"))
-@predicate_cache(cache_key_fn=lambda obj: getattr(obj, 'pk', None))
+@predicate_cache(
+    cache_key_fn=lambda obj: getattr(obj, 'pk', None),
+    batch_fn=_batch_is_period_open(event_perms.generate_event_perm_creation_end_date_proposal)
+)
 def is_proposal_creation_period_open(self, user, learning_unit_year):
     if learning_unit_year:
         for role in self.context['role_qs']:
@@ -1,4 +1,5 @@
 from backoffice.celery import app as celery_app
+from base.business.event_perms import verify_academic_event_indexes
 from learning_unit.calendar.learning_unit_enrollment_calendar import LearningUnitEnrollmentCalendar
 from learning_unit.calendar.learning_unit_force_majeur_summary_edition import \
     LearningUnitForceMajeurSummaryEditionCalendar
@@ -10,4 +11,11 @@ def run() -> dict:
     LearningUnitSummaryEditionCalendar.ensure_consistency_until_n_plus_6()
     LearningUnitForceMajeurSummaryEditionCalendar.ensure_consistency_until_n_plus_6()
     LearningUnitEnrollmentCalendar.ensure_consistency_until_n_plus_6()
+    changed_references = verify_academic_event_indexes([
+        LearningUnitSummaryEditionCalendar.event_reference,
+        LearningUnitForceMajeurSummaryEditionCalendar.event_reference,
+        LearningUnitEnrollmentCalendar.event_reference,
+    ])
+    if changed_references:
+        return {'Academic calendars changed without being saved': changed_references}
     return {}
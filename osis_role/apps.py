@@ -7,3 +7,4 @@ class OsisRoleConfig(AppConfig):
     def ready(self):
         from django.utils.module_loading import autodiscover_modules
         autodiscover_modules('roles')
+        from . import signals
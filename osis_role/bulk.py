@@ -0,0 +1,45 @@
+##############################################################################
+#
+#    OSIS stands for Open Student Information System. It's an application
+#    designed to manage the core business of higher education institutions,
+#    such as universities, faculties, institutes and professional schools.
+#    The core business involves the administration of students, teachers,
+#    courses, programs and so on.
+#
+#    Copyright (C) 2015-2020 Université catholique de Louvain (http://www.uclouvain.be)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    A copy of this license - GNU General Public License - is available
+#    at the root of the source code of this program.  If not,
+#    see http://www.gnu.org/licenses/.
+#
+##############################################################################
+from typing import Dict, Iterable
+
+from django.contrib.auth.models import User
+from django.db.models import Model
+
+from osis_role.cache import bulk_evaluation
+
+
+def has_perms_bulk(user: User, perms: Iterable[str], objects: Iterable[Model]) -> Dict[Model, Dict[str, bool]]:
+    """
+    Check each permission on each object.
+    The predicates declaring a batch_fn (see osis_role.cache.predicate_cache) load what they need for all the objects
+    at once instead of querying the database object by object.
+
+    :return: The result of each permission by object, e.g. {obj: {'base.can_edit_learningunit': True}}
+    """
+    perms = list(perms)
+    objects = list(objects)
+    with bulk_evaluation(user, objects):
+        return {obj: {perm: user.has_perm(perm, obj) for perm in perms} for obj in objects}
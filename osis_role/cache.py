@@ -1,18 +1,47 @@
+import collections
+import contextlib
+import threading
 from functools import wraps
 
 from django.conf import settings
+from django.core.cache import cache as shared_cache
 
+from base.utils.cache import VersionStamp
 
-def predicate_cache(cache_key_fn=None):
+SHARED_CACHE_VERSION = VersionStamp('osis_role_permission_cache_version')
+
+# Hits and misses of each permission cache layer in the current process
+stats = collections.Counter()
+
+_bulk_evaluation = threading.local()
+
+# Caches kept on the user object for the duration of a request, dropped when a role changes in the current process
+USER_CACHE_ATTRIBUTES = ('_cache_predicates', '_cache_decisions', '_group_cache', '_role_qs_cache')
+_user_caches_generation = 0
+_user_caches_generation_lock = threading.Lock()
+
+
+def predicate_cache(cache_key_fn=None, batch_fn=None):
+    """
+    :param batch_fn: Optional function (predicate, user_obj, objects) -> {pk: result} evaluating the predicate for all
+    the objects of a bulk evaluation at once (see osis_role.bulk.has_perms_bulk)
+    """
     def predicate_decorator(func):
         @wraps(func)
         def wrapped_function(self, user_obj, *args, **kwargs):
+            if batch_fn is not None and len(args) == 1 and not kwargs:
+                try:
+                    return get_batched_result(self, user_obj, batch_fn, args[0])
+                except CachePredicateResultNotFound:
+                    pass
             if not settings.PERMISSION_CACHE_ENABLED:
                 return func(self, user_obj, *args, **kwargs)
             predicate_cache_key = _build_cache_key(func, cache_key_fn, *args, **kwargs)
             try:
                 cached_result = get_cache_predicate_result(user_obj, predicate_cache_key)
+                stats['predicate_hit'] += 1
             except CachePredicateResultNotFound:
+                stats['predicate_miss'] += 1
                 cached_result = func(self, user_obj, *args, **kwargs)
                 set_cache_predicate_result(user_obj, predicate_cache_key, cached_result)
             return cached_result
@@ -37,5 +66,134 @@ def _build_cache_key(func, cache_key_fn, *args, **kwargs):
     return "_".join(filter(None, [func.__name__, args_types, str(cache_key_fn(*args, **kwargs))]))
 
 
+def is_decision_cache_enabled():
+    return settings.PERMISSION_CACHE_ENABLED and getattr(settings, 'PERMISSION_DECISION_CACHE_ENABLED', False)
+
+
+def get_cache_decision(user_obj, decision_key):
+    """
+    :return: The (result, error message) of a permission already checked for the user during the current request
+    """
+    if hasattr(user_obj, '_cache_decisions') and decision_key in user_obj._cache_decisions:
+        stats['decision_hit'] += 1
+        return user_obj._cache_decisions[decision_key]
+    stats['decision_miss'] += 1
+    raise CachePredicateResultNotFound
+
+
+def set_cache_decision(user_obj, decision_key, result, error=None):
+    if not hasattr(user_obj, '_cache_decisions'):
+        setattr(user_obj, '_cache_decisions', {})
+    user_obj._cache_decisions[decision_key] = (result, error)
+
+
+def build_decision_key(perm, *args):
+    """
+    :return: A key identifying the permission checked on an object or None if the object can not be identified
+    """
+    if not args:
+        return perm, None
+    obj = args[0]
+    if len(args) == 1 and getattr(obj, 'pk', None) is not None:
+        return perm, type(obj).__name__, obj.pk
+    return None
+
+
+def is_shared_cache_enabled():
+    return settings.PERMISSION_CACHE_ENABLED and getattr(settings, 'PERMISSION_SHARED_CACHE_ENABLED', False)
+
+
+def get_or_set_shared(key, compute_fn):
+    """
+    Return the value cached under the key for all the requests or compute it. The cached values are dropped as soon
+    as a role or an entity changes (see osis_role.signals).
+    """
+    if not is_shared_cache_enabled():
+        return compute_fn()
+    versioned_key = '{}_v{}'.format(key, SHARED_CACHE_VERSION.get())
+    value = shared_cache.get(versioned_key)
+    if value is None:
+        stats['shared_miss'] += 1
+        value = compute_fn()
+        shared_cache.set(versioned_key, value, timeout=getattr(settings, 'PERMISSION_SHARED_CACHE_TIMEOUT', 3600))
+    else:
+        stats['shared_hit'] += 1
+    return value
+
+
+def invalidate_shared_cache():
+    """ Drop the values cached for all the requests once the current transaction is committed """
+    if is_shared_cache_enabled():
+        SHARED_CACHE_VERSION.bump_on_commit()
+
+
+def invalidate_user_caches():
+    """ Drop the decisions, predicates results and roles kept on the user objects of the current process """
+    global _user_caches_generation
+    with _user_caches_generation_lock:
+        _user_caches_generation += 1
+
+
+def refresh_user_caches(user_obj):
+    """ Clear the caches kept on the user object if a role has changed since they were filled """
+    if getattr(user_obj, '_user_caches_generation', None) == _user_caches_generation:
+        return
+    for attribute in USER_CACHE_ATTRIBUTES:
+        user_obj.__dict__.pop(attribute, None)
+    user_obj._user_caches_generation = _user_caches_generation
+
+
+@contextlib.contextmanager
+def bulk_evaluation(user_obj, objects):
+    """
+    Within this context, the batched predicates are evaluated once for all the objects instead of object by object
+    """
+    previous_session = getattr(_bulk_evaluation, 'session', None)
+    _bulk_evaluation.session = BulkEvaluationSession(user_obj, objects)
+    try:
+        yield _bulk_evaluation.session
+    finally:
+        _bulk_evaluation.session = previous_session
+
+
+def get_batched_result(predicate_obj, user_obj, batch_fn, obj):
+    session = getattr(_bulk_evaluation, 'session', None)
+    if session is None:
+        raise CachePredicateResultNotFound
+    return session.get_result(predicate_obj, user_obj, batch_fn, obj)
+
+
+class BulkEvaluationSession:
+    def __init__(self, user_obj, objects):
+        self.user_obj = user_obj
+        self.objects_by_type = collections.defaultdict(dict)
+        for obj in objects:
+            if getattr(obj, 'pk', None) is not None:
+                self.objects_by_type[type(obj)][obj.pk] = obj
+        self.results = {}
+
+    def get_result(self, predicate_obj, user_obj, batch_fn, obj):
+        objects = self.objects_by_type.get(type(obj))
+        if user_obj is not self.user_obj or not objects or getattr(obj, 'pk', None) not in objects:
+            raise CachePredicateResultNotFound
+        # The role queryset in the predicate context differs for each role model of the user
+        role_qs = predicate_obj.context.get('role_qs')
+        batch_key = (batch_fn, type(obj), getattr(role_qs, 'model', None))
+        if batch_key in self.results:
+            stats['batch_hit'] += 1
+        else:
+            stats['batch_miss'] += 1
+            self.results[batch_key] = batch_fn(predicate_obj, user_obj, list(objects.values()))
+        return self.results[batch_key][obj.pk]
+
+
+def get_stats():
+    return dict(stats)
+
+
+def reset_stats():
+    stats.clear()
+
+
 class CachePredicateResultNotFound(Exception):
     pass
@@ -23,14 +23,17 @@
 #    see http://www.gnu.org/licenses/.
 #
 ##############################################################################
+import hashlib
+
 import rules
 from django.contrib.auth.models import Group, User
-from django.core.exceptions import ImproperlyConfigured
+from django.core.exceptions import EmptyResultSet, ImproperlyConfigured
 from django.db import models
 
 from base.models.entity import Entity
 from base.models.entity_version import EntityVersion
 from base.models.person import Person
+from osis_role import cache
 
 
 class RoleQuerySet(models.QuerySet):
@@ -67,12 +70,16 @@ class RoleModel(models.Model, metaclass=RoleModelMeta):
     def save(self, *args, **kwargs):
         super().save(*args, **kwargs)
         self._add_user_to_group()
+        cache.invalidate_shared_cache()
+        cache.invalidate_user_caches()
         return self
 
     def delete(self, *args, **kwargs):
         person = self.person
         super().delete(*args, kwargs)
         self._remove_user_from_group(person)
+        cache.invalidate_shared_cache()
+        cache.invalidate_user_caches()
 
     @classmethod
     def belong_to(cls, person):
@@ -97,6 +104,21 @@ class RoleModel(models.Model, metaclass=RoleModelMeta):
 
 class EntityRoleModelQueryset(models.QuerySet):
     def get_entities_ids(self):
+        """
+        The result is kept on the queryset (shared by the permission checks of a request) and in the shared
+        permission cache, keyed by the SQL of the queryset.
+        """
+        if not hasattr(self, '_entities_ids'):
+            try:
+                shared_key = 'osis_role_entities_{}'.format(
+                    hashlib.md5('{} {}'.format(self.model._meta.label, self.query).encode()).hexdigest()
+                )
+            except EmptyResultSet:
+                return set()
+            self._entities_ids = cache.get_or_set_shared(shared_key, self._compute_entities_ids)
+        return set(self._entities_ids)
+
+    def _compute_entities_ids(self):
         person_entities = self.values('entity_id', 'with_child')
         entities_with_child = {entity['entity_id'] for entity in person_entities if entity['with_child']}
         entity_version_tree = EntityVersion.objects.get_tree(entities_with_child)
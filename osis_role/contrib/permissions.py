@@ -23,11 +23,22 @@
 #    see http://www.gnu.org/licenses/.
 #
 ##############################################################################
+import threading
+
 import rules
+from django.conf import settings
 from django.contrib.auth.backends import ModelBackend
 from django.contrib.auth.models import Permission, Group
+from django.utils import translation
+
+from osis_role import role, errors, cache
 
-from osis_role import role, errors
+# Role queryset and permission name of the rule being tested, read by the first predicate of each rule
+_role_context = threading.local()
+_rule_sets = {}
+_rules_with_role_context = {}
+# Rule sets are shared by the threads of the process
+_rule_sets_lock = threading.Lock()
 
 
 class ObjectPermissionBackend(ModelBackend):
@@ -35,22 +46,36 @@ class ObjectPermissionBackend(ModelBackend):
         if not user_obj.is_active or user_obj.is_anonymous:
             return False
 
+        cache.refresh_user_caches(user_obj)
+        decision_key = cache.build_decision_key(perm, *args) \
+            if cache.is_decision_cache_enabled() and not kwargs else None
+        if decision_key:
+            try:
+                result, error = cache.get_cache_decision(user_obj, decision_key)
+                errors.set_permission_error(user_obj, perm, error)
+                return result
+            except cache.CachePredicateResultNotFound:
+                pass
+
         errors.clear_permission_error(user_obj, perm)
         results = set()
         for role_mdl in _get_relevant_roles(user_obj, perm):
-            rule_set = role_mdl.rule_set()
-            role_qs = role_mdl.objects.filter(person=getattr(user_obj, 'person', None))
-            _add_role_queryset_to_perms_context(rule_set, perm, role_qs)
-            results.add(rule_set.test_rule(perm, user_obj, *args, **kwargs))
-        return any(results) or super().has_perm(user_obj, perm, obj=kwargs.get('obj'))
+            role_qs = _get_role_queryset(user_obj, role_mdl)
+            results.add(_test_rule_with_role_context(role_mdl, perm, role_qs, user_obj, *args, **kwargs))
+        result = any(results) or super().has_perm(user_obj, perm, obj=kwargs.get('obj'))
+
+        if decision_key:
+            cache.set_cache_decision(user_obj, decision_key, result, errors.get_permission_error(user_obj, perm))
+        return result
 
     def has_module_perms(self, user_obj, app_label, *args, **kwargs):
         if not user_obj.is_active or user_obj.is_anonymous:
             return False
+        cache.refresh_user_caches(user_obj)
         roles_assigned = _get_roles_assigned_to_user(user_obj)
         all_perms = []
         for r in roles_assigned:
-            all_perms += [key for key in r.rule_set().keys() if app_label in key]
+            all_perms += [key for key in _get_rule_set(r).keys() if app_label in key]
         return any(app_label in perm for perm in all_perms) or super().has_module_perms(user_obj, app_label)
 
     def _get_group_permissions(self, user_obj, obj=None):
@@ -65,27 +90,67 @@ class ObjectPermissionBackend(ModelBackend):
 
 def _get_relevant_roles(user_obj, perm):
     roles_assigned = _get_roles_assigned_to_user(user_obj)
-    return {r for r in roles_assigned if r.rule_set().rule_exists(perm)}
+    return {r for r in roles_assigned if _get_rule_set(r).rule_exists(perm)}
 
 
 def _get_roles_assigned_to_user(user_obj):
     if not hasattr(user_obj, '_group_cache'):
-        user_obj._group_cache = set(user_obj.groups.values_list('name', flat=True))
+        user_obj._group_cache = cache.get_or_set_shared(
+            'osis_role_groups_{}'.format(user_obj.pk),
+            lambda: set(user_obj.groups.values_list('name', flat=True))
+        )
     return {r for r in role.role_manager.roles if r.group_name in user_obj._group_cache}
 
 
-def _add_role_queryset_to_perms_context(rule_set, perm, qs):
+def _get_role_queryset(user_obj, role_mdl):
     """
-    :param rule_set: Set of rules for a specific role
-    :param perm: Django permission name
-    :param qs: Queryset which represent the role found on database
-    :return: rule_set with cached predicate
+    :return: The roles of the user, as a queryset shared by all the permissions checked during the request
+    """
+    if not settings.PERMISSION_CACHE_ENABLED:
+        return role_mdl.objects.filter(person=getattr(user_obj, 'person', None))
+    if not hasattr(user_obj, '_role_qs_cache'):
+        user_obj._role_qs_cache = {}
+    if role_mdl not in user_obj._role_qs_cache:
+        user_obj._role_qs_cache[role_mdl] = role_mdl.objects.filter(person=getattr(user_obj, 'person', None))
+    return user_obj._role_qs_cache[role_mdl]
+
+
+def _get_rule_set(role_mdl):
+    """
+    Rule sets are static, they are built once per role and language (predicates messages are translated on build)
     """
-    if perm in rule_set:
-        @rules.predicate(name='cache_role_qs')
-        def cache_role_qs_fn(*args, **kwargs):
-            cache_role_qs_fn.context['perm_name'] = perm
-            cache_role_qs_fn.context['role_qs'] = qs
-            return True
-        rule_set[perm] = cache_role_qs_fn & rule_set[perm]
+    key = (role_mdl, translation.get_language())
+    rule_set = _rule_sets.get(key)
+    if rule_set is None:
+        with _rule_sets_lock:
+            rule_set = _rule_sets.get(key)
+            if rule_set is None:
+                rule_set = _rule_sets[key] = role_mdl.rule_set()
     return rule_set
+
+
+@rules.predicate(name='cache_role_qs')
+def _add_role_queryset_to_perms_context(*args, **kwargs):
+    _add_role_queryset_to_perms_context.context['perm_name'] = _role_context.perm
+    _add_role_queryset_to_perms_context.context['role_qs'] = _role_context.role_qs
+    return True
+
+
+def _test_rule_with_role_context(role_mdl, perm, role_qs, *args, **kwargs):
+    """
+    :param role_mdl: Role model whose rule is tested
+    :param perm: Django permission name
+    :param role_qs: Queryset which represent the role found on database, given to the predicates through their context
+    :return: The result of the rule of the permission
+    """
+    key = (role_mdl, translation.get_language(), perm)
+    rule = _rules_with_role_context.get(key)
+    if rule is None:
+        rule_set = _get_rule_set(role_mdl)
+        if perm not in rule_set:
+            return False
+        with _rule_sets_lock:
+            rule = _rules_with_role_context.setdefault(key, _add_role_queryset_to_perms_context & rule_set[perm])
+    _role_context.perm = perm
+    _role_context.role_qs = role_qs
+    return rule.test(*args, **kwargs)
@@ -28,12 +28,13 @@ import rules
 from django.contrib.auth import models
 from django.contrib.auth.models import Group, Permission
 from django.db.models import QuerySet
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from rules import RuleSet
 
 from base.tests.factories.person import PersonFactory, PersonWithPermissionsFactory
 from base.tests.factories.user import UserFactory
-from osis_role.contrib.permissions import ObjectPermissionBackend, _add_role_queryset_to_perms_context
+from osis_role import cache
+from osis_role.contrib.permissions import ObjectPermissionBackend, _test_rule_with_role_context
 
 
 class TestObjectPermissionBackend(TestCase):
@@ -81,6 +82,27 @@ class TestObjectPermissionBackend(TestCase):
 
         self.assertFalse(self.auth_class.has_perm(self.person.user, 'perm_denied'))
 
+    @override_settings(PERMISSION_CACHE_ENABLED=True, PERMISSION_DECISION_CACHE_ENABLED=True)
+    def test_decision_is_memoized_by_perm_and_object(self):
+        calls = []
+
+        @rules.predicate
+        def predicate(user, obj):
+            calls.append(obj)
+            return True
+
+        self.mock_role_model.rule_set.return_value = rules.RuleSet({'perm_on_obj': predicate})
+        self.person.user.groups.add(self.group)
+        obj = PersonFactory.build(pk=1)
+        cache.reset_stats()
+
+        self.assertTrue(self.auth_class.has_perm(self.person.user, 'perm_on_obj', obj))
+        self.assertTrue(self.auth_class.has_perm(self.person.user, 'perm_on_obj', obj))
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(cache.get_stats()['decision_hit'], 1)
+        self.assertEqual(cache.get_stats()['decision_miss'], 1)
+
     @mock.patch('django.db.models.QuerySet.exists', return_value=False)
     def test_ensure_that_group_not_managed_by_role_manager_fallback_to_default_behaviour(self, mock_queryset_exists):
         group = Group.objects.create(name='group_not_managed_by_role')
@@ -100,12 +122,11 @@ class TestAddRoleQuerysetToRuleSet(TestCase):
                 raise Exception
             return True
 
-        qs = QuerySet()
         rule_set = RuleSet()
         rule_set.add_rule('perm_allowed', ensure_role_qs_exist_fn)
+        role_mdl = mock.Mock(rule_set=mock.Mock(return_value=rule_set))
 
-        _add_role_queryset_to_perms_context(rule_set, 'perm_allowed', qs)
-        self.assertTrue(rule_set.test_rule('perm_allowed', UserFactory()))
+        self.assertTrue(_test_rule_with_role_context(role_mdl, 'perm_allowed', QuerySet(), UserFactory()))
 
     def test_ensure_perm_name_is_added_to_perms_context(self):
         @rules.predicate(bind=True, name='ensure_role_qs_exist')
@@ -116,8 +137,17 @@ class TestAddRoleQuerysetToRuleSet(TestCase):
 
         rule_set = RuleSet()
         rule_set.add_rule('perm_allowed', ensure_perm_name_exist_fn)
-        _add_role_queryset_to_perms_context(rule_set, 'perm_allowed', QuerySet())
-        self.assertTrue(rule_set.test_rule('perm_allowed', UserFactory()))
+        role_mdl = mock.Mock(rule_set=mock.Mock(return_value=rule_set))
+
+        self.assertTrue(_test_rule_with_role_context(role_mdl, 'perm_allowed', QuerySet(), UserFactory()))
+
+    def test_ensure_rule_set_is_built_once_by_role(self):
+        rule_set = RuleSet({'perm_allowed': rules.always_allow})
+        role_mdl = mock.Mock(rule_set=mock.Mock(return_value=rule_set))
+
+        for _ in range(3):
+            self.assertTrue(_test_rule_with_role_context(role_mdl, 'perm_allowed', QuerySet(), UserFactory.build()))
+        self.assertEqual(role_mdl.rule_set.call_count, 1)
 
 
 class TestHasModulePerms(TestCase):
@@ -0,0 +1,213 @@
+##############################################################################
+#
+#    OSIS stands for Open Student Information System. It's an application
+#    designed to manage the core business of higher education institutions,
+#    such as universities, faculties, institutes and professional schools.
+#    The core business involves the administration of students, teachers,
+#    courses, programs and so on.
+#
+#    Copyright (C) 2015-2020 Université catholique de Louvain (http://www.uclouvain.be)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    A copy of this license - GNU General Public License - is available
+#    at the root of the source code of this program.  If not,
+#    see http://www.gnu.org/licenses/.
+#
+##############################################################################
+import mock
+from django.conf import settings
+from django.test import SimpleTestCase, TestCase, override_settings
+from rules import predicate
+
+from base.models.enums import academic_calendar_type
+from base.models.enums.learning_container_year_types import LearningContainerYearType
+from base.tests.factories.academic_calendar import OpenAcademicCalendarFactory
+from base.tests.factories.academic_year import AcademicYearFactory
+from base.tests.factories.learning_unit_year import LearningUnitYearFactory
+from base.tests.factories.person import FacultyManagerForUEFactory, PersonFactory
+from base.tests.factories.user import UserFactory
+from education_group.auth import predicates as education_group_predicates
+from education_group.auth.roles.faculty_manager import FacultyManager as EducationGroupFacultyManager
+from education_group.tests.factories.auth.faculty_manager import \
+    FacultyManagerFactory as EducationGroupFacultyManagerFactory
+from education_group.tests.factories.group_year import GroupYearFactory
+from learning_unit.auth import predicates as learning_unit_predicates
+from learning_unit.auth.roles.faculty_manager import FacultyManager as LearningUnitFacultyManager
+from learning_unit.tests.factories.faculty_manager import FacultyManagerFactory as LearningUnitFacultyManagerFactory
+from osis_role import cache
+from osis_role.bulk import has_perms_bulk
+from osis_role.cache import predicate_cache
+
+batch_calls = []
+
+
+def _batch_is_even_year(self, user_obj, academic_years):
+    batch_calls.append([academic_year.pk for academic_year in academic_years])
+    return {academic_year.pk: academic_year.year % 2 == 0 for academic_year in academic_years}
+
+
+@predicate(bind=True)
+@predicate_cache(cache_key_fn=lambda obj: getattr(obj, 'pk', None), batch_fn=_batch_is_even_year)
+def is_even_year(self, user_obj, academic_year=None):
+    return academic_year.year % 2 == 0
+
+
+@override_settings(PERMISSION_CACHE_ENABLED=False)
+class TestBulkEvaluation(SimpleTestCase):
+    def setUp(self):
+        batch_calls.clear()
+        self.user = UserFactory.build()
+        self.academic_years = [AcademicYearFactory.build(pk=pk, year=2018 + pk) for pk in range(1, 5)]
+
+    def test_should_evaluate_batched_predicate_once_for_all_objects(self):
+        with cache.bulk_evaluation(self.user, self.academic_years):
+            results = [is_even_year.test(self.user, academic_year) for academic_year in self.academic_years]
+
+        self.assertListEqual(results, [False, True, False, True])
+        self.assertListEqual(batch_calls, [[1, 2, 3, 4]])
+
+    def test_should_evaluate_object_by_object_outside_bulk_evaluation(self):
+        results = [is_even_year.test(self.user, academic_year) for academic_year in self.academic_years]
+
+        self.assertListEqual(results, [False, True, False, True])
+        self.assertListEqual(batch_calls, [])
+
+    def test_should_evaluate_object_by_object_when_object_not_part_of_bulk_evaluation(self):
+        other_academic_year = AcademicYearFactory.build(pk=10, year=2030)
+        with cache.bulk_evaluation(self.user, self.academic_years):
+            self.assertTrue(is_even_year.test(self.user, other_academic_year))
+        self.assertListEqual(batch_calls, [])
+
+
+class TestHasPermsBulk(SimpleTestCase):
+    def setUp(self):
+        batch_calls.clear()
+        self.user = UserFactory.build()
+        self.user.has_perm = lambda perm, obj: is_even_year.test(self.user, obj)
+        self.academic_years = [AcademicYearFactory.build(pk=pk, year=2018 + pk) for pk in range(1, 4)]
+
+    def test_should_return_result_of_each_perm_by_object(self):
+        results = has_perms_bulk(self.user, ['base.perm_a', 'base.perm_b'], self.academic_years)
+
+        self.assertDictEqual(results, {
+            self.academic_years[0]: {'base.perm_a': False, 'base.perm_b': False},
+            self.academic_years[1]: {'base.perm_a': True, 'base.perm_b': True},
+            self.academic_years[2]: {'base.perm_a': False, 'base.perm_b': False},
+        })
+        self.assertListEqual(batch_calls, [[1, 2, 3]])
+
+
+class BatchedPredicatesTestMixin:
+    """ The batched predicates must give the same results as the predicates evaluated object by object """
+    role_model = None
+
+    def setUp(self):
+        self.user = self.person.user
+        self.predicate_context_mock = mock.patch(
+            "rules.Predicate.context",
+            new_callable=mock.PropertyMock,
+            return_value={
+                'role_qs': self.role_model.objects.filter(person=self.person),
+                'perm_name': 'dummy-perm'
+            }
+        )
+        self.predicate_context_mock.start()
+        self.addCleanup(self.predicate_context_mock.stop)
+
+    def assertBatchedResultsEqual(self, predicates, objects):
+        for predicate_to_check in predicates:
+            with self.subTest(predicate=predicate_to_check.name):
+                single_results = [predicate_to_check(self.user, obj) for obj in objects]
+                batch_misses = cache.stats['batch_miss']
+                with cache.bulk_evaluation(self.user, objects):
+                    batched_results = [predicate_to_check(self.user, obj) for obj in objects]
+
+                self.assertListEqual(batched_results, single_results)
+                self.assertEqual(cache.stats['batch_miss'], batch_misses + 1)
+
+
+@override_settings(PERMISSION_CACHE_ENABLED=False)
+class TestLearningUnitBatchedPredicates(BatchedPredicatesTestMixin, TestCase):
+    role_model = LearningUnitFacultyManager
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.person = FacultyManagerForUEFactory()
+        role = LearningUnitFacultyManagerFactory(person=cls.person)
+        cls.learning_unit_years = [
+            LearningUnitYearFactory(
+                academic_year__year=settings.YEAR_LIMIT_LUE_MODIFICATION,
+                learning_container_year__requirement_entity=role.entity,
+                learning_container_year__container_type=LearningContainerYearType.COURSE.name,
+            ),
+            LearningUnitYearFactory(
+                academic_year__year=settings.YEAR_LIMIT_LUE_MODIFICATION - 1,
+                learning_container_year__container_type=LearningContainerYearType.OTHER_COLLECTIVE.name,
+            ),
+            LearningUnitYearFactory(
+                academic_year__year=settings.YEAR_LIMIT_LUE_MODIFICATION + 1,
+                learning_container_year=None,
+            ),
+        ]
+        OpenAcademicCalendarFactory(
+            reference=academic_calendar_type.LEARNING_UNIT_EDITION_FACULTY_MANAGERS,
+            data_year=cls.learning_unit_years[0].academic_year,
+        )
+
+    def test_should_give_same_results_as_single_object_predicates(self):
+        self.assertBatchedResultsEqual(
+            [
+                learning_unit_predicates.is_user_attached_to_current_requirement_entity,
+                learning_unit_predicates.is_learning_unit_year_older_or_equals_than_limit_settings_year,
+                learning_unit_predicates.is_learning_unit_container_type_editable,
+                learning_unit_predicates.is_learning_unit_date_container_type_editable,
+                learning_unit_predicates.is_learning_unit_edition_period_open,
+                learning_unit_predicates.is_proposal_date_edition_period_open,
+                learning_unit_predicates.is_proposal_edition_period_open,
+                learning_unit_predicates.is_proposal_creation_period_open,
+            ],
+            self.learning_unit_years
+        )
+
+
+@override_settings(PERMISSION_CACHE_ENABLED=False)
+class TestEducationGroupBatchedPredicates(BatchedPredicatesTestMixin, TestCase):
+    role_model = EducationGroupFacultyManager
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.person = PersonFactory()
+        role = EducationGroupFacultyManagerFactory(person=cls.person)
+        cls.group_years = [
+            GroupYearFactory(academic_year__year=settings.YEAR_LIMIT_EDG_MODIFICATION, management_entity=role.entity),
+            GroupYearFactory(academic_year__year=settings.YEAR_LIMIT_EDG_MODIFICATION - 1),
+            GroupYearFactory(academic_year__year=settings.YEAR_LIMIT_EDG_MODIFICATION + 1),
+        ]
+        for reference in (
+                academic_calendar_type.EDUCATION_GROUP_EDITION,
+                academic_calendar_type.EDUCATION_GROUP_EXTENDED_DAILY_MANAGEMENT,
+                academic_calendar_type.EDUCATION_GROUP_LIMITED_DAILY_MANAGEMENT,
+        ):
+            OpenAcademicCalendarFactory(reference=reference, data_year=cls.group_years[0].academic_year)
+
+    def test_should_give_same_results_as_single_object_predicates(self):
+        self.assertBatchedResultsEqual(
+            [
+                education_group_predicates.is_education_group_year_older_or_equals_than_limit_settings_year,
+                education_group_predicates.is_education_group_type_authorized_according_to_user_scope,
+                education_group_predicates.is_user_attached_to_management_entity,
+                education_group_predicates.is_program_edition_period_open,
+                education_group_predicates.is_education_group_extended_daily_management_calendar_open,
+                education_group_predicates.is_education_group_limited_daily_management_calendar_open,
+            ],
+            self.group_years
+        )
@@ -64,3 +64,24 @@ class TestPredicateCacheDecorator(SimpleTestCase):
         self.assertTrue(
             cache.get_cache_predicate_result(self.user, 'predicate_name_dummy_type_predicate_cache_key')
         )
+
+
+class TestRefreshUserCaches(SimpleTestCase):
+    def setUp(self):
+        self.user = UserFactory.build()
+        cache.refresh_user_caches(self.user)
+        cache.set_cache_decision(self.user, ('perm', None), True)
+        cache.set_cache_predicate_result(self.user, 'predicate_cache_key', True)
+
+    def test_should_keep_user_caches_when_no_role_changed(self):
+        cache.refresh_user_caches(self.user)
+
+        self.assertTrue(hasattr(self.user, '_cache_decisions'))
+        self.assertTrue(hasattr(self.user, '_cache_predicates'))
+
+    def test_should_clear_user_caches_when_a_role_changed(self):
+        cache.invalidate_user_caches()
+        cache.refresh_user_caches(self.user)
+
+        self.assertFalse(hasattr(self.user, '_cache_decisions'))
+        self.assertFalse(hasattr(self.user, '_cache_predicates'))
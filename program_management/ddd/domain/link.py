@@ -63,7 +63,7 @@ class Link(interface.Entity):
 
     entity_id = attr.ib(type=LinkIdentity)
 
-    _has_changed = False
+    _has_changed = attr.ib(type=bool, default=False, init=False, repr=False)
 
     @entity_id.default
     def _link_identity(self) -> LinkIdentity:
@@ -131,9 +131,9 @@ class LinkWithChildLeaf(Link):
     relative_credits = attr.ib(type=int, default=attr.Factory(lambda self: self.child.credits, takes_self=True))
 
 
+@attr.s(slots=True, str=False, hash=False, eq=False)
 class LinkWithChildBranch(Link):
-    def __init__(self, *args, **kwargs):
-        super(LinkWithChildBranch, self).__init__(*args, **kwargs)
+    pass
 
 
 class LinkFactory:
@@ -151,16 +151,34 @@ class NodeFactory:
         return child
 
     def deepcopy_node_without_copy_children_recursively(self, original_node: 'Node') -> 'Node':
-        original_children = original_node.children
-        original_node.children = []  # To avoid recursive deep copy of all children behind
+        original_children = original_node._children
+        original_stamps = original_node._modification_stamps
+        # To avoid recursive deep copy of all children behind (and of the trees indexing the node)
+        original_node._children = []
+        original_node._modification_stamps = ()
         copied_node = copy.deepcopy(original_node)
-        original_node.children = original_children
+        original_node._children = original_children
+        original_node._modification_stamps = original_stamps
         return copied_node
 
 
 factory = NodeFactory()
 
 
+class ModificationStamp:
+    """
+    Counter of the modifications of the children of the nodes of a tree. Allows a ProgramTree to know if its indexes
+    are outdated : the nodes indexed by a tree hold its stamp and increment it each time their children change.
+    """
+    __slots__ = ('value',)
+
+    def __init__(self):
+        self.value = 0
+
+    def increment(self) -> None:
+        self.value += 1
+
+
 @attr.s(frozen=True, slots=True)
 class NodeIdentity(interface.EntityIdentity):
     code = attr.ib(type=str, converter=to_upper_case_converter)
@@ -187,8 +205,9 @@ class Node(interface.Entity):
     _children = children
     _deleted_children = attr.ib(type=List, factory=list)
 
-    _academic_year = None
-    _has_changed = False
+    _academic_year = attr.ib(type=AcademicYear, default=None, init=False, repr=False)
+    _has_changed = attr.ib(type=bool, default=False, init=False, repr=False)
+    _modification_stamps = attr.ib(type=tuple, default=(), init=False, repr=False)
 
     @entity_id.default
     def _entity_id(self) -> NodeIdentity:
@@ -215,6 +234,15 @@ class Node(interface.Entity):
     @children.setter
     def children(self, new_children: List['Link']):
         self._children = new_children
+        self._notify_children_modification()
+
+    def register_modification_stamp(self, stamp: ModificationStamp) -> None:
+        if not any(registered is stamp for registered in self._modification_stamps):
+            self._modification_stamps += (stamp,)
+
+    def _notify_children_modification(self) -> None:
+        for stamp in self._modification_stamps:
+            stamp.increment()
 
     def is_learning_unit(self):
         return self.type == NodeType.LEARNING_UNIT
@@ -430,14 +458,19 @@ class Node(interface.Entity):
     def add_child(self, node: 'Node', **link_attrs) -> 'Link':
         max_order = max((child.order for child in self.children), default=-1)
         child = link_factory.get_link(parent=self, child=node, order=max_order + 1, **link_attrs)
-        self._children.append(child)
         child._has_changed = True
+        self.append_link(child)
         return child
 
+    def append_link(self, link: 'Link') -> None:
+        self._children.append(link)
+        self._notify_children_modification()
+
     def detach_child(self, node_to_detach: 'Node') -> 'Link':
         link_to_detach = next(link for link in self.children if link.child == node_to_detach)
         self._deleted_children.append(link_to_detach)
         self.children.remove(link_to_detach)
+        self._notify_children_modification()
         return link_to_detach
 
     def get_link(self, link_id: int) -> 'Link':
@@ -569,6 +602,7 @@ def _get_full_title(common_title, specific_title):
     )
 
 
+@attr.s(slots=True, hash=False, eq=False, init=False)
 class NodeLearningClassYear(Node):
 
     type = NodeType.LEARNING_CLASS
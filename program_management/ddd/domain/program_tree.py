@@ -23,11 +23,10 @@
 #    see http://www.gnu.org/licenses/.
 #
 ##############################################################################
-import collections
 import copy
 import itertools
 from collections import Counter
-from typing import List, Set, Optional, Dict
+from typing import List, Set, Optional, Dict, Iterator, Tuple
 
 import attr
 
@@ -35,7 +34,6 @@ from base.ddd.utils.converters import to_upper_case_converter
 from base.models.authorized_relationship import AuthorizedRelationshipList
 from base.models.enums.education_group_types import EducationGroupTypesEnum, TrainingType, GroupType
 from base.models.enums.link_type import LinkTypes
-from base.utils.cache import cached_result
 from education_group.ddd.business_types import *
 from osis_common.ddd import interface
 from osis_common.decorators.deprecated import deprecated
@@ -44,7 +42,8 @@ from program_management.ddd.business_types import *
 from program_management.ddd.command import DO_NOT_OVERRIDE
 from program_management.ddd.domain import exception
 from program_management.ddd.domain.link import factory as link_factory
-from program_management.ddd.domain.node import factory as node_factory, NodeIdentity, Node, NodeNotFoundException
+from program_management.ddd.domain.node import factory as node_factory, NodeIdentity, Node, NodeNotFoundException, \
+    ModificationStamp
 from program_management.ddd.repositories import load_authorized_relationship
 from program_management.ddd.validators import validators_by_business_action
 from program_management.ddd.validators._path_validator import PathValidator
@@ -108,7 +107,7 @@ class ProgramTreeBuilder:
                 override_start_year_to=override_start_year_to
             )
             copied_link = link_factory.create_link(new_parent, new_child)
-            new_parent.children.append(copied_link)
+            new_parent.append_link(copied_link)
         return new_parent
 
     def copy_to_next_year(self, copy_from: 'ProgramTree', repository: 'ProgramTreeRepository') -> 'ProgramTree':
@@ -144,7 +143,7 @@ class ProgramTreeBuilder:
             child_node = copy_from_link.child
             child_next_year = self._copy_node_and_children_to_next_year(child_node)
             link_next_year = link_factory.copy_to_next_year(copy_from_link, parent_next_year, child_next_year)
-            parent_next_year.children.append(link_next_year)
+            parent_next_year.append_link(link_next_year)
         return parent_next_year
 
     def build_from_orphan_group_as_root(
@@ -178,6 +177,9 @@ class ProgramTree(interface.RootEntity):
     entity_id = attr.ib(type=ProgramTreeIdentity)  # FIXME :: pass entity_id as mandatory param !
     prerequisites = attr.ib(type='Prerequisites')
 
+    _index = attr.ib(type='ProgramTreeIndex', default=None, init=False, repr=False)
+    _modification_stamp = attr.ib(type=ModificationStamp, factory=ModificationStamp, init=False, repr=False)
+
     @prerequisites.default
     def _default_prerequisite(self) -> 'Prerequisites':
         from program_management.ddd.domain.prerequisite import NullPrerequisites
@@ -198,6 +200,11 @@ class ProgramTree(interface.RootEntity):
     def _entity_id(self) -> 'ProgramTreeIdentity':
         return ProgramTreeIdentity(self.root_node.code, self.root_node.year)
 
+    def _get_index(self) -> 'ProgramTreeIndex':
+        if self._index is None or not self._index.is_up_to_date():
+            self._index = ProgramTreeIndex(self.root_node, self._modification_stamp)
+        return self._index
+
     def is_master_2m(self):
         return self.root_node.is_master_2m()
 
@@ -224,12 +231,12 @@ class ProgramTree(interface.RootEntity):
             return False
 
     def get_parents_node_with_respect_to_reference(self, parent_node: 'Node') -> List['Node']:
-        links = _links_from_root(self.root_node)
+        links_by_child = self._get_index().links_by_child
 
         def _get_parents(child_node: 'Node') -> List['Node']:
             result = []
-            reference_links = [link_obj for link_obj in links
-                               if link_obj.child == child_node and link_obj.is_reference()]
+            reference_links = [link_obj for link_obj in links_by_child.get(child_node, [])
+                               if link_obj.is_reference()]
             for link_obj in reference_links:
                 reference_parents = _get_parents(link_obj.parent)
                 if reference_parents:
@@ -238,8 +245,8 @@ class ProgramTree(interface.RootEntity):
                     result.append(link_obj.parent)
             return result
 
-        non_reference_links = [link_obj for link_obj in links
-                               if link_obj.child == parent_node and not link_obj.is_reference()]
+        non_reference_links = [link_obj for link_obj in links_by_child.get(parent_node, [])
+                               if not link_obj.is_reference()]
         if non_reference_links or self.root_node == parent_node:
             return [parent_node] + _get_parents(parent_node)
         return _get_parents(parent_node)
@@ -267,7 +274,7 @@ class ProgramTree(interface.RootEntity):
         return result
 
     def search_links_using_node(self, child_node: 'Node') -> List['Link']:
-        return [link_obj for link_obj in self.get_all_links() if link_obj.child == child_node]
+        return list(self._get_index().links_by_child.get(child_node) or [])
 
     def get_first_link_occurence_using_node(self, child_node: 'Node') -> 'Link':
         links = self.search_links_using_node(child_node)
@@ -280,21 +287,16 @@ class ProgramTree(interface.RootEntity):
         :param path: str
         :return: Node
         """
-
-        def _get_node(root_node: 'Node', path: 'Path') -> 'Node':
-            direct_child_id, separator, remaining_path = path.partition(PATH_SEPARATOR)
-            direct_child = next(child for child in root_node.children_as_nodes if str(child.pk) == direct_child_id)
-
-            if not remaining_path:
-                return direct_child
-            return _get_node(direct_child, remaining_path)
-
-        try:
-            if path == str(self.root_node.pk):
-                return self.root_node
-            return _get_node(self.root_node, path.split(PATH_SEPARATOR, maxsplit=1)[1])
-        except (StopIteration, IndexError):
+        index = self._get_index()
+        node = index.node_by_path.get(path)
+        if node is None:
+            # The first element of the path is not taken into account : it is always the root of the tree
+            __, separator, path_from_root = path.partition(PATH_SEPARATOR)
+            if separator:
+                node = index.node_by_path.get(PATH_SEPARATOR.join([index.root_path, path_from_root]))
+        if node is None:
             raise NodeNotFoundException
+        return node
 
     @deprecated  # Please use :py:meth:`~program_management.ddd.domain.program_tree.ProgramTree.get_node` instead !
     def get_node_by_id_and_type(self, node_id: int, node_type: NodeType) -> 'Node':
@@ -305,13 +307,7 @@ class ProgramTree(interface.RootEntity):
         :param node_type: NodeType
         :return: Node
         """
-        return next(
-            (
-                node for node in self.get_all_nodes()
-                if node.node_id == node_id and node.type == node_type
-            ),
-            None
-        )
+        return self._get_index().node_by_id_and_type.get((node_id, node_type))
 
     def get_node_smallest_ordered_path(self, node: 'Node') -> Optional[Path]:
         """
@@ -338,20 +334,14 @@ class ProgramTree(interface.RootEntity):
         :param year: int
         :return: Node
         """
-        return next(
-            (
-                node for node in self.get_all_nodes()
-                if node.code == code and node.academic_year.year == year
-            ),
-            None
-        )
+        return self._get_index().node_by_code_and_year.get((code, year))
 
     def get_all_nodes(self, types: Set[EducationGroupTypesEnum] = None) -> Set['Node']:
         """
         Return a flat set of all nodes present in the tree
         :return: list of Node
         """
-        all_nodes = set([self.root_node] + _nodes_from_root(self.root_node))
+        all_nodes = {self.root_node} | set(self._get_index().paths_by_node)
         if types:
             return set(n for n in all_nodes if n.node_type in types)
         return all_nodes
@@ -458,7 +448,8 @@ class ProgramTree(interface.RootEntity):
         )
         validator.validate()
 
-        return node_to_paste_to.add_child(
+        index = self._get_index()
+        link_created = node_to_paste_to.add_child(
             node_to_paste,
             access_condition=paste_command.access_condition,
             is_mandatory=paste_command.is_mandatory,
@@ -468,6 +459,8 @@ class ProgramTree(interface.RootEntity):
             comment_english=paste_command.comment_english,
             relative_credits=paste_command.relative_credits
         )
+        index.add_link(link_created)
+        return link_created
 
     def set_prerequisite(
             self,
@@ -512,7 +505,10 @@ class ProgramTree(interface.RootEntity):
             prerequisite_repository
         ).validate()
 
-        return parent.detach_child(node_to_detach)
+        index = self._get_index()
+        link_detached = parent.detach_child(node_to_detach)
+        index.remove_link(link_detached)
+        return link_detached
 
     def __copy__(self) -> 'ProgramTree':
         return ProgramTree(
@@ -597,15 +593,8 @@ class ProgramTree(interface.RootEntity):
         ).validate()
         return link_updated
 
-    @cached_result
-    def _paths_by_node(self) -> Dict['Node', List['Path']]:
-        paths_by_node = collections.defaultdict(list)
-        for path, child_node in self.root_node.descendents:
-            paths_by_node[child_node].append(path)
-        return paths_by_node
-
     def search_paths_using_node(self, node: 'Node') -> List['Path']:
-        return self._paths_by_node().get(node) or []
+        return list(self._get_index().paths_by_node.get(node) or [])
 
     def search_indirect_parents(self, node: 'Node') -> List['NodeGroupYear']:
         paths = self.search_paths_using_node(node)
@@ -639,11 +628,124 @@ class ProgramTree(interface.RootEntity):
         return self.prerequisites.get_prerequisite(node)
 
 
-def _nodes_from_root(root: 'Node') -> List['Node']:
-    nodes = [root]
-    for link in root.children:
-        nodes.extend(_nodes_from_root(link.child))
-    return nodes
+class ProgramTreeIndex:
+    """
+    Indexes of the nodes of a tree by path, by (code, year) and by (node_id, type), built in one pass over the tree,
+    and of its links by child node.
+    The mutations made through the ProgramTree (paste_node, detach_node) are applied incrementally.
+    Any other modification of the children of a node of the tree increments the modification stamp of the tree :
+    the index is then outdated and rebuilt on next access.
+    """
+
+    def __init__(self, root_node: 'Node', modification_stamp: ModificationStamp):
+        self.root_node = root_node
+        self.root_path = str(root_node.pk)
+        self.modification_stamp = modification_stamp
+        self.node_by_path = {self.root_path: root_node}  # type: Dict[Path, Node]
+        self.paths_by_node = {}  # type: Dict[Node, List[Path]]
+        self.node_by_code_and_year = {}  # type: Dict[tuple, Node]
+        self.node_by_id_and_type = {}  # type: Dict[tuple, Node]
+        self.link_by_path = {}  # type: Dict[Path, Link]
+        self.links_by_child = {}  # type: Dict[Node, List[Link]]
+        self._register_node(root_node)
+        self._add_subtree(root_node, self.root_path)
+        self.stamp = modification_stamp.value
+
+    def is_up_to_date(self) -> bool:
+        return self.stamp == self.modification_stamp.value
+
+    def add_link(self, link: 'Link') -> None:
+        nodes_with_new_paths = set()
+        for parent_path in self._get_paths(link.parent):
+            child_path = PATH_SEPARATOR.join([parent_path, str(link.child.pk)])
+            self._add_path(child_path, link)
+            nodes_with_new_paths.add(link.child)
+            for path, descendent_link in _get_descendents_paths(link.child, child_path):
+                self._add_path(path, descendent_link)
+                nodes_with_new_paths.add(descendent_link.child)
+        # The new paths are appended : put them back in the depth-first order of the tree (i.e. of get_all_links)
+        for node in nodes_with_new_paths:
+            self._sort_paths(node)
+        self.stamp = self.modification_stamp.value
+
+    def remove_link(self, link: 'Link') -> None:
+        for parent_path in self._get_paths(link.parent):
+            child_path = PATH_SEPARATOR.join([parent_path, str(link.child.pk)])
+            self._remove_path(child_path, link.child)
+            for path, descendent_link in _get_descendents_paths(link.child, child_path):
+                self._remove_path(path, descendent_link.child)
+        self.stamp = self.modification_stamp.value
+
+    def _get_paths(self, node: 'Node') -> List[Path]:
+        if node is self.root_node:
+            return [self.root_path]
+        return list(self.paths_by_node.get(node) or [])
+
+    def _add_subtree(self, node: 'Node', path: Path) -> None:
+        for descendent_path, descendent_link in _get_descendents_paths(node, path):
+            self._add_path(descendent_path, descendent_link)
+
+    def _add_path(self, path: Path, link: 'Link') -> None:
+        """ Index the path ending with the link : a path of the child of the link is an occurrence of the link """
+        node = link.child
+        self.node_by_path.setdefault(path, node)
+        self.link_by_path.setdefault(path, link)
+        self.paths_by_node.setdefault(node, []).append(path)
+        self.links_by_child.setdefault(node, []).append(link)
+        self._register_node(node)
+
+    def _remove_path(self, path: Path, node: 'Node') -> None:
+        if self.node_by_path.get(path) is node:
+            del self.node_by_path[path]
+            self.link_by_path.pop(path, None)
+        paths = self.paths_by_node.get(node) or []
+        if path in paths:
+            del self.links_by_child[node][paths.index(path)]
+            paths.remove(path)
+        if not paths and node is not self.root_node:
+            self.paths_by_node.pop(node, None)
+            self.links_by_child.pop(node, None)
+            self._unregister_node(node)
+
+    def _sort_paths(self, node: 'Node') -> None:
+        occurrences = sorted(
+            zip(self.paths_by_node[node], self.links_by_child[node]),
+            key=lambda occurrence: self._get_depth_first_position(occurrence[0])
+        )
+        self.paths_by_node[node] = [path for path, link in occurrences]
+        self.links_by_child[node] = [link for path, link in occurrences]
+
+    def _get_depth_first_position(self, path: Path) -> Tuple[int, ...]:
+        """ Position of each link of the path among the children of its parent, from the root """
+        position = []
+        while path != self.root_path:
+            link = self.link_by_path[path]
+            position.append(next(index for index, child_link in enumerate(link.parent.children) if child_link is link))
+            path = path.rsplit(PATH_SEPARATOR, 1)[0]
+        return tuple(reversed(position))
+
+    def _register_node(self, node: 'Node') -> None:
+        node.register_modification_stamp(self.modification_stamp)
+        self.node_by_code_and_year.setdefault((node.code, node.year), node)
+        self.node_by_id_and_type.setdefault((node.node_id, node.type), node)
+
+    def _unregister_node(self, node: 'Node') -> None:
+        if self.node_by_code_and_year.get((node.code, node.year)) is node:
+            del self.node_by_code_and_year[(node.code, node.year)]
+        if self.node_by_id_and_type.get((node.node_id, node.type)) is node:
+            del self.node_by_id_and_type[(node.node_id, node.type)]
+
+
+def _get_descendents_paths(node: 'Node', path: Path) -> Iterator[Tuple[Path, 'Link']]:
+    """Depth-first walk (with respect to the order of the links) yielding the path and the link of all descendents"""
+    to_visit = [(PATH_SEPARATOR.join([path, str(link.child.pk)]), link) for link in reversed(node.children)]
+    while to_visit:
+        current_path, current_link = to_visit.pop()
+        yield current_path, current_link
+        to_visit.extend(
+            (PATH_SEPARATOR.join([current_path, str(link.child.pk)]), link)
+            for link in reversed(current_link.child.children)
+        )
 
 
 def _links_from_root(root: 'Node', ignore: Set[EducationGroupTypesEnum] = None) -> List['Link']:
@@ -21,10 +21,13 @@
 #  at the root of the source code of this program.  If not,
 #  see http://www.gnu.org/licenses/.
 # ############################################################################
+from typing import List
+
 from base.models import learning_unit_year, prerequisite_item, learning_unit
 from base.models import prerequisite as prerequisite_model
 from program_management.ddd.business_types import *
 from program_management.ddd.domain.node import NodeLearningUnitYear, NodeGroupYear
+from program_management.ddd.repositories import tree_cache
 from program_management.models.education_group_version import EducationGroupVersion
 from program_management.models.enums.node_type import NodeType
 
@@ -33,17 +36,36 @@ def persist(tree: 'ProgramTree'):
     prerequisites_changed = [prerequisite for prerequisite in tree.get_all_prerequisites() if prerequisite.has_changed]
     for prerequisite in prerequisites_changed:
         _persist(tree.root_node, prerequisite)
+    if prerequisites_changed:
+        tree_cache.invalidate([tree.root_node.pk])
 
 
 def _persist(
         node_group_year: 'NodeGroupYear',
         prerequisite: 'Prerequisite',
 ) -> None:
+    persist_many(node_group_year, [prerequisite])
+
+
+def persist_many(
+        node_group_year: 'NodeGroupYear',
+        prerequisites: List['Prerequisite'],
+) -> None:
+    if not prerequisites:
+        return
     try:
         education_group_version_obj = EducationGroupVersion.objects.get(root_group__element__pk=node_group_year.node_id)
     except EducationGroupVersion.DoesNotExist:
         return
 
+    for prerequisite in prerequisites:
+        _persist_of_version(education_group_version_obj, prerequisite)
+
+
+def _persist_of_version(
+        education_group_version_obj: EducationGroupVersion,
+        prerequisite: 'Prerequisite',
+) -> None:
     learning_unit_year_obj = learning_unit_year.LearningUnitYear.objects.get(
         acronym=prerequisite.node_having_prerequisites.code,
         academic_year__year=prerequisite.node_having_prerequisites.year,
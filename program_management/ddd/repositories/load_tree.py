@@ -26,6 +26,7 @@
 from typing import List, Dict, Any
 
 from base.models import group_element_year
+from base.models.authorized_relationship import AuthorizedRelationshipList
 from base.models.enums.link_type import LinkTypes
 from base.models.enums.quadrimesters import DerogationQuadrimester
 from education_group.models.group_year import GroupYear
@@ -37,7 +38,7 @@ from program_management.ddd.domain.exception import ProgramTreeNotFoundException
 from program_management.ddd.domain.link import factory as link_factory, LinkIdentity
 # Typing
 from program_management.ddd.domain.prerequisite import Prerequisites, NullPrerequisites
-from program_management.ddd.repositories import load_node, load_authorized_relationship
+from program_management.ddd.repositories import load_node, load_authorized_relationship, tree_cache
 from program_management.ddd.repositories.tree_prerequisites import TreePrerequisitesRepository
 
 GroupElementYearColumnName = str
@@ -56,21 +57,56 @@ def load(tree_root_id: int) -> 'ProgramTree':
 
 @deprecated  # use ProgramTreeRepository.search() instead
 def load_trees(tree_root_ids: List[int]) -> List['ProgramTree']:
-    trees = []
+    tree_root_ids = list(dict.fromkeys(tree_root_ids))
+    cache = tree_cache.ProgramTreeCache()
+    trees_by_root_id = cache.get_many(tree_root_ids)
+    root_ids_to_load = [root_id for root_id in tree_root_ids if root_id not in trees_by_root_id]
+    if root_ids_to_load:
+        loaded_trees = __load_trees_from_database(root_ids_to_load)
+        cache.set_many(loaded_trees)
+        trees_by_root_id.update({tree.root_node.pk: tree for tree in loaded_trees})
+    return [trees_by_root_id[root_id] for root_id in tree_root_ids if root_id in trees_by_root_id]
+
+
+def __load_trees_from_database(tree_root_ids: List[int]) -> List['ProgramTree']:
+    """
+    Load all trees in a fixed number of queries. Nodes and links used by several trees of the batch
+    (common cores, shared groups, learning units...) are instantiated only once and shared between trees.
+    """
     structure = group_element_year.GroupElementYear.objects.get_adjacency_list(tree_root_ids)
-    nodes = __load_tree_nodes(structure)
+    structure_by_root_id = __group_structure_by_root_id(structure)
+    nodes = __load_tree_nodes(structure, tree_root_ids)
     links = __load_tree_links(structure)
-    prerequisites_of_all_trees = TreePrerequisitesRepository().search(tree_root_ids=tree_root_ids)
-    root_nodes = load_node.load_multiple(tree_root_ids)
-    nodes.update({n.pk: n for n in root_nodes})
-    for root_node in root_nodes:
-        tree_root_id = root_node.pk
-        structure_for_current_root_node = [s for s in structure if s['starting_node_id'] == tree_root_id]
-        tree = __build_tree(root_node, structure_for_current_root_node, nodes, links, prerequisites_of_all_trees)
+    prerequisites_by_tree_identity = {
+        prerequisites.context_tree: prerequisites
+        for prerequisites in TreePrerequisitesRepository().search(tree_root_ids=tree_root_ids)
+    }
+    authorized_relationships = load_authorized_relationship.load()
+
+    trees = []
+    for tree_root_id in tree_root_ids:
+        root_node = nodes.get(tree_root_id)
+        if root_node is None:
+            continue
+        tree = __build_tree(
+            root_node,
+            structure_by_root_id.get(tree_root_id, []),
+            nodes,
+            links,
+            prerequisites_by_tree_identity,
+            authorized_relationships,
+        )
         trees.append(tree)
     return trees
 
 
+def __group_structure_by_root_id(tree_structure: TreeStructure) -> Dict[NodeKey, TreeStructure]:
+    structure_by_root_id = {}
+    for s_dict in tree_structure:
+        structure_by_root_id.setdefault(s_dict['starting_node_id'], []).append(s_dict)
+    return structure_by_root_id
+
+
 def load_trees_from_children(
         child_element_ids: list,
         link_type: LinkTypes = None
@@ -79,9 +115,9 @@ def load_trees_from_children(
     return load_trees(list(root_ids))
 
 
-def __load_tree_nodes(tree_structure: TreeStructure) -> Dict[NodeKey, 'Node']:
-    element_ids = [link['child_id'] for link in tree_structure]
-    nodes_list = load_node.load_multiple(element_ids)
+def __load_tree_nodes(tree_structure: TreeStructure, tree_root_ids: List[int]) -> Dict[NodeKey, 'Node']:
+    element_ids = {link['child_id'] for link in tree_structure} | set(tree_root_ids)
+    nodes_list = load_node.load_multiple(list(element_ids))
     return {n.pk: n for n in nodes_list}
 
 
@@ -133,7 +169,8 @@ def __build_tree(
         tree_structure: TreeStructure,
         nodes: Dict[NodeKey, 'Node'],
         links: Dict[LinkKey, 'Link'],
-        prerequisites_of_all_trees: List['Prerequisites']
+        prerequisites_by_tree_identity: Dict['ProgramTreeIdentity', 'Prerequisites'],
+        authorized_relationships: AuthorizedRelationshipList
 ) -> 'ProgramTree':
     structure_by_parent = {}  # For performance
     for s_dict in tree_structure:
@@ -143,10 +180,10 @@ def __build_tree(
     root_node.children = __build_children(str(root_node.pk), structure_by_parent, nodes, links)
     tree = program_tree.ProgramTree(
         root_node,
-        authorized_relationships=load_authorized_relationship.load(),
+        authorized_relationships=authorized_relationships,
     )
-    tree.prerequisites = next(
-        (prereq for prereq in prerequisites_of_all_trees if prereq.context_tree == tree.entity_id),
+    tree.prerequisites = prerequisites_by_tree_identity.get(
+        tree.entity_id,
         NullPrerequisites(context_tree=tree.entity_id)
     )
     return tree
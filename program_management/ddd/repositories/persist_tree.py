@@ -23,54 +23,184 @@
 #    see http://www.gnu.org/licenses/.
 #
 ##############################################################################
-from typing import List, Set, Dict
+import logging
+from typing import List, Set, Dict, Tuple, Iterable
 
+import attr
+from django.conf import settings
 from django.db import transaction
-from django.db.models import F
+from django.db.models import F, Max
+from django.utils import timezone
 
+from base.models import group_element_year_closure
 from base.models.enums.link_type import LinkTypes
 from base.models.group_element_year import GroupElementYear
 from osis_common.decorators.deprecated import deprecated
 from program_management.ddd.business_types import *
-from program_management.ddd.repositories import _persist_prerequisite
+from program_management.ddd.repositories import _persist_prerequisite, tree_cache
 from program_management.models.element import Element
 
+logger = logging.getLogger(settings.DEFAULT_LOGGER)
+
 ElementId = int
+Code = str
+Year = int
+
+GROUP_ELEMENT_YEAR_FIELDS_TO_PERSIST = [
+    'relative_credits',
+    'min_credits',
+    'max_credits',
+    'is_mandatory',
+    'block',
+    'access_condition',
+    'comment',
+    'comment_english',
+    'own_comment',
+    'quadrimester_derogation',
+    'link_type',
+    'order',
+]
+
+
+@attr.s(slots=True)
+class PersistTreeReport:
+    links_created = attr.ib(type=int, default=0)
+    links_updated = attr.ib(type=int, default=0)
+    links_deleted = attr.ib(type=int, default=0)
+    prerequisites_persisted = attr.ib(type=int, default=0)
 
 
 @deprecated  # use ProgramTreeRepository.create() or .update() instead
 @transaction.atomic
-def persist(tree: 'ProgramTree') -> None:
-    __update_or_create_links(tree)
-    __delete_links(tree, tree.root_node)
+def persist(tree: 'ProgramTree') -> PersistTreeReport:
+    report = PersistTreeReport()
+    links_has_changed, links_deleted = __get_links_changed_and_deleted(tree)
+    report.links_created, report.links_updated = __update_or_create_links(links_has_changed)
+    report.links_deleted, report.prerequisites_persisted = __delete_links(tree, links_deleted)
     _persist_prerequisite.persist(tree)
-
-
-def __update_or_create_links(tree: 'ProgramTree'):
-    links_has_changed = [
-        link for link in tree.get_all_links() if link.has_changed
-    ]
+    tree_cache.invalidate([tree.root_node.pk] + [link.parent.pk for link in links_has_changed + links_deleted])
+    logger.debug("Program tree {} persisted : {}".format(tree.entity_id, report))
+    return report
+
+
+def __get_links_changed_and_deleted(tree: 'ProgramTree') -> Tuple[List['Link'], List['Link']]:
+    """
+    Single pass over the nodes of the tree (each shared node is visited once) to collect the links changed
+    and the links detached by the mutations of the tree
+    """
+    links_has_changed = []
+    links_deleted = []
+    visited_node_ids = set()
+    nodes_to_visit = [tree.root_node]
+    while nodes_to_visit:
+        node = nodes_to_visit.pop()
+        if id(node) in visited_node_ids:
+            continue
+        visited_node_ids.add(id(node))
+        links_deleted.extend(node._deleted_children)
+        for link in node.children:
+            if link.has_changed:
+                links_has_changed.append(link)
+            nodes_to_visit.append(link.child)
+    return links_has_changed, links_deleted
+
+
+def __update_or_create_links(links_has_changed: List['Link']) -> Tuple[int, int]:
+    if not links_has_changed:
+        return 0, 0
     elements_by_identity = __get_elements_by_node_identity(links_has_changed)
-    for link in links_has_changed:
-        __persist_group_element_year(link, elements_by_identity)
+    links_by_element_ids = {
+        (elements_by_identity[link.parent.entity_id], elements_by_identity[link.child.entity_id]): link
+        for link in links_has_changed
+    }
+    existing_group_element_years = {
+        (gey.parent_element_id, gey.child_element_id): gey
+        for gey in GroupElementYear.objects.filter(
+            parent_element_id__in={parent_id for parent_id, _ in links_by_element_ids},
+            child_element_id__in={child_id for _, child_id in links_by_element_ids},
+        )
+    }
+
+    now = timezone.now()
+    to_create = []
+    to_update = []
+    for (parent_id, child_id), link in links_by_element_ids.items():
+        group_element_year = existing_group_element_years.get((parent_id, child_id))
+        if group_element_year:
+            to_update.append(group_element_year)
+        else:
+            group_element_year = GroupElementYear(parent_element_id=parent_id, child_element_id=child_id)
+            to_create.append(group_element_year)
+        __set_group_element_year_fields(group_element_year, link)
+        group_element_year.changed = now
+
+    __set_order_of_new_group_element_years(to_create)
+    GroupElementYear.objects.bulk_update(to_update, GROUP_ELEMENT_YEAR_FIELDS_TO_PERSIST + ['changed'])
+    GroupElementYear.objects.bulk_create(to_create)
+    if group_element_year_closure.is_enabled():
+        # bulk_create doesn't send the post_save signal which maintains the closure table
+        group_element_year_closure.add_links(
+            (group_element_year.parent_element_id, group_element_year.child_element_id)
+            for group_element_year in to_create
+        )
+    return len(to_create), len(to_update)
+
+
+def __set_group_element_year_fields(group_element_year: GroupElementYear, link: 'Link') -> None:
+    group_element_year.relative_credits = link.relative_credits
+    group_element_year.min_credits = link.min_credits
+    group_element_year.max_credits = link.max_credits
+    group_element_year.is_mandatory = link.is_mandatory
+    group_element_year.block = link.block
+    group_element_year.access_condition = link.access_condition
+    group_element_year.comment = link.comment
+    group_element_year.comment_english = link.comment_english
+    group_element_year.own_comment = link.own_comment
+    group_element_year.quadrimester_derogation = \
+        link.quadrimester_derogation.name if link.quadrimester_derogation else None
+    # FIXME : Find a rules for enum in order to be consistant
+    group_element_year.link_type = link.link_type.name if isinstance(link.link_type, LinkTypes) else link.link_type
+    group_element_year.order = link.order
+
+
+def __set_order_of_new_group_element_years(to_create: List[GroupElementYear]) -> None:
+    """
+    bulk_create bypass OrderedModel.save() : new links without order are put at the end of their parent
+    """
+    without_order = [gey for gey in to_create if gey.order is None]
+    if not without_order:
+        return
+    max_order_by_parent = dict(
+        GroupElementYear.objects.filter(
+            parent_element_id__in={gey.parent_element_id for gey in without_order}
+        ).values('parent_element_id').annotate(max_order=Max('order')).values_list('parent_element_id', 'max_order')
+    )
+    for gey in to_create:
+        if gey.order is not None:
+            max_order_by_parent[gey.parent_element_id] = max(
+                filter(lambda order: order is not None, [max_order_by_parent.get(gey.parent_element_id), gey.order])
+            )
+    for gey in without_order:
+        current_max = max_order_by_parent.get(gey.parent_element_id)
+        gey.order = 0 if current_max is None else current_max + 1
+        max_order_by_parent[gey.parent_element_id] = gey.order
 
 
 def __get_elements_by_node_identity(links_has_changed: List['Link']) -> Dict['NodeIdentity', ElementId]:
     nodes = {link.parent for link in links_has_changed} | {link.child for link in links_has_changed}
 
-    group_elements = __get_elements_as_group(nodes)
-    learning_unit_elements = __get_elements_as_learning_unit(nodes)
+    group_elements = __index_by_code_and_year(__get_elements_as_group(nodes))
+    learning_unit_elements = __index_by_code_and_year(__get_elements_as_learning_unit(nodes))
 
     result = {}
     for node in nodes:
-        elements = group_elements
-        if node.is_learning_unit():
-            elements = learning_unit_elements
+        elements = learning_unit_elements if node.is_learning_unit() else group_elements
+        result[node.entity_id] = elements[(node.code, node.year)]
+    return result
 
-        element = next(elem for elem in elements if elem['code'] == node.code and elem['year'] == node.year)
-        result[node.entity_id] = element['pk']
 
-    return result
+def __index_by_code_and_year(elements: Iterable[Dict]) -> Dict[Tuple[Code, Year], ElementId]:
+    return {(elem['code'], elem['year']): elem['pk'] for elem in elements}
 
 
 def __get_elements_as_group(nodes: Set['Node']):
@@ -95,48 +225,27 @@ def __get_elements_as_learning_unit(nodes: Set['Node']):
     ).values('pk', 'code', 'year')
 
 
-def __persist_group_element_year(link: 'Link', elements_by_identity: Dict['NodeIdentity', ElementId]):
-    group_element_year, _ = GroupElementYear.objects.update_or_create(
-        parent_element_id=elements_by_identity[link.parent.entity_id],
-        child_element_id=elements_by_identity[link.child.entity_id],
-        defaults={
-            'relative_credits': link.relative_credits,
-            'min_credits': link.min_credits,
-            'max_credits': link.max_credits,
-            'is_mandatory': link.is_mandatory,
-            'block': link.block,
-            'access_condition': link.access_condition,
-            'comment': link.comment,
-            'comment_english': link.comment_english,
-            'own_comment': link.own_comment,
-            'quadrimester_derogation': link.quadrimester_derogation.name if link.quadrimester_derogation else None,
-            # FIXME : Find a rules for enum in order to be consistant
-            'link_type': link.link_type.name if isinstance(link.link_type, LinkTypes) else link.link_type,
-            'order': link.order,
-
-        }
-    )
-
-
-def __delete_links(tree: 'ProgramTree', node: 'Node'):
-    for link in node._deleted_children:
-        __persist_deleted_prerequisites(tree, link.child)
-        __delete_group_element_year(link)
-    for link in node.children:
-        __delete_links(tree, link.child)
-
-
-def __persist_deleted_prerequisites(tree: 'ProgramTree', node: 'Node'):
-    if node.is_learning_unit():
-        prerequisite = tree.get_prerequisite(node)
-        if prerequisite:
-            _persist_prerequisite._persist(tree.root_node, prerequisite)
-    else:
-        for child_node in node.get_all_children_as_learning_unit_nodes():
-            prerequisite = tree.get_prerequisite(child_node)
-            if prerequisite:
-                _persist_prerequisite._persist(tree.root_node, prerequisite)
-
-
-def __delete_group_element_year(link):
-    GroupElementYear.objects.filter(pk=link.pk).delete()
+def __delete_links(tree: 'ProgramTree', links_deleted: List['Link']) -> Tuple[int, int]:
+    if not links_deleted:
+        return 0, 0
+    prerequisites_persisted = __persist_deleted_prerequisites(tree, links_deleted)
+    links_deleted_count, _ = GroupElementYear.objects.filter(
+        pk__in=[link.pk for link in links_deleted if link.pk]
+    ).delete()
+    return links_deleted_count, prerequisites_persisted
+
+
+def __persist_deleted_prerequisites(tree: 'ProgramTree', links_deleted: List['Link']) -> int:
+    learning_unit_nodes = {}
+    for link in links_deleted:
+        if link.child.is_learning_unit():
+            learning_unit_nodes[link.child.entity_id] = link.child
+        else:
+            learning_unit_nodes.update(
+                {node.entity_id: node for node in link.child.get_all_children_as_learning_unit_nodes()}
+            )
+
+    prerequisites = [tree.get_prerequisite(node) for node in learning_unit_nodes.values()]
+    prerequisites = [prerequisite for prerequisite in prerequisites if prerequisite]
+    _persist_prerequisite.persist_many(tree.root_node, prerequisites)
+    return len(prerequisites)
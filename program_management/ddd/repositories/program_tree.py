@@ -34,7 +34,7 @@ from osis_common.ddd.interface import Entity
 from program_management.ddd import command
 from program_management.ddd.business_types import *
 from program_management.ddd.domain import exception
-from program_management.ddd.repositories import persist_tree, load_tree, node
+from program_management.ddd.repositories import persist_tree, load_tree, node, tree_cache
 from program_management.models.element import Element
 
 
@@ -67,6 +67,7 @@ class ProgramTreeRepository(interface.AbstractRepository):
         program_tree = cls.get(entity_id)
 
         _delete_node_content(program_tree.root_node, delete_node_service)
+        tree_cache.invalidate([program_tree.root_node.pk])
         cmd = command.DeleteNodeCommand(
             code=program_tree.root_node.code,
             year=program_tree.root_node.year,
@@ -0,0 +1,149 @@
+##############################################################################
+#
+#    OSIS stands for Open Student Information System. It's an application
+#    designed to manage the core business of higher education institutions,
+#    such as universities, faculties, institutes and professional schools.
+#    The core business involves the administration of students, teachers,
+#    courses, programs and so on.
+#
+#    Copyright (C) 2015-2020 Université catholique de Louvain (http://www.uclouvain.be)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    A copy of this license - GNU General Public License - is available
+#    at the root of the source code of this program.  If not,
+#    see http://www.gnu.org/licenses/.
+#
+##############################################################################
+import collections
+import logging
+import pickle
+import zlib
+from typing import Dict, List, Iterable
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from base.models.group_element_year import GroupElementYear
+from base.utils.cache import VersionStamp
+from program_management.ddd.business_types import *
+
+logger = logging.getLogger(settings.DEFAULT_LOGGER)
+
+TreeRootId = int
+ElementId = int
+
+TREE_VERSION_KEY = 'program_tree_{root_id}_version'
+TREE_KEY = 'program_tree_{root_id}_v{version}'
+LOCAL_CACHE_MAX_SIZE = 256
+
+
+class ProgramTreeCache:
+    """
+    Two levels cache of loaded program trees, keyed by root element id and the version stamp of this root.
+
+    The shared level (Django's cache, i.e. redis in production) holds a compressed pickle of each tree so that
+    all workers take advantage of it. The local level keeps the last serialized trees of the current process
+    in order to avoid a network round trip for the same root.
+
+    A link or a node is often shared by several trees, so a write bumps the version stamp of the changed elements
+    and of all their ancestors (see invalidate) : the trees cached with an older stamp are ignored and will expire
+    by themselves, the other trees stay cached.
+    """
+    _local_cache = collections.OrderedDict()  # type: Dict[str, bytes]
+
+    def __init__(self):
+        # The versions are read once, before loading from database, to never store stale data under a new version
+        self.versions = {}  # type: Dict[TreeRootId, int]
+
+    @staticmethod
+    def is_enabled() -> bool:
+        return getattr(settings, 'PROGRAM_TREE_CACHE_ENABLED', False)
+
+    def get_many(self, tree_root_ids: Iterable[TreeRootId]) -> Dict[TreeRootId, 'ProgramTree']:
+        if not self.is_enabled():
+            return {}
+        self._read_versions(tree_root_ids)
+        keys_by_root_id = {root_id: self._build_key(root_id) for root_id in tree_root_ids}
+        serialized_by_key = {
+            key: self._local_cache[key] for key in keys_by_root_id.values() if key in self._local_cache
+        }
+        keys_to_fetch = [key for key in keys_by_root_id.values() if key not in serialized_by_key]
+        if keys_to_fetch:
+            shared_values = cache.get_many(keys_to_fetch)
+            for key, serialized in shared_values.items():
+                self._set_local(key, serialized)
+            serialized_by_key.update(shared_values)
+
+        trees = {}
+        for root_id, key in keys_by_root_id.items():
+            if key in serialized_by_key:
+                try:
+                    trees[root_id] = deserialize(serialized_by_key[key])
+                except Exception:
+                    logger.exception('Unable to deserialize cached program tree {}'.format(key))
+        return trees
+
+    def set_many(self, trees: List['ProgramTree']) -> None:
+        if not self.is_enabled():
+            return
+        self._read_versions([tree.root_node.pk for tree in trees if tree.root_node.pk not in self.versions])
+        values = {}
+        for tree in trees:
+            key = self._build_key(tree.root_node.pk)
+            values[key] = serialize(tree)
+            self._set_local(key, values[key])
+        cache.set_many(values, timeout=getattr(settings, 'PROGRAM_TREE_CACHE_TIMEOUT', None))
+
+    def _read_versions(self, tree_root_ids: Iterable[TreeRootId]) -> None:
+        keys_by_root_id = {root_id: TREE_VERSION_KEY.format(root_id=root_id) for root_id in tree_root_ids}
+        versions_by_key = cache.get_many(keys_by_root_id.values())
+        for root_id, key in keys_by_root_id.items():
+            version = versions_by_key.get(key)
+            self.versions[root_id] = version if version is not None else VersionStamp(key).get()
+
+    def _build_key(self, tree_root_id: TreeRootId) -> str:
+        return TREE_KEY.format(root_id=tree_root_id, version=self.versions[tree_root_id])
+
+    @classmethod
+    def _set_local(cls, key: str, serialized: bytes) -> None:
+        cls._local_cache[key] = serialized
+        cls._local_cache.move_to_end(key)
+        while len(cls._local_cache) > LOCAL_CACHE_MAX_SIZE:
+            cls._local_cache.popitem(last=False)
+
+
+def serialize(tree: 'ProgramTree') -> bytes:
+    return zlib.compress(pickle.dumps(tree, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def deserialize(serialized: bytes) -> 'ProgramTree':
+    return pickle.loads(zlib.decompress(serialized))
+
+
+def invalidate(element_ids: Iterable[ElementId]) -> None:
+    """
+    Invalidate the cached trees containing one of the elements once the current transaction is committed, i.e. the
+    trees rooted on these elements or on one of their ancestors
+    """
+    if not ProgramTreeCache.is_enabled():
+        return
+    element_ids = [element_id for element_id in set(element_ids) if element_id is not None]
+    if element_ids:
+        transaction.on_commit(lambda: _bump_tree_versions(element_ids))
+
+
+def _bump_tree_versions(element_ids: List[ElementId]) -> None:
+    ancestors = GroupElementYear.objects.get_reverse_adjacency_list(child_element_ids=element_ids)
+    tree_root_ids = set(element_ids) | {ancestor['parent_id'] for ancestor in ancestors}
+    for tree_root_id in tree_root_ids:
+        VersionStamp(TREE_VERSION_KEY.format(root_id=tree_root_id)).bump()
@@ -23,22 +23,39 @@
 #    see http://www.gnu.org/licenses/.
 #
 ##############################################################################
-from threading import Thread
-from typing import List
+import datetime
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
 
 import requests
 from django.conf import settings
+from django.core.cache import cache
 from django.db import transaction
 from django.utils.translation import gettext_lazy as _
 
 from program_management.ddd.business_types import *
 from program_management.ddd.command import PublishProgramTreesVersionUsingNodeCommand, GetProgramTreesFromNodeCommand
 from program_management.ddd.domain import exception
+from program_management.ddd.domain.node import NodeIdentity
 from program_management.ddd.domain.service.get_node_publish_url import GetNodePublishUrl
 from program_management.ddd.service.read import search_program_trees_using_node_service
 from program_management.ddd.repositories.program_tree import ProgramTreeRepository
 from program_management.ddd.domain.program_tree import ProgramTreeIdentity
 
+logger = logging.getLogger(settings.DEFAULT_LOGGER)
+
+PUBLICATION_STATUS_KEY = 'program_publication_status_{year}_{code}'
+PUBLICATION_STATUS_TIMEOUT = 24 * 3600
+RETRY_BACKOFF_SECONDS = 1
+
+QUEUED = 'QUEUED'
+PUBLISHING = 'PUBLISHING'
+PUBLISHED = 'PUBLISHED'
+FAILED = 'FAILED'
+
 
 @transaction.atomic()
 def publish_program_trees_using_node(cmd: PublishProgramTreesVersionUsingNodeCommand) -> List['ProgramTreeIdentity']:
@@ -50,30 +67,118 @@ def publish_program_trees_using_node(cmd: PublishProgramTreesVersionUsingNodeCom
         except exception.ProgramTreeNotFoundException:
             program_trees = []
     nodes_to_publish = [program_tree.root_node for program_tree in program_trees]
-    t = Thread(target=_bulk_publish, args=(nodes_to_publish,))
-    t.start()
+    # The portal reads the general information back : publish only once it is committed
+    transaction.on_commit(lambda: _bulk_publish(nodes_to_publish))
     return [program_tree.entity_id for program_tree in program_trees]
 
 
 def _bulk_publish(nodes: List['NodeGroupYear']) -> None:
-    error_root_nodes_ids = []
     for node in nodes:
-        publish_url = GetNodePublishUrl.get_url_from_node(node)
-        try:
-            __publish(publish_url)
-        except Exception:
-            error_root_nodes_ids.append(node.entity_id)
+        publication_queue.put(node.entity_id, GetNodePublishUrl.get_url_from_node(node))
+
+
+def get_publication_status(node_identity: 'NodeIdentity') -> Optional[Dict]:
+    """
+    :return: The status of the last publication of the node, e.g.
+    {'status': 'PUBLISHED', 'attempts': 1, 'error': None, 'changed': '2020-09-01T10:00:00'}
+    """
+    return cache.get(_get_publication_status_key(node_identity))
+
+
+def _set_publication_status(node_identity: 'NodeIdentity', status: str, attempts: int = 0, error: str = None):
+    cache.set(
+        _get_publication_status_key(node_identity),
+        {'status': status, 'attempts': attempts, 'error': error, 'changed': datetime.datetime.now().isoformat()},
+        timeout=PUBLICATION_STATUS_TIMEOUT
+    )
+
+
+def _get_publication_status_key(node_identity: 'NodeIdentity') -> str:
+    return PUBLICATION_STATUS_KEY.format(year=node_identity.year, code=node_identity.code)
+
+
+class PublicationQueue:
+    """
+    Publish the nodes on the portal with a bounded pool of workers sharing their HTTP connections.
+    A node is published after the coalesce window : the publications asked for the same node meanwhile are merged.
+    Each publication is retried with an exponential backoff and its status is kept in Django's cache.
+
+    The queue lives in the web process : the publications still waiting are lost when the process restarts (publish
+    the programs again). The status is only visible to the other processes when the cache backend is shared.
+    """
+    def __init__(self):
+        self._executor = None
+        self._pending = {}  # type: Dict[NodeIdentity, str]
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def put(self, node_identity: 'NodeIdentity', publish_url: str) -> bool:
+        """
+        :return: False when the publication is merged with a publication of the node still waiting
+        """
+        with self._lock:
+            is_pending = node_identity in self._pending
+            self._pending[node_identity] = publish_url
+            if is_pending:
+                return False
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=settings.PUBLICATION_MAX_WORKERS,
+                    thread_name_prefix='publication'
+                )
+            _set_publication_status(node_identity, QUEUED)
+            self._executor.submit(self._publish, node_identity, time.monotonic())
+        return True
+
+    def _publish(self, node_identity: 'NodeIdentity', queued_at: float) -> None:
+        time.sleep(max(queued_at + settings.PUBLICATION_COALESCE_WINDOW - time.monotonic(), 0))
+        with self._lock:
+            publish_url = self._pending.pop(node_identity)
+
+        retries = max(settings.PUBLICATION_RETRIES, 1)
+        for attempt in range(1, retries + 1):
+            _set_publication_status(node_identity, PUBLISHING, attempts=attempt)
+            try:
+                _publish_on_portal(self._get_session(), publish_url)
+                _set_publication_status(node_identity, PUBLISHED, attempts=attempt)
+                return
+            except requests.RequestException as e:
+                if attempt == retries:
+                    logger.error("Unable to publish {} - {} : {}".format(node_identity.code, node_identity.year, e))
+                    _set_publication_status(node_identity, FAILED, attempts=attempt, error=str(e))
+                    return
+                time.sleep(RETRY_BACKOFF_SECONDS * 2 ** (attempt - 1))
+            except Exception as e:
+                # Nobody reads the result of the worker : an unexpected error must end the publication as well
+                logger.exception("Unable to publish {} - {}".format(node_identity.code, node_identity.year))
+                _set_publication_status(node_identity, FAILED, attempts=attempt, error=str(e))
+                return
+
+    def _get_session(self) -> requests.Session:
+        # One session by worker keeps the connections to the portal alive between publications
+        if not hasattr(self._local, 'session'):
+            self._local.session = requests.Session()
+        return self._local.session
+
+    def join(self) -> None:
+        """ Wait for the publications already queued (used by the tests) """
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor:
+            executor.shutdown(wait=True)
+
 
-    if error_root_nodes_ids:
-        raise PublishNodesException(node_ids=error_root_nodes_ids)
+publication_queue = PublicationQueue()
 
 
-def __publish(publish_url: str):
-    return requests.get(
+def _publish_on_portal(session: requests.Session, publish_url: str) -> requests.Response:
+    response = session.get(
         publish_url,
         headers={"Authorization": settings.ESB_AUTHORIZATION},
         timeout=settings.REQUESTS_TIMEOUT or 20
     )
+    response.raise_for_status()
+    return response
 
 
 class PublishNodesException(Exception):
@@ -32,8 +32,8 @@ from django.utils.translation import gettext_lazy as _, pgettext_lazy
 from django_filters import OrderingFilter, filters, FilterSet
 
 from base.business.entity import get_entities_ids
-from base.forms.utils.filter_field import filter_field_by_regex
-from base.models import entity_version
+from base.forms.utils.filter_field import filter_field_by_search_index
+from base.models import entity_version, search_index
 from base.models.academic_year import AcademicYear
 from base.models.education_group_type import EducationGroupType
 from base.models.enums import education_group_categories
@@ -45,6 +45,9 @@ from education_group.models.group_year import GroupYear
 PARTICULAR = "PARTICULAR"
 STANDARD = "STANDARD"
 
+# Filtered field : field of the search index entry
+SEARCH_INDEX_FIELDS = {'acronym': 'acronym', 'partial_acronym': 'code', 'full_title_fr': 'full_title'}
+
 VERSION_CHOICES = (
     (STANDARD, _("Standard")),
     (PARTICULAR, _("Particulière")),
@@ -166,7 +169,9 @@ class GroupFilter(FilterSet):
 
     @staticmethod
     def filter_education_group_year_field(queryset, name, value):
-        return filter_field_by_regex(queryset, name, value)
+        return filter_field_by_search_index(
+            queryset, name, value, search_index.GROUP_YEAR, SEARCH_INDEX_FIELDS[name]
+        )
 
     @staticmethod
     def filter_by_transition(queryset, name, value):
@@ -0,0 +1,92 @@
+##############################################################################
+#
+#    OSIS stands for Open Student Information System. It's an application
+#    designed to manage the core business of higher education institutions,
+#    such as universities, faculties, institutes and professional schools.
+#    The core business involves the administration of students, teachers,
+#    courses, programs and so on.
+#
+#    Copyright (C) 2015-2020 Université catholique de Louvain (http://www.uclouvain.be)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    A copy of this license - GNU General Public License - is available
+#    at the root of the source code of this program.  If not,
+#    see http://www.gnu.org/licenses/.
+#
+##############################################################################
+import gc
+import sys
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+
+from program_management.ddd.repositories import load_tree
+from program_management.models.element import Element
+
+
+class Command(BaseCommand):
+    help = "Load all program trees of an academic year and report the memory retained by their nodes and links"
+
+    def add_arguments(self, parser):
+        parser.add_argument('year', type=int, help="Academic year of the trees to load (ex: 2020)")
+
+    def handle(self, *args, **options):
+        root_ids = list(
+            Element.objects.filter(
+                group_year__academic_year__year=options['year'],
+                group_year__educationgroupversion__isnull=False,
+            ).values_list('pk', flat=True)
+        )
+
+        gc.collect()
+        tracemalloc.start()
+        memory_before, _ = tracemalloc.get_traced_memory()
+        trees = load_tree.load_trees(root_ids)
+        gc.collect()
+        memory_after, memory_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        nodes, links = _get_unique_nodes_and_links(trees)
+        retained_bytes = memory_after - memory_before
+        self.stdout.write("{} trees, {} distinct nodes, {} distinct links".format(len(trees), len(nodes), len(links)))
+        self.stdout.write("Retained memory : {} bytes (peak {} bytes)".format(retained_bytes, memory_peak))
+        if nodes:
+            self.stdout.write("Retained memory by node : {} bytes".format(retained_bytes // len(nodes)))
+            self.stdout.write("Instance size by node : {} bytes".format(_get_average_instance_size(nodes)))
+        if links:
+            self.stdout.write("Instance size by link : {} bytes".format(_get_average_instance_size(links)))
+
+
+def _get_unique_nodes_and_links(trees):
+    nodes = {}
+    links = {}
+    to_visit = [tree.root_node for tree in trees]
+    while to_visit:
+        node = to_visit.pop()
+        if id(node) in nodes:
+            continue
+        nodes[id(node)] = node
+        for link in node.children:
+            links[id(link)] = link
+            to_visit.append(link.child)
+    return list(nodes.values()), list(links.values())
+
+
+def _get_average_instance_size(objects) -> int:
+    """Shallow size of the instances, including their __dict__ when one has been materialized"""
+    total_size = 0
+    for obj in objects:
+        total_size += sys.getsizeof(obj)
+        instance_dict = next((ref for ref in gc.get_referents(obj) if type(ref) is dict), None)
+        if instance_dict is not None:
+            total_size += sys.getsizeof(instance_dict)
+    return total_size // len(objects)
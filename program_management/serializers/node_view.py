@@ -40,7 +40,9 @@ from program_management.ddd.domain.program_tree import PATH_SEPARATOR
 from program_management.ddd.domain.service.identity_search import ProgramTreeIdentitySearch
 from program_management.models.enums.node_type import NodeType
 
-NodeViewContext = namedtuple('NodeViewContext', 'view_path root_node current_path')
+# allowed_actions : permissions of the user on the groups of the tree by element id (see get_tree_allowed_actions)
+NodeViewContext = namedtuple('NodeViewContext', 'view_path root_node current_path allowed_actions')
+NodeViewContext.__new__.__defaults__ = (None,)
 
 
 def serialize_children(
@@ -53,7 +55,8 @@ def serialize_children(
         child_context = NodeViewContext(
             view_path=context.view_path,
             root_node=context.root_node,
-            current_path=context.current_path + PATH_SEPARATOR + str(link.child.pk)
+            current_path=context.current_path + PATH_SEPARATOR + str(link.child.pk),
+            allowed_actions=context.allowed_actions,
         )
         if link.child.is_learning_unit():
             serialized_node = _leaf_view_serializer(link, tree, child_context)
@@ -66,7 +69,7 @@ def serialize_children(
 def _get_node_view_attribute_serializer(link: 'Link', tree: 'ProgramTree', context: NodeViewContext) -> dict:
     querystring_params = {"path": context.current_path, "redirect_path": context.view_path}
 
-    return {
+    attrs = {
         'path': context.current_path,
         'href': reverse_with_get(
             'element_identification',
@@ -95,6 +98,19 @@ def _get_node_view_attribute_serializer(link: 'Link', tree: 'ProgramTree', conte
             get=querystring_params
         ),
     }
+    if context.allowed_actions is not None:
+        attrs['permissions'] = _get_link_permissions(link, context)
+    return attrs
+
+
+def _get_link_permissions(link: 'Link', context: NodeViewContext) -> Dict[str, bool]:
+    child_perms = context.allowed_actions.get(link.child.pk, {})
+    parent_perms = context.allowed_actions.get(link.parent.pk, {})
+    return {
+        'attach': child_perms.get('base.can_attach_node', False),
+        'detach': parent_perms.get('base.can_detach_node', False),
+        'modify': parent_perms.get('base.change_link_data', False),
+    }
 
 
 def _get_leaf_view_attribute_serializer(link: 'Link', tree: 'ProgramTree', context: NodeViewContext) -> dict:
@@ -23,17 +23,42 @@
 #    see http://www.gnu.org/licenses/.
 #
 ##############################################################################
+from typing import Dict
 
+from django.contrib.auth.models import User
+from django.db.models import F
 from django.urls import reverse
 
 from base.utils.urls import reverse_with_get
+from education_group.models.group_year import GroupYear
+from osis_role.bulk import has_perms_bulk
 from program_management.ddd.business_types import *
 from program_management.serializers.node_view import serialize_children, _format_node_group_text
 
+TREE_NODE_PERMISSIONS = ('base.can_attach_node', 'base.can_detach_node', 'base.change_link_data')
+
+
+def get_tree_allowed_actions(tree: 'ProgramTree', user: User) -> Dict[int, Dict[str, bool]]:
+    """
+    :return: The permissions of the user on each group of the tree by element id, checked at once for all the groups
+    """
+    group_element_ids = [node.pk for node in tree.get_all_nodes() if not node.is_learning_unit()]
+    group_years = GroupYear.objects.filter(
+        element__pk__in=group_element_ids
+    ).select_related(
+        'academic_year', 'education_group_type', 'management_entity'
+    ).annotate(
+        element_pk=F('element__pk')
+    )
+    return {
+        group_year.element_pk: perms
+        for group_year, perms in has_perms_bulk(user, TREE_NODE_PERMISSIONS, group_years).items()
+    }
+
 
 def program_tree_view_serializer(tree: 'ProgramTree', context: 'NodeViewContext') -> dict:
     querystring_params = {"path": context.current_path, "redirect_path": context.view_path}
-    return {
+    serialized_tree = {
         'text': _format_node_group_text(tree.root_node),
         'id': context.current_path,
         'icon': None,
@@ -56,3 +81,8 @@ def program_tree_view_serializer(tree: 'ProgramTree', context: 'NodeViewContext'
             ),
         }
     }
+    if context.allowed_actions is not None:
+        serialized_tree['a_attr']['permissions'] = {
+            'attach': context.allowed_actions.get(tree.root_node.pk, {}).get('base.can_attach_node', False),
+        }
+    return serialized_tree
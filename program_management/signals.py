@@ -23,13 +23,20 @@
 #    see http://www.gnu.org/licenses/.
 #
 ##############################################################################
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from django.core.cache import cache
 
+from base.models.group_element_year import GroupElementYear
 from base.models.learning_unit_year import LearningUnitYear
+from base.models.prerequisite import Prerequisite
+from base.models.prerequisite_item import PrerequisiteItem
 from base.utils.cache import ElementCache
 from education_group import publisher
 from education_group.models.group_year import GroupYear
+from program_management.ddd.domain.program_tree import PATH_SEPARATOR
+from program_management.ddd.repositories import tree_cache
+from program_management.models.education_group_version import EducationGroupVersion
 from program_management.models.element import Element
 from program_management import publisher as publisher_pgrm_management
 
@@ -95,3 +102,57 @@ def delete_element_in_cache_from_element_deleted(sender, **kwargs):
         cache.delete(key) for key, cached in cached_items.items()
         if cached.get('element_code') == identity.code and cached.get('element_year') == identity.year
     ]
+
+
+@receiver(publisher_pgrm_management.element_detached)
+def invalidate_program_tree_cache_from_path_detached(sender, path_detached: str, **kwargs):
+    tree_cache.invalidate(int(element_id) for element_id in path_detached.split(PATH_SEPARATOR)[:-1])
+
+
+# Nodes are shared by several trees : the content of a tree can be changed outside of persist_tree. Only the trees
+# containing the changed element are invalidated.
+
+@receiver(post_save, sender=GroupElementYear)
+@receiver(post_delete, sender=GroupElementYear)
+def invalidate_program_tree_cache_from_link(sender, instance, **kwargs):
+    tree_cache.invalidate([instance.parent_element_id])
+
+
+@receiver(post_save, sender=Prerequisite)
+@receiver(post_delete, sender=Prerequisite)
+def invalidate_program_tree_cache_from_prerequisite(sender, instance, **kwargs):
+    tree_cache.invalidate(
+        Element.objects.filter(
+            group_year__educationgroupversion=instance.education_group_version_id
+        ).values_list('pk', flat=True)
+    )
+
+
+@receiver(post_save, sender=PrerequisiteItem)
+@receiver(post_delete, sender=PrerequisiteItem)
+def invalidate_program_tree_cache_from_prerequisite_item(sender, instance, **kwargs):
+    tree_cache.invalidate(
+        Element.objects.filter(
+            group_year__educationgroupversion__prerequisite=instance.prerequisite_id
+        ).values_list('pk', flat=True)
+    )
+
+
+@receiver(post_save, sender=GroupYear)
+def invalidate_program_tree_cache_from_group_year(sender, instance, **kwargs):
+    tree_cache.invalidate(Element.objects.filter(group_year=instance.pk).values_list('pk', flat=True))
+
+
+@receiver(post_save, sender=LearningUnitYear)
+def invalidate_program_tree_cache_from_learning_unit_year(sender, instance, **kwargs):
+    tree_cache.invalidate(Element.objects.filter(learning_unit_year=instance.pk).values_list('pk', flat=True))
+
+
+@receiver(post_save, sender=EducationGroupVersion)
+def invalidate_program_tree_cache_from_version(sender, instance, **kwargs):
+    tree_cache.invalidate(Element.objects.filter(group_year=instance.root_group_id).values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=Element)
+def invalidate_program_tree_cache_from_element(sender, instance, **kwargs):
+    tree_cache.invalidate([instance.pk])
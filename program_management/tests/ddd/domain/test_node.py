@@ -30,6 +30,7 @@ from django.test import SimpleTestCase
 from base.models.enums.education_group_types import TrainingType, GroupType, MiniTrainingType
 from base.models.enums.link_type import LinkTypes
 from education_group.enums.node_type import NodeType
+from osis_common.ddd import interface
 from program_management.ddd.domain.prerequisite import NullPrerequisites
 from program_management.tests.ddd.factories.domain.prerequisite.prerequisite import PrerequisitesFactory
 from program_management.tests.ddd.factories.domain.program_tree.LDROI200M_DROI2M import ProgramTreeDROI2MFactory
@@ -105,6 +106,24 @@ class TestEq(SimpleTestCase):
         self.assertFalse(node == node_with_different_identity)
 
 
+class TestSlots(SimpleTestCase):
+
+    def setUp(self):
+        # Nodes and links inherit from osis_common : without __slots__ there, every instance gets a __dict__ back
+        self.assertIn('__slots__', vars(interface.Entity), "osis_common.ddd.interface.Entity must declare __slots__")
+
+    def test_should_store_state_of_nodes_and_links_in_slots(self):
+        node = NodeGroupYearFactory()
+        link = node.add_child(NodeLearningUnitYearFactory())
+        link.child.academic_year
+
+        for obj in (node, link, link.child):
+            with self.subTest(type=type(obj).__name__):
+                self.assertFalse(hasattr(obj, '__dict__'))
+                with self.assertRaises(AttributeError):
+                    obj.undeclared_attribute = True
+
+
 class TestStr(SimpleTestCase):
 
     def setUp(self):
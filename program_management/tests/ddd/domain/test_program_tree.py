@@ -39,7 +39,7 @@ from base.models.enums.link_type import LinkTypes
 from program_management.ddd.domain import node, exception
 from program_management.ddd.domain import prerequisite
 from program_management.ddd.domain import program_tree
-from program_management.ddd.domain.link import Link
+from program_management.ddd.domain.link import Link, factory as link_factory
 from program_management.ddd.domain.prerequisite import PrerequisiteItem
 from program_management.ddd.domain.program_tree import ProgramTree
 from program_management.ddd.domain.program_tree import build_path
@@ -179,6 +179,124 @@ class TestGetNodeProgramTree(SimpleTestCase):
         )
 
 
+class TestProgramTreeIndex(ValidatorPatcherMixin, SimpleTestCase):
+    def setUp(self):
+        link = LinkFactory()
+        self.root_node = link.parent
+        self.subgroup_node = link.child
+        self.tree = ProgramTreeFactory(root_node=self.root_node)
+        self.subgroup_path = build_path(self.root_node, self.subgroup_node)
+
+    def test_should_index_node_pasted_into_tree(self):
+        self.mock_validator_validate_to_not_raise_exception(PasteNodeValidatorList)
+        self.tree.get_all_nodes()
+        node_to_paste = NodeGroupYearFactory()
+        request = PasteElementCommandFactory(
+            node_to_paste_code=node_to_paste.code,
+            node_to_paste_year=node_to_paste.year,
+            path_where_to_paste=self.subgroup_path
+        )
+
+        self.tree.paste_node(node_to_paste, request, mock.Mock(), mock.Mock())
+
+        expected_path = build_path(self.root_node, self.subgroup_node, node_to_paste)
+        self.assertEqual(self.tree.get_node(expected_path), node_to_paste)
+        self.assertEqual(self.tree.get_node_by_code_and_year(node_to_paste.code, node_to_paste.year), node_to_paste)
+        self.assertListEqual(self.tree.search_paths_using_node(node_to_paste), [expected_path])
+
+    @patch.object(DetachNodeValidatorList, 'validate')
+    def test_should_unindex_node_detached_from_tree(self, mock_validate):
+        self.tree.get_all_nodes()
+
+        self.tree.detach_node(self.subgroup_path, mock.Mock(), mock.Mock())
+
+        with self.assertRaises(node.NodeNotFoundException):
+            self.tree.get_node(self.subgroup_path)
+        self.assertIsNone(self.tree.get_node_by_code_and_year(self.subgroup_node.code, self.subgroup_node.year))
+        self.assertListEqual(self.tree.search_paths_using_node(self.subgroup_node), [])
+
+    def test_should_rebuild_index_when_children_are_modified_outside_of_tree(self):
+        self.tree.get_all_nodes()
+
+        link = LinkFactory(parent=self.subgroup_node)
+
+        expected_path = build_path(self.root_node, self.subgroup_node, link.child)
+        self.assertEqual(self.tree.get_node(expected_path), link.child)
+        self.assertIn(link.child, self.tree.get_all_nodes())
+
+    def test_should_keep_index_when_another_tree_is_modified(self):
+        self.tree.get_all_nodes()
+        index = self.tree._index
+        other_tree = ProgramTreeFactory(root_node=LinkFactory().parent)
+        other_tree.get_all_nodes()
+
+        LinkFactory(parent=other_tree.root_node)
+        self.tree.get_all_nodes()
+
+        self.assertIs(self.tree._index, index)
+
+    def test_should_rebuild_index_when_link_appended_to_node_of_tree(self):
+        self.tree.get_all_nodes()
+        new_link = link_factory.create_link(self.subgroup_node, NodeGroupYearFactory())
+
+        self.subgroup_node.append_link(new_link)
+
+        self.assertListEqual(self.tree.search_links_using_node(new_link.child), [new_link])
+
+    def test_should_index_links_by_child(self):
+        self.mock_validator_validate_to_not_raise_exception(PasteNodeValidatorList)
+        self.assertEqual(self.tree.get_first_link_occurence_using_node(self.subgroup_node).parent, self.root_node)
+        node_to_paste = NodeGroupYearFactory()
+        request = PasteElementCommandFactory(
+            node_to_paste_code=node_to_paste.code,
+            node_to_paste_year=node_to_paste.year,
+            path_where_to_paste=self.subgroup_path
+        )
+
+        link_created = self.tree.paste_node(node_to_paste, request, mock.Mock(), mock.Mock())
+
+        self.assertListEqual(self.tree.search_links_using_node(node_to_paste), [link_created])
+        self.assertListEqual(
+            self.tree.search_links_using_node(node_to_paste),
+            [link for link in self.tree.get_all_links() if link.child == node_to_paste]
+        )
+
+    def test_should_update_links_by_child_in_depth_first_order_on_paste(self):
+        self.mock_validator_validate_to_not_raise_exception(PasteNodeValidatorList)
+        self.root_node.children[0].order = 1
+        first_group_node = LinkFactory(parent=self.root_node, order=0).child
+        reused_node = LinkFactory(parent=self.subgroup_node).child
+        self.tree.get_all_nodes()
+        index = self.tree._index
+        request = PasteElementCommandFactory(
+            node_to_paste_code=reused_node.code,
+            node_to_paste_year=reused_node.year,
+            path_where_to_paste=build_path(self.root_node, first_group_node)
+        )
+
+        link_created = self.tree.paste_node(reused_node, request, mock.Mock(), mock.Mock())
+
+        self.assertIs(self.tree._index, index)
+        self.assertEqual(self.tree.get_first_link_occurence_using_node(reused_node), link_created)
+        self.assertListEqual(
+            self.tree.search_links_using_node(reused_node),
+            [link for link in self.tree.get_all_links() if link.child == reused_node]
+        )
+
+    @patch.object(DetachNodeValidatorList, 'validate')
+    def test_should_update_links_by_child_on_detach(self, mock_validate):
+        reused_node = LinkFactory(parent=self.subgroup_node).child
+        link_kept = LinkFactory(parent=self.root_node, child=reused_node)
+        self.tree.get_all_nodes()
+        index = self.tree._index
+
+        self.tree.detach_node(self.subgroup_path, mock.Mock(), mock.Mock())
+
+        self.assertIs(self.tree._index, index)
+        self.assertListEqual(self.tree.search_links_using_node(reused_node), [link_kept])
+        self.assertListEqual(self.tree.search_links_using_node(self.subgroup_node), [])
+
+
 class TestGetNodeByIdAndTypeProgramTree(SimpleTestCase):
     def setUp(self):
         link = LinkFactory(child=NodeGroupYearFactory(node_id=1))
@@ -49,7 +49,4 @@ class LinkFactory(factory.Factory):
 
     @factory.post_generation
     def _add_children(self, create, extracted, ** kwargs):
-        if not self.parent.children:
-            self.parent.children = [self]
-        else:
-            self.parent.children.append(self)
+        self.parent.children = self.parent.children + [self]
@@ -23,7 +23,9 @@
 #    see http://www.gnu.org/licenses/.
 #
 ##############################################################################
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.utils.translation import gettext_lazy as _
 
 from base.models.enums import prerequisite_operator
@@ -209,6 +211,18 @@ class TestLoadTree(TestCase):
         self.assertEqual(second_root.code, training_containing_root_node.group_year.partial_acronym)
         self.assertEqual(second_root.year, training_containing_root_node.group_year.academic_year.year)
 
+    def test_should_share_nodes_between_trees_and_load_them_in_a_fixed_number_of_queries(self):
+        other_root_node = ElementGroupYearFactory(group_year__academic_year=self.academic_year)
+        GroupElementYearFactory(parent_element=other_root_node, child_element=self.link_level_1.child_element)
+
+        with CaptureQueriesContext(connection) as queries_for_one_tree:
+            load_tree.load_trees([self.root_node.pk])
+        with CaptureQueriesContext(connection) as queries_for_two_trees:
+            result = load_tree.load_trees([self.root_node.pk, other_root_node.pk])
+
+        self.assertEqual(len(queries_for_one_tree), len(queries_for_two_trees))
+        self.assertIs(result[0].root_node.children[0].child, result[1].root_node.children[0].child)
+
 
 class TestLoadTreesFromChildren(TestCase):
 
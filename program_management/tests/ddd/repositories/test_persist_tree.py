@@ -109,24 +109,35 @@ class TestPersistTree(TestCase):
             ).exists()
         )
 
-    @patch("program_management.ddd.repositories.persist_tree.__persist_group_element_year")
-    def test_save_when_link_has_not_changed(self, mock):
+    def test_save_when_link_has_not_changed(self):
         GroupElementYearFactory(parent_element=self.root_group, child_element=self.common_core_element)
         tree = load_tree.load(self.root_node.node_id)
-        persist_tree.persist(tree)
-        assertion_msg = "No changes made, so function GroupelementYear.save() should not have been called"
-        self.assertFalse(mock.called, assertion_msg)
+        report = persist_tree.persist(tree)
+        assertion_msg = "No changes made, so no GroupElementYear should have been saved"
+        self.assertEqual(report.links_created + report.links_updated, 0, assertion_msg)
 
-    @patch("program_management.ddd.repositories.persist_tree.__persist_group_element_year")
-    def test_save_when_link_has_changed(self, mock):
+    def test_save_when_link_has_changed(self):
         GroupElementYearFactory(parent_element=self.root_group, child_element=self.common_core_element)
         tree = load_tree.load(self.root_node.node_id)
         tree.root_node.children[0]._has_changed = True  # Made some changes
-        persist_tree.persist(tree)
+        tree.root_node.children[0].block = 123
+        report = persist_tree.persist(tree)
         assertion_msg = """
-            Changes were triggered in the Link object, so function GroupelementYear.save() should have been called
+            Changes were triggered in the Link object, so the GroupElementYear should have been updated
         """
-        self.assertTrue(mock.called, assertion_msg)
+        self.assertEqual(report.links_updated, 1, assertion_msg)
+        self.assertEqual(report.links_created, 0)
+        self.assertEqual(GroupElementYear.objects.get(child_element=self.common_core_element).block, 123)
+
+    def test_save_should_report_links_created(self):
+        tree = load_tree.load(self.root_node.node_id)
+        tree.root_node.add_child(self.common_core_node)
+        tree.root_node.children_as_nodes[0].add_child(self.learning_unit_year_node)
+
+        report = persist_tree.persist(tree)
+
+        self.assertEqual(report.links_created, 2)
+        self.assertEqual(report.links_updated, 0)
 
     @patch.object(DetachNodeValidatorList, 'validate')
     def test_delete_when_1_link_has_been_deleted(self, mock_detach):
@@ -140,16 +151,16 @@ class TestPersistTree(TestCase):
 
         path_to_detach = "|".join([str(self.root_node.pk), str(node_to_detach.pk)])
         tree.detach_node(path_to_detach, mock.Mock(), mock.Mock())
-        persist_tree.persist(tree)
+        report = persist_tree.persist(tree)
         self.assertEqual(qs_link_will_be_detached.count(), 0)
+        self.assertEqual(report.links_deleted, 1)
 
-    @patch("program_management.ddd.repositories.persist_tree.__delete_group_element_year")
-    def test_delete_when_nothing_has_been_deleted(self, mock):
+    def test_delete_when_nothing_has_been_deleted(self):
         GroupElementYearFactory(parent_element=self.root_group, child_element=self.common_core_element)
         tree = load_tree.load(self.root_node.node_id)
-        persist_tree.persist(tree)
-        assertion_msg = "No changes made, so function GroupelementYear.delete() should not have been called"
-        self.assertFalse(mock.called, assertion_msg)
+        report = persist_tree.persist(tree)
+        assertion_msg = "No changes made, so no GroupElementYear should have been deleted"
+        self.assertEqual(report.links_deleted, 0, assertion_msg)
 
 
 class TestPersistPrerequisites(TestCase):
@@ -162,13 +173,8 @@ class TestPersistPrerequisites(TestCase):
 
         mock_persist_prerequisite.assert_called_once_with(tree)
 
-    @patch("program_management.ddd.repositories._persist_prerequisite._persist")
-    @patch("program_management.ddd.repositories.persist_tree.__delete_group_element_year")
-    def test_should_call_persist_prerequisites_on_all_children_when_link_deleted(
-            self,
-            mock_delete_group_element_year,
-            mock_persist_prerequisite
-    ):
+    @patch("program_management.ddd.repositories._persist_prerequisite._persist_of_version")
+    def test_should_call_persist_prerequisites_on_all_children_when_link_deleted(self, mock_persist_prerequisite):
         year = 2020
         root_version = EducationGroupVersionFactory(
             offer__academic_year__year=year,
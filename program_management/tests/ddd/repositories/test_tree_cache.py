@@ -0,0 +1,117 @@
+##############################################################################
+#
+#    OSIS stands for Open Student Information System. It's an application
+#    designed to manage the core business of higher education institutions,
+#    such as universities, faculties, institutes and professional schools.
+#    The core business involves the administration of students, teachers,
+#    courses, programs and so on.
+#
+#    Copyright (C) 2015-2020 Université catholique de Louvain (http://www.uclouvain.be)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    A copy of this license - GNU General Public License - is available
+#    at the root of the source code of this program.  If not,
+#    see http://www.gnu.org/licenses/.
+#
+##############################################################################
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from base.tests.factories.group_element_year import GroupElementYearFactory
+from base.utils.cache import VersionStamp
+from program_management.ddd.repositories import tree_cache
+from program_management.tests.ddd.factories.link import LinkFactory
+from program_management.tests.ddd.factories.program_tree import ProgramTreeFactory
+
+
+@override_settings(PROGRAM_TREE_CACHE_ENABLED=True)
+class TestProgramTreeCache(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        tree_cache.ProgramTreeCache._local_cache.clear()
+        self.tree = ProgramTreeFactory(root_node__node_id=1)
+        LinkFactory(parent=self.tree.root_node, child__node_id=2)
+
+    def test_should_return_nothing_when_tree_not_cached(self):
+        self.assertDictEqual(tree_cache.ProgramTreeCache().get_many([self.tree.root_node.pk]), {})
+
+    def test_should_return_copy_of_cached_tree(self):
+        tree_cache.ProgramTreeCache().set_many([self.tree])
+
+        result = tree_cache.ProgramTreeCache().get_many([self.tree.root_node.pk])
+
+        cached_tree = result[self.tree.root_node.pk]
+        self.assertIsNot(cached_tree, self.tree)
+        self.assertEqual(cached_tree.entity_id, self.tree.entity_id)
+        self.assertListEqual(
+            [link.child.entity_id for link in cached_tree.root_node.children],
+            [link.child.entity_id for link in self.tree.root_node.children],
+        )
+
+    def test_should_share_cached_tree_between_processes(self):
+        tree_cache.ProgramTreeCache().set_many([self.tree])
+        tree_cache.ProgramTreeCache._local_cache.clear()
+
+        result = tree_cache.ProgramTreeCache().get_many([self.tree.root_node.pk])
+
+        self.assertIn(self.tree.root_node.pk, result)
+
+    def test_should_ignore_trees_cached_before_new_version(self):
+        tree_cache.ProgramTreeCache().set_many([self.tree])
+        VersionStamp(tree_cache.TREE_VERSION_KEY.format(root_id=self.tree.root_node.pk)).bump()
+
+        self.assertDictEqual(tree_cache.ProgramTreeCache().get_many([self.tree.root_node.pk]), {})
+
+    def test_should_keep_other_trees_when_a_tree_version_changes(self):
+        other_tree = ProgramTreeFactory(root_node__node_id=3)
+        tree_cache.ProgramTreeCache().set_many([self.tree, other_tree])
+        VersionStamp(tree_cache.TREE_VERSION_KEY.format(root_id=self.tree.root_node.pk)).bump()
+
+        result = tree_cache.ProgramTreeCache().get_many([self.tree.root_node.pk, other_tree.root_node.pk])
+
+        self.assertListEqual(list(result), [other_tree.root_node.pk])
+
+    @override_settings(PROGRAM_TREE_CACHE_ENABLED=False)
+    def test_should_not_cache_when_disabled(self):
+        tree_cache.ProgramTreeCache().set_many([self.tree])
+
+        self.assertDictEqual(tree_cache.ProgramTreeCache().get_many([self.tree.root_node.pk]), {})
+
+
+class TestBumpTreeVersions(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.link = GroupElementYearFactory()
+        cls.parent_link = GroupElementYearFactory(child_element=cls.link.parent_element)
+        cls.other_link = GroupElementYearFactory()
+
+    def setUp(self):
+        cache.clear()
+
+    def test_should_bump_versions_of_element_and_its_ancestors_only(self):
+        elements = [
+            self.link.child_element, self.link.parent_element, self.parent_link.parent_element,
+            self.other_link.parent_element
+        ]
+        versions_before = [self._get_version(element) for element in elements]
+
+        tree_cache._bump_tree_versions([self.link.child_element.pk])
+
+        versions_after = [self._get_version(element) for element in elements]
+        self.assertListEqual(
+            [before != after for before, after in zip(versions_before, versions_after)],
+            [True, True, True, False]
+        )
+
+    @staticmethod
+    def _get_version(element) -> int:
+        return VersionStamp(tree_cache.TREE_VERSION_KEY.format(root_id=element.pk)).get()
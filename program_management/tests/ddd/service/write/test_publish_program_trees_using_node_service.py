@@ -21,10 +21,12 @@
 #  at the root of the source code of this program.  If not,
 #  see http://www.gnu.org/licenses/.
 # ############################################################################
+import collections
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
 from unittest import mock
 
-from django.http import HttpResponse
-from django.test import TestCase
+from django.test import TestCase, override_settings
 
 from base.models.enums.education_group_types import TrainingType, MiniTrainingType
 from program_management.ddd import command
@@ -52,23 +54,47 @@ class TestPublishProgramTreesUsingNodeService(TestCase):
         self.mocked_get_pgrm_trees = self.get_pgrm_trees_patcher.start()
         self.addCleanup(self.get_pgrm_trees_patcher.stop)
 
-        self.get_publish_url_patcher = mock.patch(
-            "program_management.ddd.service.write.publish_program_trees_using_node_service."
-            "GetNodePublishUrl.get_url_from_node",
-            return_value="dummy-url"
-        )
-        self.mocked_get_publish_url = self.get_publish_url_patcher.start()
-        self.addCleanup(self.get_publish_url_patcher.stop)
+    @mock.patch("program_management.ddd.service.write.publish_program_trees_using_node_service._bulk_publish")
+    @mock.patch("django.db.transaction.on_commit")
+    def test_publish_once_transaction_committed(self, mock_on_commit, mock_bulk_publish):
+        result = publish_program_trees_using_node_service.publish_program_trees_using_node(self.cmd)
+
+        self.assertEqual(result, [self.program_tree.entity_id])
+        self.assertFalse(mock_bulk_publish.called)
+        publish_callback = mock_on_commit.call_args[0][0]
+        publish_callback()
+        mock_bulk_publish.assert_called_once_with([self.program_tree.root_node])
 
-    @mock.patch('requests.get', return_value=HttpResponse)
-    @mock.patch('threading.Thread')
-    def test_publish_call_seperate_thread(self, mock_thread, mock_requests_get):
-        mock_thread.start.return_value = True
-        publish_program_trees_using_node_service.publish_program_trees_using_node(self.cmd)
-        self.assertTrue(mock_thread.start)
 
+class FakePortalRequestHandler(BaseHTTPRequestHandler):
+    requests_by_path = collections.Counter()
+    failures_by_path = {}
 
+    def do_GET(self):
+        self.requests_by_path[self.path] += 1
+        failures = self.failures_by_path.get(self.path, 0)
+        self.send_response(500 if self.requests_by_path[self.path] <= failures else 200)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@override_settings(PUBLICATION_MAX_WORKERS=2, PUBLICATION_RETRIES=3, PUBLICATION_COALESCE_WINDOW=0)
 class TestBulkPublish(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = HTTPServer(('127.0.0.1', 0), FakePortalRequestHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
     @classmethod
     def setUpTestData(cls):
         cls.minor = NodeGroupYearFactory(node_type=MiniTrainingType.ACCESS_MINOR)
@@ -77,24 +103,70 @@ class TestBulkPublish(TestCase):
         cls.training = NodeGroupYearFactory(node_type=TrainingType.PGRM_MASTER_120)
 
     def setUp(self):
-        self.requests_get_patcher = mock.patch('requests.get', return_value=HttpResponse)
-        self.mocked_requests_get = self.requests_get_patcher.start()
-        self.addCleanup(self.requests_get_patcher.stop)
+        FakePortalRequestHandler.requests_by_path.clear()
+        FakePortalRequestHandler.failures_by_path.clear()
 
         self.get_publish_url_patcher = mock.patch(
             "program_management.ddd.service.write.publish_program_trees_using_node_service."
             "GetNodePublishUrl.get_url_from_node",
-            return_value="dummy-url"
+            side_effect=lambda node: "http://127.0.0.1:{}/{}".format(self.server.server_port, node.code)
         )
         self.mocked_get_publish_url = self.get_publish_url_patcher.start()
         self.addCleanup(self.get_publish_url_patcher.stop)
 
+        self.backoff_patcher = mock.patch(
+            "program_management.ddd.service.write.publish_program_trees_using_node_service.RETRY_BACKOFF_SECONDS", 0
+        )
+        self.backoff_patcher.start()
+        self.addCleanup(self.backoff_patcher.stop)
+
+    def _bulk_publish(self, nodes):
+        publish_program_trees_using_node_service._bulk_publish(nodes)
+        publish_program_trees_using_node_service.publication_queue.join()
+
+    def _get_status(self, node):
+        return publish_program_trees_using_node_service.get_publication_status(node.entity_id)
+
     def test_assert_multiple_publication_call(self):
-        publish_program_trees_using_node_service._bulk_publish([
-            self.minor,
-            self.deepening,
-            self.major,
-            self.training
-        ])
-        self.assertEqual(self.mocked_requests_get.call_count, 4)
+        nodes = [self.minor, self.deepening, self.major, self.training]
+        self._bulk_publish(nodes)
+
+        self.assertEqual(sum(FakePortalRequestHandler.requests_by_path.values()), 4)
+        for node in nodes:
+            self.assertEqual(self._get_status(node)['status'], publish_program_trees_using_node_service.PUBLISHED)
+
+    def test_should_retry_publication_in_error(self):
+        FakePortalRequestHandler.failures_by_path['/' + self.minor.code] = 1
+        self._bulk_publish([self.minor])
+
+        status = self._get_status(self.minor)
+        self.assertEqual(status['status'], publish_program_trees_using_node_service.PUBLISHED)
+        self.assertEqual(status['attempts'], 2)
+
+    def test_should_record_failure_when_all_attempts_in_error(self):
+        FakePortalRequestHandler.failures_by_path['/' + self.minor.code] = 3
+        self._bulk_publish([self.minor])
+
+        status = self._get_status(self.minor)
+        self.assertEqual(status['status'], publish_program_trees_using_node_service.FAILED)
+        self.assertEqual(status['attempts'], 3)
+        self.assertTrue(status['error'])
+
+    @mock.patch(
+        "program_management.ddd.service.write.publish_program_trees_using_node_service._publish_on_portal",
+        side_effect=ValueError("unexpected")
+    )
+    def test_should_record_failure_when_unexpected_error(self, mock_publish_on_portal):
+        self._bulk_publish([self.minor])
+
+        status = self._get_status(self.minor)
+        self.assertEqual(status['status'], publish_program_trees_using_node_service.FAILED)
+        self.assertEqual(status['attempts'], 1)
+        self.assertEqual(status['error'], "unexpected")
+
+    @override_settings(PUBLICATION_COALESCE_WINDOW=1)
+    def test_should_merge_publications_of_same_node_within_window(self):
+        self._bulk_publish([self.minor, self.minor, self.minor, self.training])
 
+        self.assertEqual(FakePortalRequestHandler.requests_by_path['/' + self.minor.code], 1)
+        self.assertEqual(FakePortalRequestHandler.requests_by_path['/' + self.training.code], 1)
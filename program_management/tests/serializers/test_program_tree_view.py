@@ -25,11 +25,14 @@
 ##############################################################################
 from django.test import TestCase
 
+from base.tests.factories.user import SuperUserFactory, UserFactory
 from program_management.ddd.domain.program_tree import ProgramTree
 from program_management.serializers.node_view import NodeViewContext
-from program_management.serializers.program_tree_view import program_tree_view_serializer
+from program_management.serializers.program_tree_view import program_tree_view_serializer, \
+    get_tree_allowed_actions, TREE_NODE_PERMISSIONS
 from program_management.tests.ddd.factories.link import LinkFactory
 from program_management.tests.ddd.factories.node import NodeGroupYearFactory, NodeLearningUnitYearFactory
+from program_management.tests.factories.element import ElementGroupYearFactory
 
 
 class TestProgramTreeViewSerializer(TestCase):
@@ -118,3 +121,33 @@ class TestProgramTreeViewSerializer(TestCase):
         serialized_data = program_tree_view_serializer(self.tree, self.context)
         self.assertEqual(serialized_data['text'],
                          "{} - {}{}".format(self.root_node.code, self.root_node.title, "[CEMS]"))
+
+
+class TestGetTreeAllowedActions(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.root_element = ElementGroupYearFactory()
+        cls.subgroup_element = ElementGroupYearFactory()
+
+    def setUp(self):
+        root_node = NodeGroupYearFactory(node_id=self.root_element.pk)
+        subgroup = NodeGroupYearFactory(node_id=self.subgroup_element.pk)
+        LinkFactory(parent=root_node, child=subgroup)
+        LinkFactory(parent=subgroup, child=NodeLearningUnitYearFactory())
+        self.tree = ProgramTree(root_node=root_node)
+
+    def test_should_return_permissions_on_each_group_by_element_id(self):
+        allowed_actions = get_tree_allowed_actions(self.tree, SuperUserFactory())
+
+        all_allowed = {perm: True for perm in TREE_NODE_PERMISSIONS}
+        self.assertDictEqual(
+            allowed_actions,
+            {self.root_element.pk: all_allowed, self.subgroup_element.pk: all_allowed}
+        )
+
+    def test_should_deny_actions_to_user_without_role(self):
+        allowed_actions = get_tree_allowed_actions(self.tree, UserFactory())
+
+        for perms in allowed_actions.values():
+            self.assertFalse(any(perms.values()))
+        self.assertCountEqual(allowed_actions.keys(), [self.root_element.pk, self.subgroup_element.pk])
@@ -95,3 +95,26 @@ class GeneralInformationPublishViewTestCase(TestCase):
         self.assertEqual(len(msg), 1)
         self.assertIn(messages.ERROR, msg_level)
         self.assertEqual(response.status_code, HttpResponseRedirect.status_code)
+
+
+class PublicationStatusViewTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.person = PersonWithPermissionsFactory('view_educationgroup')
+        cls.url = reverse('publish_general_information_status', kwargs={'code': 'LDROI100', 'year': 2018})
+
+    def setUp(self):
+        self.client.force_login(self.person.user)
+
+    def test_should_return_no_status_when_never_published(self):
+        response = self.client.get(self.url)
+        self.assertDictEqual(response.json(), {'status': None})
+
+    @mock.patch("program_management.views.publish_general_information."
+                "publish_program_trees_using_node_service.get_publication_status",
+                return_value={'status': 'PUBLISHED', 'attempts': 1, 'error': None, 'changed': '2020-09-01T10:00:00'})
+    def test_should_return_status_of_node(self, mock_get_status):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.json()['status'], 'PUBLISHED')
+        mock_get_status.assert_called_once_with(NodeIdentity(code='LDROI100', year=2018))
@@ -123,6 +123,11 @@ urlpatterns = [
             name="create_education_group_version"
         ),
         path('publish', publish_general_information.publish, name='publish_general_information'),
+        path(
+            'publish/status',
+            publish_general_information.publication_status,
+            name='publish_general_information_status'
+        ),
         path('delete/', TreeVersionDeleteView.as_view(), name='delete_permanently_tree_version'),
     ])),
 
@@ -28,6 +28,8 @@ from django.http import HttpResponse
 from django.shortcuts import render
 from django.utils.translation import gettext_lazy as _
 
+from base.business.export_job import count_program_tree_links
+from base.views.export_job import export_in_background
 from osis_common.decorators.download import set_download_cookie
 from osis_common.document.xls_build import CONTENT_TYPE_XLS
 from program_management.business.excel import EducationGroupYearLearningUnitsPrerequisitesToExcel, \
@@ -39,6 +41,7 @@ from program_management.forms.custom_xls import CustomXlsForm
 @login_required
 @permission_required('base.view_educationgroup', raise_exception=True)
 @set_download_cookie
+@export_in_background(count_program_tree_links, 'EXPORT_JOB_TREE_LINKS_THRESHOLD')
 def get_learning_unit_prerequisites_excel(request, year, code):
     excel = EducationGroupYearLearningUnitsPrerequisitesToExcel(year, code).to_excel()
     response = HttpResponse(excel['workbook'], content_type=CONTENT_TYPE_XLS)
@@ -55,6 +58,7 @@ def get_learning_unit_prerequisites_excel(request, year, code):
 @login_required
 @permission_required('base.view_educationgroup', raise_exception=True)
 @set_download_cookie
+@export_in_background(count_program_tree_links, 'EXPORT_JOB_TREE_LINKS_THRESHOLD')
 def get_learning_units_is_prerequisite_for_excel(request, year, code):
     excel = EducationGroupYearLearningUnitsIsPrerequisiteOfToExcel(year, code).to_excel()
     response = HttpResponse(excel["workbook"], content_type=CONTENT_TYPE_XLS)
@@ -71,6 +75,7 @@ def get_learning_units_is_prerequisite_for_excel(request, year, code):
 @login_required
 @permission_required('base.view_educationgroup', raise_exception=True)
 @set_download_cookie
+@export_in_background(count_program_tree_links, 'EXPORT_JOB_TREE_LINKS_THRESHOLD')
 def get_learning_units_of_training_for_excel(request, year: int, code: str):
     excel = EducationGroupYearLearningUnitsContainedToExcel(CustomXlsForm(request.POST or None, year=year, code=code),
                                                             year,
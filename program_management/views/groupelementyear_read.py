@@ -31,6 +31,8 @@ from waffle.decorators import waffle_switch
 
 from program_management.forms.pdf_select_language import PDFSelectLanguage
 from base.models.enums.education_group_types import GroupType
+from base.business.export_job import count_program_tree_links
+from base.views.export_job import export_in_background
 from base.views.mixins import FlagMixin, AjaxTemplateMixin
 from osis_common.document.pdf_build import render_pdf
 from program_management.ddd.domain.node import NodeIdentity
@@ -50,6 +52,7 @@ USUAL_NUMBER_OF_BLOCKS = 3
 
 @login_required
 @waffle_switch('education_group_year_generate_pdf')
+@export_in_background(count_program_tree_links, 'EXPORT_JOB_TREE_LINKS_THRESHOLD')
 def pdf_content(request, year, code, language):
     node_id = NodeIdentity(code=code, year=year)
 
@@ -25,13 +25,14 @@
 ##############################################################################
 from django.contrib.auth.decorators import login_required
 from django.utils.translation import gettext_lazy as _
-from django.http import HttpResponseRedirect, Http404
+from django.http import HttpResponseRedirect, Http404, JsonResponse
 from django.urls import reverse
-from django.views.decorators.http import require_http_methods
+from django.views.decorators.http import require_http_methods, require_GET
 
 from base.views.common import display_error_messages, display_success_messages
 from program_management.ddd import command as command_program_management
 from program_management.ddd.domain.exception import ProgramTreeNotFoundException
+from program_management.ddd.domain.node import NodeIdentity
 from program_management.ddd.service.write.publish_program_trees_using_node_service import PublishNodesException
 from program_management.ddd.service.read import get_program_tree_service
 from program_management.ddd.service.write import publish_program_trees_using_node_service
@@ -67,3 +68,10 @@ def publish(request, year, code):
         url_name = 'group_general_information'
     default_redirect_view = reverse(url_name, kwargs={'year': year, 'code': code})
     return HttpResponseRedirect(request.META.get('HTTP_REFERER', default_redirect_view))
+
+
+@login_required
+@require_GET
+def publication_status(request, year, code):
+    status = publish_program_trees_using_node_service.get_publication_status(NodeIdentity(code=code, year=year))
+    return JsonResponse(status or {'status': None})
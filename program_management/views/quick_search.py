@@ -29,6 +29,7 @@ from django_filters import FilterSet, filters, OrderingFilter
 from django_filters.views import FilterView
 
 from base.forms.learning_unit.search.quick_search import QuickLearningUnitYearFilter
+from base.models import search_index
 from base.models.academic_year import AcademicYear
 from base.models.learning_unit_year import LearningUnitYear
 from base.utils.cache import CacheFilterMixin
@@ -41,6 +42,9 @@ from learning_unit.api.serializers.learning_unit import LearningUnitSerializer
 
 CACHE_TIMEOUT = 60
 
+# Filtered field : field of the search index entry
+QUICK_SEARCH_INDEX_FIELDS = {'acronym': 'acronym', 'partial_acronym': 'code', 'title_fr': 'title'}
+
 
 class QuickGroupYearFilter(FilterSet):
     academic_year = filters.ModelChoiceFilter(
@@ -52,21 +56,21 @@ class QuickGroupYearFilter(FilterSet):
     )
     acronym = filters.CharFilter(
         field_name="acronym",
-        lookup_expr='icontains',
+        method="filter_group_year_field",
         max_length=40,
         required=False,
         label=_('Acronym/Short title'),
     )
     partial_acronym = filters.CharFilter(
         field_name="partial_acronym",
-        lookup_expr='icontains',
+        method="filter_group_year_field",
         max_length=40,
         required=False,
         label=_('Code'),
     )
     title = filters.CharFilter(
         field_name="title_fr",
-        lookup_expr='icontains',
+        method="filter_group_year_field",
         max_length=255,
         required=False,
         label=_('Title')
@@ -106,6 +110,14 @@ class QuickGroupYearFilter(FilterSet):
             return GroupYear.objects.none()
         return GroupYear.objects.all()
 
+    @staticmethod
+    def filter_group_year_field(queryset, name, value):
+        if search_index.is_enabled():
+            return search_index.filter_by_search_index(
+                queryset, search_index.GROUP_YEAR, QUICK_SEARCH_INDEX_FIELDS[name], value
+            )
+        return queryset.filter(**{"{}__icontains".format(name): value})
+
 
 class QuickSearchGroupYearView(PermissionRequiredMixin, CacheFilterMixin, AjaxTemplateMixin, SearchMixin,
                                FilterView):
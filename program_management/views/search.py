@@ -83,18 +83,21 @@ class EducationGroupSearch(LoginRequiredMixin, PermissionRequiredMixin, CacheFil
 
     serializer_class = EducationGroupSerializer
     cache_search = True
-    cache_exclude_params = ['xls_status']
+    cache_exclude_params = ['xls_status', 'cursor']
+    keyset_pagination = True
 
     def get_context_data(self, **kwargs):
         person = get_object_or_404(Person, user=self.request.user)
         context = super().get_context_data(**kwargs)
         starting_ac = starting_academic_year()
-        if context["paginator"].count == 0 and self.request.GET:
+        # The pages following a cursor are served without counting the rows
+        count = None if self._is_keyset_pagination_requested() else context["paginator"].count
+        if count == 0 and self.request.GET:
             messages.add_message(self.request, messages.WARNING, _('No result!'))
         context.update({
             'person': person,
             'form': context["filter"].form,
-            'object_list_count': context["paginator"].count,
+            'object_list_count': count,
             'current_academic_year': starting_ac,
             'items_per_page': context["paginator"].per_page,
             'enums': education_group_categories,
@@ -4,7 +4,8 @@ from django.views.decorators.http import require_GET
 
 from program_management.ddd import command
 from program_management.ddd.service.read import node_identity_service, get_program_tree_service
-from program_management.serializers.program_tree_view import program_tree_view_serializer
+from program_management.serializers.program_tree_view import program_tree_view_serializer, \
+    get_tree_allowed_actions
 from program_management.serializers.node_view import NodeViewContext
 
 
@@ -21,7 +22,8 @@ def tree_json_view(request, root_id: int):
         node_view_context = NodeViewContext(
             view_path=request.GET.get('path', str(tree.root_node.pk)),
             root_node=tree.root_node,
-            current_path=str(tree.root_node.pk)
+            current_path=str(tree.root_node.pk),
+            allowed_actions=get_tree_allowed_actions(tree, request.user),
         )
         return JsonResponse(program_tree_view_serializer(tree, node_view_context))
     return HttpResponseBadRequest()
@@ -85,7 +85,8 @@ class AdmissionConditionSectionSerializer(serializers.Serializer):
         try:
             return AdmissionCondition.objects.get(education_group_year_id=offer.id)
         except AdmissionCondition.DoesNotExist:
-            return AdmissionCondition.objects.create(education_group_year_id=offer.id)
+            # Serialize empty conditions : a read must not create any row
+            return AdmissionCondition(education_group_year=offer)
 
 
 class ContactsSectionSerializer(serializers.Serializer):
@@ -27,7 +27,10 @@ import functools
 
 from django.db.models import Q
 from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
 from rest_framework import generics
+from rest_framework.response import Response
 
 from base.business.education_groups import general_information_sections
 from education_group.ddd import command
@@ -37,6 +40,7 @@ from osis_common.utils.models import get_object_or_none
 from program_management.ddd.domain.program_tree import ProgramTreeIdentity
 from program_management.ddd.repositories.program_tree import ProgramTreeRepository
 from program_management.models.education_group_version import EducationGroupVersion
+from webservices import cache
 from webservices.api.serializers.general_information import GeneralInformationSerializer
 
 
@@ -47,6 +51,29 @@ class GeneralInformation(generics.RetrieveAPIView):
     name = 'generalinformations_read'
     serializer_class = GeneralInformationSerializer
 
+    def retrieve(self, request, *args, **kwargs):
+        if not cache.is_general_information_cache_enabled():
+            return super().retrieve(request, *args, **kwargs)
+
+        payload = self.get_payload()
+        response = Response(payload['data'])
+        response['ETag'] = payload['etag']
+        response['Last-Modified'] = http_date(payload['last_modified'])
+        return get_conditional_response(
+            request,
+            etag=payload['etag'],
+            last_modified=payload['last_modified'],
+            response=response
+        )
+
+    def get_payload(self) -> dict:
+        return cache.get_or_set_general_information_payload(
+            self.kwargs['acronym'],
+            self.kwargs['year'],
+            self.kwargs['language'],
+            lambda: self.get_serializer(self.get_object()).data
+        )
+
     def get_object(self):
         group = self.get_group()
         identity = ProgramTreeIdentity(code=group.code, year=group.year)
@@ -102,3 +129,18 @@ class GeneralInformation(generics.RetrieveAPIView):
     def get_offer(self):
         version = self.get_education_group_version()
         return version.offer
+
+
+def build_general_information_payload(acronym: str, year: int, language: str) -> dict:
+    """ Compute and cache the general information of a programme outside of a request (see warm-up command) """
+    view = GeneralInformation(
+        kwargs={'acronym': acronym, 'year': year, 'language': language},
+        request=None,
+        format_kwarg=None
+    )
+    return cache.set_general_information_payload(
+        acronym,
+        year,
+        language,
+        lambda: view.get_serializer(view.get_object()).data
+    )
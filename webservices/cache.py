@@ -0,0 +1,100 @@
+##############################################################################
+#
+#    OSIS stands for Open Student Information System. It's an application
+#    designed to manage the core business of higher education institutions,
+#    such as universities, faculties, institutes and professional schools.
+#    The core business involves the administration of students, teachers,
+#    courses, programs and so on.
+#
+#    Copyright (C) 2015-2020 Université catholique de Louvain (http://www.uclouvain.be)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    A copy of this license - GNU General Public License - is available
+#    at the root of the source code of this program.  If not,
+#    see http://www.gnu.org/licenses/.
+#
+##############################################################################
+import hashlib
+import json
+import time
+from typing import Callable, Dict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+
+from base.utils.cache import VersionStamp
+
+GENERAL_INFORMATION_VERSION = VersionStamp('webservices_general_information_version')
+GENERAL_INFORMATION_PAYLOAD_KEY = 'webservices_general_information_{acronym}_{year}_{language}_v{version}'
+
+
+def is_general_information_cache_enabled() -> bool:
+    return getattr(settings, 'GENERAL_INFORMATION_CACHE_ENABLED', False)
+
+
+def get_or_set_general_information_payload(
+        acronym: str,
+        year: int,
+        language: str,
+        compute_data_fn: Callable[[], Dict]
+) -> Dict:
+    """
+    Return the general information payload cached for the programme or compute it.
+    :return: The payload, i.e. {'data': serialized data, 'etag': str, 'last_modified': timestamp}
+    """
+    key = _get_payload_key(acronym, year, language)
+    payload = cache.get(key)
+    if payload is None:
+        payload = _set_payload(key, compute_data_fn())
+    return payload
+
+
+def set_general_information_payload(
+        acronym: str,
+        year: int,
+        language: str,
+        compute_data_fn: Callable[[], Dict]
+) -> Dict:
+    """
+    Compute the general information payload of the programme and cache it.
+    The version is read before computing : a payload computed while an invalidation is committed is stored under
+    the outdated version and never served.
+    """
+    key = _get_payload_key(acronym, year, language)
+    return _set_payload(key, compute_data_fn())
+
+
+def _set_payload(key: str, data: Dict) -> Dict:
+    data = json.loads(json.dumps(data, cls=DjangoJSONEncoder))
+    payload = {
+        'data': data,
+        'etag': '"{}"'.format(hashlib.md5(json.dumps(data, sort_keys=True).encode()).hexdigest()),
+        'last_modified': int(time.time()),
+    }
+    cache.set(key, payload, timeout=settings.GENERAL_INFORMATION_CACHE_TIMEOUT)
+    return payload
+
+
+def invalidate_general_information_payloads() -> None:
+    """ Drop the general information payloads of all the programmes once the current transaction is committed """
+    if is_general_information_cache_enabled():
+        GENERAL_INFORMATION_VERSION.bump_on_commit()
+
+
+def _get_payload_key(acronym: str, year: int, language: str) -> str:
+    return GENERAL_INFORMATION_PAYLOAD_KEY.format(
+        acronym=acronym.upper(),
+        year=year,
+        language=language.lower(),
+        version=GENERAL_INFORMATION_VERSION.get()
+    )
@@ -0,0 +1,65 @@
+##############################################################################
+#
+#    OSIS stands for Open Student Information System. It's an application
+#    designed to manage the core business of higher education institutions,
+#    such as universities, faculties, institutes and professional schools.
+#    The core business involves the administration of students, teachers,
+#    courses, programs and so on.
+#
+#    Copyright (C) 2015-2020 Université catholique de Louvain (http://www.uclouvain.be)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    A copy of this license - GNU General Public License - is available
+#    at the root of the source code of this program.  If not,
+#    see http://www.gnu.org/licenses/.
+#
+##############################################################################
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.http import Http404
+
+from base.business.education_groups import general_information_sections
+from program_management.models.education_group_version import EducationGroupVersion
+from webservices.api.views.general_information import build_general_information_payload
+from webservices.cache import is_general_information_cache_enabled
+
+
+class Command(BaseCommand):
+    help = "Compute and cache the general information of every programme published on the portal for a year"
+
+    def add_arguments(self, parser):
+        parser.add_argument('year', type=int)
+        parser.add_argument(
+            '--languages',
+            nargs='+',
+            default=[settings.LANGUAGE_CODE_FR[:2], settings.LANGUAGE_CODE_EN],
+        )
+
+    def handle(self, *args, **options):
+        if not is_general_information_cache_enabled():
+            raise CommandError("GENERAL_INFORMATION_CACHE_ENABLED must be set to warm the general information cache")
+
+        acronyms = EducationGroupVersion.standard.filter(
+            offer__academic_year__year=options['year'],
+            offer__education_group_type__name__in=general_information_sections.SECTIONS_PER_OFFER_TYPE.keys(),
+            is_transition=False
+        ).values_list('offer__acronym', flat=True).order_by('offer__acronym')
+
+        payloads_count = 0
+        for acronym in acronyms:
+            for language in options['languages']:
+                try:
+                    build_general_information_payload(acronym, options['year'], language)
+                    payloads_count += 1
+                except Http404:
+                    self.stderr.write("{} - {} ({}) : not found".format(acronym, options['year'], language))
+        self.stdout.write(self.style.SUCCESS("{} general information payloads cached".format(payloads_count)))
@@ -0,0 +1,50 @@
+##############################################################################
+#
+#    OSIS stands for Open Student Information System. It's an application
+#    designed to manage the core business of higher education institutions,
+#    such as universities, faculties, institutes and professional schools.
+#    The core business involves the administration of students, teachers,
+#    courses, programs and so on.
+#
+#    Copyright (C) 2015-2020 Université catholique de Louvain (http://www.uclouvain.be)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    A copy of this license - GNU General Public License - is available
+#    at the root of the source code of this program.  If not,
+#    see http://www.gnu.org/licenses/.
+#
+##############################################################################
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from base.models.admission_condition import AdmissionCondition, AdmissionConditionLine
+from base.models.education_group_achievement import EducationGroupAchievement
+from base.models.education_group_detailed_achievement import EducationGroupDetailedAchievement
+from base.models.education_group_publication_contact import EducationGroupPublicationContact
+from base.models.education_group_year import EducationGroupYear
+from base.models.group_element_year import GroupElementYear
+from cms.models.translated_text import TranslatedText
+from education_group.models.group_year import GroupYear
+from webservices.cache import invalidate_general_information_payloads
+
+
+@receiver([post_save, post_delete], sender=TranslatedText)
+@receiver([post_save, post_delete], sender=AdmissionCondition)
+@receiver([post_save, post_delete], sender=AdmissionConditionLine)
+@receiver([post_save, post_delete], sender=EducationGroupAchievement)
+@receiver([post_save, post_delete], sender=EducationGroupDetailedAchievement)
+@receiver([post_save, post_delete], sender=EducationGroupPublicationContact)
+@receiver([post_save, post_delete], sender=EducationGroupYear)
+@receiver([post_save, post_delete], sender=GroupYear)
+@receiver([post_save, post_delete], sender=GroupElementYear)
+def invalidate_general_information_on_change(sender, **kwargs):
+    invalidate_general_information_payloads()
@@ -26,6 +26,8 @@
 from unittest import mock
 
 from django.conf import settings
+from django.core.cache import cache as django_cache
+from django.test import override_settings
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase
@@ -44,6 +46,7 @@ from education_group.tests.factories.group_year import GroupYearFactory
 from program_management.ddd.repositories import load_tree
 from program_management.tests.factories.education_group_version import StandardEducationGroupVersionFactory
 from program_management.tests.factories.element import ElementFactory
+from webservices import cache
 from webservices.api.serializers.general_information import GeneralInformationSerializer
 from webservices.business import EVALUATION_KEY, SKILLS_AND_ACHIEVEMENTS_INTRO, SKILLS_AND_ACHIEVEMENTS_EXTRA
 
@@ -174,3 +177,43 @@ class GeneralInformationTestCase(APITestCase):
             }
         )
         self.assertEqual(response.data, serializer.data)
+
+    @override_settings(GENERAL_INFORMATION_CACHE_ENABLED=True)
+    def test_get_results_from_cache_with_etag(self):
+        django_cache.clear()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response['ETag']
+
+        with mock.patch("webservices.api.views.general_information.GeneralInformation.get_object") as mock_get_object:
+            cached_response = self.client.get(self.url)
+            self.assertFalse(mock_get_object.called)
+        self.assertEqual(cached_response['ETag'], etag)
+        self.assertEqual(cached_response.json(), response.json())
+
+        not_modified_response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(not_modified_response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    @override_settings(GENERAL_INFORMATION_CACHE_ENABLED=True)
+    def test_get_results_computed_again_when_general_information_changed(self):
+        django_cache.clear()
+        response = self.client.get(self.url)
+        self.assertTrue(response.json()['sections'])
+
+        cache.GENERAL_INFORMATION_VERSION.bump()
+        with mock.patch.object(GeneralInformationSerializer, 'get_sections', return_value=[]):
+            response = self.client.get(self.url)
+        self.assertListEqual(response.json()['sections'], [])
+
+    @override_settings(GENERAL_INFORMATION_CACHE_ENABLED=True)
+    def test_payload_computed_while_general_information_changed_is_not_served(self):
+        django_cache.clear()
+
+        def get_sections_changed_meanwhile(*args, **kwargs):
+            cache.GENERAL_INFORMATION_VERSION.bump()
+            return []
+
+        with mock.patch.object(GeneralInformationSerializer, 'get_sections', side_effect=get_sections_changed_meanwhile):
+            self.client.get(self.url)
+        response = self.client.get(self.url)
+        self.assertTrue(response.json()['sections'])
@@ -0,0 +1,57 @@
+##############################################################################
+#
+#    OSIS stands for Open Student Information System. It's an application
+#    designed to manage the core business of higher education institutions,
+#    such as universities, faculties, institutes and professional schools.
+#    The core business involves the administration of students, teachers,
+#    courses, programs and so on.
+#
+#    Copyright (C) 2015-2020 Université catholique de Louvain (http://www.uclouvain.be)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    A copy of this license - GNU General Public License - is available
+#    at the root of the source code of this program.  If not,
+#    see http://www.gnu.org/licenses/.
+#
+##############################################################################
+from unittest import mock
+
+from django.test import TestCase
+
+from base.tests.factories.admission_condition import AdmissionConditionFactory
+from base.tests.factories.group_element_year import GroupElementYearFactory
+from cms.tests.factories.translated_text import TranslatedTextFactory
+
+
+@mock.patch("webservices.signals.invalidate_general_information_payloads")
+class TestInvalidateGeneralInformationOnChange(TestCase):
+    def test_should_invalidate_when_translated_text_saved(self, mock_invalidate):
+        TranslatedTextFactory()
+        self.assertTrue(mock_invalidate.called)
+
+    def test_should_invalidate_when_admission_condition_deleted(self, mock_invalidate):
+        admission_condition = AdmissionConditionFactory()
+        mock_invalidate.reset_mock()
+
+        admission_condition.delete()
+        self.assertTrue(mock_invalidate.called)
+
+    def test_should_invalidate_when_group_element_year_saved(self, mock_invalidate):
+        GroupElementYearFactory()
+        self.assertTrue(mock_invalidate.called)
+
+    def test_should_invalidate_when_group_element_year_deleted(self, mock_invalidate):
+        group_element_year = GroupElementYearFactory()
+        mock_invalidate.reset_mock()
+
+        group_element_year.delete()
+        self.assertTrue(mock_invalidate.called)